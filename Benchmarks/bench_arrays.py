@@ -0,0 +1,66 @@
+""" Headless benchmark of array ingestion (ironplot_arrays).
+Reports conversion throughput (million samples per second) by dtype and memory layout.
+Under IronPython, with IronPlot.dll on the path, the block copy into a .NET double[]
+(GeneralArray.ToDoubleArray) is timed as well.
+Usage: python bench_arrays.py [--size N] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_arrays import asdoublearray
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    from IronPlot import GeneralArray
+except Exception:
+    GeneralArray = None
+
+
+def layouts(size, dtype):
+    """ Yield (name, data) pairs of the same number of samples in different layouts.
+    """
+    base = (np.arange(2 * size) % 1000).astype(dtype)
+    yield 'contiguous', base[:size]
+    yield 'strided', base[::2]
+    side = int(np.sqrt(size))
+    yield 'transposed', base[:side * side].reshape(side, side).T
+    if dtype == np.float64:
+        yield 'list', base[:size].tolist()
+
+
+def run(size, repeat):
+    """ Return a list of result dictionaries, one per dtype and layout.
+    """
+    results = []
+    for dtype in [np.float64, np.float32, np.int64, np.int32, np.int16, np.uint8]:
+        for layout, data in layouts(size, dtype):
+            n = len(data) if isinstance(data, list) else data.size
+            elapsed = timeit(lambda: asdoublearray(data), repeat)
+            result = {'dtype': np.dtype(dtype).name, 'layout': layout, 'samples': n,
+                      'seconds': elapsed, 'msps': rate(n, elapsed)}
+            if GeneralArray is not None:
+                buffer = asdoublearray(data)
+                elapsed = timeit(lambda: GeneralArray.ToDoubleArray(buffer), repeat)
+                result['managed_msps'] = rate(n, elapsed)
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=10000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    print('%-8s %-11s %12s %10s' % ('dtype', 'layout', 'samples', 'MS/s'))
+    for result in run(options.size, options.repeat):
+        line = '%-8s %-11s %12d %10.1f' % (result['dtype'], result['layout'], result['samples'], result['msps'])
+        if 'managed_msps' in result:
+            line += '  (to double[]: %.1f MS/s)' % result['managed_msps']
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
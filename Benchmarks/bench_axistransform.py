@@ -0,0 +1,59 @@
+""" Benchmark of switching the axes of many long curves between linear and log.
+Reports the time to transform all the curves for log axes the first time (in bulk, in parallel
+chunks), to switch back to linear and to switch to log again (both from the per-curve cache),
+against numpy.log10 of the same data. The managed timings need IronPython with IronPlot.dll on the path.
+All curves share one x and one y array, so memory is dominated by the cached transformed values.
+Usage: python bench_axistransform.py [--curves C] [--points N] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit, rate
+import numpy as np
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    from IronPlot import Curve, AxisType, GeneralArray
+except Exception:
+    Curve = None
+
+
+def run(curves, points, repeat):
+    """ Return a dictionary of results.
+    """
+    x = np.arange(1, points + 1, dtype=np.float64)
+    y = 2.0 + np.sin(x)
+    results = {'curves': curves, 'points': points}
+    results['numpy_seconds'] = timeit(lambda: [(np.log10(x), np.log10(y)) for k in range(curves)], repeat)
+    if Curve is not None:
+        managedX, managedY = GeneralArray.ToDoubleArray(x), GeneralArray.ToDoubleArray(y)
+        items = [Curve(managedX, managedY) for k in range(curves)]
+
+        def transform(xType, yType):
+            for item in items:
+                item.Transform(xType, yType)
+        results['first_log_seconds'] = timeit(lambda: transform(AxisType.Log, AxisType.Log), 1)
+        results['linear_seconds'] = timeit(lambda: transform(AxisType.Linear, AxisType.Linear), repeat)
+        results['cached_log_seconds'] = timeit(lambda: transform(AxisType.Log, AxisType.Log), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--curves', type=int, default=50)
+    parser.add_argument('--points', type=int, default=5000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.curves, options.points, options.repeat)
+    values = 2 * results['curves'] * results['points']
+    print('numpy log10:        %8.1f ms (%.1f MV/s)' % (results['numpy_seconds'] * 1e3, rate(values, results['numpy_seconds'])))
+    if 'first_log_seconds' in results:
+        print('log, first time:    %8.1f ms (%.1f MV/s)'
+              % (results['first_log_seconds'] * 1e3, rate(values, results['first_log_seconds'])))
+        print('back to linear:     %8.1f ms' % (results['linear_seconds'] * 1e3))
+        print('log again (cached): %8.1f ms' % (results['cached_log_seconds'] * 1e3))
+
+
+if __name__ == '__main__':
+    main()
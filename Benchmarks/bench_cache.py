@@ -0,0 +1,62 @@
+""" Headless benchmark of the persistent level-of-detail cache (ironplot_cache).
+Reports the time to get the tile pyramid of a raw float32 image and the min/max pyramid of a curve
+when they must be built (a cache miss) and when they are read back from the cache (a hit).
+Usage: python bench_cache.py [--size N] [--points N] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchcommon import timeit
+import numpy as np
+from ironplot_tiles import openraw
+from ironplot_cache import Cache
+
+
+def run(size, points, repeat):
+    """ Return a dictionary of results.
+    """
+    directory = tempfile.mkdtemp(prefix='bench_cache_')
+    try:
+        path = os.path.join(directory, 'image.f4')
+        image = np.memmap(path, dtype='<f4', mode='w+', shape=(size, size))
+        x = np.linspace(-10, 10, size, dtype=np.float32)
+        for start in range(0, size, 1024):
+            image[start:start + 1024] = np.sin(x * x + x[start:start + 1024, None] ** 2)
+        image.flush()
+        del image
+        data = openraw(path, (size, size), '<f4')
+        curvex = np.arange(points, dtype=np.float64)
+        curvey = np.cumsum(np.random.RandomState(0).standard_normal(points))
+        cache = Cache(os.path.join(directory, 'cache'))
+        results = {'pixels': size * size, 'points': points}
+        for name, get in [('image', lambda: cache.imagepyramid(data)),
+                          ('curve', lambda: cache.minmaxpyramid(curvex, curvey))]:
+            results[name + '_miss_seconds'] = timeit(get, 1)
+            results[name + '_hit_seconds'] = timeit(get, repeat)
+        del data
+        results.update(cache.stats())
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=8192)
+    parser.add_argument('--points', type=int, default=10000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.size, options.points, options.repeat)
+    print('image: %d pixels, miss %.2f s, hit %.1f ms'
+          % (results['pixels'], results['image_miss_seconds'], results['image_hit_seconds'] * 1e3))
+    print('curve: %d points, miss %.2f s, hit %.1f ms'
+          % (results['points'], results['curve_miss_seconds'], results['curve_hit_seconds'] * 1e3))
+    print('cache: %d hits, %d misses, %d entries, %d bytes'
+          % (results['hits'], results['misses'], results['entries'], results['bytes']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+""" Headless benchmark of false-colour image generation (ironplot_colour).
+Reports the throughput (million pixels per second) of the limits, quantise and BGRA32 lookup
+stages, for linear and log normalisation. Under IronPython, with IronPlot.dll on the path,
+the same stages of IronPlot.ColourIndexing are timed and checked to produce identical pixels.
+Usage: python bench_colour.py [--width W] [--height H] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_colour import limits, quantise, lookuptable, tobgra32, colourmap
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    import System
+    from IronPlot import ColourIndexing, ColourNormalisation, ColourMap, ColourMapType
+except Exception:
+    ColourIndexing = None
+
+
+def managed(data, clim, norm):
+    """ Pixels from IronPlot.ColourIndexing, as a uint32 array.
+    """
+    values = System.Array[float](data.ravel().tolist())
+    normalisation = ColourNormalisation.Log if norm == 'log' else ColourNormalisation.Linear
+    indices = ColourIndexing.Quantise(values, clim[0], clim[1], normalisation, 256)
+    table = ColourIndexing.LookupTable(ColourMap(ColourMapType.Jet, 256).ToIntArray(), 255)
+    return np.array(list(ColourIndexing.ToBgra32(indices, table)), dtype=np.int64).astype(np.uint32)
+
+
+def run(width, height, repeat):
+    """ Return a list of result dictionaries, one per normalisation.
+    """
+    x = np.linspace(0, 8 * np.pi, width)
+    y = np.linspace(0, 8 * np.pi, height)[:, None]
+    data = np.exp(np.sin(x) * np.cos(y) * 3)
+    data[::97, ::89] = np.nan
+    pixels = width * height
+    table = lookuptable(colourmap('jet', 256))
+    results = []
+    for norm in ['linear', 'log']:
+        clim = limits(data, norm)
+        indices = quantise(data, clim, norm)
+        result = {'norm': norm, 'pixels': pixels,
+                  'limits_mpps': rate(pixels, timeit(lambda: limits(data, norm), repeat)),
+                  'quantise_mpps': rate(pixels, timeit(lambda: quantise(data, clim, norm), repeat)),
+                  'lookup_mpps': rate(pixels, timeit(lambda: tobgra32(indices, table), repeat))}
+        if ColourIndexing is not None:
+            expected = tobgra32(indices, table).reshape(-1, 4).view('<u4').ravel()
+            result['identical'] = np.array_equal(managed(data, clim, norm), expected)
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=4096)
+    parser.add_argument('--height', type=int, default=4096)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    print('%-7s %12s %12s %12s %12s' % ('norm', 'pixels', 'limits MP/s', 'quant. MP/s', 'lookup MP/s'))
+    for result in run(options.width, options.height, options.repeat):
+        line = '%-7s %12d %12.1f %12.1f %12.1f' % (result['norm'], result['pixels'], result['limits_mpps'],
+                                                  result['quantise_mpps'], result['lookup_mpps'])
+        if 'identical' in result:
+            line += '  (IronPlot identical: %s)' % result['identical']
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
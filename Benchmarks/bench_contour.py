@@ -0,0 +1,69 @@
+""" Headless benchmark of contour extraction (ironplot_contour).
+Reports the throughput (million cells per second) of finding the contours of a grid at several levels,
+with one worker thread and with one per core, and the time to stitch the segments into polylines.
+Under IronPython, with IronPlot.dll on the path, IronPlot.Contouring is timed as well and checked to
+produce the same number of points and polylines at each level.
+Usage: python bench_contour.py [--size N] [--levels L] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+from multiprocessing import cpu_count
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_contour import contourlines, contourlevels, segments, stitch
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    import System
+    from IronPlot import Contouring, GeneralArray
+except Exception:
+    Contouring = None
+
+
+def run(size, levels, repeat):
+    """ Return a dictionary of results.
+    """
+    x = np.linspace(-3.0, 3.0, size)
+    y = np.linspace(-2.0, 2.0, size)
+    z = np.sin(3 * x[None, :]) * np.cos(2 * y[:, None]) + 0.1 * x[None, :]
+    values = contourlevels(z, levels)
+    cells = (size - 1) ** 2
+    results = {'cells': cells, 'workers': cpu_count()}
+    results['serial_seconds'] = timeit(lambda: contourlines(x, y, z, values, 1), repeat)
+    results['parallel_seconds'] = timeit(lambda: contourlines(x, y, z, values), repeat)
+    starts, ends = segments(z, values)
+    results['segments'] = len(starts)
+    results['stitch_seconds'] = timeit(lambda: stitch(starts, ends), repeat)
+    if Contouring is not None:
+        managedX, managedY, managedZ = GeneralArray.ToDoubleArray(x), GeneralArray.ToDoubleArray(y), GeneralArray.ToDoubleArray(z)
+        managedLevels = GeneralArray.ToDoubleArray(values)
+        results['managed_seconds'] = timeit(lambda: Contouring.Contours(managedX, managedY, managedZ, managedLevels), repeat)
+        managed = Contouring.Contours(managedX, managedY, managedZ, managedLevels)
+        lines = contourlines(x, y, z, values)
+        # The same points, and as many polylines as the NaN breaks separate:
+        results['identical'] = all(level.X.Length == np.isfinite(px).sum() and level.PolylineCount == np.isnan(px).sum() + (len(px) > 0)
+                                   for level, (px, py) in zip(managed, lines))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=4000)
+    parser.add_argument('--levels', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.size, options.levels, options.repeat)
+    cells = results['cells']
+    print('contours, 1 thread:   %8.1f ms (%.1f Mcells/s)' % (results['serial_seconds'] * 1e3, rate(cells, results['serial_seconds'])))
+    print('contours, %2d threads: %8.1f ms (%.1f Mcells/s)'
+          % (results['workers'], results['parallel_seconds'] * 1e3, rate(cells, results['parallel_seconds'])))
+    print('stitch %d segments: %8.1f ms' % (results['segments'], results['stitch_seconds'] * 1e3))
+    if 'managed_seconds' in results:
+        print('managed contours:     %8.1f ms (%.1f Mcells/s), same points: %s'
+              % (results['managed_seconds'] * 1e3, rate(cells, results['managed_seconds']), results['identical']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+""" Headless benchmark of density scatter rendering (ironplot_density).
+Reports the throughput (million points per second) of binning points into a screen-sized grid,
+with and without categories, and the time to shade the grid. Under IronPython, with IronPlot.dll
+on the path, IronPlot.DensityBinning is timed as well and checked to produce identical counts.
+Usage: python bench_density.py [--points N] [--columns C] [--rows R] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_density import bincounts, maxcount, shade, shadecategories
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    import System
+    from IronPlot import DensityBinning, GeneralArray
+except Exception:
+    DensityBinning = None
+
+
+def run(points, columns, rows, repeat):
+    """ Return a dictionary of results.
+    """
+    random = np.random.RandomState(0)
+    x = random.randn(points)
+    y = 0.5 * x + random.randn(points)
+    categories = random.randint(0, 4, points).astype(np.int32)
+    region = (-4.0, -4.0, 8.0, 8.0)
+    results = {'points': points}
+    results['bin_seconds'] = timeit(lambda: bincounts(x, y, region, columns, rows), repeat)
+    results['categories_seconds'] = timeit(lambda: bincounts(x, y, region, columns, rows, categories, 4), repeat)
+    counts = bincounts(x, y, region, columns, rows)
+    results['shade_seconds'] = timeit(lambda: shade(counts, maxcount(counts)), repeat)
+    counts4 = bincounts(x, y, region, columns, rows, categories, 4)
+    results['shadecategories_seconds'] = timeit(
+        lambda: shadecategories(counts4, maxcount(counts4, True), 'log', [0xFF0000, 0x00FF00, 0x0000FF, 0]), repeat)
+    if DensityBinning is not None:
+        managedX, managedY = GeneralArray.ToDoubleArray(x), GeneralArray.ToDoubleArray(y)
+        elapsed = timeit(lambda: DensityBinning.Bin(managedX, managedY, -4.0, -4.0, 8.0, 8.0, columns, rows), repeat)
+        results['managed_bin_seconds'] = elapsed
+        managed = DensityBinning.Bin(managedX, managedY, -4.0, -4.0, 8.0, 8.0, columns, rows)
+        results['identical'] = (np.array(list(managed), dtype=np.int64) == counts.ravel()).all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=10000000)
+    parser.add_argument('--columns', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=800)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.points, options.columns, options.rows, options.repeat)
+    points = results['points']
+    print('bin:               %8.1f ms (%.1f MP/s)' % (results['bin_seconds'] * 1e3, rate(points, results['bin_seconds'])))
+    print('bin, 4 categories: %8.1f ms (%.1f MP/s)'
+          % (results['categories_seconds'] * 1e3, rate(points, results['categories_seconds'])))
+    print('shade:             %8.1f ms' % (results['shade_seconds'] * 1e3))
+    print('shade categories:  %8.1f ms' % (results['shadecategories_seconds'] * 1e3))
+    if 'managed_bin_seconds' in results:
+        print('managed bin:       %8.1f ms (%.1f MP/s), identical: %s'
+              % (results['managed_bin_seconds'] * 1e3, rate(points, results['managed_bin_seconds']), results['identical']))
+
+
+if __name__ == '__main__':
+    main()
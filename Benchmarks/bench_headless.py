@@ -0,0 +1,72 @@
+""" Headless rendering benchmark (ironplot_headless).
+Reports figures per second for PNG and SVG output of a figure of four subplots, and for a batch of
+figures rendered serially and by renderbatch in a pool of processes.
+Usage: python bench_headless.py [--points N] [--figures F] [--processes P] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+import functools
+import os
+import shutil
+import tempfile
+
+from benchcommon import timeit
+import numpy as np
+import ironplot_headless as headless
+
+
+def draw(points, seed):
+    """ A figure of lines, markers, an image and many lines, with labels.
+    """
+    random = np.random.RandomState(seed)
+    x = np.linspace(0, 10, points)
+    headless.figure(800, 600)
+    headless.subplot(2, 2, 0)
+    headless.plot(x, np.sin(x) + 0.1 * random.randn(points), '-b', x, np.cos(x), '--r')
+    headless.title('Lines')
+    headless.xlabel('x')
+    headless.ylabel('y')
+    headless.subplot(1)
+    headless.plot(x[::10], np.sin(x[::10]), 'sk', MarkersFill='y', MarkersSize=6)
+    headless.subplot(2)
+    headless.image(random.rand(200, 300))
+    headless.subplot(3)
+    headless.plot_many(x, np.sin(x[None, :] + np.arange(20)[:, None]))
+
+
+def run(points, figures, processes, repeat):
+    """ Return a dictionary of results.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        draw(points, 0)
+        figure = headless.currentfigure
+        results = {}
+        for format in ['png', 'svg']:
+            path = os.path.join(directory, 'single.' + format)
+            results[format + '_seconds'] = timeit(lambda: headless.savefig(path, figure), repeat)
+        jobs = [(os.path.join(directory, 'figure%d.png' % k), functools.partial(draw, points, k)) for k in range(figures)]
+        results['serial_seconds'] = timeit(lambda: headless.renderbatch(jobs, processes=1), repeat)
+        results['batch_seconds'] = timeit(lambda: headless.renderbatch(jobs, processes=processes), repeat)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=100000)
+    parser.add_argument('--figures', type=int, default=32)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.points, options.figures, options.processes, options.repeat)
+    for format in ['png', 'svg']:
+        print('%s: %.1f ms per figure' % (format, results[format + '_seconds'] * 1e3))
+    for name in ['serial', 'batch']:
+        print('%-6s: %d figures in %.2f s (%.1f figures/s)'
+              % (name, options.figures, results[name + '_seconds'], options.figures / results[name + '_seconds']))
+
+
+if __name__ == '__main__':
+    main()
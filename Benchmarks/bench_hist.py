@@ -0,0 +1,94 @@
+""" Headless benchmark of histogram binning (ironplot_hist).
+Reports the throughput (million samples per second) of binning samples into evenly spaced bins and into
+bins with given edges, and points into a 2-D grid, with one worker thread and with one per core, against
+numpy.histogram, and of binning a numpy.memmap a chunk at a time. Under IronPython, with IronPlot.dll on
+the path, IronPlot.Histogramming is timed as well and checked to produce identical counts.
+Usage: python bench_hist.py [--samples N] [--bins B] [--repeat R] [--memmap PATH]
+"""
+from __future__ import print_function
+import argparse
+import os
+import tempfile
+from multiprocessing import cpu_count
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_hist import binedges, histcounts, histcounts2d
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    import System
+    from IronPlot import Histogramming, GeneralArray
+except Exception:
+    Histogramming = None
+
+
+def run(samples, bins, repeat, path=None):
+    """ Return a dictionary of results.
+    """
+    random = np.random.RandomState(0)
+    x = random.randn(samples)
+    y = 0.5 * x + random.randn(samples)
+    edges, uniform = binedges(bins, (-4.0, 4.0))
+    uneven = np.sort(random.uniform(-4.0, 4.0, bins + 1))
+    results = {'samples': samples, 'workers': cpu_count()}
+    results['serial_seconds'] = timeit(lambda: histcounts(x, edges, uniform, workers=1), repeat)
+    results['parallel_seconds'] = timeit(lambda: histcounts(x, edges, uniform), repeat)
+    results['numpy_seconds'] = timeit(lambda: np.histogram(x, bins, (-4.0, 4.0)), repeat)
+    results['edges_seconds'] = timeit(lambda: histcounts(x, uneven), repeat)
+    results['serial2d_seconds'] = timeit(lambda: histcounts2d(x, y, edges, edges, True, True, workers=1), repeat)
+    results['parallel2d_seconds'] = timeit(lambda: histcounts2d(x, y, edges, edges, True, True), repeat)
+    results['numpy2d_seconds'] = timeit(lambda: np.histogram2d(x, y, bins, ((-4.0, 4.0), (-4.0, 4.0))), repeat)
+    counts = histcounts(x, edges, uniform)
+    results['identical'] = (counts == np.histogram(x, bins, (-4.0, 4.0))[0]).all()
+    temporary = path is None
+    path = path or os.path.join(tempfile.mkdtemp(), 'samples.bin')
+    try:
+        x.tofile(path)
+        mapped = np.memmap(path, dtype=np.float64, mode='r')
+        results['memmap_seconds'] = timeit(lambda: histcounts(mapped, edges, uniform), repeat)
+        del mapped
+    finally:
+        if temporary:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+    if Histogramming is not None:
+        managedX, managedY = GeneralArray.ToDoubleArray(x), GeneralArray.ToDoubleArray(y)
+        managedEdges = Histogramming.Edges(-4.0, 4.0, bins)
+        results['managed_seconds'] = timeit(lambda: Histogramming.Count(managedX, managedEdges, True), repeat)
+        results['managed2d_seconds'] = timeit(
+            lambda: Histogramming.Count(managedX, managedY, managedEdges, managedEdges, True, True), repeat)
+        managed = Histogramming.Count(managedX, managedEdges, True)
+        results['managed_identical'] = (np.array(list(managed), dtype=np.int64) == counts).all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=20000000)
+    parser.add_argument('--bins', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--memmap', help='file for the memory-mapped samples (by default a temporary file)')
+    options = parser.parse_args()
+    results = run(options.samples, options.bins, options.repeat, options.memmap)
+    samples = results['samples']
+    for label, key in (('hist, 1 thread:     ', 'serial_seconds'),
+                       ('hist, %2d threads:   ' % results['workers'], 'parallel_seconds'),
+                       ('numpy.histogram:    ', 'numpy_seconds'),
+                       ('hist, given edges:  ', 'edges_seconds'),
+                       ('hist, memmap:       ', 'memmap_seconds'),
+                       ('hist2d, 1 thread:   ', 'serial2d_seconds'),
+                       ('hist2d, %2d threads: ' % results['workers'], 'parallel2d_seconds'),
+                       ('numpy.histogram2d:  ', 'numpy2d_seconds')):
+        print('%s%8.1f ms (%.1f MS/s)' % (label, results[key] * 1e3, rate(samples, results[key])))
+    print('identical to numpy.histogram: %s' % results['identical'])
+    if 'managed_seconds' in results:
+        print('managed hist:       %8.1f ms (%.1f MS/s), identical: %s'
+              % (results['managed_seconds'] * 1e3, rate(samples, results['managed_seconds']), results['managed_identical']))
+        print('managed hist2d:     %8.1f ms (%.1f MS/s)'
+              % (results['managed2d_seconds'] * 1e3, rate(samples, results['managed2d_seconds'])))
+
+
+if __name__ == '__main__':
+    main()
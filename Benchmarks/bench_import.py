@@ -0,0 +1,64 @@
+""" Cold-start benchmark of the ironplot package.
+Each run starts a new interpreter (this one's executable), times import ironplot, then imports each
+backend module in turn as its first use would (ironplot_lazy.load) and times those imports. The best
+of repeat runs is reported. Under CPython the backends are the headless ones; under IronPython the
+WPF, 3D and charting modules are loaded too (starting the UI thread, but opening no window).
+Usage: python bench_import.py [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+LIBRARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ILabPythonLib')
+
+RUN = '''
+import json, sys, time
+sys.path.insert(0, %r)
+clock = getattr(time, 'perf_counter', time.time)
+start = clock()
+import ironplot
+imported = clock() - start
+if ironplot.headless:
+    names = ['ironplot_headless', 'ironplot_cache', 'ironplot_server']
+else:
+    names = ['ironplot_windows', 'ironplot_functions', 'ironplot_3d', 'ironplot_mscharts', 'ironplot_cache', 'ironplot_server']
+for name in names:
+    ironplot.ironplot_lazy.load(name)
+print(json.dumps({'import': imported, 'total': clock() - start, 'names': names,
+                  'modules': ironplot.ironplot_lazy.loadtimes, 'numpy': 'numpy' in sys.modules}))
+'''
+
+
+def coldstart():
+    """ Timings of one run in a new interpreter.
+    """
+    output = subprocess.check_output([sys.executable, '-c', RUN % LIBRARY])
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def run(repeat):
+    """ Return the timings of the run with the least total time, with the least package import time of all runs.
+    """
+    runs = [coldstart() for i in range(repeat)]
+    best = min(runs, key=lambda result: result['total'])
+    best['import'] = min(result['import'] for result in runs)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    result = run(options.repeat)
+    print('%-22s %10s' % ('import', 'ms'))
+    print('%-22s %10.1f' % ('ironplot', result['import'] * 1e3))
+    for name in result['names']:
+        print('%-22s %10.1f' % ('+ ' + name, result['modules'][name] * 1e3))
+    print('%-22s %10.1f' % ('all', result['total'] * 1e3))
+
+
+if __name__ == '__main__':
+    main()
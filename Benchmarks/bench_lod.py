@@ -0,0 +1,52 @@
+""" Headless benchmark of the min/max level-of-detail pyramid (ironplot_lod).
+Compares decimating a zoomed view with the pyramid against a full rescan of the points
+in view (what Curve.FilterMinMax does on every cache miss), and checks that both select
+the same points.
+Usage: python bench_lod.py [--size N] [--width PIXELS] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit
+import numpy as np
+from ironplot_lod import MinMaxPyramid, decimatefullscan
+
+
+def run(size, width, repeat):
+    """ Return a list of result dictionaries, one per zoom level.
+    """
+    x = np.arange(size, dtype=np.float64)
+    y = np.sin(x * 1e-4) + np.random.RandomState(0).standard_normal(size) * 0.1
+    results = []
+    build = timeit(lambda: MinMaxPyramid(x, y), 1)
+    pyramid = MinMaxPyramid(x, y)
+    for fraction in [1.0, 0.1, 0.01, 0.001]:
+        span = size * fraction
+        xstart = (size - span) / 2
+        columnwidth = span / width
+        pyramidTime = timeit(lambda: pyramid.decimate(xstart, columnwidth, width), repeat)
+        scanTime = timeit(lambda: decimatefullscan(x, y, xstart, columnwidth, width), repeat)
+        indices = pyramid.decimate(xstart, columnwidth, width)
+        identical = np.array_equal(indices, decimatefullscan(x, y, xstart, columnwidth, width))
+        results.append({'samples': size, 'fraction': fraction, 'build_seconds': build,
+                        'pyramid_seconds': pyramidTime, 'scan_seconds': scanTime,
+                        'points_out': len(indices), 'identical': identical})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=10000000)
+    parser.add_argument('--width', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.size, options.width, options.repeat)
+    print('Pyramid build for %d points: %.3f s' % (options.size, results[0]['build_seconds']))
+    print('%-10s %12s %12s %10s %10s' % ('view', 'pyramid ms', 'rescan ms', 'points', 'identical'))
+    for result in results:
+        print('%-10s %12.2f %12.2f %10d %10s' % ('%g' % result['fraction'], result['pyramid_seconds'] * 1e3,
+                                                 result['scan_seconds'] * 1e3, result['points_out'], result['identical']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+""" Headless benchmark of sending arrays to a plot server (ironplot_server).
+A stand-in server in this process receives an array of N doubles per command, as a JSON list in the
+message, copied through the client's scratch segment of shared memory, or as an array made with
+PlotClient.sharedarray (no copy). Reports commands per second and throughput in million samples per second.
+Usage: python bench_server.py [--sizes 1e2,1e4,...] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_server import PlotServer, lockexecutor, connect
+
+COMMANDS = 20
+
+
+def run(sizes, repeat):
+    """ Return a list of result dictionaries, one per size and way of sending.
+    """
+    server = PlotServer({'last': lambda data: float(data[-1])}, lockexecutor(), 0).start()
+    client = connect(server.address)
+    results = []
+    try:
+        for size in sizes:
+            data = np.random.RandomState(0).standard_normal(size)
+            shared = client.sharedarray(size)
+            shared[:] = data
+            for transport, value in [('json', data.tolist()), ('scratch', data), ('shared', shared)]:
+                def send():
+                    for k in range(COMMANDS):
+                        client.last(value)
+                seconds = timeit(send, repeat) / COMMANDS
+                results.append({'transport': transport, 'size': size, 'seconds': seconds,
+                                'msps': rate(size, seconds)})
+    finally:
+        client.close()
+        server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1e2,1e4,1e6')
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    sizes = [int(float(size)) for size in options.sizes.split(',')]
+    print('%-8s %10s %12s %12s %10s' % ('send', 'size', 'ms', 'commands/s', 'MS/s'))
+    for result in run(sizes, options.repeat):
+        print('%-8s %10d %12.3f %12.0f %10.1f' % (result['transport'], result['size'], result['seconds'] * 1e3,
+                                                  1 / result['seconds'], result['msps']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+""" Headless benchmark of streaming into a live curve (ironplot_stream).
+Feeds a generator of small chunks through batches() and reports the sustained rate
+(million samples per second) for several chunk sizes. Under IronPython, with IronPlot.dll
+on the path, each batch is also appended to a rolling-window IronPlot.Curve and filtered
+as for a redraw.
+Usage: python bench_stream.py [--size N] [--window W] [--interval SECONDS]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import clock, rate
+import numpy as np
+from ironplot_stream import batches
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    clr.AddReferenceByPartialName("WindowsBase")
+    clr.AddReferenceByPartialName("PresentationCore")
+    from IronPlot import Curve, GeneralArray
+    from System.Windows import Rect
+    from System.Windows.Media import Matrix, MatrixTransform
+except Exception:
+    Curve = None
+
+
+def source(size, chunk):
+    """ Yield (x, y) chunks of a sampled signal, size samples in total.
+    A chunk size of 1 yields single points as numbers.
+    """
+    if chunk == 1:
+        for i in range(size):
+            yield float(i), np.sin(i * 1e-3)
+        return
+    for start in range(0, size, chunk):
+        x = np.arange(start, min(start + chunk, size), dtype=np.float64)
+        yield x, np.sin(x * 1e-3)
+
+
+def run(size, window, interval):
+    """ Return a list of result dictionaries, one per chunk size.
+    """
+    results = []
+    for chunk in [1, 16, 256, 4096]:
+        n = min(size, 200000) if chunk == 1 else size
+        curve = Curve(0, window) if Curve is not None else None
+        canvasToGraph = MatrixTransform(Matrix(window / 1000.0, 0, 0, -0.01, 0, 1)) if curve is not None else None
+        appends = 0
+        start = clock()
+        for x, y in batches(source(n, chunk), interval):
+            appends += 1
+            if curve is not None:
+                curve.Append(GeneralArray.ToDoubleArray(x), GeneralArray.ToDoubleArray(y))
+                bounds = curve.Bounds()
+                curve.FilterMinMax(canvasToGraph, bounds)
+        elapsed = clock() - start
+        results.append({'chunk': chunk, 'samples': n, 'appends': appends, 'seconds': elapsed, 'msps': rate(n, elapsed)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=10000000)
+    parser.add_argument('--window', type=int, default=1000000)
+    parser.add_argument('--interval', type=float, default=0.05)
+    options = parser.parse_args()
+    print('%8s %12s %8s %10s' % ('chunk', 'samples', 'appends', 'MS/s'))
+    for result in run(options.size, options.window, options.interval):
+        print('%8d %12d %8d %10.1f' % (result['chunk'], result['samples'], result['appends'], result['msps']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+""" Headless benchmark of surface decimation (ironplot_surface).
+For a smooth surface on an N x N grid, reports the time to decimate it at a range of tolerances,
+the number of triangles against the 2 (N - 1)^2 of the full mesh, and the measured maximum
+vertical error, which must be within the tolerance.
+Usage: python bench_surface.py [--size N] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+
+from benchcommon import timeit
+import numpy as np
+from ironplot_surface import decimate, maxerror
+
+
+def run(size, repeat):
+    """ Return a list of result dictionaries, one per tolerance.
+    """
+    y, x = np.mgrid[-2:2:size * 1j, -2:2:size * 1j]
+    z = np.exp(-(x * x + y * y)) * np.cos(3 * x) + 0.1 * np.sin(5 * y)
+    results = []
+    for tolerance in [1e-2, 1e-3, 1e-4]:
+        seconds = timeit(lambda: decimate(z, tolerance), repeat)
+        vertices, triangles = decimate(z, tolerance)
+        error = maxerror(z, vertices, triangles)
+        results.append({'tolerance': tolerance, 'seconds': seconds, 'triangles': len(triangles),
+                        'fulltriangles': 2 * (size - 1) ** 2, 'maxerror': error, 'bounded': error <= tolerance})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=1)
+    options = parser.parse_args()
+    for result in run(options.size, options.repeat):
+        print('tolerance %-6g %6.2f s  %9d of %d triangles (%.2f%%)  max error %.2g %s'
+              % (result['tolerance'], result['seconds'], result['triangles'], result['fulltriangles'],
+                 100.0 * result['triangles'] / result['fulltriangles'], result['maxerror'],
+                 'ok' if result['bounded'] else 'EXCEEDS TOLERANCE'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+""" Headless benchmark of tiled image pyramids (ironplot_tiles).
+Writes a raw float32 image of the given size, then reports the throughput (million pixels per second)
+of building its pyramid from a numpy.memmap, and the time to read and colour the tiles of a
+screen-sized view at full resolution and zoomed fully out.
+Usage: python bench_tiles.py [--size N] [--tilesize T] [--screen PIXELS] [--repeat R]
+"""
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_tiles import openraw, buildpyramid, TilePyramid
+
+
+def run(size, tilesize, screen, repeat):
+    """ Return a dictionary of results.
+    """
+    directory = tempfile.mkdtemp(prefix='bench_tiles_')
+    try:
+        path = os.path.join(directory, 'image.f4')
+        image = np.memmap(path, dtype='<f4', mode='w+', shape=(size, size))
+        x = np.linspace(-10, 10, size, dtype=np.float32)
+        for start in range(0, size, 1024):
+            image[start:start + 1024] = np.sin(x * x + x[start:start + 1024, None] ** 2)
+        image.flush()
+        del image
+        data = openraw(path, (size, size), '<f4')
+        build = timeit(lambda: buildpyramid(data, os.path.join(directory, 'pyramid'), tilesize), 1)
+        pyramid = TilePyramid(os.path.join(directory, 'pyramid'))
+        results = {'pixels': size * size, 'levels': len(pyramid.levels), 'build_seconds': build,
+                   'build_mpps': rate(size * size, build)}
+        for name, level in [('full', 0), ('overview', pyramid.chooselevel(size / float(screen)))]:
+            span = screen * 2 ** level
+            tiles = pyramid.tilesinview(level, 0, span, 0, span)
+            results[name + '_tiles'] = len(tiles)
+            results[name + '_seconds'] = timeit(lambda: [pyramid.tilebgra32(level, tx, ty) for tx, ty in tiles], repeat)
+        del pyramid, data
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=8192)
+    parser.add_argument('--tilesize', type=int, default=256)
+    parser.add_argument('--screen', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=3)
+    options = parser.parse_args()
+    results = run(options.size, options.tilesize, options.screen, options.repeat)
+    print('pyramid: %d pixels, %d levels, built in %.2f s (%.1f MP/s)'
+          % (results['pixels'], results['levels'], results['build_seconds'], results['build_mpps']))
+    for name in ['full', 'overview']:
+        print('%-8s view: %4d tiles in %.1f ms' % (name, results[name + '_tiles'], results[name + '_seconds'] * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+""" Helpers shared by the headless benchmarks: puts the ironplot modules on the path
+without importing the ironplot package itself (which needs a WPF dispatcher).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ILabPythonLib', 'ironplot'))
+
+clock = getattr(time, 'perf_counter', time.time)
+
+
+def timeit(function, repeat):
+    """ Best wall-clock time of repeat calls of function.
+    """
+    best = float('inf')
+    for i in range(repeat):
+        start = clock()
+        function()
+        best = min(best, clock() - start)
+    return best
+
+
+def rate(samples, seconds):
+    """ Throughput in million samples per second.
+    """
+    return samples / seconds / 1e6 if seconds > 0 else float('inf')
@@ -0,0 +1,230 @@
+""" Headless benchmark and regression suite for the compute kernels behind the plots.
+Runs each kernel over a matrix of sizes and variants (dtype, layout, sortedness) and reports throughput
+in million samples per second. The Python kernels (ironplot_arrays, ironplot_lod, ironplot_colour,
+ironplot_surface and numpy) always run; under IronPython with IronPlot.dll on the path the managed kernels
+(GeneralArray.ToDoubleArray, Curve.FilterMinMax, FalseColourImage.IEnumerableToIndexArray and
+ColourIndexing, the SurfaceModel3D mesh, Axis tick derivation and Curve.Interpolate) run as well.
+No window is opened: managed objects are only constructed, never shown.
+Results can be saved as JSON and later compared: --compare exits with status 1 if the throughput of any
+case present in both has fallen by more than the threshold.
+Usage: python benchsuite.py [--sizes 1e3,1e4,...] [--kernels ingest,decimate,...] [--repeat R]
+       [--output results.json] [--compare baseline.json] [--threshold 0.15]
+"""
+from __future__ import print_function
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchcommon import timeit, rate
+import numpy as np
+from ironplot_arrays import asdoublearray
+from ironplot_lod import decimatefullscan
+from ironplot_colour import limits, quantise
+from ironplot_surface import decimate
+
+try:
+    import clr
+    clr.AddReferenceToFile("IronPlot.dll")
+    import System
+    from System.Windows import Point, Rect
+    from System.Windows.Media import Matrix, MatrixTransform
+    from IronPlot import GeneralArray, Curve, XAxis, AxisType, ColourIndexing, ColourNormalisation \
+        , FalseColourImage, InterpolationMethod, Extrapolation
+    from IronPlot.Plotting3D import SurfaceModel3D
+except Exception:
+    GeneralArray = None
+
+DEFAULTSIZES = '1e3,1e4,1e5,1e6,1e7'
+# Kernels that would take minutes above these sizes are skipped: pure Python surface meshing and
+# FilterLinInterp, which makes repeated passes over the points.
+PYTHONSURFACELIMIT = 10 ** 6
+LININTERPLIMIT = 10 ** 6
+TICKUPDATES = 1000
+WIDTH = 2000
+
+
+def sampledata(size, variant):
+    """ x (sorted, or shuffled if variant is 'shuffled') and a noisy y of size points.
+    """
+    random = np.random.RandomState(0)
+    x = np.arange(size, dtype=np.float64)
+    if variant == 'shuffled':
+        random.shuffle(x)
+    y = np.sin(x * 1e-3) + random.standard_normal(size) * 0.1
+    return x, y
+
+
+def managedarray(data):
+    return GeneralArray.ToDoubleArray(asdoublearray(data))
+
+
+def ingest(size, repeat):
+    """ Bulk conversion of arrays of several dtypes and layouts to double buffers.
+    """
+    base = np.arange(2 * size) % 1000
+    for variant, data in [('float64', base[:size].astype(np.float64)), ('float32', base[:size].astype(np.float32)),
+                          ('int32', base[:size].astype(np.int32)), ('float64-strided', base.astype(np.float64)[::2])]:
+        yield variant, 'python', timeit(lambda: asdoublearray(data), repeat)
+        if GeneralArray is not None:
+            yield variant, 'managed', timeit(lambda: GeneralArray.ToDoubleArray(data), repeat)
+
+
+def decimation(size, repeat):
+    """ Min/max decimation of a curve to a 2000 pixel wide view of its middle half, and (for sorted x) the
+    managed linear-interpolation filter, FilterLinInterp, at the same scale.
+    The Python reference needs sorted x. The managed timing alternates between two views so that every call
+    misses the filter's cache.
+    """
+    for variant in ['sorted', 'shuffled']:
+        x, y = sampledata(size, variant)
+        if variant == 'sorted':
+            yield variant, 'python', timeit(lambda: decimatefullscan(x, y, size / 4.0, size / 2.0 / WIDTH, WIDTH), repeat)
+        if GeneralArray is not None:
+            curve = Curve(managedarray(x), managedarray(y))
+            views = []
+            for span in [size / 2.0, size / 3.0]:
+                transform = MatrixTransform(Matrix(span / WIDTH, 0, 0, -4.0 / 1000, (size - span) / 2, 2.0))
+                views.append((transform, Rect(Point((size - span) / 2, -2.0), Point((size + span) / 2, 2.0))))
+            state = [0]
+
+            def filterview():
+                state[0] = 1 - state[0]
+                curve.FilterMinMax(*views[state[0]])
+            filterview()
+            yield variant, 'managed', timeit(filterview, repeat)
+            if variant == 'sorted' and size <= LININTERPLIMIT:
+                yield 'lininterp', 'managed', timeit(lambda: curve.FilterLinInterp(views[0][0]), repeat)
+
+
+def colour(size, repeat):
+    """ Colour map indices of an image of size pixels, for linear and log normalisation.
+    """
+    data = np.random.RandomState(0).lognormal(0.0, 1.0, size)
+    side = int(np.sqrt(size))
+    for norm in ['linear', 'log']:
+        clim = limits(data, norm)
+        yield norm, 'python', timeit(lambda: quantise(data, clim, norm), repeat)
+        if GeneralArray is not None:
+            values = managedarray(data)
+            if norm == 'linear':
+                yield norm, 'managed', timeit(lambda: FalseColourImage.IEnumerableToIndexArray(values, side, size // side, 256), repeat)
+            else:
+                yield norm, 'managed', timeit(lambda: ColourIndexing.Quantise(values, clim[0], clim[1], ColourNormalisation.Log, 256), repeat)
+
+
+def surface(size, repeat):
+    """ Mesh of a smooth surface on a square grid of about size points: the full mesh for Python
+    (ironplot_surface.decimate with zero tolerance) and SurfaceModel3D's vertices, indices and colours for IronPlot.
+    """
+    side = max(int(np.sqrt(size)), 2)
+    y, x = np.mgrid[-2:2:side * 1j, -2:2:side * 1j]
+    z = np.exp(-(x * x + y * y)) * np.cos(3 * x)
+    if side * side <= PYTHONSURFACELIMIT:
+        yield 'grid', 'python', timeit(lambda: decimate(z, 0.0), repeat)
+    if GeneralArray is not None:
+        xm, ym, zm = managedarray(x), managedarray(y), managedarray(z)
+        yield 'grid', 'managed', timeit(lambda: SurfaceModel3D(xm, ym, zm), repeat)
+
+
+def ticks(size, repeat):
+    """ Tick and label derivation for 1000 changes of an axis' range. Independent of size, so run once.
+    """
+    if GeneralArray is None:
+        return
+    for variant, axisType, start in [('linear', AxisType.Linear, 0.0), ('log', AxisType.Log, 1.0), ('date', AxisType.Date, 45000.0)]:
+        axis = XAxis()
+        axis.AxisType = axisType
+
+        def update():
+            for k in range(TICKUPDATES):
+                axis.Min = start
+                axis.Max = start + 1.5 + k
+        yield variant, 'managed', timeit(update, repeat)
+
+
+def interpolation(size, repeat):
+    """ Linear interpolation of a curve of size points at size query points, sorted or shuffled.
+    """
+    x = np.arange(size, dtype=np.float64)
+    y = np.sin(x * 1e-3)
+    for variant in ['sorted', 'shuffled']:
+        xi, unused = sampledata(size, variant)
+        xi = xi + 0.5
+        yield variant, 'python', timeit(lambda: np.interp(xi, x, y), repeat)
+        if GeneralArray is not None:
+            curve = Curve(managedarray(x), managedarray(y))
+            managedXi = managedarray(xi)
+            yield variant, 'managed', timeit(lambda: curve.Interpolate(managedXi, InterpolationMethod.Linear, Extrapolation.Extrapolate), repeat)
+
+
+KERNELS = [('ingest', ingest), ('decimate', decimation), ('colour', colour), ('surface', surface),
+           ('ticks', ticks), ('interpolate', interpolation)]
+
+
+def run(sizes, kernels, repeat):
+    """ Return a list of result dictionaries, one per kernel, size, variant and implementation.
+    """
+    results = []
+    for name, kernel in KERNELS:
+        if name not in kernels:
+            continue
+        for size in ([TICKUPDATES] if name == 'ticks' else sizes):
+            for variant, implementation, seconds in kernel(size, repeat):
+                results.append({'kernel': name, 'implementation': implementation, 'variant': variant, 'size': size,
+                                'seconds': seconds, 'msps': rate(size, seconds)})
+    return results
+
+
+def environment():
+    return {'python': sys.version.split()[0], 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'numpy': np.__version__, 'managed': GeneralArray is not None,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def key(result):
+    return (result['kernel'], result['implementation'], result['variant'], result['size'])
+
+
+def compare(results, baseline, threshold):
+    """ Return the (result, baseline throughput) pairs of results whose throughput is below
+    (1 - threshold) times that of the same case in baseline.
+    """
+    previous = dict((key(result), result['msps']) for result in baseline)
+    return [(result, previous[key(result)]) for result in results
+            if key(result) in previous and result['msps'] < previous[key(result)] * (1 - threshold)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULTSIZES)
+    parser.add_argument('--kernels', default=','.join(name for name, kernel in KERNELS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='fractional fall in throughput that fails')
+    options = parser.parse_args()
+    sizes = [int(float(size)) for size in options.sizes.split(',')]
+    results = run(sizes, options.kernels.split(','), options.repeat)
+    print('%-12s %-8s %-16s %10s %12s %10s' % ('kernel', 'impl.', 'variant', 'size', 'ms', 'MS/s'))
+    for result in results:
+        print('%-12s %-8s %-16s %10d %12.3f %10.1f' % (result['kernel'], result['implementation'], result['variant'],
+                                                      result['size'], result['seconds'] * 1e3, result['msps']))
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump({'environment': environment(), 'results': results}, output, indent=1, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as baselineFile:
+            baseline = json.load(baselineFile)['results']
+        regressions = compare(results, baseline, options.threshold)
+        for result, previous in regressions:
+            print('REGRESSION %s %s %s %d: %.1f MS/s against %.1f MS/s' % (result['kernel'], result['implementation'],
+                  result['variant'], result['size'], result['msps'], previous))
+        if regressions:
+            sys.exit(1)
+        print('No regressions beyond %d%% against %s' % (round(options.threshold * 100), options.compare))
+
+
+if __name__ == '__main__':
+    main()
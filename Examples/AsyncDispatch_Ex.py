@@ -0,0 +1,14 @@
+﻿# An acquisition loop that updates a plot without waiting for it to redraw.
+# dispatchasync posts each update to the plotting thread and returns a future at once;
+# updates with the same key replace one another while they wait, so a slow redraw
+# only ever applies the latest status.
+
+import math
+from ironplot import *
+
+curve = plot(range(100), [math.sin(0.1 * i) for i in range(100)], Title = 'acquiring')
+for i in range(10000):
+    value = math.sin(0.001 * i)
+    future = dispatchasync(lambda value = value: setattr(curve, 'Title', 'latest: %.3f' % value), key = curve)
+future.result()
+print(dispatchstats())
@@ -0,0 +1,17 @@
+﻿# Contours of a 4000 x 4000 grid: all levels are found in one parallel pass over the grid,
+# and each level is drawn as a single path, coloured through the colour map.
+
+import System
+import numpy as np
+from ironplot import *
+
+x = np.linspace(-3, 3, 4000)
+y = np.linspace(-2, 2, 4000)
+z = np.sin(3 * x[np.newaxis, :]) * np.cos(2 * y[:, np.newaxis]) + 0.1 * x[np.newaxis, :]
+contours = contour(x, y, z, 12, StrokeThickness = 1.5)
+title('16 million samples, 12 levels')
+
+# Restyling, or going back to levels shown before, reuses the contours already found:
+contours.Stroke = Brushes.Black
+contours.Levels = System.Array[float]([-0.5, 0.0, 0.5])
+contours.SetLevels(12)
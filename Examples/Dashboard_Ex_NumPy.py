@@ -0,0 +1,16 @@
+﻿# A dashboard of tabs of subplot grids. Only the plots on the selected tab are laid out and drawn: the others
+# are dormant (see Plot2D.SleepWhenHidden) and catch up when their tab is selected. Within each grid the x axes
+# are linked, so panning or zooming one plot pans or zooms the whole tab.
+
+import numpy as np
+from ironplot import *
+
+x = np.linspace(0, 100, 200000)
+window(0)
+for t in range(4):
+    tab(t)
+    subplot(3, 3)
+    for k in range(9):
+        subplot(k)
+        plot(x, np.sin(x * (k + 1) * 0.1 + t) + 0.05 * np.random.standard_normal(len(x)))
+    linkaxes(x = True, y = False)
@@ -0,0 +1,17 @@
+﻿# Ten million points as a density scatter plot: points are counted into a grid with a cell per
+# screen pixel and the counts are shaded through the colour map (log scaled by default).
+# Zooming or resizing counts the points again, at the new resolution.
+
+import numpy as np
+from ironplot import *
+
+n = 10000000
+x = np.random.randn(n)
+y = 0.5 * x + np.random.randn(n)
+density = scatter(x, y, mode = 'density')
+title('10 million points')
+
+# Categories: each cell has the mean colour of its points' categories.
+window(1)
+labels = np.where(x * y > 0, 'same sign', 'opposite sign')
+scatter(x, y, mode = 'density', categories = labels, colours = ['r', 'b'], norm = 'linear')
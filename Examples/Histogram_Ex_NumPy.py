@@ -0,0 +1,28 @@
+﻿# Histograms of 200 million samples held in a memory-mapped file: samples are binned a chunk at a
+# time by a pool of threads, so memory use does not grow with the data, and more data can be added
+# to a histogram that is already shown, binning only the new samples.
+
+import os
+import tempfile
+import numpy as np
+from ironplot import *
+
+path = os.path.join(tempfile.gettempdir(), 'histogram_samples.bin')
+samples = np.memmap(path, dtype = np.float32, mode = 'w+', shape = (2, 200000000))
+random = np.random.RandomState(0)
+for start in range(0, samples.shape[1], 10000000):
+    x = random.randn(10000000)
+    samples[0, start:start + 10000000] = x
+    samples[1, start:start + 10000000] = 0.5 * x + random.randn(10000000)
+samples.flush()
+
+subplot(1, 2)
+subplot(0)
+bars = hist(samples[0, :100000000], 100, range = (-5, 5), Fill = Brushes.SteelBlue)
+title('hist: 100 million samples...')
+histappend(bars, samples[0, 100000000:])
+title('...and 100 million more')
+
+subplot(1)
+image = hist2d(samples[0], samples[1], 400, range = ((-5, 5), (-5, 5)), norm = 'log')
+title('hist2d: 200 million points')
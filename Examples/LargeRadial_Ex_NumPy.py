@@ -0,0 +1,17 @@
+﻿# A million-sample polar trace (e.g. a vibration orbit): the arrays are bound to the chart in one call,
+# after angular min/max decimation to screen resolution. Further revolutions are then appended
+# without rebinding the points already plotted.
+
+import numpy as np
+from ironplot import *
+
+samplesPerRevolution = 100000
+revolutions = 10
+theta = np.arange(samplesPerRevolution * revolutions) * 360.0 / samplesPerRevolution
+r = 10.0 + np.sin(np.radians(theta) * 3) + 0.1 * np.random.randn(len(theta))
+series = radial(theta, r, Name="Orbit")
+
+for revolution in range(5):
+   theta = theta[-1] + np.arange(1, samplesPerRevolution + 1) * 360.0 / samplesPerRevolution
+   r = 10.5 + np.sin(np.radians(theta) * 3) + 0.1 * np.random.randn(len(theta))
+   radialappend(series, theta, r)
@@ -0,0 +1,15 @@
+﻿# Large surfaces: a 4000 x 4000 grid would be 32 million triangles. Grids of a million samples or
+# more are drawn as a decimated mesh whose vertical error on screen is at most a pixel, and the
+# mesh is refined as the view zooms in.
+
+import numpy as np
+from ironplot import *
+
+[x, y] = np.mgrid[-2:2:4000j, -2:2:4000j]
+z = np.exp(-(x * x + y * y)) * np.cos(3 * x) + 0.1 * np.sin(5 * y)
+plot3d(x, y, z)
+surface = currentplot().Viewport3D.Models[1]
+print('level %d: %d triangles' % (surface.Level, len(surface.Decimation.Mesh(surface.Level)[1]) / 3))
+
+# Allow 3 pixels of error for faster rotation; lod = False draws every sample.
+surface.LevelOfDetailTolerance = 3
@@ -0,0 +1,15 @@
+﻿# A parameter sweep: 500 traces against one x vector, added in one call.
+# The traces are a single item on the plot, so the axes and layout are worked out once,
+# and traces of the same style are drawn together as one geometry.
+
+import numpy as np
+from ironplot import *
+
+x = np.linspace(0, 10, 2000)
+frequencies = np.linspace(0.5, 3, 500)
+Y = np.sin(frequencies[:, None] * x) * np.exp(-0.1 * frequencies[:, None] * x)
+lines = plot_many(x, Y, ['-b', '-r', '-g'], StrokeThickness = 0.5)
+
+# Y may also have one column per trace. Legend titles are optional, one per trace.
+hold(True)
+envelope = plot_many(x, np.column_stack([np.exp(-0.05 * x), -np.exp(-0.05 * x)]), '--k', titles = ['envelope', ''])
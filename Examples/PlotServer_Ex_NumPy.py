@@ -0,0 +1,26 @@
+﻿# Plotting from another process through a plot server.
+# Start the server first (it owns the plot windows):
+#     ipy ILabPythonLib\ironplot\ironplot_server.py
+# then run this script with CPython (or IronPython) and NumPy. Arrays reach the server
+# through shared memory; an array made with sharedarray is not even copied into it.
+
+import sys
+import numpy as np
+sys.path.append('ILabPythonLib/ironplot')
+from ironplot_server import connect
+
+client = connect()
+x = np.linspace(0, 20, 100000)
+curve = client.plot(x, np.sin(x) * np.exp(-0.1 * x), '-b', Title = 'damped')
+client.title('From another process')
+curve.StrokeThickness = 2
+
+# A live curve, fed in chunks computed straight into shared memory:
+live = client.plot(np.zeros(0), np.zeros(0), '-r', Title = 'live')
+t = client.sharedarray(1000)
+y = client.sharedarray(1000)
+for i in range(100):
+    t[:] = np.arange(i * 1000, (i + 1) * 1000) * 0.02
+    np.cos(t, out = y)
+    client.append(live, t, y, True)
+client.close()
@@ -0,0 +1,21 @@
+﻿# Live data: points are appended to a curve as they are produced, without rebuilding it.
+
+import time
+import numpy as np
+from ironplot import *
+
+def acquire(rate = 1000000, tick = 0.01):
+    # Simulated acquisition: yields (x, y) chunks of rate samples per second.
+    t = 0.0
+    while True:
+        x = t + np.arange(int(rate * tick)) / float(rate)
+        yield x, np.sin(2 * np.pi * 5 * x) + 0.1 * np.random.standard_normal(len(x))
+        t = x[-1] + 1.0 / rate
+        time.sleep(tick)
+
+# Keep the most recent 2 million points; the axes follow the data.
+curve = stream(acquire(), window = 2000000)
+curve.QuickLine = '-b'
+# Points can also be appended directly, from any thread:
+curve2 = plot([0, 1], [2, 2], '-r')
+append(curve2, [2, 3], [2.5, 2.5])
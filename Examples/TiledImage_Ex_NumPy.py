@@ -0,0 +1,21 @@
+﻿# Images larger than memory: the image is read from disk a strip at a time into a tiled
+# multi-resolution pyramid, and only the tiles in view are loaded, at screen resolution.
+
+import os
+import tempfile
+import numpy as np
+from ironplot import *
+
+# Write a 20000 x 20000 uint16 frame (800 MB) a strip at a time, as a detector might.
+path = os.path.join(tempfile.gettempdir(), 'frame.raw')
+frame = np.memmap(path, dtype = '<u2', mode = 'w+', shape = (20000, 20000))
+x = np.linspace(-20, 20, 20000)
+for start in range(0, 20000, 1000):
+    y = x[start:start + 1000, None]
+    frame[start:start + 1000] = (30000 * (1 + np.sin(x * x + y * y) * np.exp(-0.01 * (x * x + y * y)))).astype(np.uint16)
+frame.flush()
+del frame
+
+# A raw file needs its shape and dtype; a numpy.memmap can be passed directly.
+# Decoded tiles are kept up to 64 MB.
+image(path, shape = (20000, 20000), dtype = '<u2', cachebytes = 64 * 1024 * 1024)
@@ -0,0 +1,14 @@
+﻿# A day of 1 kHz telemetry with datetime64[ns] time stamps, plotted directly on a Date axis.
+# Zoom in to see tick labels down to microseconds: the times keep their full resolution.
+
+import numpy as np
+from ironplot import *
+
+samples = 86400 * 1000
+t = np.datetime64('2024-03-01T00:00:00', 'ns') + np.arange(samples) * np.timedelta64(1000000, 'ns')
+signal = np.sin(np.arange(samples) * 2 * np.pi / 3600000.0) + 0.05 * np.random.randn(samples)
+plot(t, signal, '-b')
+hold(True)
+# Added to the same Date axis (and its origin):
+events = t[::3600000]
+plot(events, signal[::3600000], 'or')
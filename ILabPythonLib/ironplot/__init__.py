@@ -5,21 +5,41 @@ newPath = __path__[0] + "\\bin"
 import sys
 sys.path.append(newPath)
 
-import ironplot_windows
-import ironplot_functions
-import ironplot_mscharts
+import os
+# Without .NET (e.g. CPython on a machine without a display), or if asked for, plots are rendered
+# straight to files by the headless backend:
+headless = os.environ.get('IRONPLOT_BACKEND', '').lower() == 'headless'
+if not headless:
+    try:
+        import clr
+    except ImportError:
+        headless = True
 
-from ironplot_windows import dispatch
-from ironplot_functions import plot, image, plot3d, xlabel, ylabel, title, equalaxes, window \
-    , currentplot, currplot, tab, hold, subplot \
-    , MarkersType, Position \
-    , Plot2D, Plot2DCurve, FalseColourImage, QuickStrokeDash, Plot3D, XAxis, YAxis, XAxisPosition, YAxisPosition \
-    , MSChartHost, FormatOverrides
-from ironplot_mscharts import radial
-
-import clr
-from System.Windows import Thickness, Visibility, FontStyles, FontWeights
-from System.Windows.Controls import Orientation
-from System.Windows.Media import Brushes
+# Each module (and the assemblies and NumPy it loads) is only imported when one of its names is first used
+# (see ironplot_lazy): importing the package itself starts no UI thread and loads no assemblies.
+if headless:
+    sys.path.insert(0, __path__[0])
+import ironplot_lazy
+from ironplot_lazy import export
 
+if headless:
+    export(globals(), 'ironplot_headless'
+        , functions = ('plot', 'plot_many', 'scatter', 'image', 'contour', 'bar', 'hist', 'hist2d', 'histappend', 'xlabel', 'ylabel', 'title', 'currentplot', 'hold', 'subplot'
+        , 'figure', 'savefig', 'close', 'renderbatch')
+        , objects = ('Figure',))
+else:
+    export(globals(), 'ironplot_windows'
+        , functions = ('dispatch', 'dispatchasync', 'dispatchstats', 'asyncmode')
+        , objects = ('Thickness', 'Visibility', 'FontStyles', 'FontWeights', 'Orientation', 'Brushes'))
+    export(globals(), 'ironplot_functions'
+        , functions = ('plot', 'plot_many', 'scatter', 'stream', 'append', 'interpolate', 'nearest', 'select', 'profiling', 'stats', 'savetrace', 'image', 'contour'
+        , 'bar', 'hist', 'hist2d', 'histappend'
+        , 'xlabel', 'ylabel', 'title', 'equalaxes', 'window', 'currentplot', 'currplot', 'tab', 'hold', 'subplot', 'linkaxes')
+        , objects = ('MarkersType', 'Position', 'Plot2D', 'Plot2DCurve', 'Plot2DLines', 'DensityScatter', 'FalseColourImage', 'Plot2DContour', 'Bars', 'BarType', 'Histogram', 'Histogram2D', 'TiledImage', 'QuickStrokeDash'
+        , 'XAxis', 'YAxis', 'XAxisPosition', 'YAxisPosition', 'FormatOverrides')
+        , ui = True)
+    export(globals(), 'ironplot_3d', functions = ('plot3d',), objects = ('Plot3D',), ui = True)
+    export(globals(), 'ironplot_mscharts', functions = ('radial', 'radialappend'), objects = ('MSChartHost',), ui = True)
 
+export(globals(), 'ironplot_cache', functions = ('enablecache', 'disablecache'))
+export(globals(), 'ironplot_server', functions = ('connect', 'localserver'))
@@ -0,0 +1,44 @@
+""" 3D surface plots (IronPlot.Plotting3D), in a module of their own so that the 3D types are only
+imported by the first plot3d.
+"""
+from ironplot_windows import *
+import clr
+clr.AddReferenceToFile("IronPlot.dll")
+from IronPlot import PlotContext
+from IronPlot.Plotting3D import Plot3D, SurfaceModel3D
+from ironplot_arrays import ingestargs
+
+
+def plot3d(*args, **kwargs):
+    """ Create a 3D surface plot of the specified 2D array (matrix).
+    Plot3D image(surface): surface is a 2D array (matrix).
+    Plot3D image(x, y, surface): surface is a 2D array (matrix); x and y are matrices of the same size that provide the x and y coordinates.
+    x and y are expected in the format provided by mgrid, e.g., [x, y] = mgrid[0:127, 0:127]
+    Surfaces of a million samples or more are drawn as a decimated mesh whose error on screen is at most
+    lodtolerance pixels (default 1), refined as the view zooms in; lod = True or False turns this on or off.
+    """
+    lod = kwargs.pop('lod', None)
+    lodtolerance = kwargs.pop('lodtolerance', None)
+    args = ingestargs(args)
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot3D()
+        PlotContext.AddPlot(plot)      
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    if len(args) == 1:
+        surface = SurfaceModel3D(args[0])
+    elif len(args) == 3:
+        surface = SurfaceModel3D(args[0], args[1], args[2])
+    else:
+        return plot
+    if lodtolerance is not None:
+        surface.LevelOfDetailTolerance = lodtolerance
+    if lod is not None:
+        surface.LevelOfDetail = lod
+    setprops(surface, **kwargs)
+    plot.Viewport3D.Models.Add(surface)
+    return plot
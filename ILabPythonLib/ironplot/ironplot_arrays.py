@@ -0,0 +1,152 @@
+""" Bulk ingestion of array-like data for IronPlot.
+
+Everything handed to IronPlot is first turned into a single C-contiguous
+double precision buffer in one vectorised step (NumPy), whatever the input
+dtype or memory layout. IronPlot then copies that buffer across in one block
+rather than converting element by element.
+Without NumPy, Python sequences are turned into a System.Array[float] in a
+single .NET call.
+"""
+import array as pyarray
+
+numpyAvailable = True
+try:
+    import numpy as np
+except ImportError:
+    numpyAvailable = False
+
+try:
+    stringTypes = (basestring,)
+    sequenceTypes = (list, tuple, pyarray.array, xrange)
+except NameError:
+    stringTypes = (str, bytes)
+    sequenceTypes = (list, tuple, pyarray.array, range)
+try:
+    sequenceTypes += (memoryview,)
+except NameError:
+    pass
+
+
+def isarraylike(obj):
+    """ True if obj is data that should go through asdoublearray before being plotted:
+    NumPy arrays, lists, tuples, array.array and other buffer-protocol objects.
+    Strings, .NET arrays and IronPlot objects are left alone.
+    """
+    if isinstance(obj, stringTypes):
+        return False
+    if numpyAvailable and isinstance(obj, np.ndarray):
+        return True
+    return isinstance(obj, sequenceTypes)
+
+
+def asdoublearray(data, ndim=None):
+    """ Return data as a C-contiguous float64 NumPy array, copying only if necessary.
+    Any dtype (float32, integer, bool, ...), any strides (slices, transposes) and
+    nested Python sequences are handled in one bulk conversion.
+    Masked values become NaN. If ndim is given, the result must have that many dimensions.
+    """
+    if not numpyAvailable:
+        raise ImportError('NumPy is required for asdoublearray.')
+    if isinstance(data, np.ma.MaskedArray):
+        data = data.astype(np.float64).filled(np.nan)
+    result = np.ascontiguousarray(data, dtype=np.float64)
+    if ndim is not None and result.ndim != ndim:
+        if ndim == 1 and result.ndim == 2 and 1 in result.shape:
+            result = result.reshape(-1)
+        else:
+            raise ValueError('Array must be %d dimensional (found %d dimensions).' % (ndim, result.ndim))
+    return result
+
+
+def isdatetime64(data):
+    """ True if data is a NumPy datetime64 array (of any unit).
+    """
+    return numpyAvailable and isinstance(data, np.ndarray) and data.dtype.kind == 'M'
+
+
+def asepochnanoseconds(data):
+    """ Return a datetime64 array as a C-contiguous 1D int64 array of nanoseconds since the Unix epoch (NaT is the
+    smallest int64). A contiguous datetime64[ns] array is viewed rather than copied.
+    """
+    if data.dtype != np.dtype('datetime64[ns]'):
+        data = data.astype('datetime64[ns]')
+    return np.ascontiguousarray(data).reshape(-1).view(np.int64)
+
+
+def dayorigin(epochnanoseconds):
+    """ Nanoseconds since the Unix epoch of the start of the day of the first time that is not NaT
+    (0 if there is none).
+    """
+    valid = epochnanoseconds[epochnanoseconds != np.iinfo(np.int64).min]
+    if len(valid) == 0:
+        return 0
+    day = 86400 * 10**9
+    return int(valid[0]) // day * day
+
+
+def todays(data, origin):
+    """ Days from origin (nanoseconds since the Unix epoch) of the times of a datetime64 array, of the same shape;
+    NaT gives NaN. NumPy equivalent of DateTimeArrays.ToDays: whole and fractional days are separated so that no
+    precision is lost for times far from the origin.
+    """
+    nanoseconds = asepochnanoseconds(data)
+    day = 86400 * 10**9
+    relative = nanoseconds - np.int64(origin)
+    whole = relative // day
+    days = whole + (relative - whole * day) / float(day)
+    days[nanoseconds == np.iinfo(np.int64).min] = np.nan
+    return days.reshape(np.shape(data))
+
+
+def todoublebuffer(data, ndim=None):
+    """ Convert array-like data into the single contiguous buffer that is passed to IronPlot.
+    With NumPy this is a C-contiguous float64 ndarray, which IronPlot copies in one block.
+    Without NumPy, a 1D sequence becomes a System.Array[float] built in one call.
+    Data that is not array-like is returned unchanged.
+    """
+    if not isarraylike(data):
+        return data
+    if numpyAvailable:
+        return asdoublearray(data, ndim)
+    import System
+    if ndim == 2 or (len(data) > 0 and isinstance(data[0], (list, tuple))):
+        # Jagged lists are handled (and NaN-padded) by GeneralArray.
+        return data
+    return System.Array[float](data)
+
+
+def ingestargs(args):
+    """ Apply todoublebuffer to every array-like argument in a plot argument list,
+    leaving line properties (strings) and other objects untouched.
+    Anything NumPy cannot convert (e.g. a list of System.DateTime) is also passed
+    through unchanged, so that IronPlot's own conversion can deal with it.
+    """
+    ingested = []
+    for arg in args:
+        try:
+            ingested.append(todoublebuffer(arg))
+        except (TypeError, ValueError):
+            ingested.append(arg)
+    return tuple(ingested)
+
+
+def ingestlines(x, Y):
+    """ Bulk conversion of the arguments of plot_many: x (or None) becomes a 1D buffer and Y a 2D buffer
+    with one row per line (a 1D Y is a single line).
+    With NumPy, Y may also have one column per line: it is transposed if its rows do not match x but its columns do.
+    """
+    if not numpyAvailable:
+        return (None if x is None else todoublebuffer(x, 1)), todoublebuffer(Y, 2)
+    Y = asdoublearray(Y)
+    if Y.ndim == 1:
+        Y = Y.reshape(1, -1)
+    elif Y.ndim != 2:
+        raise ValueError('Lines must be 1 or 2 dimensional (found %d dimensions).' % Y.ndim)
+    if x is None:
+        return None, Y
+    x = asdoublearray(x, 1)
+    if Y.shape[1] != len(x) and Y.shape[0] == len(x):
+        Y = np.ascontiguousarray(Y.T)
+    if Y.shape[1] != len(x):
+        raise ValueError('Lines must have the same length as x (%d, found %d).' % (len(x), Y.shape[1]))
+    return x, Y
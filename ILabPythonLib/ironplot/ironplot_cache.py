@@ -0,0 +1,334 @@
+""" Persistent on-disk cache of derived level-of-detail structures.
+
+Building the structures IronPlot needs for large data (image tile pyramids,
+colour index arrays, curve min/max pyramids) means reading all of the data.
+When the same data is opened again, a Cache returns the structures saved the
+first time instead, as memory-mappable files, so only the tiles or nodes that
+are actually used are read.
+
+Entries are keyed by a hash of the data (dtype, shape and contents) and of
+the parameters used to build them. A numpy.memmap of a whole file is keyed by
+the file's path, size and modification time instead, so looking it up does
+not read the file. Each entry is a directory in the cache directory
+(~/.ironplot/cache, or $IRONPLOT_CACHE), and the least recently used entries
+are removed once the cache exceeds its size limit.
+
+The cache is opt-in: enablecache() turns it on. It is used where these
+structures are built in Python: for the tile pyramids of images too large for
+memory (tiledimage, and image of a numpy.memmap or raw file) with either
+backend, and, in the headless backend, for the colour indices of images and
+the min/max pyramids of long curves with sorted x. Curves and in-memory images
+of the interactive plots are indexed by IronPlot itself and are not cached.
+Run this module as a script to inspect or prune the cache:
+    python ironplot_cache.py [--dir DIR] stats | list | prune [--max-bytes SIZE] | clear
+"""
+from __future__ import print_function
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import time
+
+numpyAvailable = True
+try:
+    import numpy as np
+except ImportError:
+    numpyAvailable = False
+
+DEFAULTDIRECTORY = os.environ.get('IRONPLOT_CACHE') or os.path.join(os.path.expanduser('~'), '.ironplot', 'cache')
+DEFAULTMAXBYTES = 4 * 1024 ** 3
+ENTRYFILE = 'entry.txt'
+STATSFILE = 'stats.txt'
+# Rows of data hashed at a time are limited to about this many bytes:
+HASHBYTES = 1 << 24
+# Temporary directories of builds older than this (seconds) were abandoned:
+STALEAGE = 3600
+
+activecache = None
+
+
+def enablecache(directory=None, maxbytes=None):
+    """ Turn on caching of image pyramids, colour indices and curve pyramids (see above), and return the Cache.
+    """
+    global activecache
+    activecache = Cache(directory, maxbytes)
+    return activecache
+
+
+def disablecache():
+    global activecache
+    activecache = None
+
+
+def datakey(data, *params):
+    """ Hex digest identifying data and the parameters params.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(params).encode('utf-8'))
+    if isinstance(data, np.memmap) and isinstance(data.base, mmap.mmap) and data.filename:
+        # The whole of a file: identify the file rather than reading it.
+        status = os.stat(data.filename)
+        identity = (os.path.realpath(data.filename), status.st_size, status.st_mtime, data.offset,
+                    data.dtype.str, data.shape, data.flags.f_contiguous)
+        digest.update(('file' + repr(identity)).encode('utf-8'))
+        return digest.hexdigest()
+    data = np.asanyarray(data)
+    digest.update(('array' + repr((data.dtype.str, data.shape))).encode('utf-8'))
+    if data.ndim == 0:
+        digest.update(data.tobytes())
+        return digest.hexdigest()
+    rows = max(1, HASHBYTES // max(1, data[:1].nbytes))
+    for start in range(0, data.shape[0], rows):
+        digest.update(np.ascontiguousarray(data[start:start + rows]).tobytes())
+    return digest.hexdigest()
+
+
+def parsesize(text):
+    """ Number of bytes in a size such as '500M' or '2G' (powers of 1024).
+    """
+    text = str(text).strip().upper().rstrip('B')
+    multiplier = 1
+    if text and text[-1] in 'KMGT':
+        multiplier = 1024 ** ('KMGT'.index(text[-1]) + 1)
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def formatsize(size):
+    if size < 1024:
+        return '%d B' % size
+    for unit in ['KB', 'MB', 'GB']:
+        size /= 1024.0
+        if size < 1024 or unit == 'GB':
+            return '%.1f %s' % (size, unit)
+
+
+def readsettings(path):
+    """ Dictionary of the 'key = value' lines of a file (empty if there is no file).
+    """
+    settings = {}
+    if os.path.isfile(path):
+        with open(path) as f:
+            for line in f:
+                if '=' in line:
+                    key, value = line.split('=', 1)
+                    settings[key.strip()] = value.strip()
+    return settings
+
+
+def writesettings(path, settings):
+    with open(path, 'w') as f:
+        f.write(''.join('%s = %s\n' % (key, settings[key]) for key in sorted(settings)))
+
+
+def directorysize(directory):
+    total = 0
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class Cache(object):
+    """ Cache(directory=None, maxbytes=None): a size-limited store of derived structures in directory.
+    """
+
+    def __init__(self, directory=None, maxbytes=None):
+        self.directory = directory or DEFAULTDIRECTORY
+        self.maxbytes = DEFAULTMAXBYTES if maxbytes is None else maxbytes
+        # Lookups by this Cache object; stats() also reports the totals for the directory.
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def entrypath(self, key):
+        return os.path.join(self.directory, key)
+
+    def lookup(self, key):
+        """ Path of the entry for key, or None. A hit marks the entry as most recently used.
+        """
+        path = self.entrypath(key)
+        if os.path.isfile(os.path.join(path, ENTRYFILE)):
+            os.utime(os.path.join(path, ENTRYFILE), None)
+            self.hits += 1
+            self.recordstat('hits')
+            return path
+        self.misses += 1
+        self.recordstat('misses')
+        return None
+
+    def store(self, key, kind, build, description=''):
+        """ Create the entry for key: build(directory) writes its files. Returns the entry's path.
+        The entry is built in a temporary directory and renamed into place, so it is never seen incomplete.
+        """
+        temporary = tempfile.mkdtemp(prefix='tmp-', dir=self.directory)
+        try:
+            build(temporary)
+            writesettings(os.path.join(temporary, ENTRYFILE),
+                          {'kind': kind, 'bytes': directorysize(temporary), 'created': time.time(),
+                           'description': description})
+            path = self.entrypath(key)
+            try:
+                os.rename(temporary, path)
+            except OSError:
+                # Built at the same time by another process: keep theirs.
+                if not os.path.isfile(os.path.join(path, ENTRYFILE)):
+                    raise
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+        self.prune(keep=key)
+        return path
+
+    def get(self, key, kind, build, description=''):
+        """ Path of the entry for key, building it first if it is not in the cache.
+        """
+        return self.lookup(key) or self.store(key, kind, build, description)
+
+    def recordstat(self, name):
+        path = os.path.join(self.directory, STATSFILE)
+        try:
+            stats = readsettings(path)
+            stats[name] = int(stats.get(name, 0)) + 1
+            writesettings(path, stats)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def entries(self):
+        """ A dictionary for each entry (key, kind, bytes, created, used, description), least recently used first.
+        """
+        entries = []
+        for key in os.listdir(self.directory):
+            entryfile = os.path.join(self.entrypath(key), ENTRYFILE)
+            if not os.path.isfile(entryfile):
+                continue
+            settings = readsettings(entryfile)
+            entries.append({'key': key, 'kind': settings.get('kind', ''), 'bytes': int(settings.get('bytes', 0)),
+                            'created': float(settings.get('created', 0)), 'used': os.path.getmtime(entryfile),
+                            'description': settings.get('description', '')})
+        entries.sort(key=lambda entry: entry['used'])
+        return entries
+
+    def size(self):
+        return sum(entry['bytes'] for entry in self.entries())
+
+    def stats(self):
+        """ Dictionary of the hits and misses of this Cache and of all users of the directory,
+        and the number and total size of the entries.
+        """
+        totals = readsettings(os.path.join(self.directory, STATSFILE))
+        entries = self.entries()
+        return {'hits': self.hits, 'misses': self.misses,
+                'totalhits': int(totals.get('hits', 0)), 'totalmisses': int(totals.get('misses', 0)),
+                'entries': len(entries), 'bytes': sum(entry['bytes'] for entry in entries),
+                'maxbytes': self.maxbytes, 'directory': self.directory}
+
+    def remove(self, key):
+        """ Remove an entry. Returns False if it is in use (files still open, on Windows) and was left alone.
+        """
+        trash = tempfile.mkdtemp(prefix='tmp-', dir=self.directory)
+        try:
+            os.rename(self.entrypath(key), os.path.join(trash, key))
+        except OSError:
+            os.rmdir(trash)
+            return False
+        shutil.rmtree(trash, ignore_errors=True)
+        return True
+
+    def prune(self, maxbytes=None, keep=None):
+        """ Remove least recently used entries (other than keep) until the cache is no larger than maxbytes
+        (by default the cache's limit), and any abandoned temporary directories. Returns the number removed.
+        """
+        if maxbytes is None:
+            maxbytes = self.maxbytes
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('tmp-') and time.time() - os.path.getmtime(path) > STALEAGE:
+                shutil.rmtree(path, ignore_errors=True)
+        entries = self.entries()
+        total = sum(entry['bytes'] for entry in entries)
+        removed = 0
+        for entry in entries:
+            if total <= maxbytes:
+                break
+            if entry['key'] != keep and self.remove(entry['key']):
+                total -= entry['bytes']
+                removed += 1
+        return removed
+
+    def clear(self):
+        return self.prune(0)
+
+    def imagepyramid(self, data, tilesize=256, clim=None, norm='linear', ncolours=256):
+        """ Directory of the tile pyramid of the 2D array data (see ironplot_tiles.buildpyramid), for TiledImage.
+        """
+        from ironplot_tiles import buildpyramid
+        key = datakey(data, 'imagepyramid', tilesize, clim, norm, ncolours)
+        return self.get(key, 'imagepyramid', lambda directory: buildpyramid(data, directory, tilesize, clim, norm, ncolours),
+                        '%s image' % 'x'.join(str(n) for n in data.shape))
+
+    def colourindices(self, data, clim=None, norm='linear', ncolours=256):
+        """ Colour map indices of data (see ironplot_colour.quantise), as a read-only memory-mapped array.
+        """
+        from ironplot_colour import quantise
+        key = datakey(data, 'colourindices', clim, norm, ncolours)
+        path = self.get(key, 'colourindices',
+                        lambda directory: np.save(os.path.join(directory, 'indices.npy'), quantise(data, clim, norm, ncolours)),
+                        '%s indices' % 'x'.join(str(n) for n in np.shape(data)))
+        return np.load(os.path.join(path, 'indices.npy'), mmap_mode='r')
+
+    def minmaxpyramid(self, x, y):
+        """ ironplot_lod.MinMaxPyramid for a curve, with its levels memory-mapped from the cache.
+        """
+        from ironplot_lod import MinMaxPyramid
+        from ironplot_arrays import asdoublearray
+        x = asdoublearray(x, 1)
+        y = asdoublearray(y, 1)
+        key = datakey(np.vstack([x, y]), 'minmaxpyramid')
+
+        def build(directory):
+            for k, level in enumerate(MinMaxPyramid(x, y).levels):
+                np.save(os.path.join(directory, 'level%d.npy' % k), np.vstack(level))
+
+        path = self.get(key, 'minmaxpyramid', build, '%d point curve' % len(x))
+        levels = []
+        while os.path.isfile(os.path.join(path, 'level%d.npy' % len(levels))):
+            level = np.load(os.path.join(path, 'level%d.npy' % len(levels)), mmap_mode='r')
+            levels.append((level[0], level[1]))
+        return MinMaxPyramid(x, y, levels)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Inspect and prune the IronPlot level-of-detail cache.')
+    parser.add_argument('--dir', default=None, help='cache directory (default %s)' % DEFAULTDIRECTORY)
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('stats', help='hits, misses and size')
+    commands.add_parser('list', help='entries, least recently used first')
+    prune = commands.add_parser('prune', help='remove least recently used entries')
+    prune.add_argument('--max-bytes', default=None, help='size to prune to, e.g. 500M (default %s)' % formatsize(DEFAULTMAXBYTES))
+    commands.add_parser('clear', help='remove all entries')
+    options = parser.parse_args(argv)
+    cache = Cache(options.dir)
+    if options.command == 'list':
+        for entry in cache.entries():
+            print('%s  %-14s %10s  %s  %s' % (entry['key'][:12], entry['kind'], formatsize(entry['bytes']),
+                                               time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['used'])),
+                                               entry['description']))
+    elif options.command == 'prune':
+        maxbytes = None if options.max_bytes is None else parsesize(options.max_bytes)
+        print('Removed %d entries.' % cache.prune(maxbytes))
+    elif options.command == 'clear':
+        print('Removed %d entries.' % cache.clear())
+    else:
+        stats = cache.stats()
+        lookups = stats['totalhits'] + stats['totalmisses']
+        print('directory: %s' % stats['directory'])
+        print('entries:   %d (%s)' % (stats['entries'], formatsize(stats['bytes'])))
+        print('hits:      %d of %d lookups (%.0f%%)' % (stats['totalhits'], lookups,
+                                                        100.0 * stats['totalhits'] / lookups if lookups else 0))
+
+
+if __name__ == '__main__':
+    main()
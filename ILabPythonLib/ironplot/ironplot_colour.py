@@ -0,0 +1,178 @@
+""" Colour map quantisation and lookup for false-colour images.
+
+NumPy equivalent of IronPlot.ColourIndexing and IronPlot.ColourMap, used by
+FalseColourImage and SurfaceModel3D: for the same data, colour limits and
+normalisation it produces the same colour map indices and the same packed
+BGRA32 pixels, so images can be generated and checked without WPF.
+Images are 2D arrays of shape (height, width), in pixel order: rows from the
+top of the bitmap down.
+NaNs (and, for log normalisation, values that are not positive) are masked:
+their index is the number of colours and their pixels are transparent.
+Log normalisation uses the platform's log10, so values lying exactly on a
+colour boundary may fall either side of it from one implementation to the other.
+"""
+import numpy as np
+from ironplot_arrays import asdoublearray, stringTypes
+
+NORMALISATIONS = ('linear', 'log')
+
+# Colours of the line property colour codes, as the WPF Brushes used by Plot2DCurve:
+COLOURCODES = {'r': (255, 0, 0), 'g': (0, 128, 0), 'b': (0, 0, 255), 'y': (255, 255, 0),
+               'c': (0, 255, 255), 'm': (255, 0, 255), 'k': (0, 0, 0), 'w': (255, 255, 255)}
+
+# (interpolation points, red, green, blue) as in ColourMap.Jet() and ColourMap.Gray():
+RGBMAPS = {
+    'jet': ([0.0, 0.01, 0.125, 0.375, 0.625, 0.875, 0.99, 1.0],
+            [0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 0.5, 0.5],
+            [0.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 0.0],
+            [0.5, 0.5, 1.0, 1.0, 0.0, 0.0, 0.0, 0.0]),
+    'gray': ([0.0, 0.125, 0.375, 0.625, 0.875, 1.0],
+             [0.0, 0.125, 0.375, 0.625, 0.875, 1.0],
+             [0.0, 0.125, 0.375, 0.625, 0.875, 1.0],
+             [0.0, 0.125, 0.375, 0.625, 0.875, 1.0])}
+
+# (interpolation points, hue, saturation, value) as in ColourMap.HSV():
+HSVMAPS = {
+    'hsv': ([0.0, 0.25, 0.5, 0.75, 1.0],
+            [0.0, 0.25, 0.5, 0.75, 1.0],
+            [1.0, 1.0, 1.0, 1.0, 1.0],
+            [1.0, 1.0, 1.0, 1.0, 1.0])}
+
+
+def interpolatelinear(points, values, positions):
+    """ Piecewise linear interpolation, evaluated as Curve.GetValuesLinear does.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    lower = np.clip(np.searchsorted(points, positions, 'left') - 1, 0, len(points) - 2)
+    slopes = (values[1:] - values[:-1]) / (points[1:] - points[:-1])
+    return values[lower] + (positions - points[lower]) * slopes[lower]
+
+
+def colourmap(maptype='jet', length=256):
+    """ Packed RGB colours (0x00RRGGBB) of a colour map, identical to ColourMap.ToIntArray().
+    maptype is 'jet', 'gray' or 'hsv'.
+    """
+    maptype = maptype.lower()
+    # Each colour is the colour at the centre of its interval:
+    positions = (np.arange(1, length + 1, dtype=np.float64) - 0.5) / float(length)
+    if maptype in RGBMAPS:
+        points, red, green, blue = RGBMAPS[maptype]
+        r = interpolatelinear(points, red, positions) * 255.0
+        g = interpolatelinear(points, green, positions) * 255.0
+        b = interpolatelinear(points, blue, positions) * 255.0
+    elif maptype in HSVMAPS:
+        points, hue, saturation, value = HSVMAPS[maptype]
+        h = interpolatelinear(points, hue, positions)
+        # ColourMap.UpdateColourMap takes v from the saturation curve and s from the value curve.
+        v = interpolatelinear(points, saturation, positions)
+        s = interpolatelinear(points, value, positions)
+        hi = np.floor(h * 6).astype(np.int64)
+        f = h * 6 - hi
+        p = v * (1 - s)
+        q = v * (1 - f * s)
+        t = v * (1 - (1 - f) * s)
+        r = np.choose(hi, [v, q, p, p, t, v]) * 255
+        g = np.choose(hi, [t, v, v, q, p, p]) * 255
+        b = np.choose(hi, [p, p, t, v, v, q]) * 255
+    else:
+        raise ValueError('Unknown colour map: %s' % maptype)
+    r, g, b = [np.trunc(c).astype(np.int64) for c in (r, g, b)]
+    return ((r << 16) | (g << 8) | b).astype(np.uint32)
+
+
+def tocolour(colour):
+    """ (r, g, b) of a colour code ('r'), '#rrggbb' or an (r, g, b) sequence; None stays None.
+    """
+    if colour is None:
+        return None
+    if isinstance(colour, stringTypes):
+        if colour.startswith('#') and len(colour) == 7:
+            return tuple(int(colour[k:k + 2], 16) for k in (1, 3, 5))
+        if colour in COLOURCODES:
+            return COLOURCODES[colour]
+        raise ValueError('Unknown colour: %s' % colour)
+    return tuple(int(c) for c in colour[:3])
+
+
+def packrgb(colour):
+    """ Packed RGB value (0xRRGGBB) of a colour as accepted by tocolour, or of a packed value.
+    """
+    if isinstance(colour, (int, np.integer)):
+        return int(colour) & 0xFFFFFF
+    red, green, blue = tocolour(colour)
+    return (red << 16) | (green << 8) | blue
+
+
+def checknorm(norm):
+    if norm not in NORMALISATIONS:
+        raise ValueError("norm must be 'linear' or 'log'")
+    return norm == 'log'
+
+
+def limits(data, norm='linear'):
+    """ (min, max) of data, ignoring NaN and infinite values and, for log normalisation,
+    values that are not positive. (0, 1), or (1, 10) for log, if there are no such values.
+    """
+    log = checknorm(norm)
+    data = asdoublearray(data)
+    valid = np.isfinite(data)
+    if log:
+        valid &= data > 0
+    if not valid.any():
+        return (1.0, 10.0) if log else (0.0, 1.0)
+    values = data[valid]
+    return float(values.min()), float(values.max())
+
+
+def quantise(data, clim=None, norm='linear', ncolours=256):
+    """ Indices (uint16) into a colour map of ncolours colours, as ColourIndexing.Quantise.
+    clim = (min, max) are the values mapped to the first and last colours (by default the limits of the data);
+    values outside take the first or last colour. Masked values take the index ncolours.
+    """
+    log = checknorm(norm)
+    if ncolours < 1 or ncolours > 65535:
+        raise ValueError('Number of colours must be between 1 and 65535')
+    data = asdoublearray(data)
+    if clim is None:
+        clim = limits(data, norm)
+    cmin, cmax = float(clim[0]), float(clim[1])
+    last = ncolours - 1
+    with np.errstate(all='ignore'):
+        if log:
+            offset = np.log10(cmin)
+            values = np.log10(np.where(data > 0, data, np.nan))
+        else:
+            offset = cmin
+            values = data
+        span = (np.log10(cmax) if log else cmax) - offset
+        scale = float(last) / span if span > 0 else 0.0
+        position = (values - offset) * scale
+        indices = np.where(position >= last, last, np.trunc(np.where(position >= 0, position, 0)))
+    indices = indices.astype(np.uint16)
+    indices[np.isnan(position) & np.isnan(values)] = ncolours
+    return indices
+
+
+def lookuptable(colours, alpha=255):
+    """ Packed BGRA32 lookup table for packed RGB colours, as ColourIndexing.LookupTable:
+    the colours with the given alpha, then a transparent entry for masked indices.
+    """
+    colours = np.asarray(colours, dtype=np.uint32)
+    table = np.zeros(len(colours) + 1, dtype=np.uint32)
+    table[:-1] = (np.uint32(alpha) << np.uint32(24)) | (colours & np.uint32(0xFFFFFF))
+    return table
+
+
+def tobgra32(indices, table):
+    """ The pixels for indices as bytes in B, G, R, A order: an array of shape indices.shape + (4,),
+    identical to the bitmap written by ColourIndexing.WriteBgra32.
+    """
+    pixels = np.asarray(table, dtype='<u4')[np.asarray(indices)]
+    return pixels.view(np.uint8).reshape(pixels.shape + (4,))
+
+
+def falsecolour(data, clim=None, norm='linear', maptype='jet', ncolours=256):
+    """ BGRA32 bytes of a false-colour image of data, shape (height, width, 4).
+    """
+    return tobgra32(quantise(data, clim, norm, ncolours), lookuptable(colourmap(maptype, ncolours)))
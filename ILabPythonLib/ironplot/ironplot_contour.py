@@ -0,0 +1,272 @@
+""" Contour lines of 2-D grids.
+
+NumPy equivalent of IronPlot.Contouring, used by the headless backend. z is an array of
+shape (rows, columns) sampled at x (one value per column) and y (one value per row), with
+row 0 at the bottom as for DensityBinning. Contours are found by marching squares over all
+the levels in one pass: the grid is split into bands of rows, each sample of a band is
+ranked among the levels once, and only the cells whose corners differ in rank make segments,
+one for each level between. The bands are processed by a pool of threads (NumPy releases
+the GIL). Cells with a NaN corner have no contours.
+Each segment runs between two crossed cell edges, oriented so that values above the level
+are on its left, so each crossing starts one segment and ends at most one other. The
+segments are then stitched into polylines without a Python loop over them, by list ranking
+(pointer jumping) on the successor of each segment. The polylines of a level are returned
+as one pair of arrays with NaN between polylines, to be drawn as a single path.
+"""
+import numpy as np
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from ironplot_arrays import asdoublearray
+
+# Largest number of cells in each band of rows:
+BANDCELLS = 1 << 21
+# Number of worker threads (by default, one per core):
+WORKERS = None
+
+
+def segmenttable():
+    """ (count, edges) of the segments of each cell case. Corners are numbered anticlockwise from the bottom left,
+    and edge k joins corner k to corner k + 1 (bottom, right, top, left). The case is the sum of 2^k over the corners k
+    that are above the level, plus 16 for saddles (cases 5 and 10) whose centre is above the level.
+    edges[case, s] = (from edge, to edge) of segment s. Segments run from an edge where the corners go from above
+    to below (anticlockwise) to one where they go from below to above, so values above the level are on their left.
+    Saddles with the centre above join the two corners above; otherwise they are cut off separately.
+    """
+    counts = np.zeros(32, dtype=np.int64)
+    edges = np.zeros((32, 2, 2), dtype=np.int64)
+    for case in range(32):
+        above = [(case >> k) & 1 for k in range(4)]
+        exits = [k for k in range(4) if above[k] and not above[(k + 1) % 4]]
+        entries = [k for k in range(4) if not above[k] and above[(k + 1) % 4]]
+        centreAbove = case >= 16
+        for s, exit in enumerate(exits):
+            # Entries and exits alternate round the cell: pair each exit with the next entry, or the previous one.
+            following = [(entry - exit) % 4 for entry in entries]
+            pick = following.index(min(following)) if centreAbove or len(exits) == 1 else following.index(max(following))
+            edges[case, s] = (exit, entries[pick])
+        counts[case] = len(exits)
+    return counts, edges
+
+SEGMENTCOUNTS, SEGMENTEDGES = segmenttable()
+
+
+def asgrid(z):
+    """ z as a 2-D float64 array; a numpy.memmap is left as it is, to be read a band at a time.
+    """
+    if isinstance(z, np.memmap):
+        if z.ndim != 2:
+            raise ValueError('Array must be 2 dimensional (found %d dimensions).' % z.ndim)
+        return z
+    return asdoublearray(z, 2)
+
+
+def contourlevels(z, levels=10):
+    """ The levels of contours of z, ascending: levels is a sequence of levels, or a number of levels evenly
+    spaced strictly between the minimum and maximum of z.
+    """
+    if np.ndim(levels) == 0:
+        count = int(levels)
+        if count < 1:
+            raise ValueError('There must be at least one level')
+        lo, hi = np.nanmin(z), np.nanmax(z)
+        return np.linspace(lo, hi, count + 2)[1:-1]
+    return np.unique(asdoublearray(levels, 1))
+
+
+def edgecount(rows, columns):
+    """ Number of cell edges of a grid: horizontal edges (row * (columns - 1) + column) come first, then vertical
+    edges (row * columns + column).
+    """
+    return rows * (columns - 1) + (rows - 1) * columns
+
+
+def bandsegments(z, levels, first, last):
+    """ (start, end) crossing keys of the segments of the cells of rows first to last - 1, for all levels.
+    The key of a crossing is level * edgecount + edge.
+    Each sample is ranked among the levels once; a cell then crosses the levels from the lowest rank of its corners
+    up to (not including) the highest, so cells that cross no level cost no more than the ranking.
+    """
+    rows, columns = z.shape
+    horizontal = rows * (columns - 1)
+    band = asdoublearray(z[first:last + 1], 2)
+    # Number of levels at or below each sample (the sample is above level k if its rank is more than k):
+    rank = np.searchsorted(levels, band, 'right')
+    corners = [rank[:-1, :-1], rank[:-1, 1:], rank[1:, 1:], rank[1:, :-1]]
+    lowest = np.minimum(np.minimum(corners[0], corners[1]), np.minimum(corners[2], corners[3]))
+    highest = np.maximum(np.maximum(corners[0], corners[1]), np.maximum(corners[2], corners[3]))
+    finite = np.isfinite(band)
+    finite = finite[:-1, :-1] & finite[:-1, 1:] & finite[1:, 1:] & finite[1:, :-1]
+    row, column = np.nonzero((highest > lowest) & finite)
+    crossed = (highest - lowest)[row, column]
+    # One entry for each level crossed by each cell:
+    cell = np.repeat(np.arange(len(row)), crossed)
+    level = lowest[row, column][cell] + np.arange(len(cell)) - np.repeat(np.cumsum(crossed) - crossed, crossed)
+    row, column = row[cell], column[cell]
+    case = np.zeros(len(cell), dtype=np.int64)
+    for k, corner in enumerate(corners):
+        case += (corner[row, column] > level) << k
+    saddle = (case == 5) | (case == 10)
+    if saddle.any():
+        r, c = row[saddle], column[saddle]
+        centre = 0.25 * (band[r, c] + band[r, c + 1] + band[r + 1, c + 1] + band[r + 1, c])
+        case[saddle] += 16 * (centre >= levels[level[saddle]])
+    row = row + first
+    # Edge of each side of each cell (bottom, right, top, left):
+    sides = np.column_stack([row * (columns - 1) + column, horizontal + row * columns + column + 1,
+                             (row + 1) * (columns - 1) + column, horizontal + row * columns + column])
+    base = level * edgecount(rows, columns)
+    starts, ends = [], []
+    for s in (0, 1):
+        index = np.nonzero(SEGMENTCOUNTS[case] > s)[0]
+        starts.append(base[index] + sides[index, SEGMENTEDGES[case[index], s, 0]])
+        ends.append(base[index] + sides[index, SEGMENTEDGES[case[index], s, 1]])
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def segments(z, levels, workers=None):
+    """ (start, end) crossing keys of all the segments of the contours of z at levels, found a band of rows at
+    a time by a pool of workers threads.
+    """
+    rows, columns = z.shape
+    workers = workers or WORKERS or cpu_count()
+    bandrows = max(1, min(BANDCELLS // columns, -(-(rows - 1) // workers)))
+    bands = [(first, min(first + bandrows, rows - 1)) for first in range(0, rows - 1, bandrows)]
+    if len(bands) > 1 and workers > 1:
+        pool = ThreadPool(min(workers, len(bands)))
+        try:
+            parts = pool.map(lambda band: bandsegments(z, levels, band[0], band[1]), bands)
+        finally:
+            pool.close()
+    else:
+        parts = [bandsegments(z, levels, first, last) for first, last in bands]
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def successors(starts, ends):
+    """ Index of the segment that continues each segment (the one starting where it ends), or -1.
+    """
+    order = np.argsort(starts, kind='mergesort')
+    sortedStarts = starts[order]
+    position = np.minimum(np.searchsorted(sortedStarts, ends), max(len(starts) - 1, 0))
+    found = sortedStarts[position] == ends if len(starts) else np.zeros(0, dtype=bool)
+    return np.where(found, order[position], -1)
+
+
+def stitch(starts, ends):
+    """ (order, tails) of segments stitched into polylines: order lists the segments polyline by polyline (in
+    order of level), each from its first segment to its last, and tails marks the last segment of each polyline.
+    Closed loops are opened at their lowest numbered segment.
+    Pointer jumping: each doubling step halves the distance left to the end of every polyline at once.
+    """
+    n = len(starts)
+    index = np.arange(n)
+    following = successors(starts, ends)
+    following = np.where(following < 0, index, following)
+    steps = max(1, int(n).bit_length())
+    # Segments of closed loops never reach a segment that is its own successor:
+    jump = following
+    for step in range(steps):
+        jump = jump[jump]
+    loop = following[jump] != jump
+    if loop.any():
+        # Open each loop before its lowest numbered segment:
+        lowest, jump = index.copy(), following
+        for step in range(steps):
+            lowest = np.minimum(lowest, lowest[jump])
+            jump = jump[jump]
+        heads = index[loop & (lowest == index)]
+        predecessor = np.empty(n, dtype=np.int64)
+        predecessor[following] = index
+        following = following.copy()
+        following[predecessor[heads]] = predecessor[heads]
+    # Distance of each segment from the end of its polyline, and that end:
+    distance, tail = (following != index).astype(np.int64), following
+    for step in range(steps):
+        distance = distance + distance[tail]
+        tail = tail[tail]
+    # Polylines in order of the crossing key of their end, and so by level:
+    order = np.lexsort((-distance, ends[tail]))
+    return order, distance[order] == 0
+
+
+def crossingpoints(keys, x, y, z, levels):
+    """ (x, y) of the crossings of the contours with cell edges, by linear interpolation along the edge.
+    """
+    rows, columns = z.shape
+    edges = edgecount(rows, columns)
+    horizontal = rows * (columns - 1)
+    level, edge = levels[keys // edges], keys % edges
+    isHorizontal = edge < horizontal
+    vertical = edge - horizontal
+    row = np.where(isHorizontal, edge // max(columns - 1, 1), vertical // columns)
+    column = np.where(isHorizontal, edge % max(columns - 1, 1), vertical % columns)
+    row1 = np.where(isHorizontal, row, row + 1)
+    column1 = np.where(isHorizontal, column + 1, column)
+    z0 = np.asarray(z[row, column], dtype=np.float64)
+    t = (level - z0) / (np.asarray(z[row1, column1], dtype=np.float64) - z0)
+    px = x[column] + np.where(isHorizontal, t, 0.0) * (x[column1] - x[column])
+    py = y[row] + np.where(isHorizontal, 0.0, t) * (y[row1] - y[row])
+    return px, py
+
+
+def contourlines(x, y, z, levels, workers=None):
+    """ [(px, py)] of the contours of z at each of levels (ascending): the polylines of a level are joined, with
+    NaN between them. x and y are the coordinates of the columns and rows of z (None for their indices).
+    """
+    z = asgrid(z)
+    rows, columns = z.shape
+    x = np.arange(columns, dtype=np.float64) if x is None else asdoublearray(x, 1)
+    y = np.arange(rows, dtype=np.float64) if y is None else asdoublearray(y, 1)
+    if len(x) != columns or len(y) != rows:
+        raise ValueError('x must have a value for each column of z and y one for each row')
+    levels = asdoublearray(levels, 1)
+    if (np.diff(levels) <= 0).any():
+        raise ValueError('Levels must be ascending')
+    if rows < 2 or columns < 2 or len(levels) == 0:
+        return [(np.zeros(0), np.zeros(0)) for level in levels]
+    starts, ends = segments(z, levels, workers)
+    order, tails = stitch(starts, ends)
+    # Each polyline is the start of each of its segments, then the end of its last segment, then a NaN break:
+    polyline = np.cumsum(tails) - tails
+    position = np.arange(len(order)) + 2 * polyline
+    px = np.full(len(order) + 2 * int(tails.sum()), np.nan)
+    py = px.copy()
+    px[position], py[position] = crossingpoints(starts[order], x, y, z, levels)
+    last = position[tails] + 1
+    px[last], py[last] = crossingpoints(ends[order][tails], x, y, z, levels)
+    # Polylines are in order of level, so each level is one slice, from the start of its first polyline to the
+    # end of its last:
+    first = np.concatenate([[0], last[:-1] + 2]).astype(np.int64)
+    bounds = np.searchsorted(ends[order][tails] // edgecount(rows, columns), np.arange(len(levels) + 1))
+    lines = []
+    for k in range(len(levels)):
+        if bounds[k] == bounds[k + 1]:
+            lines.append((np.zeros(0), np.zeros(0)))
+            continue
+        part = slice(first[bounds[k]], last[bounds[k + 1] - 1] + 1)
+        lines.append((px[part], py[part]))
+    return lines
+
+
+class ContourSet(object):
+    """ The contours of a grid, as Plot2DContour: contours are found for a set of levels when first asked for and
+    kept, so drawing the same levels again (e.g. after restyling) does not find them again.
+    """
+
+    def __init__(self, x, y, z, workers=None):
+        self.z = asgrid(z)
+        self.x = None if x is None else asdoublearray(x, 1)
+        self.y = None if y is None else asdoublearray(y, 1)
+        self.workers = workers
+        self.cache = {}
+
+    def lines(self, levels):
+        """ (levels, [(px, py)]): the levels (see contourlevels) and the contours at each, as contourlines.
+        """
+        levels = contourlevels(self.z, levels)
+        key = tuple(levels.tolist())
+        if key not in self.cache:
+            self.cache[key] = contourlines(self.x, self.y, self.z, levels, self.workers)
+        return levels, self.cache[key]
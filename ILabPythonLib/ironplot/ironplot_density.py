@@ -0,0 +1,106 @@
+""" Density rendering of large scatter plots.
+
+NumPy equivalent of IronPlot.DensityBinning, used by DensityScatter: rather than
+a marker for every point, points are counted into a grid of cells at screen
+resolution and the grid is shaded as an image. Points are binned a chunk at a
+time, so x and y may be numpy.memmap arrays of 1e8 points or more.
+The grid covers the region from (left, bottom) of the given width and height,
+and has shape (rows, columns) with row 0 at the bottom (graph y increasing with
+the row), as DensityBinning. For the same points it produces the same counts and
+the same packed BGRA32 pixels.
+"""
+import numpy as np
+from ironplot_arrays import asdoublearray
+from ironplot_colour import checknorm, quantise, lookuptable, tobgra32, colourmap
+
+# Number of points binned at a time:
+CHUNKSIZE = 1 << 22
+# Opacity of the least dense cells of categorised counts, as DensityBinning.MinimumAlpha:
+MINIMUMALPHA = 64
+
+
+def bincounts(x, y, region, columns, rows, categories=None, ncategories=1, chunksize=CHUNKSIZE):
+    """ Counts (int64) of the points in each cell of a grid of columns by rows covering
+    region = (left, bottom, width, height), shape (rows, columns).
+    With categories (an integer for each point, from 0 to ncategories - 1), the counts of each category,
+    shape (ncategories, rows, columns); points of other categories are not counted.
+    Points outside the region and points with NaN coordinates are not counted;
+    points on the right and top edges go in the last cells.
+    """
+    if len(x) != len(y):
+        raise ValueError("Component vectors' lengths must be equal")
+    if categories is not None and len(categories) != len(x):
+        raise ValueError('There must be a category for each point')
+    if columns < 1 or rows < 1 or ncategories < 1:
+        raise ValueError('Grid must have at least one cell and one category')
+    left, bottom, width, height = [float(value) for value in region]
+    xScale, yScale = columns / width, rows / height
+    cells = columns * rows
+    counts = np.zeros(cells * ncategories, dtype=np.int64)
+    for start in range(0, len(x), chunksize):
+        with np.errstate(invalid='ignore'):
+            u = (asdoublearray(x[start:start + chunksize], 1) - left) * xScale
+            v = (asdoublearray(y[start:start + chunksize], 1) - bottom) * yScale
+            inside = (u >= 0) & (u <= columns) & (v >= 0) & (v <= rows)
+        index = np.minimum(v[inside].astype(np.int64), rows - 1) * columns + np.minimum(u[inside].astype(np.int64), columns - 1)
+        if categories is not None:
+            category = np.asarray(categories[start:start + chunksize], dtype=np.int64)[inside]
+            valid = (category >= 0) & (category < ncategories)
+            index = category[valid] * cells + index[valid]
+        counts += np.bincount(index, minlength=cells * ncategories)
+    if categories is None:
+        return counts.reshape(rows, columns)
+    return counts.reshape(ncategories, rows, columns)
+
+
+def maxcount(counts, categorised=False):
+    """ The largest count of a cell (summed over the categories of categorised counts).
+    """
+    totals = counts.sum(axis=0) if categorised else counts
+    return int(totals.max()) if totals.size else 0
+
+
+def shade(counts, maxcount, norm='log', maptype='jet', ncolours=256):
+    """ BGRA32 bytes of single-category counts, shape counts.shape + (4,), as DensityBinning.Shade:
+    a count of 1 takes the first colour of the colour map and maxcount the last; empty cells are transparent.
+    """
+    values = np.where(counts > 0, counts, np.nan).astype(np.float64)
+    indices = quantise(values, (1, max(maxcount, 1)), norm, ncolours)
+    return tobgra32(indices, lookuptable(colourmap(maptype, ncolours)))
+
+
+def shadecategories(counts, maxcount, norm='log', colours=None):
+    """ BGRA32 bytes of categorised counts (shape (ncategories, rows, columns)), shape (rows, columns, 4),
+    as DensityBinning.ShadeCategories: each cell has the mean of the colours (packed RGB) of its categories
+    weighted by their counts, and an opacity from MINIMUMALPHA (a count of 1) to 255 (maxcount).
+    """
+    log = checknorm(norm)
+    colours = np.asarray(colours, dtype=np.int64)
+    if len(colours) < counts.shape[0]:
+        raise ValueError('There must be a colour for each category')
+    colours = colours[:counts.shape[0]]
+    weights = counts.astype(np.float64)
+    total = weights.sum(axis=0)
+    span = np.log10(max(maxcount, 1)) if log else maxcount - 1.0
+    with np.errstate(all='ignore'):
+        channels = [np.floor(np.tensordot((colours >> shift) & 255, weights, 1) / total + 0.5) for shift in (0, 8, 16)]
+        level = ((np.log10(total) if log else total - 1) / span) if span > 0 else np.ones_like(total)
+    alpha = MINIMUMALPHA + np.floor(level * (255 - MINIMUMALPHA) + 0.5)
+    pixels = np.zeros(total.shape + (4,), dtype=np.uint8)
+    occupied = total > 0
+    for channel, values in enumerate(channels + [alpha]):
+        pixels[..., channel][occupied] = values[occupied]
+    return pixels
+
+
+def categorycodes(categories):
+    """ (codes, labels) of a category for each point: codes are integers from 0 (int32) and labels[code] is the
+    category of a code. Categories that are already integers from 0 are their own codes; anything else
+    (e.g. strings) is numbered in sorted order.
+    """
+    categories = np.asarray(categories)
+    if categories.dtype.kind in 'iub' and (categories.size == 0 or categories.min() >= 0):
+        codes = categories.astype(np.int32)
+        return codes, list(range(int(codes.max()) + 1 if codes.size else 0))
+    labels, codes = np.unique(categories, return_inverse=True)
+    return codes.astype(np.int32), list(labels)
@@ -0,0 +1,238 @@
+""" Non-blocking dispatch of calls to the plotting UI thread.
+
+Dispatcher.Invoke blocks the calling thread until the UI thread has run the call,
+including any layout and rendering it causes, so a compute loop that plots stalls
+on every redraw. A DispatchQueue instead posts each call (with Dispatcher.BeginInvoke
+in ironplot_windows) and returns a DispatchFuture at once.
+Calls submitted with the same key are coalesced: while a call is waiting, a newer
+call with its key replaces it, so only the latest update of a plot is applied and
+both callers get its result. The number of waiting calls is bounded; when the queue
+is full, submit blocks until the UI thread catches up (or raises, if asked not to
+block). The queue keeps counters of its depth and of the latency from submission
+to the start of each call on the UI thread.
+This module does not use .NET, so that it can be used with any function that
+schedules calls on another thread.
+"""
+import threading
+import time
+
+clock = getattr(time, 'perf_counter', time.time)
+
+DEFAULTMAXPENDING = 64
+
+
+class DispatchFuture(object):
+    """ The result of a call dispatched to the UI thread, as concurrent.futures.Future:
+    result(timeout) waits for and returns the result (or raises the call's exception).
+    With asyncio, a DispatchFuture can be awaited from a coroutine.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.finished = False
+        self.started = False
+        self.cancelled = False
+        self.value = None
+        self.error = None
+        self.callbacks = []
+
+    def done(self):
+        return self.finished
+
+    def cancel(self):
+        """ Cancel the call if it has not started. Returns True if it was cancelled.
+        """
+        with self.condition:
+            if self.started or self.finished:
+                return self.cancelled
+            self.cancelled = True
+        self.finish(None, None)
+        return True
+
+    def result(self, timeout=None):
+        self.wait(timeout)
+        if self.cancelled:
+            raise RuntimeError('Dispatched call was cancelled')
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def exception(self, timeout=None):
+        self.wait(timeout)
+        return self.error
+
+    def wait(self, timeout=None):
+        with self.condition:
+            if not self.finished:
+                self.condition.wait(timeout)
+            if not self.finished:
+                raise RuntimeError('Timed out waiting for dispatched call')
+
+    def add_done_callback(self, function):
+        """ Call function(future) when the call completes (at once if it has), on the thread that completes it.
+        """
+        with self.condition:
+            if not self.finished:
+                self.callbacks.append(function)
+                return
+        function(self)
+
+    def start(self):
+        """ Mark the call as running; returns False if it was cancelled.
+        """
+        with self.condition:
+            self.started = not self.cancelled
+            return self.started
+
+    def finish(self, value, error):
+        with self.condition:
+            if self.finished:
+                return
+            self.value, self.error, self.finished = value, error, True
+            callbacks, self.callbacks = self.callbacks, []
+            self.condition.notify_all()
+        for function in callbacks:
+            function(self)
+
+    def __await__(self):
+        return asasyncio(self).__await__()
+
+
+def asasyncio(future, loop=None):
+    """ An asyncio future (of loop, by default the running loop) that completes with a DispatchFuture.
+    """
+    import asyncio
+    loop = loop or asyncio.get_event_loop()
+    result = loop.create_future()
+
+    def copy(source):
+        if result.cancelled():
+            return
+        if source.cancelled:
+            result.cancel()
+        elif source.error is not None:
+            result.set_exception(source.error)
+        else:
+            result.set_result(source.value)
+    future.add_done_callback(lambda source: loop.call_soon_threadsafe(copy, source))
+    return result
+
+
+class PendingCall(object):
+
+    def __init__(self, function, key):
+        self.function = function
+        self.key = key
+        self.future = DispatchFuture()
+        self.submitted = clock()
+
+
+class DispatchQueue(object):
+    """ DispatchQueue(post, maxpending): a bounded queue of calls for the UI thread.
+    post(function) must schedule function() to be run on the UI thread and return without waiting.
+    """
+
+    def __init__(self, post, maxpending=DEFAULTMAXPENDING):
+        if maxpending < 1:
+            raise ValueError('maxpending must be at least 1')
+        self.post = post
+        self.maxpending = maxpending
+        self.condition = threading.Condition()
+        # Waiting calls with a key, by key:
+        self.keyed = {}
+        self.depth = 0
+        self.resetstats()
+
+    def resetstats(self):
+        with self.condition:
+            self.counters = {'submitted': 0, 'coalesced': 0, 'completed': 0, 'failed': 0, 'cancelled': 0,
+                             'maxdepth': self.depth}
+            self.latencies = {'total': 0.0, 'max': 0.0, 'last': 0.0}
+
+    def submit(self, function, key=None, block=True, timeout=None):
+        """ Post function() to the UI thread and return a DispatchFuture of its result.
+        If a call with the same key (e.g. the plot it updates) is still waiting, function replaces it and
+        its future is returned; a waiting call that was cancelled is not replaced, but left to be dropped, and
+        function is queued as a new call. If the queue is full, wait (up to timeout seconds) for a place, or raise
+        RuntimeError at once if block is False.
+        """
+        with self.condition:
+            self.counters['submitted'] += 1
+            call = self.keyed.get(key) if key is not None else None
+            if call is not None and not call.future.cancelled:
+                call.function = function
+                self.counters['coalesced'] += 1
+                return call.future
+            deadline = None if timeout is None else clock() + timeout
+            while self.depth >= self.maxpending:
+                remaining = None if deadline is None else deadline - clock()
+                if not block or (remaining is not None and remaining <= 0):
+                    self.counters['submitted'] -= 1
+                    raise RuntimeError('Dispatch queue is full')
+                self.condition.wait(remaining)
+            call = PendingCall(function, key)
+            if key is not None:
+                self.keyed[key] = call
+            self.depth += 1
+            self.counters['maxdepth'] = max(self.counters['maxdepth'], self.depth)
+        try:
+            self.post(lambda: self.run(call))
+        except Exception:
+            self.release(call)
+            raise
+        return call.future
+
+    def release(self, call):
+        """ Take a call off the queue (as it starts); returns the latency of the call.
+        """
+        with self.condition:
+            if call.key is not None and self.keyed.get(call.key) is call:
+                del self.keyed[call.key]
+            self.depth -= 1
+            self.condition.notify_all()
+            return clock() - call.submitted
+
+    def run(self, call):
+        """ Run a call on the UI thread.
+        """
+        latency = self.release(call)
+        if not call.future.start():
+            with self.condition:
+                self.counters['cancelled'] += 1
+            return
+        try:
+            value, error = call.function(), None
+        except Exception as e:
+            value, error = None, e
+        with self.condition:
+            self.counters['failed' if error is not None else 'completed'] += 1
+            self.latencies['total'] += latency
+            self.latencies['last'] = latency
+            self.latencies['max'] = max(self.latencies['max'], latency)
+        call.future.finish(value, error)
+
+    def flush(self, timeout=None):
+        """ Wait until no calls are waiting (they may still be running). Returns False on timeout.
+        """
+        deadline = None if timeout is None else clock() + timeout
+        with self.condition:
+            while self.depth > 0:
+                remaining = None if deadline is None else deadline - clock()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def stats(self):
+        """ Dictionary of counters: depth (calls waiting now), maxdepth, submitted, coalesced (calls replaced by a
+        newer call with the same key), completed, failed, cancelled and the latency (seconds from submission to the
+        start of a call on the UI thread) of the last call, the maximum and the mean.
+        """
+        with self.condition:
+            stats = dict(self.counters)
+            stats['depth'] = self.depth
+            started = self.counters['completed'] + self.counters['failed']
+            stats['lastlatency'] = self.latencies['last']
+            stats['maxlatency'] = self.latencies['max']
+            stats['meanlatency'] = self.latencies['total'] / started if started else 0.0
+            return stats
@@ -1,25 +1,23 @@
 from ironplot_windows import *
+import atexit
 import clr
+import numbers
 import System
 import System.Windows.Controls 
 from System.Windows.Controls import *
 from System.Windows import Thickness, Visibility
 clr.AddReferenceToFile("IronPlot.dll")
 from IronPlot import *
-from IronPlot.Plotting3D import Plot3D
+from ironplot_arrays import ingestargs, ingestlines, todoublebuffer, stringTypes, isdatetime64, asepochnanoseconds, dayorigin
+from ironplot_stream import aschunk, batches
 
 floatarray = System.Array[float]
 
 numpyAvailable = True
-ilnumericsAvailable = True
 try:
     import numpy as np
 except ImportError:
     numpyAvailable = False
-try:
-    import ilnumerics as il
-except ImportError:
-    ilnumericsAvailable = False
     
     
 def plot(*args, **kwargs):
@@ -33,7 +31,12 @@ def plot(*args, **kwargs):
    Colours are 'r', 'g', 'b', 'y', 'c', 'm', 'k', 'w'
    Can also specify properties of the Curves to change, e.g.:
    plot(x1, y1, '-or', StrokeThickness = 2)
+   Arrays of any dtype or layout (and Python sequences) are converted in bulk before plotting.
+   NumPy datetime64 arrays are plotted on Date axes, keeping their full (nanosecond) resolution, as are
+   System.DateTime[] arrays (with the same origin as datetime64 arrays on the same axis).
    """
+   args, origins = ingestdates(args)
+   args = ingestargs(args)
    if PlotContext.CurrentWindowIndex == None:
       PlotContext.OpenNextWindow()
    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
@@ -45,6 +48,7 @@ def plot(*args, **kwargs):
    else:
       # Add to current plot
       curves = Plotting.Plot2D(PlotContext.CurrentPlot, *args)
+   setdateaxes(curves[0].Plot, origins)
    # Apply kwargs
    for curve in curves:
       setprops(curve, **kwargs)
@@ -54,31 +58,373 @@ def plot(*args, **kwargs):
       return curves[0]
 
 
-# def bar(*args, **kwargs):
-   # """ Create a bar plot (or overwite current plot if hold is set).
-   # """
-   # if PlotContext.CurrentWindowIndex == None:
-      # PlotContext.OpenNextWindow()
-   # if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
-      # # New plot or overwite plot
-      # plot = Plot2D()
-      # PlotContext.AddPlot(plot)      
-   # else:
-      # # Add to current plot
-      # plot = PlotContext.CurrentPlot
-   # ILArrayType = ILArray[float]
-   # if len(args) == 1 and isinstance(args[0], ILArrayType) and args[0].IsVector:
-      # bars = plot.AddBars(args[0])
-   # for bar in bars:
-      # setprops(bar, **kwargs)
-   # return plot    
+def isdatetimearray(data):
+    """ True if data is a NumPy datetime64 array or a System.DateTime[] array.
+    """
+    return isdatetime64(data) or isinstance(data, System.Array[System.DateTime])
+
+
+def ingestdates(args):
+    """ Convert the NumPy datetime64 and System.DateTime[] arrays in a plot argument list to days from a date
+    origin, which is kept close to the data so that doubles hold their full resolution (days from 1899, as OADates,
+    resolve only about a microsecond). Returns the arguments and the origins (System.DateTime or None) of the x
+    and y axes. Each axis has one origin, used for all its arrays of either kind: when adding to a plot that
+    already has a Date axis, its origin is used; otherwise the origin is the start of the day of the first time.
+    datetime64 conversion is a zero-copy int64 view, one block copy and a parallel managed loop.
+    """
+    args = list(args)
+    origins = [None, None]
+    if not any(isdatetimearray(arg) for arg in args):
+        return args, origins
+    axes = [None, None]
+    if PlotContext.HoldState and isinstance(PlotContext.CurrentPlot, Plot2D):
+        axes = [PlotContext.CurrentPlot.Axes.XAxes.Bottom, PlotContext.CurrentPlot.Axes.YAxes.Left]
+    i = 0
+    while i < len(args):
+        # Each line is up to two vectors (x and y, or just y), then possibly a line property, as in Plotting.Plot2D.
+        group = []
+        while i < len(args) and len(group) < 2 and not isinstance(args[i], stringTypes):
+            group.append(i)
+            i += 1
+        if len(group) == 0:
+            i += 1
+            continue
+        roles = [0, 1] if len(group) == 2 else [1]
+        for index, role in zip(group, roles):
+            if isdatetime64(args[index]):
+                nanoseconds = asepochnanoseconds(args[index])
+                if origins[role] is None:
+                    origins[role] = axisorigin(axes[role], lambda: System.DateTime(1970, 1, 1).AddTicks(dayorigin(nanoseconds) // 100))
+                args[index] = DateTimeArrays.ToDays(GeneralArray.ToInt64Array(nanoseconds), origins[role])
+            elif isinstance(args[index], System.Array[System.DateTime]):
+                dates = args[index]
+                if origins[role] is None:
+                    origins[role] = axisorigin(axes[role], lambda: dates[0].Date if dates.Length > 0 else Axis.OADateOrigin)
+                args[index] = DateTimeArrays.ToDays(dates, origins[role])
+    return args, origins
+
+
+def axisorigin(axis, default):
+    """ The DateOrigin of axis if it is a Date axis, otherwise default().
+    """
+    if axis is not None and axis.AxisType == AxisType.Date:
+        return axis.DateOrigin
+    return default()
+
+
+def setdateaxes(plot, origins):
+    """ Make the axes of a plot whose data were converted by ingestdates Date axes with the given origins.
+    """
+    for axes, origin in zip(((plot.Axes.XAxes.Bottom, plot.Axes.XAxes.Top), (plot.Axes.YAxes.Left, plot.Axes.YAxes.Right)), origins):
+        if origin is None:
+            continue
+        for axis in axes:
+            axis.DateOrigin = origin
+            axis.AxisType = AxisType.Date
+
+
+def plot_many(x, Y=None, styles=None, titles=None, **kwargs):
+    """ Plot many lines against one x vector in a single call (or overwite current plot if hold is set).
+    Plot2DLines plot_many(x, Y): each row of the 2D array Y is a line plotted against x
+    (Y may also have one column per line)
+    Plot2DLines plot_many(Y): x vector will be created
+    styles is a line property, e.g. '-r', or a sequence of them used in turn for the lines.
+    titles is a sequence of legend titles, one per line.
+    The lines are added to the plot as one Plot2DLines: x is converted and transformed once,
+    the axes and layout are updated once, and lines of the same style are drawn as one geometry.
+    Can also specify properties of the Plot2DLines, e.g.:
+    plot_many(x, Y, '--b', StrokeThickness = 2)
+    """
+    if Y is None or isinstance(Y, stringTypes):
+        x, Y, styles = None, x, styles if Y is None else Y
+    x, Y = ingestlines(x, Y)
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot2D()
+        plot.Padding = Thickness(10)
+        PlotContext.AddPlot(plot)
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    lines = Plot2DLines(Y) if x is None else Plot2DLines(x, Y)
+    if styles is not None:
+        if isinstance(styles, stringTypes):
+            styles = [styles]
+        lines.Styles = System.Array[str](styles)
+    if titles is not None:
+        lines.Titles = System.Array[str](titles)
+    plot.Children.Add(lines)
+    setprops(lines, **kwargs)
+    return lines
+
+
+def stream(source, window=0, capacity=65536, interval=0.05, rescale=True, **kwargs):
+    """ Plot data from source (typically a generator) as it arrives, without blocking the console.
+    Plot2DCurve stream(source): source yields (x, y) pairs, where x and y are numbers or arrays of the same length.
+    The curve is added to the current plot (or a new plot if hold is not set) and source is consumed on a
+    background thread; the pairs arriving in each interval (seconds) are appended to the curve in one call.
+    If window is greater than zero, only the most recent window points are kept.
+    If rescale is True, the axes follow the data.
+    """
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot2D()
+        plot.Padding = Thickness(10)
+        PlotContext.AddPlot(plot)
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    curve = Plot2DCurve(Curve(capacity, window))
+    plot.Children.Add(curve)
+    setprops(curve, **kwargs)
+    def feed():
+        for x, y in batches(source, interval):
+            append(curve, x, y, rescale)
+    thread = Thread(ThreadStart(feed))
+    thread.IsBackground = True
+    thread.Start()
+    return curve
+
+
+def append(curve, x, y, rescale=False):
+    """ Append points to a Plot2DCurve (e.g. one returned by plot or stream) and redraw.
+    x and y are numbers or arrays of the same length. Can be called from any thread.
+    """
+    x = todoublebuffer(aschunk(x), 1)
+    y = todoublebuffer(aschunk(y), 1)
+    curve.Dispatcher.Invoke(DispatcherPriority.Normal, CallTarget0(lambda: curve.Append(x, y, rescale)))
+
+
+def interpolate(x, y, xi, method='linear', outside='extrapolate'):
+    """ Values at xi of the curve through the points (x, y), evaluated in bulk by IronPlot (Curve.Interpolate).
+    method is 'linear', 'spline' (natural cubic spline) or 'monotone' (monotone piecewise cubic Hermite).
+    outside gives the values where xi is outside the range of x: 'extrapolate' (the end segments extended),
+    'clamp' (the end values held) or 'nan'. Values are NaN where xi is NaN.
+    Ascending xi, e.g. a new grid to resample onto, are located by walking along x rather than by a search
+    per point, and long xi are evaluated in parallel chunks.
+    Arrays are passed across in one block each way: with NumPy, the result is a NumPy array.
+    """
+    methods = {'linear': InterpolationMethod.Linear, 'spline': InterpolationMethod.CubicSpline,
+               'monotone': InterpolationMethod.MonotoneCubicSpline}
+    policies = {'extrapolate': Extrapolation.Extrapolate, 'clamp': Extrapolation.Clamp, 'nan': Extrapolation.NaN}
+    if method not in methods:
+        raise ValueError("method must be 'linear', 'spline' or 'monotone'")
+    if outside not in policies:
+        raise ValueError("outside must be 'extrapolate', 'clamp' or 'nan'")
+    x = todoublebuffer(x, 1)
+    y = todoublebuffer(y, 1)
+    sort = True
+    if numpyAvailable and isinstance(x, np.ndarray) and isinstance(y, np.ndarray):
+        if len(x) > 1 and (np.diff(x) < 0).any():
+            order = np.argsort(x, kind='mergesort')
+            x, y = x[order], y[order]
+        sort = False
+    curve = Curve(Plotting.Array(x), Plotting.Array(y))
+    if sort:
+        curve.Sort()
+    values = curve.Interpolate(Plotting.Array(todoublebuffer(xi, 1)), methods[method], policies[outside])
+    if not numpyAvailable:
+        return values
+    result = np.empty(len(values))
+    GeneralArray.CopyToNumpyArray(values, result)
+    return result
+
+
+def scatter(x, y, style='ob', mode='markers', categories=None, colours=None, norm='log', **kwargs):
+    """ Create a scatter plot (or add to the current plot if hold is set).
+    Plot2DCurve scatter(x, y, 'sr'): a marker for each point, with the marker and colour of the line properties.
+    DensityScatter scatter(x, y, mode = 'density'): for millions of points, the points are counted into a grid
+    with a cell per screen pixel, and the counts are shaded through the colour map, linearly or (by default)
+    logarithmically: norm is 'linear' or 'log'. The points are counted again only when the view changes.
+    scatter(x, y, mode = 'density', categories = labels, colours = ['r', 'b']): one category per point
+    (integers from 0, or any labels, taken in sorted order); each cell has the mean of the colours of its
+    categories, weighted by their counts, and an opacity from its count.
+    Colours are colour codes, '#rrggbb' or packed RGB values.
+    """
+    if mode == 'markers':
+        if categories is not None:
+            raise ValueError("categories need mode = 'density'")
+        return plot(x, y, style, **kwargs)
+    if mode != 'density':
+        raise ValueError("mode must be 'markers' or 'density'")
+    from ironplot_density import categorycodes
+    from ironplot_colour import packrgb
+    x = todoublebuffer(x, 1)
+    y = todoublebuffer(y, 1)
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        target = Plot2D()
+        target.Padding = Thickness(10)
+        PlotContext.AddPlot(target)
+    else:
+        # Add to current plot
+        target = PlotContext.CurrentPlot
+    if categories is None:
+        density = target.AddDensityScatter(x, y)
+    else:
+        codes, labels = categorycodes(categories)
+        density = target.AddDensityScatter(x, y, todoublebuffer(codes, 1))
+        if colours:
+            # Colours are used in turn if there are more categories:
+            packed = [packrgb(colours[k % len(colours)]) for k in range(max(len(labels), 1))]
+            density.CategoryColours = System.Array[int](packed)
+    setcolourscale(density, None, norm)
+    setprops(density, **kwargs)
+    return density
+
+
+def nearest(x, y, k=1, curve=None):
+    """ The points nearest (x, y), in data coordinates, nearest on screen first.
+    nearest(x, y, k, curve): array of the indices of the k points of curve (a Plot2DCurve) nearest (x, y).
+    nearest(x, y, k): list of (curve, index) pairs for the k points of the curves of the current plot nearest (x, y).
+    Points are found with a spatial index of each curve, made on the first query, so that hovering and
+    snapping stay fast for millions of unsorted points.
+    """
+    point = System.Windows.Point(x, y)
+    if curve is not None:
+        return toindices(invoke(curve, lambda: curve.NearestIndices(point, k)))
+    plot = PlotContext.CurrentPlot
+    pairs = invoke(plot, lambda: plot.NearestPoints(point, k))
+    return [(pair.Key, pair.Value) for pair in pairs]
+
+
+def select(region, curve=None):
+    """ The points inside a region, in data coordinates.
+    region is a rectangle (xmin, xmax, ymin, ymax) or a polygon (lasso), as a sequence of (x, y) vertices.
+    select(region, curve): array of the indices, ascending, of the points of curve (a Plot2DCurve) in region.
+    select(region): dictionary of these arrays for the curves of the current plot with any points in region.
+    """
+    if len(region) == 4 and not hasattr(region[0], '__len__'):
+        xmin, xmax, ymin, ymax = [float(value) for value in region]
+        rect = System.Windows.Rect(System.Windows.Point(xmin, ymin), System.Windows.Point(xmax, ymax))
+        if curve is not None:
+            return toindices(invoke(curve, lambda: curve.IndicesInRegion(rect)))
+        plot = PlotContext.CurrentPlot
+        selection = invoke(plot, lambda: plot.SelectRegion(rect))
+    else:
+        polygon = System.Collections.Generic.List[System.Windows.Point]()
+        for vertex in region:
+            polygon.Add(System.Windows.Point(float(vertex[0]), float(vertex[1])))
+        if curve is not None:
+            return toindices(invoke(curve, lambda: curve.IndicesInPolygon(polygon)))
+        plot = PlotContext.CurrentPlot
+        selection = invoke(plot, lambda: plot.SelectPolygon(polygon))
+    return dict((pair.Key, toindices(pair.Value)) for pair in selection)
+
+
+def invoke(target, function):
+    """ Call function on the thread of target (a plot or plot item) and return its result.
+    """
+    return target.Dispatcher.Invoke(DispatcherPriority.Normal, CallTarget0(function))
+
+
+def toindices(indices):
+    """ A numpy int32 array (or a list, without numpy) of a .NET array of indices, copied in one block.
+    """
+    if numpyAvailable:
+        result = np.empty(len(indices), dtype=np.int32)
+        GeneralArray.CopyToNumpyArray(indices, result)
+        return result
+    return list(indices)
+
+
+def profiling(*args):
+    """ Set to True to time each stage of drawing plots (see RenderProfiler); False (the default) to stop.
+    The argument is taken as a truth value (e.g. 1 or 0), as for asyncmode. With no argument, return whether
+    profiling is on.
+    """
+    if len(args) > 1:
+        raise TypeError('profiling takes at most 1 argument (%d given)' % len(args))
+    if len(args) == 1:
+        RenderProfiler.Enabled = bool(args[0])
+    else:
+        return RenderProfiler.Enabled
+
+
+def stats(plot=None, reset=False):
+    """ Breakdown of the time spent drawing, from the events recorded since profiling was switched on
+    (the most recent RenderProfiler.Capacity of them).
+    stats(): dictionary from each plot to a dictionary from stage name (e.g. 'FilterMinMax', 'LineGeometry',
+    'DeriveTicks', 'LabelLayout', 'PanelArrange', 'SurfaceDraw') to a dictionary of count, total_ms, mean_ms,
+    max_ms, last_ms, points_in, points_out (of the last event, -1 where not applicable) and allocated_bytes.
+    stats(plot): the dictionary of stages of one plot.
+    If reset is True, the events are cleared afterwards.
+    """
+    summary = invoke(Application.Current, lambda: RenderProfiler.Summary())
+    if reset:
+        RenderProfiler.Clear()
+    breakdown = {}
+    for stage in summary:
+        breakdown.setdefault(stage.Plot, {})[str(stage.Stage)] = {'count': stage.Count, 'total_ms': stage.TotalMilliseconds,
+            'mean_ms': stage.MeanMilliseconds, 'max_ms': stage.MaxMilliseconds, 'last_ms': stage.LastMilliseconds,
+            'points_in': stage.PointsIn, 'points_out': stage.PointsOut, 'allocated_bytes': stage.AllocatedBytes}
+    if plot is not None:
+        return breakdown.get(plot, {})
+    return breakdown
+
+
+def savetrace(path):
+    """ Write the recorded drawing events as a Chrome trace (JSON), to view a whole interaction on a timeline
+    in chrome://tracing or Perfetto.
+    """
+    invoke(Application.Current, lambda: RenderProfiler.WriteChromeTrace(path))
+
+
+def bar(*args, **kwargs):
+    """ Create a bar plot (or add to the current plot if hold is set).
+    Bars bar(lengths): vertical bars of lengths at 0, 1, 2...
+    Bars bar(start, end, position, thickness): bars from start to end, centred on position with width thickness
+    (arrays, or numbers for all the bars); orientation = 'horizontal' draws the bars along x.
+    Can also specify properties of the Bars, e.g.:
+    bar(lengths, Fill = Brushes.Orange, StrokeThickness = 0)
+    """
+    orientation = kwargs.pop('orientation', 'vertical')
+    if orientation not in ('vertical', 'horizontal'):
+        raise ValueError("orientation must be 'vertical' or 'horizontal'")
+    if len(args) not in (1, 4):
+        raise ValueError('bar takes lengths or start, end, position, thickness')
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot2D()
+        plot.Padding = Thickness(10)
+        PlotContext.AddPlot(plot)
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    if len(args) == 1:
+        bars = plot.AddBars(Plotting.Array(todoublebuffer(args[0], 1)))
+    else:
+        n = max([len(arg) for arg in args if hasattr(arg, '__len__')] + [1])
+        start, end, position, thickness = [floatarray([float(arg)] * n) if not hasattr(arg, '__len__')
+            else Plotting.Array(todoublebuffer(arg, 1)) for arg in args]
+        bars = plot.AddBars(start, end, position, thickness, BarType.Horizontal if orientation == 'horizontal' else BarType.Vertical)
+    setprops(bars, **kwargs)
+    return bars
 
  
 def image(*args, **kwargs):
     """ Create a false-colour image plot of the specified 2D array (matrix) (or overwite current plot if hold is set).
     Plot2DImage image(image): image is a 2D array (matrix)
     Plot2DImage image(x, y, image): image is a 2D array (matrix); x and y are arrays. Max and min of x and y provide the ranges for the axes.
+    Colour scaling, e.g. image(data, clim = (0, 1), norm = 'log'):
+    clim fixes the values mapped to the first and last colours (by default the range of the data);
+    norm is 'linear' (default) or 'log'. NaNs (and, for 'log', values that are not positive) are transparent.
+    Images larger than memory can be given as a numpy.memmap, or as the path of a raw binary file, e.g.
+    image('frame.raw', shape = (40000, 40000), dtype = '<u2'): see tiledimage.
     """
+    if len(args) in (1, 3) and istiledsource(args[-1]):
+        return tiledimage(*args, **kwargs)
+    args = ingestargs(args)
+    clim = kwargs.pop('clim', None)
+    norm = kwargs.pop('norm', None)
     if PlotContext.CurrentWindowIndex == None:
         PlotContext.OpenNextWindow()
     if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
@@ -93,6 +439,7 @@ def image(*args, **kwargs):
         if len(dims) == 2:
             image = plot.AddFalseColourImage(args[0])
             plot.Margin = Thickness(10)
+            setcolourscale(image, clim, norm)
             setprops(image, **kwargs)
     elif len(args) == 3 and (type(args[0]) == type(args[1]) == type(args[2])):
         dims0 = getsize(args[0])
@@ -100,36 +447,269 @@ def image(*args, **kwargs):
         dims2 = getsize(args[2])
         if len(dims2) == 2:
             image = plot.AddFalseColourImage(args[0], args[1], args[2])
+            setcolourscale(image, clim, norm)
             setprops(image, **kwargs)
     return plot
 
-    
-def getsize(array):
-    return GeneralArray.GetDimensions(array)
-    
 
-def plot3d(*args, **kwargs):
-    """ Create a 3D surface plot of the specified 2D array (matrix).
-    Plot3D image(surface): surface is a 2D array (matrix).
-    Plot3D image(x, y, surface): surface is a 2D array (matrix); x and y are matrices of the same size that provide the x and y coordinates.
-    x and y are expected in the format provided by mgrid, e.g., [x, y] = mgrid[0:127, 0:127]
+def contour(*args, **kwargs):
+    """ Create contour lines of a 2D array (or add them to the current plot if hold is set).
+    Plot2DContour contour(z, levels): z is a 2D array (rows, columns), plotted against its column and row indices
+    Plot2DContour contour(x, y, z, levels): x has a value for each column of z and y one for each row
+    levels is a sequence of levels, or a number of levels evenly spaced between the minimum and maximum of z
+    (default 10). Arrays are ingested as for image. All the levels are found in one parallel pass over the grid
+    (see Contouring), and each level is drawn as a single path, coloured through the colour map unless Stroke is set.
+    The contours of each set of levels are kept, so restyling, or setting Levels back to levels shown before,
+    does not find them again.
+    Can also specify properties of the Plot2DContour, e.g.:
+    contour(x, y, z, 20, StrokeThickness = 2)
+    """
+    levels = kwargs.pop('levels', 10)
+    if len(args) in (2, 4):
+        args, levels = args[:-1], args[-1]
+    if len(args) not in (1, 3):
+        raise ValueError('contour takes z or x, y, z, and optionally levels')
+    args = ingestargs(args)
+    z = GeneralArray.ToDoubleArray(args[-1])
+    # A number (of any type, as np.ndim(levels) == 0 in ironplot_contour.contourlevels) is a count of levels;
+    # otherwise duplicate levels are dropped, as np.unique there.
+    if isinstance(levels, numbers.Number) or (numpyAvailable and np.ndim(levels) == 0):
+        levels = Contouring.Levels(z, int(levels))
+    else:
+        levels = floatarray(sorted(set(float(level) for level in levels)))
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot2D()
+        plot.Padding = Thickness(10)
+        PlotContext.AddPlot(plot)
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    if len(args) == 3:
+        contour = plot.AddContour(Plotting.Array(args[0]), Plotting.Array(args[1]), z, levels)
+    else:
+        contour = plot.AddContour(z, levels)
+    setprops(contour, **kwargs)
+    return contour
+
+
+def hist(data, bins=10, range=None, **kwargs):
+    """ Create a histogram of data, drawn as Bars (or add it to the current plot if hold is set).
+    Bars hist(data, bins): bins is a number of evenly spaced bins over range = (min, max), by default the range
+    of the data, or the bin edges. As numpy.histogram, the last bin includes its right edge, and NaNs and
+    values outside the edges are not counted.
+    NumPy arrays, including numpy.memmap arrays larger than memory, are binned a chunk at a time by a pool of
+    threads (see ironplot_hist); other arrays are binned in parallel by Histogramming.
+    histappend(bars, more) adds more data: only the new data are binned, and the bars follow the counts.
+    Can also specify properties of the Bars, e.g.:
+    hist(data, 100, Fill = Brushes.Orange)
     """
+    if hasattr(bins, '__len__'):
+        histogram = Histogram(floatarray([float(edge) for edge in bins]))
+    else:
+        lo, hi = histrange(data, range)
+        histogram = Histogram(lo, hi, int(bins))
+    histogram.AddCounts(histogramcounts(histogram, data))
     if PlotContext.CurrentWindowIndex == None:
         PlotContext.OpenNextWindow()
     if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
         # New plot or overwite plot
-        plot = Plotting3D.Plot3D()
+        plot = Plot2D()
+        plot.Padding = Thickness(10)
+        PlotContext.AddPlot(plot)
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    bars = plot.AddHistogram(histogram)
+    setprops(bars, **kwargs)
+    return bars
+
+
+def hist2d(x, y, bins=10, range=None, **kwargs):
+    """ Create a 2D histogram of the points (x, y), drawn as a FalseColourImage of the counts (or add it to the
+    current plot if hold is set).
+    FalseColourImage hist2d(x, y, bins): bins is a number of bins for both axes, or a pair (xbins, ybins),
+    evenly spaced over range = ((xmin, xmax), (ymin, ymax)), by default the ranges of x and y.
+    Points are binned as for hist; histappend(image, x, y) adds more points.
+    Colour scaling as for image, e.g. hist2d(x, y, 200, norm = 'log').
+    """
+    clim = kwargs.pop('clim', None)
+    norm = kwargs.pop('norm', None)
+    xbins, ybins = bins if hasattr(bins, '__len__') else (bins, bins)
+    xrange, yrange = range if range is not None else (None, None)
+    xlo, xhi = histrange(x, xrange)
+    ylo, yhi = histrange(y, yrange)
+    histogram = Histogram2D(xlo, xhi, int(xbins), ylo, yhi, int(ybins))
+    histogram.AddCounts(histogramcounts2d(histogram, x, y))
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot2D()
+        PlotContext.AddPlot(plot)
+    else:
+        # Add to current plot
+        plot = PlotContext.CurrentPlot
+    image = plot.AddHistogram2D(histogram)
+    setcolourscale(image, clim, norm)
+    setprops(image, **kwargs)
+    return image
+
+
+def histappend(target, *data):
+    """ Add data to the histogram of Bars from hist (histappend(bars, data)) or of a FalseColourImage from hist2d
+    (histappend(image, x, y)), and redraw. Only the new data are binned, off the UI thread, and their counts
+    are added to those so far. Can be called from any thread.
+    """
+    histogram = target.Histogram
+    if histogram is None:
+        raise ValueError('histappend needs Bars from hist or a FalseColourImage from hist2d')
+    if isinstance(histogram, Histogram2D):
+        counts = histogramcounts2d(histogram, *data)
+    else:
+        counts = histogramcounts(histogram, *data)
+    invoke(target, lambda: histogram.AddCounts(counts))
+
+
+def histrange(data, range=None):
+    """ (min, max) of the bins of data: range, or the range of the finite values of data.
+    """
+    if range is not None:
+        return float(range[0]), float(range[1])
+    if numpyAvailable and isinstance(data, np.ndarray):
+        from ironplot_hist import datarange
+        return datarange(data)
+    return Histogramming.Range(Plotting.Array(todoublebuffer(data, 1)))
+
+
+def histogramcounts(histogram, data):
+    """ Counts (a .NET array) of data in the bins of a Histogram.
+    """
+    if numpyAvailable and isinstance(data, np.ndarray):
+        from ironplot_hist import histcounts
+        edges = np.fromiter(histogram.Edges, dtype=np.float64, count=len(histogram.Edges))
+        return Plotting.Array(histcounts(data, edges, histogram.Uniform).astype(np.float64))
+    return Histogramming.Count(Plotting.Array(todoublebuffer(data, 1)), histogram.Edges, histogram.Uniform)
+
+
+def histogramcounts2d(histogram, x, y):
+    """ Counts (a .NET array) of the points (x, y) in the cells of a Histogram2D.
+    """
+    if numpyAvailable and isinstance(x, np.ndarray) and isinstance(y, np.ndarray):
+        from ironplot_hist import histcounts2d
+        xedges = np.fromiter(histogram.XEdges, dtype=np.float64, count=len(histogram.XEdges))
+        yedges = np.fromiter(histogram.YEdges, dtype=np.float64, count=len(histogram.YEdges))
+        counts = histcounts2d(x, y, xedges, yedges, histogram.XUniform, histogram.YUniform)
+        return GeneralArray.ToDoubleArray(counts.astype(np.float64))
+    return Histogramming.Count(Plotting.Array(todoublebuffer(x, 1)), Plotting.Array(todoublebuffer(y, 1)),
+        histogram.XEdges, histogram.YEdges, histogram.XUniform, histogram.YUniform)
+
+
+def istiledsource(data):
+    """ True for the image sources that are drawn as tiled images: numpy.memmap arrays and file paths.
+    """
+    return isinstance(data, stringTypes) or (numpyAvailable and isinstance(data, np.memmap))
+
+
+def tiledimage(*args, **kwargs):
+    """ Create a false-colour image plot of an image too large for memory (or overwite current plot if hold is set).
+    TiledImage tiledimage(image) or tiledimage(x, y, image): image is a 2D numpy.memmap (rows, columns),
+    or the path of a raw binary file, with keywords shape = (rows, columns), dtype (default '<f8') and offset (bytes).
+    The image is read a strip at a time to build a multi-resolution pyramid of tiles on disk, in cachedir
+    (by default a new temporary directory, or the persistent cache if enablecache has been called);
+    only the tiles in view are then loaded, at screen resolution. A temporary directory is deleted when
+    the TiledImage is disposed (image.Dispose(), on its thread), or at exit.
+    Decoded tiles are cached up to cachebytes bytes (default 256 MB). clim and norm are as for image,
+    and tilesize (default 256) sets the size of the tiles.
+    Row 0 of the image is drawn at the bottom.
+    """
+    import tempfile
+    from ironplot_tiles import openraw, buildpyramid
+    shape = kwargs.pop('shape', None)
+    dtype = kwargs.pop('dtype', '<f8')
+    offset = kwargs.pop('offset', 0)
+    directory = kwargs.pop('cachedir', None)
+    cachebytes = kwargs.pop('cachebytes', None)
+    tilesize = kwargs.pop('tilesize', 256)
+    clim = kwargs.pop('clim', None)
+    norm = kwargs.pop('norm', None) or 'linear'
+    data = args[-1]
+    if isinstance(data, stringTypes):
+        if shape is None:
+            raise ValueError('shape must be given for raw binary files.')
+        data = openraw(data, shape, dtype, offset)
+    import ironplot_cache
+    temporary = False
+    if directory is None and ironplot_cache.activecache is not None:
+        # Reuse the pyramid built the last time this data was shown:
+        directory = ironplot_cache.activecache.imagepyramid(data, tilesize, clim, norm)
+    else:
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='ironplot_tiles_')
+            temporary = True
+            temporarypyramids.append(directory)
+        buildpyramid(data, directory, tilesize, clim, norm)
+    if PlotContext.CurrentWindowIndex == None:
+        PlotContext.OpenNextWindow()
+    if (PlotContext.CurrentPlot == None) or (PlotContext.HoldState == False):
+        # New plot or overwite plot
+        plot = Plot2D()
         PlotContext.AddPlot(plot)      
     else:
         # Add to current plot
         plot = PlotContext.CurrentPlot
-    if len(args) == 1:
-        plot.Viewport3D.Models.Add(Plotting3D.SurfaceModel3D(args[0]))
-    elif len(args) == 3:
-        plot.Viewport3D.Models.Add(Plotting3D.SurfaceModel3D(args[0], args[1], args[2]))
+    if len(args) == 3:
+        x, y = args[0], args[1]
+        bounds = System.Windows.Rect(System.Windows.Point(float(min(x)), float(min(y))), System.Windows.Point(float(max(x)), float(max(y))))
+        image = plot.AddTiledImage(directory, bounds)
+    else:
+        image = plot.AddTiledImage(directory)
+        plot.Margin = Thickness(10)
+    if temporary:
+        image.Pyramid.DeleteOnDispose = True
+        temporarypyramids[temporarypyramids.index(directory)] = image.Pyramid
+    if cachebytes is not None:
+        image.CacheCapacity = cachebytes
+    setprops(image, **kwargs)
     return plot
 
-  
+
+# Temporary directories of the pyramids made by tiledimage (or the ImagePyramid once it has been opened):
+temporarypyramids = []
+
+
+def removetemporarypyramids():
+    """ Release the pyramids in temporary directories made by tiledimage and delete the directories.
+    """
+    import shutil
+    for pyramid in temporarypyramids:
+        if isinstance(pyramid, stringTypes):
+            shutil.rmtree(pyramid, True)
+        else:
+            pyramid.Dispose()
+            shutil.rmtree(pyramid.Directory, True)
+    del temporarypyramids[:]
+
+atexit.register(removetemporarypyramids)
+
+
+def setcolourscale(image, clim=None, norm=None):
+    """ Set the colour limits (min, max) and normalisation ('linear' or 'log') of a false-colour image.
+    """
+    if norm is not None:
+        if norm not in ('linear', 'log'):
+            raise ValueError("norm must be 'linear' or 'log'")
+        image.ColourNormalisation = ColourNormalisation.Log if norm == 'log' else ColourNormalisation.Linear
+    if clim is not None:
+        image.SetColourLimits(float(clim[0]), float(clim[1]))
+
+    
+def getsize(array):
+    return GeneralArray.GetDimensions(array)
+    
+
 def xlabel(arg):
    """ Set X-Axis label of current plot.
    """
@@ -222,6 +802,13 @@ def subplot(*args):
       PlotContext.CurrentPlotIndex = args[2]
 
 
+def linkaxes(x=True, y=False):
+   """ Link the x axes (if x) and the y axes (if y) of the plots of the current subplot grid, so that
+   panning or zooming one plot pans or zooms them all; False unlinks them. Call once the grid's plots exist.
+   """
+   PlotContext.LinkAxes(x, y)
+
+
 def setprops(object, **kwargs):
    """ Set properties of specified object
    e.g. setprops(currentplot(), Margin = Thickness(20,20,20,20))
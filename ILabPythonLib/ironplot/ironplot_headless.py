@@ -0,0 +1,1245 @@
+""" Headless rendering of plots straight to PNG and SVG files.
+
+A NumPy backend for the plotting functions of the ironplot package (plot, plot_many,
+scatter, image, contour, bar, hist, hist2d, histappend, subplot, xlabel, ylabel, title
+and hold) that needs no window, dispatcher, .NET or display: it runs under CPython on a
+machine without a display (e.g. for CI), and the ironplot package uses it when .NET is
+not available or IRONPLOT_BACKEND is 'headless'. Functions build a Figure of subplots;
+savefig writes it as PNG (drawn here, with a built-in 5 x 7 pixel font) or SVG, and
+renderbatch renders many figures in a pool of processes.
+Line properties, colour maps and colour scaling are those of the interactive plots
+(Plot2DCurve.QuickLine and ironplot_colour). As in ironplot_colour, images are
+arrays of shape (height, width) with rows from the top down. Long curves with
+sorted x are reduced to the points that can be seen at the output resolution
+(ironplot_lod.decimatefullscan) before they are drawn. If enablecache has been called,
+the min/max pyramids of these curves and the colour indices of images are kept in the
+cache (see ironplot_cache) and reused when the same data is plotted again.
+NumPy datetime64 arrays given to plot, plot_many or scatter are plotted on date axes, as
+days from a date origin kept per axis (as Axis.DateOrigin), and labelled with dates and times.
+"""
+import base64
+import multiprocessing
+import os
+import struct
+import zlib
+from xml.sax.saxutils import escape
+
+import numpy as np
+import ironplot_cache
+from ironplot_arrays import asdoublearray, ingestlines, stringTypes, isdatetime64, asepochnanoseconds, dayorigin, todays
+from ironplot_colour import quantise, colourmap, checknorm, tocolour, packrgb, COLOURCODES
+from ironplot_lod import decimatefullscan
+from ironplot_density import bincounts, maxcount, shade, shadecategories, categorycodes
+from ironplot_contour import ContourSet
+from ironplot_hist import histogram, histogram2d, Histogram2D
+
+DEFAULTWIDTH = 640
+DEFAULTHEIGHT = 480
+# Default colours of the categories of density scatter plots, as DensityScatter.DefaultCategoryColours:
+DENSITYCOLOURS = ('b', 'r', 'g', 'c', 'm', 'y', 'k')
+# Default fill of bars, as Bars.Fill (SlateBlue):
+BARFILL = '#6a5acd'
+# Dash patterns in units of the line thickness, as PlotPath:
+DASHES = {'-': None, '--': (4, 4), ':': (1, 4), '-.': (4, 4, 1, 4)}
+# Curves with at least this many points and sorted x are decimated, as Curve.PyramidThreshold:
+DECIMATETHRESHOLD = 10000
+# Largest number of pixels generated at a time when drawing lines:
+CHUNKPIXELS = 1 << 21
+# Glyphs of printable ASCII (32 to 126): seven rows of five bits each, as hex.
+# Glyphs are drawn in cells of GLYPHWIDTH by GLYPHHEIGHT pixels (times the font scale).
+FONT = (
+    '00000000000000040404040400040a0a0a000000000a0a1f0a1f0a0a040f140e051e04181902040813030c12140815120d04040400000000'
+    '02040808080402080402020204080004150e1504000004041f040400000000000c04080000001f00000000000000000c0c00010204081000'
+    '0e11131519110e040c040404040e0e11010204081f1f02040201110e02060a121f02021f101e0101110e0608101e11110e1f010204080808'
+    '0e11110e11110e0e11110f01020c000c0c000c0c00000c0c000c04080204081008040200001f001f0000080402010204080e110102040004'
+    '0e11010d15150e0e11111f1111111e11111e11111e0e11101010110e1c12111111121c1f10101e10101f1f10101e1010100e11101711110f'
+    '1111111f1111110e04040404040e0702020202120c111214181412111010101010101f111b1515111111111119151311110e11111111110e'
+    '1e11111e1010100e11111115120d1e11111e1412110f10100e01011e1f0404040404041111111111110e11111111110a041111111515150a'
+    '11110a040a111111110a040404041f01020408101f0e08080808080e001008040201000e02020202020e040a11000000000000000000001f'
+    '0804020000000000000e010f110f1010161911111e00000e1010110e01010d1311110f00000e111f100e0609081c080808000f11110f010e'
+    '1010161911111104000c0404040e0200060202120c101012141814120c04040404040e00001a151511110000161911111100000e1111110e'
+    '00001e111e101000000d130f01010000161910101000000e100e011e08081c080809060000111111130d00001111110a040000111115150a'
+    '0000110a040a11000011110f010e00001f0204081f02040408040402040404040404040804040204040800000815020000')
+GLYPHWIDTH = 6
+GLYPHHEIGHT = 8
+
+currentfigure = None
+holdstate = False
+
+
+def parsequickline(style):
+    """ (dash, marker, colour) of line properties in <line><markers><colour> notation, as Plot2DCurve.QuickLine:
+    dash is a key of DASHES or None, marker is 's', 'o', '^' or None and colour an (r, g, b) tuple.
+    """
+    style = style or '-'
+    if style[:2] in ('--', '-.'):
+        dash, rest = style[:2], style[2:]
+    elif style[:1] in ('-', ':'):
+        dash, rest = style[:1], style[1:]
+    else:
+        dash, rest = None, style
+    marker = None
+    if rest[:1] in ('s', 'o', '^'):
+        marker, rest = rest[:1], rest[1:]
+    if dash is None and marker is None:
+        dash = '-'
+    return dash, marker, COLOURCODES.get(rest[:1], COLOURCODES['k'])
+
+
+def paddedbounds(x, y):
+    """ (xmin, xmax, ymin, ymax) of the finite points, padded by 5% as Plot2DCurve.PaddedBounds, or None.
+    """
+    valid = np.isfinite(x) & np.isfinite(y)
+    if not valid.any():
+        return None
+    x, y = x[valid], y[valid]
+    xmin, xmax, ymin, ymax = x.min(), x.max(), y.min(), y.max()
+    dx, dy = 0.05 * (xmax - xmin), 0.05 * (ymax - ymin)
+    return xmin - dx, xmax + dx, ymin - dy, ymax + dy
+
+
+class LineItem(object):
+    """ A curve of a headless plot. Keyword properties are as for Plot2DCurve:
+    StrokeThickness, MarkersSize, MarkersFill (a colour; by default markers are not filled) and Title (for the legend).
+    """
+
+    def __init__(self, x, y, style='', **kwargs):
+        self.x = asdoublearray(x, 1)
+        self.y = asdoublearray(y, 1)
+        if len(self.x) != len(self.y):
+            raise ValueError("Component vectors' lengths must be equal.")
+        self.dash, self.marker, self.colour = parsequickline(style)
+        self.thickness = float(kwargs.get('StrokeThickness', 1.0))
+        self.markersize = float(kwargs.get('MarkersSize', 10.0))
+        self.markersfill = tocolour(kwargs.get('MarkersFill'))
+        self.title = kwargs.get('Title', '') or ''
+        finite = np.isfinite(self.x)
+        self.sorted = len(self.x) >= DECIMATETHRESHOLD and finite.all() and not (np.diff(self.x) < 0).any()
+        self.pyramid = None
+        if self.sorted and ironplot_cache.activecache is not None:
+            self.pyramid = ironplot_cache.activecache.minmaxpyramid(self.x, self.y)
+
+    def bounds(self):
+        return paddedbounds(self.x, self.y)
+
+    def points(self, xlim, columns):
+        """ The (x, y) values to draw for a view of x from xlim[0] to xlim[1], columns pixels wide.
+        """
+        if not self.sorted:
+            return self.x, self.y
+        columnwidth = (xlim[1] - xlim[0]) / float(columns)
+        if self.pyramid is not None:
+            indices = self.pyramid.decimate(xlim[0], columnwidth, columns)
+        else:
+            indices = decimatefullscan(self.x, self.y, xlim[0], columnwidth, columns)
+        return self.x[indices], self.y[indices]
+
+
+class ImageItem(object):
+    """ A false-colour image of a headless plot: data of shape (height, width), rows from the top down,
+    covering extent = (xmin, xmax, ymin, ymax) (by default (0, width, 0, height), as FalseColourImage).
+    clim and norm are as for image; maptype is 'jet', 'gray' or 'hsv'.
+    """
+
+    def __init__(self, data, extent=None, clim=None, norm=None, maptype='jet', ncolours=256):
+        self.clim, self.norm = clim, norm or 'linear'
+        checknorm(self.norm)
+        if ironplot_cache.activecache is not None and np.ndim(data) == 2:
+            # A numpy.memmap is looked up by its file, without being read:
+            self.indices = ironplot_cache.activecache.colourindices(data, clim, self.norm, ncolours)
+        else:
+            self.indices = quantise(asdoublearray(data, 2), clim, self.norm, ncolours)
+        colours = colourmap(maptype, ncolours).astype(np.int64)
+        # RGB of each index; the last entry (masked values) is unused.
+        self.table = np.zeros((ncolours + 1, 3), dtype=np.uint8)
+        self.table[:-1] = np.column_stack([(colours >> 16) & 255, (colours >> 8) & 255, colours & 255])
+        self.ncolours = ncolours
+        height, width = self.indices.shape
+        self.extent = tuple(float(e) for e in extent) if extent is not None else (0.0, float(width), 0.0, float(height))
+        self.title = ''
+
+    def bounds(self):
+        return self.extent
+
+    def setdata(self, data):
+        """ Replace the data with values of the same shape, e.g. updated histogram counts.
+        """
+        data = asdoublearray(data, 2)
+        if data.shape != self.indices.shape:
+            raise ValueError('Data must be the same size as the image')
+        self.indices = quantise(data, self.clim, self.norm, self.ncolours)
+
+    def resample(self, xlim, ylim, columns, rows):
+        """ RGBA pixels (rows, columns, 4) of the image for a view of xlim by ylim, nearest neighbour;
+        pixels outside the image or masked are transparent.
+        """
+        height, width = self.indices.shape
+        x0, x1, y0, y1 = self.extent
+        xs = xlim[0] + (np.arange(columns) + 0.5) * (xlim[1] - xlim[0]) / float(columns)
+        ys = ylim[1] - (np.arange(rows) + 0.5) * (ylim[1] - ylim[0]) / float(rows)
+        u = np.floor((xs - x0) / (x1 - x0) * width).astype(np.int64)
+        v = np.floor((y1 - ys) / (y1 - y0) * height).astype(np.int64)
+        validU, validV = (u >= 0) & (u < width), (v >= 0) & (v < height)
+        indices = self.indices[np.clip(v, 0, height - 1)[:, None], np.clip(u, 0, width - 1)[None, :]]
+        visible = validV[:, None] & validU[None, :] & (indices < self.ncolours)
+        pixels = np.zeros((rows, columns, 4), dtype=np.uint8)
+        pixels[..., :3] = self.table[indices]
+        pixels[..., 3] = np.where(visible, 255, 0)
+        return pixels
+
+
+class DensityItem(object):
+    """ A scatter plot drawn as a density image, as DensityScatter: points are counted into a grid with a cell per
+    pixel of the view when the figure is drawn (see ironplot_density). Without categories, counts are shaded
+    through the colour map maptype; with categories, each cell has the mean colour of its categories.
+    """
+
+    def __init__(self, x, y, categories=None, colours=None, norm='log', maptype='jet'):
+        self.x = asdoublearray(x, 1)
+        self.y = asdoublearray(y, 1)
+        if len(self.x) != len(self.y):
+            raise ValueError("Component vectors' lengths must be equal.")
+        checknorm(norm)
+        self.norm, self.maptype = norm, maptype
+        self.codes, self.labels = (None, []) if categories is None else categorycodes(categories)
+        colours = colours or DENSITYCOLOURS
+        self.colours = [packrgb(colours[k % len(colours)]) for k in range(max(len(self.labels), 1))]
+        self.title = ''
+
+    def bounds(self):
+        return paddedbounds(self.x, self.y)
+
+    def resample(self, xlim, ylim, columns, rows):
+        """ RGBA pixels (rows, columns, 4) of the density of the points in a view of xlim by ylim.
+        """
+        region = (xlim[0], ylim[0], xlim[1] - xlim[0], ylim[1] - ylim[0])
+        if self.codes is None:
+            counts = bincounts(self.x, self.y, region, columns, rows)
+            pixels = shade(counts, maxcount(counts), self.norm, self.maptype)
+        else:
+            counts = bincounts(self.x, self.y, region, columns, rows, self.codes, len(self.labels))
+            pixels = shadecategories(counts, maxcount(counts, True), self.norm, self.colours)
+        # Row 0 of the counts is at the bottom; BGRA to RGBA:
+        return pixels[::-1, :, [2, 1, 0, 3]]
+
+
+class ContourItem(object):
+    """ Contour lines of a headless plot, as Plot2DContour: z (rows, columns) is sampled at x (one value per column)
+    and y (one per row), and each level is drawn as one LineItem with NaN between its polylines, coloured through
+    the colour map maptype unless Stroke is given. The contours of each set of levels are kept (see ContourSet), so
+    setlevels with levels shown before does not find them again.
+    """
+
+    def __init__(self, x, y, z, levels=10, maptype='jet', **kwargs):
+        self.contours = ContourSet(x, y, z)
+        rows, columns = self.contours.z.shape
+        x = np.arange(columns, dtype=np.float64) if x is None else self.contours.x
+        y = np.arange(rows, dtype=np.float64) if y is None else self.contours.y
+        self.extent = (np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y))
+        self.maptype = maptype
+        self.properties = kwargs
+        self.title = ''
+        self.setlevels(levels)
+
+    def setlevels(self, levels):
+        """ Show contours at levels (a sequence, or a number of levels between the minimum and maximum of z).
+        """
+        self.levels, lines = self.contours.lines(levels)
+        stroke = tocolour(self.properties.get('Stroke'))
+        colours = colourmap(self.maptype)
+        properties = dict((key, value) for key, value in self.properties.items() if key != 'Stroke')
+        self.lines = []
+        for k, (px, py) in enumerate(lines):
+            line = LineItem(px, py, '-', **properties)
+            # Levels take colours spread evenly over the colour map, as Plot2DContour:
+            index = len(colours) // 2 if len(lines) == 1 else int(round(k * (len(colours) - 1.0) / (len(lines) - 1)))
+            line.colour = stroke or tuple((int(colours[index]) >> shift) & 255 for shift in (16, 8, 0))
+            self.lines.append(line)
+
+    def bounds(self):
+        return self.extent
+
+
+class BarsItem(object):
+    """ Bars of a headless plot, as Bars: from start to end (along y for vertical bars, along x for horizontal ones),
+    centred on position across them with width thickness (arrays, or numbers for all the bars). Keyword properties
+    are Fill and Stroke (colours as for ironplot_colour.tocolour, or None for none), StrokeThickness and Title.
+    Bars from hist show the counts of their Histogram (histogram), and follow them through histappend.
+    """
+
+    def __init__(self, start, end, position, thickness, horizontal=False, **kwargs):
+        self.start, self.end, self.position, self.width = [np.array(a, dtype=np.float64) for a in
+                                                           np.broadcast_arrays(start, end, position, thickness)]
+        self.horizontal = horizontal
+        self.fill = tocolour(kwargs.get('Fill', BARFILL))
+        self.stroke = tocolour(kwargs.get('Stroke', 'k'))
+        self.thickness = float(kwargs.get('StrokeThickness', 1.0))
+        self.title = kwargs.get('Title', '') or ''
+        self.histogram = None
+
+    def rectangles(self):
+        """ (x0, x1, y0, y1) of the corners of the bars, in graph coordinates.
+        """
+        across = (self.position - self.width / 2, self.position + self.width / 2)
+        along = (self.start, self.end)
+        return along + across if self.horizontal else across + along
+
+    def bounds(self):
+        if not len(self.start):
+            return None
+        x0, x1, y0, y1 = self.rectangles()
+        return (min(x0.min(), x1.min()), max(x0.max(), x1.max()), min(y0.min(), y1.min()), max(y0.max(), y1.max()))
+
+
+def lineitems(axes):
+    """ The LineItems of a plot, with the lines of its contours in place of the ContourItems.
+    """
+    for item in axes.items:
+        if isinstance(item, LineItem):
+            yield item
+        elif isinstance(item, ContourItem):
+            for line in item.lines:
+                yield line
+
+
+class Axes(object):
+    """ One plot of a headless figure: its items, labels and title.
+    xlim and ylim fix the axis ranges; by default they fit the items.
+    dateorigins are the date origins (nanoseconds since the Unix epoch) of the x and y axes, or None for axes
+    that are not date axes.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.items = []
+        self.xlabel = ''
+        self.ylabel = ''
+        self.title = ''
+        self.xlim = None
+        self.ylim = None
+        self.dateorigins = [None, None]
+
+    def ingestdates(self, data, role):
+        """ data as days from the date origin of the x (role 0) or y (role 1) axis if it is a datetime64 array,
+        which makes the axis a date axis; otherwise data itself. The first datetime64 array of an axis sets its
+        origin to the start of the day of its first time, as ironplot.ingestdates.
+        """
+        if not isdatetime64(data):
+            return data
+        if self.dateorigins[role] is None:
+            self.dateorigins[role] = dayorigin(asepochnanoseconds(data))
+        return todays(data, self.dateorigins[role])
+
+    def limits(self):
+        """ ((xmin, xmax), (ymin, ymax)) of the axes.
+        """
+        bounds = [b for b in (item.bounds() for item in self.items) if b is not None]
+        result = []
+        for k, fixed in ((0, self.xlim), (2, self.ylim)):
+            if fixed is not None:
+                lo, hi = float(fixed[0]), float(fixed[1])
+            elif bounds:
+                lo, hi = min(b[k] for b in bounds), max(b[k + 1] for b in bounds)
+            else:
+                lo, hi = 0.0, 1.0
+            if not hi > lo:
+                lo, hi = lo - 0.5, hi + 0.5
+            result.append((float(lo), float(hi)))
+        return tuple(result)
+
+
+class Figure(object):
+    """ Figure(width, height, fontscale=None): a grid of plots to be saved as PNG or SVG.
+    Sizes are in pixels; fontscale is the scale of the built-in font (by default 1, or 2 for figures
+    of 800 pixels or more across).
+    """
+
+    def __init__(self, width=DEFAULTWIDTH, height=DEFAULTHEIGHT, fontscale=None):
+        self.width = int(width)
+        self.height = int(height)
+        self.fontscale = int(fontscale) if fontscale else (2 if min(self.width, self.height) >= 800 else 1)
+        self.setgrid(1, 1)
+
+    def setgrid(self, rows, columns):
+        self.rows, self.columns = rows, columns
+        self.axes = {}
+        self.index = 0
+
+    @property
+    def currentaxes(self):
+        if self.index not in self.axes:
+            self.axes[self.index] = Axes()
+        return self.axes[self.index]
+
+
+def figure(width=DEFAULTWIDTH, height=DEFAULTHEIGHT, fontscale=None):
+    """ Start a new figure, which becomes the current figure.
+    """
+    global currentfigure
+    currentfigure = Figure(width, height, fontscale)
+    return currentfigure
+
+
+def currentplot():
+    """ The Axes of the current plot (a new figure is started if there is none).
+    """
+    if currentfigure is None:
+        figure()
+    return currentfigure.currentaxes
+
+
+def newitems():
+    """ The Axes that new items go to: the current plot, cleared first unless hold is set.
+    """
+    axes = currentplot()
+    if not holdstate:
+        axes.clear()
+    return axes
+
+
+def splitlineargs(args):
+    """ [(x, y, style)] of the arguments of plot, as Plotting.Plot2D: plot(x1, y1, '-or', x2, y2, y3, '--sb').
+    x is None for a y vector on its own.
+    """
+    lines = []
+    k = 0
+    while k < len(args):
+        vectors = []
+        while k < len(args) and len(vectors) < 2 and not isinstance(args[k], stringTypes):
+            vectors.append(args[k])
+            k += 1
+        if not vectors:
+            raise ValueError('Incorrect syntax')
+        style = ''
+        if k < len(args) and isinstance(args[k], stringTypes):
+            style = args[k]
+            k += 1
+        lines.append((vectors[0], vectors[1], style) if len(vectors) == 2 else (None, vectors[0], style))
+    return lines
+
+
+def plot(*args, **kwargs):
+    """ Line plot (or add to the current plot if hold is set), as ironplot.plot:
+    plot(x, y), plot(y), plot(x1, y1, '-or', x2, y2, '--sb'), plot(x, y, StrokeThickness = 2).
+    Returns the LineItem, or a list of them for several lines.
+    """
+    axes = newitems()
+    lines = []
+    for x, y, style in splitlineargs(args):
+        x = None if x is None else axes.ingestdates(x, 0)
+        y = asdoublearray(axes.ingestdates(y, 1), 1)
+        if x is None:
+            x = np.arange(len(y), dtype=np.float64)
+        lines.append(LineItem(x, y, style, **kwargs))
+    axes.items.extend(lines)
+    return lines[0] if len(lines) == 1 else lines
+
+
+def plot_many(x, Y=None, styles=None, titles=None, **kwargs):
+    """ Many lines against one x vector, as ironplot.plot_many: each row of Y is a line
+    (Y may also have one column per line). styles is a line property or a sequence used in turn;
+    titles is a sequence of legend titles. Returns the list of LineItems.
+    """
+    if Y is None or isinstance(Y, stringTypes):
+        x, Y, styles = None, x, styles if Y is None else Y
+    axes = newitems()
+    x, Y = ingestlines(None if x is None else axes.ingestdates(x, 0), axes.ingestdates(Y, 1))
+    if x is None:
+        x = np.arange(Y.shape[1], dtype=np.float64)
+    if styles is None or isinstance(styles, stringTypes):
+        styles = [styles or '']
+    titles = list(titles or [])
+    lines = []
+    for k in range(Y.shape[0]):
+        properties = dict(kwargs)
+        if k < len(titles):
+            properties['Title'] = titles[k]
+        lines.append(LineItem(x, Y[k], styles[k % len(styles)], **properties))
+    axes.items.extend(lines)
+    return lines
+
+
+def image(*args, **kwargs):
+    """ False-colour image (or add to the current plot if hold is set), as ironplot.image:
+    image(data) or image(x, y, data), where the minimum and maximum of x and y give the extent.
+    Keywords: clim, norm ('linear' or 'log') and maptype ('jet', 'gray' or 'hsv').
+    Returns the current Axes.
+    """
+    if len(args) == 1:
+        extent = None
+    elif len(args) == 3:
+        x, y = asdoublearray(args[0]), asdoublearray(args[1])
+        extent = (np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y))
+    else:
+        raise ValueError('image takes image or x, y, image.')
+    item = ImageItem(args[-1], extent, kwargs.get('clim'), kwargs.get('norm'), kwargs.get('maptype', 'jet'))
+    axes = newitems()
+    axes.items.append(item)
+    return axes
+
+
+def contour(*args, **kwargs):
+    """ Contour lines (or add to the current plot if hold is set), as ironplot.contour:
+    contour(z, levels) or contour(x, y, z, levels), where z has shape (rows, columns), x has a value for each
+    column and y one for each row; levels is a sequence of levels or a number of them (default 10).
+    Keywords: maptype ('jet', 'gray' or 'hsv'), and Stroke and StrokeThickness as for Plot2DContour.
+    Returns the ContourItem.
+    """
+    levels = kwargs.pop('levels', 10)
+    if len(args) in (2, 4):
+        args, levels = args[:-1], args[-1]
+    if len(args) == 1:
+        x, y = None, None
+    elif len(args) == 3:
+        x, y = args[0], args[1]
+    else:
+        raise ValueError('contour takes z or x, y, z, and optionally levels.')
+    item = ContourItem(x, y, args[-1], levels, kwargs.pop('maptype', 'jet'), **kwargs)
+    newitems().items.append(item)
+    return item
+
+
+def bar(*args, **kwargs):
+    """ Bar plot (or add to the current plot if hold is set), as ironplot.bar: bar(lengths) draws vertical bars of
+    lengths at 0, 1, 2...; bar(start, end, position, thickness) bars from start to end centred on position, and
+    orientation = 'horizontal' draws them along x. Keywords Fill, Stroke and StrokeThickness as for Bars.
+    Returns the BarsItem.
+    """
+    horizontal = kwargs.pop('orientation', 'vertical') == 'horizontal'
+    if len(args) == 1:
+        lengths = asdoublearray(args[0], 1)
+        args = (0.0, lengths, np.arange(len(lengths), dtype=np.float64), 0.8)
+    elif len(args) != 4:
+        raise ValueError('bar takes lengths or start, end, position, thickness.')
+    item = BarsItem(*args, horizontal=horizontal, **kwargs)
+    newitems().items.append(item)
+    return item
+
+
+def hist(data, bins=10, range=None, **kwargs):
+    """ Histogram drawn as bars (or add to the current plot if hold is set), as ironplot.hist: bins is a number of
+    evenly spaced bins over range = (min, max), by default the range of the data, or the bin edges. Data
+    (including numpy.memmap arrays larger than memory) are binned a chunk at a time by a pool of threads
+    (see ironplot_hist); histappend(item, more) adds more data. Keywords as for bar.
+    Returns the BarsItem.
+    """
+    counts = histogram(data, bins, range)
+    item = BarsItem(0.0, counts.counts, counts.centres, counts.widths, **kwargs)
+    item.histogram = counts
+    newitems().items.append(item)
+    return item
+
+
+def hist2d(x, y, bins=10, range=None, **kwargs):
+    """ 2-D histogram drawn as a false-colour image of the counts (or add to the current plot if hold is set), as
+    ironplot.hist2d: bins is a number of bins for both axes or a pair (xbins, ybins), evenly spaced over
+    range = ((xmin, xmax), (ymin, ymax)), by default the ranges of x and y; histappend(item, x, y) adds more points.
+    Keywords: clim, norm ('linear' or 'log') and maptype, as for image.
+    Returns the ImageItem.
+    """
+    if not (np.isscalar(bins) or (len(bins) == 2 and all(isinstance(b, (int, np.integer)) for b in bins))):
+        raise ValueError('hist2d takes numbers of bins, which are evenly spaced.')
+    counts = histogram2d(x, y, bins, range)
+    extent = (counts.xedges[0], counts.xedges[-1], counts.yedges[0], counts.yedges[-1])
+    # Counts are indexed [x, y]; images have rows from the top down:
+    item = ImageItem(counts.counts.T[::-1], extent, kwargs.get('clim'), kwargs.get('norm'), kwargs.get('maptype', 'jet'))
+    item.histogram = counts
+    newitems().items.append(item)
+    return item
+
+
+def histappend(item, *data):
+    """ Add data to the histogram of an item from hist (histappend(item, data)) or hist2d (histappend(item, x, y)):
+    only the new data are binned, and their counts are added to those so far.
+    """
+    counts = getattr(item, 'histogram', None)
+    if counts is None:
+        raise ValueError('histappend needs an item from hist or hist2d.')
+    counts.add(*data)
+    if isinstance(counts, Histogram2D):
+        item.setdata(counts.counts.T[::-1])
+    else:
+        item.end = counts.counts.astype(np.float64)
+
+
+def scatter(x, y, style='ob', mode='markers', categories=None, colours=None, norm='log', **kwargs):
+    """ Scatter plot (or add to the current plot if hold is set), as ironplot.scatter.
+    scatter(x, y, 'sr') draws a marker for each point; scatter(x, y, mode = 'density') counts the points into
+    a grid at the resolution of the output and shades the counts (norm 'log' or 'linear') through the colour map
+    maptype; with categories (one per point), cells take the mean of the colours of their categories.
+    Returns the LineItem or DensityItem.
+    """
+    if mode == 'markers':
+        if categories is not None:
+            raise ValueError("categories need mode = 'density'")
+        return plot(x, y, style, **kwargs)
+    if mode != 'density':
+        raise ValueError("mode must be 'markers' or 'density'")
+    axes = newitems()
+    item = DensityItem(axes.ingestdates(x, 0), axes.ingestdates(y, 1), categories, colours, norm, kwargs.get('maptype', 'jet'))
+    axes.items.append(item)
+    return item
+
+
+def subplot(*args):
+    """ As ironplot.subplot: subplot(index) selects a plot of the grid, subplot(rows, columns) starts a new grid
+    and subplot(rows, columns, index) starts a new grid and selects a plot. Indices count from 0 along rows.
+    """
+    if currentfigure is None:
+        figure()
+    if len(args) in (2, 3):
+        currentfigure.setgrid(args[0], args[1])
+    if len(args) in (1, 3):
+        index = args[-1]
+        if index < 0 or index > currentfigure.rows * currentfigure.columns - 1:
+            raise IndexError('Index out of range')
+        currentfigure.index = index
+
+
+def xlabel(arg):
+    """ Set the x-axis label of the current plot.
+    """
+    currentplot().xlabel = arg
+
+
+def ylabel(arg):
+    """ Set the y-axis label of the current plot.
+    """
+    currentplot().ylabel = arg
+
+
+def title(arg):
+    """ Set the title of the current plot.
+    """
+    currentplot().title = arg
+
+
+def hold(*args):
+    """ Set to True to add to the current plot; False to replace it. With no argument, return the hold state.
+    """
+    global holdstate
+    if len(args) == 1 and isinstance(args[0], bool):
+        holdstate = args[0]
+    else:
+        return holdstate
+
+
+def close():
+    """ Discard the current figure.
+    """
+    global currentfigure
+    currentfigure = None
+
+
+# Layout
+
+def niceticks(lo, hi, target=6):
+    """ Tick values at a step of 1, 2 or 5 times a power of ten, about target of them from lo to hi.
+    """
+    raw = (hi - lo) / float(target)
+    magnitude = 10.0 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw * (1 - 1e-9))
+    ticks = np.arange(np.ceil(lo / step - 1e-9), np.floor(hi / step + 1e-9) + 1) * step
+    return ticks + 0.0, step
+
+
+def ticklabels(ticks, step):
+    largest = np.abs(ticks).max() if len(ticks) else 0
+    if largest >= 1e6 or step < 1e-4:
+        return ['%g' % t for t in ticks]
+    decimals = max(0, int(-np.floor(np.log10(step) + 1e-9)))
+    return ['%.*f' % (decimals, t) for t in ticks]
+
+
+def dateticks(lo, hi, origin, target=6):
+    """ (ticks, labels) of a date axis from lo to hi days after origin (nanoseconds since the Unix epoch), as
+    Axis.DeriveTicksDateTime: ticks are at a nice number of years, months, days, hours, minutes or seconds, or
+    below a second at 1, 2 or 5 times a power of ten seconds. Labels are dates for steps of a day or more, and
+    times otherwise.
+    """
+    day = 86400 * 10**9
+    interval = (hi - lo) / float(target)
+    start = origin + int(np.ceil(lo * day))
+    end = origin + int(np.floor(hi * day))
+    if interval >= 28:
+        if interval > 365:
+            unit, step = 'Y', int(niceticks(0, interval / 365.0, 1)[1])
+        else:
+            unit, step = 'M', next(m for m in (1, 2, 3, 4, 6, 12) if m * 30 >= interval)
+        first = np.datetime64(start, 'ns').astype('datetime64[%s]' % unit).astype(np.int64)
+        last = np.datetime64(end, 'ns').astype('datetime64[%s]' % unit).astype(np.int64)
+        # Steps are aligned on whole years (and on January for months), as Axis.DeriveTicksDateTime:
+        offset = 1970 if unit == 'Y' else 0
+        periods = np.arange((first + offset) // step * step - offset, last + 1, step)
+        nanoseconds = periods.astype('datetime64[%s]' % unit).astype('datetime64[ns]').astype(np.int64)
+        nanoseconds = nanoseconds[(nanoseconds >= start) & (nanoseconds <= end)]
+        formats = lambda t: t.strftime('%Y-%m-%d')
+    else:
+        seconds = interval * 86400
+        if seconds >= 0.5:
+            steps = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 14400, 21600, 43200)
+            step = 10**9 * next((s for s in steps if s >= seconds), 86400 * int(niceticks(0, interval, 1)[1]))
+            nanoseconds = np.arange(-(-start // step) * step, end + 1, step, dtype=np.int64)
+            pattern = '%Y-%m-%d' if step >= day else ('%H:%M' if step % (60 * 10**9) == 0 else '%H:%M:%S')
+            formats = lambda t: t.strftime(pattern)
+        else:
+            # Worked out in seconds from the whole second at the start, so steps finer than doubles resolve as days work:
+            whole = start // 10**9 * 10**9
+            ticks, step = niceticks((start - whole) / 1e9, (end - whole) / 1e9, target)
+            nanoseconds = whole + np.round(ticks * 1e9).astype(np.int64)
+            decimals = max(0, int(-np.floor(np.log10(step) + 1e-9)))
+            formats = lambda t: t.strftime('%H:%M:') + '%0*.*f' % (decimals + 3, decimals, t.second + t.microsecond / 1e6)
+    times = nanoseconds.astype('datetime64[ns]').astype('datetime64[us]').tolist()
+    relative = nanoseconds - origin
+    ticks = relative // day + (relative % day) / float(day)
+    return ticks, [formats(t) for t in times]
+
+
+def axisticks(lo, hi, origin):
+    """ (ticks, labels) of an axis from lo to hi: a date axis if origin is not None.
+    """
+    if origin is not None:
+        return dateticks(lo, hi, origin)
+    ticks, step = niceticks(lo, hi)
+    return ticks, ticklabels(ticks, step)
+
+
+def textwidth(text, scale):
+    return max(0, (GLYPHWIDTH * len(text) - 1) * scale)
+
+
+class Layout(object):
+    """ Positions, in pixels from the top left of the figure, of one plot of a figure, shared by the PNG and SVG output.
+    (left, top, right, bottom) bound the plotting area.
+    """
+
+    def __init__(self, figure, index, axes):
+        scale = figure.fontscale
+        self.axes = axes
+        self.scale = scale
+        self.pad = pad = 4 * scale
+        self.ticklength = 4 * scale
+        charHeight = GLYPHHEIGHT * scale
+        row, column = divmod(index, figure.columns)
+        cellWidth = figure.width / float(figure.columns)
+        cellHeight = figure.height / float(figure.rows)
+        cellLeft, cellTop = int(round(column * cellWidth)), int(round(row * cellHeight))
+        cellRight, cellBottom = int(round((column + 1) * cellWidth)), int(round((row + 1) * cellHeight))
+        self.xlim, self.ylim = axes.limits()
+        self.xticks, self.xticklabels = axisticks(self.xlim[0], self.xlim[1], axes.dateorigins[0])
+        self.yticks, self.yticklabels = axisticks(self.ylim[0], self.ylim[1], axes.dateorigins[1])
+        labelWidth = max([textwidth(label, scale) for label in self.yticklabels] + [0])
+        self.left = cellLeft + 2 * pad + labelWidth + ((charHeight + pad) if axes.ylabel else 0)
+        self.top = cellTop + 2 * pad + ((charHeight + pad) if axes.title else 0)
+        self.right = cellRight - max(2 * pad, textwidth(self.xticklabels[-1], scale) // 2 + pad if self.xticklabels else 0)
+        self.bottom = cellBottom - 2 * pad - charHeight - ((charHeight + pad) if axes.xlabel else 0)
+        self.right = max(self.right, self.left + 1)
+        self.bottom = max(self.bottom, self.top + 1)
+        self.cell = (cellLeft, cellTop, cellRight, cellBottom)
+
+    @property
+    def width(self):
+        return self.right - self.left
+
+    @property
+    def height(self):
+        return self.bottom - self.top
+
+    def tocanvas(self, x, y):
+        """ Figure pixel coordinates of graph points.
+        """
+        px = self.left + (x - self.xlim[0]) * (self.width / (self.xlim[1] - self.xlim[0]))
+        py = self.bottom - (y - self.ylim[0]) * (self.height / (self.ylim[1] - self.ylim[0]))
+        return px, py
+
+    def linepoints(self, line):
+        x, y = line.points(self.xlim, max(self.width, 1))
+        return self.tocanvas(x, y)
+
+    def markerpoints(self, line):
+        """ Figure pixel coordinates of the markers of line. For decimated lines, these are all the points that can be
+        seen, less those in the same pixel as one already included, which would draw the same marker (as
+        Curve.MarkerIndices).
+        """
+        if not line.sorted:
+            return self.tocanvas(line.x, line.y)
+        # Markers centred up to a marker size outside the view can still be seen:
+        margin = line.markersize * (self.xlim[1] - self.xlim[0]) / max(self.width, 1)
+        lo = np.searchsorted(line.x, self.xlim[0] - margin, 'left')
+        hi = np.searchsorted(line.x, self.xlim[1] + margin, 'right')
+        px, py = self.tocanvas(line.x[lo:hi], line.y[lo:hi])
+        near = (py >= self.top - line.markersize) & (py <= self.bottom + line.markersize)
+        px, py = px[near], py[near]
+        first = np.sort(np.unique(np.column_stack([np.floor(px), np.floor(py)]), axis=0, return_index=True)[1])
+        return px[first], py[first]
+
+    def barcorners(self, bars):
+        """ Figure pixel coordinates (left, top, right, bottom) of the rectangles of bars.
+        """
+        x0, x1, y0, y1 = bars.rectangles()
+        left, top = self.tocanvas(np.minimum(x0, x1), np.maximum(y0, y1))
+        right, bottom = self.tocanvas(np.maximum(x0, x1), np.minimum(y0, y1))
+        return left, top, right, bottom
+
+    def legend(self):
+        """ (left, top, right, bottom, rowHeight, [(item, text)]) of the legend box, or None if no item has a title.
+        """
+        entries = [(item, item.title) for item in self.axes.items if getattr(item, 'title', '')]
+        if not entries:
+            return None
+        pad, scale = self.pad, self.scale
+        rowHeight = GLYPHHEIGHT * scale + pad
+        width = 3 * pad + 30 * scale + max(textwidth(text, scale) for item, text in entries)
+        right, top = self.right - pad, self.top + pad
+        return right - width, top, right, top + pad + rowHeight * len(entries), rowHeight, entries
+
+
+def layouts(figure):
+    return [Layout(figure, index, axes) for index, axes in sorted(figure.axes.items())]
+
+
+# Rasterisation
+
+def clipsegments(x0, y0, dx, dy, xmin, xmax, ymin, ymax):
+    """ Parameter ranges (ta, tb) of the parts of segments (x0 + t dx, y0 + t dy), 0 <= t <= 1, inside a rectangle,
+    and a mask of the segments that have such a part (Liang-Barsky).
+    """
+    ta = np.zeros(len(x0))
+    tb = np.ones(len(x0))
+    outside = np.zeros(len(x0), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-dx, x0 - xmin), (dx, xmax - x0), (-dy, y0 - ymin), (dy, ymax - y0)):
+            r = q / p
+            outside |= (p == 0) & (q < 0)
+            ta = np.where(p < 0, np.maximum(ta, r), ta)
+            tb = np.where(p > 0, np.minimum(tb, r), tb)
+    return ta, tb, ~outside & (ta <= tb)
+
+
+def penoffsets(thickness):
+    """ Pixel offsets (dx, dy) of a square pen of the given thickness.
+    """
+    width = max(1, int(round(thickness)))
+    offsets = np.arange(width) - (width - 1) // 2
+    return np.repeat(offsets, width), np.tile(offsets, width)
+
+
+def polylinepixels(px, py, thickness=1.0, dash=None, clip=None):
+    """ Generate arrays (x, y) of the pixels of a polyline through canvas points (px, py), a chunk at a time.
+    Non-finite points break the line; dash is a pattern of on and off lengths in pixels.
+    Only segments that reach the clip rectangle (left, top, right, bottom) are drawn.
+    """
+    px = np.asarray(px, dtype=np.float64)
+    py = np.asarray(py, dtype=np.float64)
+    if len(px) < 2:
+        return
+    x0, y0, dx, dy = px[:-1], py[:-1], np.diff(px), np.diff(py)
+    lengths = np.hypot(dx, dy)
+    valid = np.isfinite(lengths)
+    # Distance along the line of the start of each segment, for the dash pattern:
+    distance = np.concatenate([[0.0], np.cumsum(np.where(valid, lengths, 0.0))[:-1]])
+    x0, y0, dx, dy, lengths, distance = [a[valid] for a in (x0, y0, dx, dy, lengths, distance)]
+    if clip is not None:
+        margin = thickness + 1
+        ta, tb, keep = clipsegments(x0, y0, dx, dy, clip[0] - margin, clip[2] + margin, clip[1] - margin, clip[3] + margin)
+    else:
+        ta, tb, keep = np.zeros(len(x0)), np.ones(len(x0)), np.ones(len(x0), dtype=bool)
+    x0, y0, dx, dy, lengths, distance, ta, tb = [a[keep] for a in (x0, y0, dx, dy, lengths, distance, ta, tb)]
+    steps = np.ceil(np.maximum(np.abs(dx), np.abs(dy)) * (tb - ta)).astype(np.int64) + 1
+    penX, penY = penoffsets(thickness)
+    if dash is not None:
+        period = float(sum(dash))
+        onEdges = np.cumsum(dash)
+    ends = np.cumsum(steps)
+    start = 0
+    chunk = max(1, CHUNKPIXELS // len(penX))
+    while start < len(steps):
+        stop = max(start + 1, np.searchsorted(ends, ends[start] - steps[start] + chunk, 'right'))
+        n = steps[start:stop]
+        owner = np.repeat(np.arange(start, stop), n)
+        offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        t = ta[owner] + offset * (tb[owner] - ta[owner]) / np.maximum(n - 1, 1)[owner - start]
+        x = np.floor(x0[owner] + t * dx[owner]).astype(np.int64)
+        y = np.floor(y0[owner] + t * dy[owner]).astype(np.int64)
+        if dash is not None:
+            phase = np.mod(distance[owner] + t * lengths[owner], period)
+            on = np.searchsorted(onEdges, phase, 'right') % 2 == 0
+            x, y = x[on], y[on]
+        if len(penX) > 1:
+            x = (x[:, None] + penX[None, :]).ravel()
+            y = (y[:, None] + penY[None, :]).ravel()
+        yield x, y
+        start = stop
+
+
+def markeroutline(marker, size):
+    """ Canvas points of the outline of a marker centred on the origin.
+    """
+    half = size / 2.0
+    if marker == 's':
+        return np.array([-half, half, half, -half, -half]), np.array([-half, -half, half, half, -half])
+    if marker == '^':
+        return np.array([-half, 0, half, -half]), np.array([half, -half, half, half])
+    angles = np.linspace(0, 2 * np.pi, max(16, int(size * 3)))
+    return half * np.cos(angles), half * np.sin(angles)
+
+
+def markerstamps(marker, size, thickness):
+    """ Pixel offsets of the outline and of the inside of a marker centred on the origin.
+    """
+    ox, oy = markeroutline(marker, size)
+    outline = [np.concatenate(parts) for parts in zip(*polylinepixels(ox, oy, thickness))]
+    outline = np.unique(np.column_stack(outline), axis=0)
+    half = int(np.ceil(size / 2.0))
+    gx, gy = np.meshgrid(np.arange(-half, half + 1), np.arange(-half, half + 1))
+    cx, cy = gx + 0.5, gy + 0.5
+    if marker == 's':
+        inside = (np.abs(cx) < size / 2.0) & (np.abs(cy) < size / 2.0)
+    elif marker == '^':
+        inside = (cy < size / 2.0) & (np.abs(cx) < (cy + size / 2.0) / 2.0)
+    else:
+        inside = np.hypot(cx, cy) < size / 2.0
+    return (outline[:, 0], outline[:, 1]), (gx[inside], gy[inside])
+
+
+def glyph(character, scale, cache={}):
+    """ Boolean mask (GLYPHHEIGHT, GLYPHWIDTH) times scale of a character of the built-in font.
+    """
+    key = (character, scale)
+    if key not in cache:
+        code = ord(character)
+        if code < 32 or code > 126:
+            code = ord('?')
+        bits = bytearray.fromhex(''.join(FONT)[(code - 32) * 14:(code - 31) * 14])
+        mask = np.zeros((GLYPHHEIGHT, GLYPHWIDTH), dtype=bool)
+        mask[:7, :5] = (np.array(bits)[:, None] >> np.arange(4, -1, -1)[None, :]) & 1
+        cache[key] = np.kron(mask, np.ones((scale, scale), dtype=bool)).astype(bool)
+    return cache[key]
+
+
+class Canvas(object):
+    """ An RGB image being drawn, shape (height, width, 3).
+    """
+
+    def __init__(self, width, height, background=(255, 255, 255)):
+        self.pixels = np.empty((height, width, 3), dtype=np.uint8)
+        self.pixels[...] = background
+
+    def setpixels(self, x, y, colour, clip=None):
+        height, width = self.pixels.shape[:2]
+        left, top, right, bottom = clip if clip is not None else (0, 0, width, height)
+        left, top, right, bottom = max(left, 0), max(top, 0), min(right, width), min(bottom, height)
+        inside = (x >= left) & (x < right) & (y >= top) & (y < bottom)
+        self.pixels[y[inside], x[inside]] = colour
+
+    def fillrect(self, left, top, right, bottom, colour):
+        self.pixels[max(int(top), 0):max(int(bottom), 0), max(int(left), 0):max(int(right), 0)] = colour
+
+    def polyline(self, px, py, colour, thickness=1.0, dash=None, clip=None):
+        for x, y in polylinepixels(px, py, thickness, dash, clip):
+            self.setpixels(x, y, colour, clip)
+
+    def rectangle(self, left, top, right, bottom, colour):
+        """ Outline of the pixels from (left, top) to (right - 1, bottom - 1).
+        """
+        self.polyline([left, right - 1, right - 1, left, left], [top, top, bottom - 1, bottom - 1, top], colour)
+
+    def blend(self, left, top, rgba):
+        """ Draw RGBA pixels with their top left corner at (left, top).
+        """
+        rows, columns = rgba.shape[:2]
+        region = self.pixels[top:top + rows, left:left + columns]
+        rgba = rgba[:region.shape[0], :region.shape[1]]
+        alpha = rgba[..., 3:4].astype(np.float64) / 255.0
+        region[...] = np.round(rgba[..., :3] * alpha + region * (1 - alpha)).astype(np.uint8)
+
+    def text(self, text, x, y, scale, colour=(0, 0, 0), halign='left', valign='top', vertical=False):
+        """ Draw text with the built-in font, aligned at (x, y); vertical text reads from bottom to top.
+        """
+        if not text:
+            return
+        mask = np.concatenate([glyph(c, scale) for c in text], axis=1)[:7 * scale, :textwidth(text, scale)]
+        if vertical:
+            mask = np.rot90(mask)
+        rows, columns = mask.shape
+        left = {'left': x, 'center': x - columns // 2, 'right': x - columns}[halign]
+        top = {'top': y, 'middle': y - rows // 2, 'bottom': y - rows}[valign]
+        gy, gx = np.nonzero(mask)
+        self.setpixels(gx + int(left), gy + int(top), colour)
+
+
+def drawmarkers(canvas, px, py, line, clip, stamps):
+    valid = np.isfinite(px) & np.isfinite(py)
+    cx, cy = np.floor(px[valid]).astype(np.int64), np.floor(py[valid]).astype(np.int64)
+    margin = line.markersize
+    near = (cx >= clip[0] - margin) & (cx < clip[2] + margin) & (cy >= clip[1] - margin) & (cy < clip[3] + margin)
+    cx, cy = cx[near], cy[near]
+    (outlineX, outlineY), (insideX, insideY) = stamps
+    for chunkStart in range(0, len(cx), max(1, CHUNKPIXELS // max(len(insideX), 1))):
+        part = slice(chunkStart, chunkStart + max(1, CHUNKPIXELS // max(len(insideX), 1)))
+        if line.markersfill is not None:
+            canvas.setpixels((cx[part, None] + insideX).ravel(), (cy[part, None] + insideY).ravel(), line.markersfill, clip)
+        canvas.setpixels((cx[part, None] + outlineX).ravel(), (cy[part, None] + outlineY).ravel(), line.colour, clip)
+
+
+def drawbars(canvas, layout, bars, clip):
+    left, top, right, bottom = layout.barcorners(bars)
+    if bars.fill is not None:
+        corners = [np.clip(np.round(a), low, high).astype(np.int64) for a, low, high in
+                   ((left, clip[0], clip[2]), (top, clip[1], clip[3]), (right, clip[0], clip[2]), (bottom, clip[1], clip[3]))]
+        for l, t, r, b in zip(*corners):
+            canvas.fillrect(l, t, r, b, bars.fill)
+    if bars.stroke is not None and bars.thickness > 0:
+        gap = np.full(len(left), np.nan)
+        px = np.column_stack([left, right, right, left, left, gap]).ravel()
+        py = np.column_stack([bottom, bottom, top, top, bottom, gap]).ravel()
+        canvas.polyline(px, py, bars.stroke, bars.thickness, None, clip)
+
+
+def dashpattern(line):
+    pattern = DASHES.get(line.dash)
+    return None if pattern is None else tuple(p * line.thickness for p in pattern)
+
+
+def render(figure):
+    """ RGB pixels of a figure, shape (height, width, 3).
+    """
+    canvas = Canvas(figure.width, figure.height)
+    for layout in layouts(figure):
+        axes, scale, pad = layout.axes, layout.scale, layout.pad
+        clip = (layout.left, layout.top, layout.right, layout.bottom)
+        for item in axes.items:
+            if isinstance(item, (ImageItem, DensityItem)):
+                canvas.blend(layout.left, layout.top, item.resample(layout.xlim, layout.ylim, layout.width, layout.height))
+            elif isinstance(item, BarsItem):
+                drawbars(canvas, layout, item, clip)
+        for item in lineitems(axes):
+            px, py = layout.linepoints(item)
+            if item.dash is not None:
+                canvas.polyline(px, py, item.colour, item.thickness, dashpattern(item), clip)
+            if item.marker is not None:
+                px, py = layout.markerpoints(item)
+                drawmarkers(canvas, px, py, item, clip, markerstamps(item.marker, item.markersize, item.thickness))
+        canvas.rectangle(layout.left, layout.top, layout.right, layout.bottom, (0, 0, 0))
+        tickX, dummy = layout.tocanvas(layout.xticks, 0)
+        dummy, tickY = layout.tocanvas(0, layout.yticks)
+        for x, label in zip(np.floor(tickX).astype(np.int64), layout.xticklabels):
+            canvas.polyline([x, x], [layout.bottom - 1, layout.bottom - 1 - layout.ticklength], (0, 0, 0))
+            canvas.text(label, x, layout.bottom + pad, scale, halign='center')
+        for y, label in zip(np.floor(tickY).astype(np.int64), layout.yticklabels):
+            canvas.polyline([layout.left, layout.left + layout.ticklength], [y, y], (0, 0, 0))
+            canvas.text(label, layout.left - pad, y, scale, halign='right', valign='middle')
+        centreX, centreY = (layout.left + layout.right) // 2, (layout.top + layout.bottom) // 2
+        canvas.text(axes.title, centreX, layout.top - pad, scale, halign='center', valign='bottom')
+        canvas.text(axes.xlabel, centreX, layout.cell[3] - pad, scale, halign='center', valign='bottom')
+        canvas.text(axes.ylabel, layout.cell[0] + pad, centreY, scale, valign='middle', vertical=True)
+        legend = layout.legend()
+        if legend is not None:
+            left, top, right, bottom, rowHeight, entries = legend
+            canvas.fillrect(left, top, right, bottom, (255, 255, 255))
+            canvas.rectangle(left, top, right, bottom, (0, 0, 0))
+            for k, (item, text) in enumerate(entries):
+                y = top + pad + k * rowHeight + rowHeight // 2
+                x0, x1 = left + pad, left + pad + 30 * scale
+                if isinstance(item, LineItem):
+                    if item.dash is not None:
+                        canvas.polyline([x0, x1], [y, y], item.colour, item.thickness, dashpattern(item))
+                    if item.marker is not None:
+                        drawmarkers(canvas, np.array([(x0 + x1) / 2.0]), np.array([float(y)]), item, (left, top, right, bottom),
+                                    markerstamps(item.marker, item.markersize, item.thickness))
+                canvas.text(text, x1 + pad, y, scale, valign='middle')
+    return canvas.pixels
+
+
+def pngbytes(pixels):
+    """ PNG file contents of RGB (height, width, 3) or RGBA (height, width, 4) uint8 pixels.
+    """
+    height, width, channels = pixels.shape
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2 if channels == 3 else 6, 0, 0, 0)
+    # Each row starts with filter type 0 (none):
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(height, -1)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+
+# SVG
+
+def svgpath(px, py):
+    """ Path data of a polyline through canvas points; non-finite points break the line.
+    """
+    valid = np.isfinite(px) & np.isfinite(py)
+    parts = []
+    previous = False
+    for x, y, ok in zip(px, py, valid):
+        if ok:
+            parts.append('%s%.2f %.2f' % ('L' if previous else 'M', x, y))
+        previous = ok
+    return ''.join(parts)
+
+
+def svgmarkers(px, py, marker, size, clip):
+    valid = np.isfinite(px) & np.isfinite(py)
+    valid &= (px >= clip[0] - size) & (px <= clip[2] + size) & (py >= clip[1] - size) & (py <= clip[3] + size)
+    half = size / 2.0
+    if marker == 's':
+        shape = 'M%%.2f %%.2fh%.2fv%.2fh%.2fz' % (size, size, -size)
+        return ''.join(shape % (x - half, y - half) for x, y in zip(px[valid], py[valid]))
+    if marker == '^':
+        shape = 'M%%.2f %%.2fl%.2f %.2fl%.2f %.2fz' % (half, -size, half, size)
+        return ''.join(shape % (x - half, y + half) for x, y in zip(px[valid], py[valid]))
+    shape = 'M%%.2f %%.2fa%.2f %.2f 0 1 0 %.2f 0a%.2f %.2f 0 1 0 %.2f 0z' % (half, half, size, half, half, -size)
+    return ''.join(shape % (x - half, y) for x, y in zip(px[valid], py[valid]))
+
+
+def svgbars(left, top, right, bottom):
+    """ Path data of rectangles.
+    """
+    return ''.join('M%.2f %.2fH%.2fV%.2fH%.2fz' % (l, b, r, t, l) for l, t, r, b in zip(left, top, right, bottom))
+
+
+def svgcolour(colour):
+    return 'none' if colour is None else '#%02x%02x%02x' % tuple(colour)
+
+
+def svgtext(text, x, y, scale, anchor='start', baseline='hanging', rotate=False):
+    if not text:
+        return ''
+    transform = ' transform="rotate(-90 %d %d)"' % (x, y) if rotate else ''
+    return ('<text x="%d" y="%d" font-size="%d" text-anchor="%s" dominant-baseline="%s"%s>%s</text>\n'
+            % (x, y, 10 * scale, anchor, baseline, transform, escape(text)))
+
+
+def svglinestyle(line):
+    pattern = dashpattern(line)
+    dash = '' if pattern is None else ' stroke-dasharray="%s"' % ' '.join('%g' % p for p in pattern)
+    return 'stroke="%s" stroke-width="%g"%s' % (svgcolour(line.colour), line.thickness, dash)
+
+
+def svgdocument(figure):
+    """ SVG document of a figure, as a string.
+    """
+    out = ['<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+           'width="%d" height="%d" viewBox="0 0 %d %d" font-family="sans-serif">\n'
+           % (figure.width, figure.height, figure.width, figure.height),
+           '<rect width="100%" height="100%" fill="white"/>\n']
+    for index, layout in enumerate(layouts(figure)):
+        axes, scale, pad = layout.axes, layout.scale, layout.pad
+        clip = (layout.left, layout.top, layout.right, layout.bottom)
+        out.append('<clipPath id="plot%d"><rect x="%d" y="%d" width="%d" height="%d"/></clipPath>\n'
+                   % (index, layout.left, layout.top, layout.width, layout.height))
+        out.append('<g clip-path="url(#plot%d)" fill="none">\n' % index)
+        for item in axes.items:
+            if isinstance(item, (ImageItem, DensityItem)):
+                data = base64.b64encode(pngbytes(item.resample(layout.xlim, layout.ylim, layout.width, layout.height)))
+                out.append('<image x="%d" y="%d" width="%d" height="%d" preserveAspectRatio="none" '
+                           'style="image-rendering:pixelated" xlink:href="data:image/png;base64,%s"/>\n'
+                           % (layout.left, layout.top, layout.width, layout.height, data.decode('ascii')))
+            elif isinstance(item, BarsItem):
+                out.append('<path fill="%s" stroke="%s" stroke-width="%g" d="%s"/>\n'
+                           % (svgcolour(item.fill), svgcolour(item.stroke), item.thickness,
+                              svgbars(*layout.barcorners(item))))
+        for item in lineitems(axes):
+            px, py = layout.linepoints(item)
+            if item.dash is not None:
+                out.append('<path %s stroke-linejoin="bevel" d="%s"/>\n' % (svglinestyle(item), svgpath(px, py)))
+            if item.marker is not None:
+                px, py = layout.markerpoints(item)
+                out.append('<path stroke="%s" stroke-width="%g" fill="%s" d="%s"/>\n'
+                           % (svgcolour(item.colour), item.thickness, svgcolour(item.markersfill),
+                              svgmarkers(px, py, item.marker, item.markersize, clip)))
+        out.append('</g>\n')
+        out.append('<rect x="%.1f" y="%.1f" width="%d" height="%d" fill="none" stroke="black"/>\n'
+                   % (layout.left + 0.5, layout.top + 0.5, layout.width - 1, layout.height - 1))
+        tickX, dummy = layout.tocanvas(layout.xticks, 0)
+        dummy, tickY = layout.tocanvas(0, layout.yticks)
+        ticks = ''.join('M%.1f %dv%d' % (x + 0.5, layout.bottom, -layout.ticklength) for x in np.floor(tickX))
+        ticks += ''.join('M%d %.1fh%d' % (layout.left, y + 0.5, layout.ticklength) for y in np.floor(tickY))
+        out.append('<path stroke="black" d="%s"/>\n' % ticks)
+        for x, label in zip(np.floor(tickX), layout.xticklabels):
+            out.append(svgtext(label, x, layout.bottom + pad, scale, 'middle'))
+        for y, label in zip(np.floor(tickY), layout.yticklabels):
+            out.append(svgtext(label, layout.left - pad, y, scale, 'end', 'central'))
+        centreX, centreY = (layout.left + layout.right) // 2, (layout.top + layout.bottom) // 2
+        out.append(svgtext(axes.title, centreX, layout.top - pad, scale, 'middle', 'auto'))
+        out.append(svgtext(axes.xlabel, centreX, layout.cell[3] - pad, scale, 'middle', 'auto'))
+        out.append(svgtext(axes.ylabel, layout.cell[0] + pad, centreY, scale, 'middle', 'hanging', rotate=True))
+        legend = layout.legend()
+        if legend is not None:
+            left, top, right, bottom, rowHeight, entries = legend
+            out.append('<rect x="%.1f" y="%.1f" width="%d" height="%d" fill="white" stroke="black"/>\n'
+                       % (left + 0.5, top + 0.5, right - left - 1, bottom - top - 1))
+            for k, (item, text) in enumerate(entries):
+                y = top + pad + k * rowHeight + rowHeight // 2
+                x0, x1 = left + pad, left + pad + 30 * scale
+                if isinstance(item, LineItem):
+                    if item.dash is not None:
+                        out.append('<path %s d="M%d %.1fH%d"/>\n' % (svglinestyle(item), x0, y + 0.5, x1))
+                    if item.marker is not None:
+                        out.append('<path stroke="%s" fill="%s" d="%s"/>\n'
+                                   % (svgcolour(item.colour), svgcolour(item.markersfill),
+                                      svgmarkers(np.array([(x0 + x1) / 2.0]), np.array([y + 0.5]), item.marker,
+                                                 item.markersize, (left, top, right, bottom))))
+                out.append(svgtext(text, x1 + pad, y, scale, 'start', 'central'))
+    out.append('</svg>\n')
+    return ''.join(out)
+
+
+# Output
+
+def savefig(path, figure=None, format=None):
+    """ Write a figure (by default the current figure) to a file. format is 'png' or 'svg'; by default it is
+    taken from the extension of path. Returns path.
+    """
+    figure = figure or currentfigure
+    if figure is None:
+        raise ValueError('There is no figure to save.')
+    format = (format or os.path.splitext(path)[1][1:] or 'png').lower()
+    if format == 'png':
+        contents = pngbytes(render(figure))
+    elif format == 'svg':
+        contents = svgdocument(figure).encode('utf-8')
+    else:
+        raise ValueError("format must be 'png' or 'svg'")
+    with open(path, 'wb') as f:
+        f.write(contents)
+    return path
+
+
+def renderjob(job):
+    """ Render one job of renderbatch in this process.
+    """
+    global currentfigure, holdstate
+    path, source = job
+    if isinstance(source, Figure):
+        return savefig(path, source)
+    currentfigure, holdstate = None, False
+    try:
+        source()
+        return savefig(path)
+    finally:
+        close()
+
+
+def renderbatch(jobs, processes=None, chunksize=None):
+    """ Render many figures to files in a pool of processes (by default one per CPU).
+    jobs is a sequence of (path, source): source is a Figure, or a function taking no arguments that draws
+    a figure with the functions of this module (it is called with a new current figure and hold off).
+    Functions must be defined at the top level of a module (e.g. functools.partial of one) so that they can
+    be sent to the worker processes. processes = 1 renders in this process. Returns the paths, in order.
+    """
+    jobs = list(jobs)
+    processes = processes or multiprocessing.cpu_count()
+    if processes == 1 or len(jobs) <= 1:
+        return [renderjob(job) for job in jobs]
+    chunksize = chunksize or max(1, len(jobs) // (4 * processes))
+    pool = multiprocessing.Pool(min(processes, len(jobs)))
+    try:
+        return pool.map(renderjob, jobs, chunksize)
+    finally:
+        pool.close()
+        pool.join()
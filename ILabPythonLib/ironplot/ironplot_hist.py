@@ -0,0 +1,220 @@
+""" Histograms of large arrays.
+
+NumPy equivalent of IronPlot.Histogramming, used by hist and hist2d. Data are binned a
+chunk at a time, so they may be numpy.memmap arrays of 1e9 samples or more, with memory
+bounded by the chunk size rather than the length of the data. The chunks are counted by a
+pool of threads (NumPy releases the GIL), each into its own partial counts, which are summed
+as they arrive. Counts are mergeable in the same way: a Histogram keeps its edges and adds the
+counts of more data to those it has, so a plotted histogram can be updated as data arrive
+without binning the earlier data again.
+Bin k holds the values from edges[k] up to but not including edges[k + 1], except that the
+last bin includes its right edge, as numpy.histogram; values outside the edges and NaNs are
+not counted. For evenly spaced edges the bins are found by arithmetic rather than by search,
+with the same results. 2-D counts have shape (xbins, ybins), indexed [x, y] as
+numpy.histogram2d and as the data of FalseColourImage.
+"""
+import numpy as np
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from ironplot_arrays import asdoublearray
+
+# Number of samples binned at a time by each worker:
+CHUNKSIZE = 1 << 22
+# Number of worker threads (by default, one per core):
+WORKERS = None
+
+
+def mapchunks(function, length, chunksize=CHUNKSIZE, workers=None):
+    """ Generate function(start, stop) for the chunks of length samples, computed by a pool of workers threads,
+    in the order they finish. Only the chunks being worked on are held at once.
+    """
+    chunks = [(start, min(start + chunksize, length)) for start in range(0, length, chunksize)]
+    workers = workers or WORKERS or cpu_count()
+    if len(chunks) <= 1 or workers <= 1:
+        for start, stop in chunks:
+            yield function(start, stop)
+        return
+    pool = ThreadPool(min(workers, len(chunks)))
+    try:
+        for part in pool.imap_unordered(lambda chunk: function(*chunk), chunks):
+            yield part
+    finally:
+        pool.close()
+
+
+def datarange(data, chunksize=CHUNKSIZE, workers=None):
+    """ (min, max) of the finite values of data, found a chunk at a time; (0, 1) if there are none.
+    """
+    def chunkrange(start, stop):
+        chunk = asdoublearray(data[start:stop], 1)
+        chunk = chunk[np.isfinite(chunk)]
+        return (chunk.min(), chunk.max()) if chunk.size else (np.inf, -np.inf)
+    lo, hi = np.inf, -np.inf
+    for low, high in mapchunks(chunkrange, len(data), chunksize, workers):
+        lo, hi = min(lo, low), max(hi, high)
+    if lo > hi:
+        return 0.0, 1.0
+    return float(lo), float(hi)
+
+
+def binedges(bins, range=None, data=None, chunksize=CHUNKSIZE, workers=None):
+    """ (edges, uniform) of bins: a number of evenly spaced bins covering range = (min, max), by default the range
+    of data (widened by 0.5 either way if it is a single value, as numpy.histogram), or the edges themselves,
+    ascending. uniform is True for evenly spaced bins.
+    """
+    if np.ndim(bins) == 0:
+        bins = int(bins)
+        if bins < 1:
+            raise ValueError('There must be at least one bin')
+        lo, hi = (float(range[0]), float(range[1])) if range is not None else datarange(data, chunksize, workers)
+        if not hi >= lo:
+            raise ValueError('The range must be ascending')
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+        return np.linspace(lo, hi, bins + 1), True
+    edges = asdoublearray(bins, 1)
+    if len(edges) < 2 or not (np.diff(edges) > 0).all():
+        raise ValueError('Bin edges must be ascending')
+    return edges, False
+
+
+def inside(values, edges):
+    """ Mask of the values within the edges (NaNs are not).
+    """
+    return (values >= edges[0]) & (values <= edges[-1])
+
+
+def binindices(values, edges, uniform):
+    """ Bins (int64) of values, all within the edges.
+    """
+    n = len(edges) - 1
+    if not uniform:
+        return np.minimum(np.searchsorted(edges, values, side='right') - 1, n - 1)
+    index = ((values - edges[0]) * (n / (edges[-1] - edges[0]))).astype(np.int64)
+    np.minimum(index, n - 1, out=index)
+    # Correct the bins of values that rounding put next to their own, as numpy.histogram:
+    index -= values < edges[index]
+    index += (values >= edges[index + 1]) & (index != n - 1)
+    return index
+
+
+def histcounts(data, edges, uniform=False, chunksize=CHUNKSIZE, workers=None):
+    """ Counts (int64) of data in the bins between edges.
+    """
+    n = len(edges) - 1
+    def chunkcounts(start, stop):
+        values = asdoublearray(data[start:stop], 1)
+        if uniform:
+            # numpy.histogram has the same edges and bins for evenly spaced bins:
+            return np.histogram(values, n, (edges[0], edges[-1]))[0]
+        values = values[inside(values, edges)]
+        return np.bincount(binindices(values, edges, uniform), minlength=n)
+    counts = np.zeros(n, dtype=np.int64)
+    for part in mapchunks(chunkcounts, len(data), chunksize, workers):
+        counts += part
+    return counts
+
+
+def histcounts2d(x, y, xedges, yedges, xuniform=False, yuniform=False, chunksize=CHUNKSIZE, workers=None):
+    """ Counts (int64) of the points (x, y) in the cells between xedges and yedges, shape (xbins, ybins).
+    """
+    if len(x) != len(y):
+        raise ValueError("Component vectors' lengths must be equal")
+    nx, ny = len(xedges) - 1, len(yedges) - 1
+    def chunkcounts(start, stop):
+        u = asdoublearray(x[start:stop], 1)
+        v = asdoublearray(y[start:stop], 1)
+        valid = inside(u, xedges) & inside(v, yedges)
+        if not valid.all():
+            u, v = u[valid], v[valid]
+        index = binindices(u, xedges, xuniform) * ny + binindices(v, yedges, yuniform)
+        return np.bincount(index, minlength=nx * ny)
+    counts = np.zeros(nx * ny, dtype=np.int64)
+    for part in mapchunks(chunkcounts, len(x), chunksize, workers):
+        counts += part
+    return counts.reshape(nx, ny)
+
+
+class Histogram(object):
+    """ Counts of data in the bins between edges, to which more data (or the counts of another Histogram with
+    the same edges) can be added. uniform is True for evenly spaced edges.
+    """
+
+    def __init__(self, edges, uniform=False):
+        self.edges = asdoublearray(edges, 1)
+        self.uniform = uniform
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def add(self, data, chunksize=CHUNKSIZE, workers=None):
+        """ Count data into the bins, and return the counts of data alone.
+        """
+        counts = histcounts(data, self.edges, self.uniform, chunksize, workers)
+        self.counts += counts
+        return counts
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError('Histograms must have the same edges to be merged')
+        self.counts += other.counts
+
+    @property
+    def centres(self):
+        return 0.5 * (self.edges[:-1] + self.edges[1:])
+
+    @property
+    def widths(self):
+        return np.diff(self.edges)
+
+
+class Histogram2D(object):
+    """ Counts of points in the cells between xedges and yedges, shape (xbins, ybins), to which more points
+    (or the counts of another Histogram2D with the same edges) can be added.
+    """
+
+    def __init__(self, xedges, yedges, xuniform=False, yuniform=False):
+        self.xedges = asdoublearray(xedges, 1)
+        self.yedges = asdoublearray(yedges, 1)
+        self.xuniform, self.yuniform = xuniform, yuniform
+        self.counts = np.zeros((len(self.xedges) - 1, len(self.yedges) - 1), dtype=np.int64)
+
+    def add(self, x, y, chunksize=CHUNKSIZE, workers=None):
+        """ Count the points (x, y) into the cells, and return the counts of these points alone.
+        """
+        counts = histcounts2d(x, y, self.xedges, self.yedges, self.xuniform, self.yuniform, chunksize, workers)
+        self.counts += counts
+        return counts
+
+    def merge(self, other):
+        if not (np.array_equal(self.xedges, other.xedges) and np.array_equal(self.yedges, other.yedges)):
+            raise ValueError('Histograms must have the same edges to be merged')
+        self.counts += other.counts
+
+
+def histogram(data, bins=10, range=None, chunksize=CHUNKSIZE, workers=None):
+    """ Histogram of data: bins is a number of evenly spaced bins over range = (min, max) (by default the range
+    of the data), or the bin edges.
+    """
+    edges, uniform = binedges(bins, range, data, chunksize, workers)
+    result = Histogram(edges, uniform)
+    result.add(data, chunksize, workers)
+    return result
+
+
+def histogram2d(x, y, bins=10, range=None, chunksize=CHUNKSIZE, workers=None):
+    """ 2-D histogram of the points (x, y): bins is a number of bins for both axes, a pair (xbins, ybins) of
+    numbers or of edges, or the edges of both; range is ((xmin, xmax), (ymin, ymax)), by default the ranges
+    of x and y.
+    """
+    if np.isscalar(bins):
+        xbins, ybins = bins, bins
+    elif len(bins) == 2 and not any(np.isscalar(b) and not isinstance(b, (int, np.integer)) for b in bins):
+        xbins, ybins = bins
+    else:
+        # The same edges for both axes:
+        xbins, ybins = bins, bins
+    xrange, yrange = (None, None) if range is None else range
+    xedges, xuniform = binedges(xbins, xrange, x, chunksize, workers)
+    yedges, yuniform = binedges(ybins, yrange, y, chunksize, workers)
+    result = Histogram2D(xedges, yedges, xuniform, yuniform)
+    result.add(x, y, chunksize, workers)
+    return result
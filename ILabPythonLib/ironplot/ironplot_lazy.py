@@ -0,0 +1,112 @@
+""" Lazy loading of the modules behind the ironplot package.
+
+Importing a backend module is what costs time at start-up: ironplot_windows starts the
+UI thread, ironplot_functions references IronPlot.dll, ironplot_mscharts the Windows
+Forms charting and System.Drawing assemblies, and most modules import NumPy. The
+package instead exports placeholders for the public names of each module, and a
+module is only imported when one of its names is first used:
+    export(globals(), 'ironplot_functions', functions=('plot', 'image'), objects=('Plot2D',), ui=True)
+Functions are replaced by functions that import the module and call through to it.
+Other names (classes, enumerations, values) are replaced by LazyObject proxies,
+which pass on attribute access, calls and isinstance checks to the real object.
+A function of a module exported with ui=True is called on the UI thread (see
+ironplot_windows.ondispatcher): the console only sends commands to the UI thread once
+ironplot_windows has been imported, so the command that first plots would otherwise
+run on the wrong thread.
+loadtimes records how long each module took to import, for bench_import.py.
+This module does not use .NET.
+"""
+import threading
+import time
+
+clock = getattr(time, 'perf_counter', time.time)
+
+# Seconds taken to import each module loaded so far, by module name:
+loadtimes = {}
+modules = {}
+loadlock = threading.RLock()
+
+
+def load(name):
+    """ Import the module name (if not yet imported) and return it.
+    """
+    module = modules.get(name)
+    if module is not None:
+        return module
+    with loadlock:
+        if name not in modules:
+            start = clock()
+            module = __import__(name, globals(), None, ['__name__'])
+            loadtimes[name] = clock() - start
+            modules[name] = module
+        return modules[name]
+
+
+def lazyfunction(modulename, name, ui=False):
+    """ A function that imports modulename on its first call and calls its function name.
+    """
+    resolved = []
+
+    def function(*args, **kwargs):
+        if not resolved:
+            target = getattr(load(modulename), name)
+            function.__doc__ = target.__doc__
+            resolved.append(target)
+        if ui:
+            return load('ironplot_windows').ondispatcher(lambda: resolved[0](*args, **kwargs))
+        return resolved[0](*args, **kwargs)
+    function.__name__ = name
+    function.__doc__ = 'See %s.%s (imported when first called).' % (modulename, name)
+    return function
+
+
+class LazyObject(object):
+    """ Placeholder for the object name of module modulename, which is imported when the object is first used.
+    """
+
+    def __init__(self, modulename, name):
+        object.__setattr__(self, '_modulename', modulename)
+        object.__setattr__(self, '_name', name)
+
+    def resolve(self):
+        """ The real object.
+        """
+        return getattr(load(self._modulename), self._name)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __instancecheck__(self, instance):
+        return isinstance(instance, self.resolve())
+
+    def __subclasscheck__(self, subclass):
+        return issubclass(subclass, self.resolve())
+
+    def __eq__(self, other):
+        return self.resolve() == other
+
+    def __ne__(self, other):
+        return self.resolve() != other
+
+    def __hash__(self):
+        return hash(self.resolve())
+
+    def __repr__(self):
+        if self._modulename in modules:
+            return repr(self.resolve())
+        return '<%s from %s, not yet imported>' % (self._name, self._modulename)
+
+
+def export(namespace, modulename, functions=(), objects=(), ui=False):
+    """ Put placeholders for functions and objects of the module modulename in namespace (a package's globals()).
+    """
+    for name in functions:
+        namespace[name] = lazyfunction(modulename, name, ui)
+    for name in objects:
+        namespace[name] = LazyObject(modulename, name)
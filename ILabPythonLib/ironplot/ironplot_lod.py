@@ -0,0 +1,175 @@
+""" Min/max level-of-detail pyramid for curves with sorted x values.
+
+NumPy reference implementation of IronPlot.MinMaxPyramid, used by
+Curve.FilterMinMax. Level 0 holds the indices of the minimum and maximum y
+of each block of BLOCKSIZE points and each level above merges pairs of nodes.
+Decimating an x range to pixel columns keeps the first, minimum, maximum and
+last point of each column, which draws exactly like the full-resolution line,
+and visits only O(columns * log n) nodes.
+"""
+import numpy as np
+from ironplot_arrays import asdoublearray
+
+BLOCKSIZE = 8
+
+
+class MinMaxPyramid(object):
+    """ MinMaxPyramid(x, y): x must be sorted ascending. NaN values of y are ignored.
+    levels, if given, are the levels of a pyramid previously built for the same x and y
+    (as saved by ironplot_cache), which are used instead of building them again.
+    """
+
+    def __init__(self, x, y, levels=None):
+        self.x = asdoublearray(x, 1)
+        self.y = asdoublearray(y, 1)
+        if len(self.x) != len(self.y):
+            raise ValueError('Component vectors\' lengths must be equal')
+        if levels is not None:
+            self.levels = list(levels)
+        else:
+            self.levels = []
+            self._build()
+
+    def __len__(self):
+        return len(self.x)
+
+    def _values(self, indices):
+        """ y values at indices, and whether each is valid (index not -1 and value not NaN).
+        """
+        values = self.y[np.maximum(indices, 0)]
+        return values, (indices >= 0) & ~np.isnan(values)
+
+    def _merge(self, minIndex, maxIndex, candidateMin, candidateMax, mask=None):
+        """ Update minIndex and maxIndex in place with candidates that are strictly better.
+        """
+        current, currentValid = self._values(minIndex)
+        candidate, candidateValid = self._values(candidateMin)
+        betterMin = candidateValid & (~currentValid | (candidate < current))
+        current, currentValid = self._values(maxIndex)
+        candidate, candidateValid = self._values(candidateMax)
+        betterMax = candidateValid & (~currentValid | (candidate > current))
+        if mask is not None:
+            betterMin &= mask
+            betterMax &= mask
+        minIndex[betterMin] = candidateMin[betterMin]
+        maxIndex[betterMax] = candidateMax[betterMax]
+
+    def _build(self):
+        nodes = len(self.y) // BLOCKSIZE
+        if nodes == 0:
+            return
+        blocks = self.y[:nodes * BLOCKSIZE].reshape(nodes, BLOCKSIZE)
+        nans = np.isnan(blocks)
+        allNaN = nans.all(axis=1)
+        base = np.arange(nodes) * BLOCKSIZE
+        minIndex = base + np.argmin(np.where(nans, np.inf, blocks), axis=1)
+        maxIndex = base + np.argmax(np.where(nans, -np.inf, blocks), axis=1)
+        minIndex[allNaN] = -1
+        maxIndex[allNaN] = -1
+        self.levels.append((minIndex, maxIndex))
+        while nodes > 1:
+            nodes //= 2
+            belowMin, belowMax = self.levels[-1]
+            minIndex = belowMin[0:2 * nodes:2].copy()
+            maxIndex = belowMax[0:2 * nodes:2].copy()
+            self._merge(minIndex, maxIndex, belowMin[1:2 * nodes:2], belowMax[1:2 * nodes:2])
+            self.levels.append((minIndex, maxIndex))
+
+    def minmax(self, starts, ends):
+        """ Indices of the minimum and maximum y over each index range [starts[i], ends[i]).
+        Both are -1 for empty or all-NaN ranges.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        minIndex = np.full(starts.shape, -1, dtype=np.int64)
+        maxIndex = np.full(starts.shape, -1, dtype=np.int64)
+        lo = np.minimum(ends, (starts + BLOCKSIZE - 1) // BLOCKSIZE * BLOCKSIZE)
+        hi = np.maximum(lo, ends // BLOCKSIZE * BLOCKSIZE)
+        # Points up to the first block boundary and after the last one:
+        offsets = np.arange(BLOCKSIZE - 1)
+        rows = np.arange(len(starts))
+        for first, last in ((starts, lo), (hi, ends)):
+            candidates = first[:, None] + offsets
+            candidates = np.where(candidates < last[:, None], candidates, -1)
+            values, valid = self._values(candidates)
+            candidateMin = candidates[rows, np.argmin(np.where(valid, values, np.inf), axis=1)]
+            candidateMax = candidates[rows, np.argmax(np.where(valid, values, -np.inf), axis=1)]
+            self._merge(minIndex, maxIndex, candidateMin, candidateMax)
+        # Whole blocks, climbing the levels:
+        lo //= BLOCKSIZE
+        hi //= BLOCKSIZE
+        for levelMin, levelMax in self.levels:
+            active = lo < hi
+            if not active.any():
+                break
+            odd = active & (lo % 2 == 1)
+            node = np.where(odd, lo, 0)
+            self._merge(minIndex, maxIndex, levelMin[node], levelMax[node], odd)
+            lo += odd
+            odd = active & (hi % 2 == 1)
+            hi -= odd
+            node = np.where(odd, hi, 0)
+            self._merge(minIndex, maxIndex, levelMin[node], levelMax[node], odd)
+            lo //= 2
+            hi //= 2
+        return minIndex, maxIndex
+
+    def decimate(self, xstart, columnwidth, columns):
+        """ Ascending indices of the points to draw for x from xstart to xstart + columns * columnwidth,
+        with one pixel per column, plus the points either side of that range.
+        """
+        n = len(self.x)
+        edges = np.searchsorted(self.x, xstart + np.arange(columns + 1) * columnwidth, 'left')
+        starts, ends = edges[:-1], edges[1:]
+        counts = ends - starts
+        parts = [starts[:1] - 1, edges[-1:]]
+        # Columns with four points or fewer are drawn in full:
+        for k in range(4):
+            parts.append(starts[(counts > k) & (counts <= 4)] + k)
+        large = counts > 4
+        minIndex, maxIndex = self.minmax(starts[large], ends[large])
+        parts.extend([starts[large], ends[large] - 1, minIndex, maxIndex])
+        indices = np.unique(np.concatenate(parts))
+        return indices[(indices >= 0) & (indices < n)]
+
+    def decimateview(self, xmin, xmax, width):
+        """ Decimate the range xmin to xmax for a view width pixels wide.
+        Return the (x, y) values to draw.
+        """
+        columnwidth = (xmax - xmin) / float(width)
+        indices = self.decimate(xmin, columnwidth, int(width))
+        return self.x[indices], self.y[indices]
+
+
+def decimatefullscan(x, y, xstart, columnwidth, columns):
+    """ The same decimation as MinMaxPyramid.decimate, but computed by scanning every point in the range,
+    as FilterMinMax does on each cache miss. Used as a reference and benchmark baseline.
+    """
+    x = asdoublearray(x, 1)
+    y = asdoublearray(y, 1)
+    n = len(x)
+    edges = np.searchsorted(x, xstart + np.arange(columns + 1) * columnwidth, 'left')
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    parts = [starts[:1] - 1, edges[-1:]]
+    for k in range(4):
+        parts.append(starts[(counts > k) & (counts <= 4)] + k)
+    nonempty = np.nonzero(counts > 0)[0]
+    if len(nonempty):
+        values = y[starts[0]:ends[-1]]
+        position = np.arange(starts[0], ends[-1])
+        column = np.repeat(np.arange(columns), counts)
+        valid = ~np.isnan(values)
+        offsets = starts[nonempty] - starts[0]
+        minValues = np.full(columns, np.inf)
+        maxValues = np.full(columns, -np.inf)
+        minValues[nonempty] = np.minimum.reduceat(np.where(valid, values, np.inf), offsets)
+        maxValues[nonempty] = np.maximum.reduceat(np.where(valid, values, -np.inf), offsets)
+        large = (counts > 4)[column]
+        for isExtreme in (valid & large & (values == minValues[column]), valid & large & (values == maxValues[column])):
+            # First occurrence in each column:
+            first = np.unique(column[isExtreme], return_index=True)[1]
+            parts.append(position[isExtreme][first])
+        parts.extend([starts[counts > 4], ends[counts > 4] - 1])
+    indices = np.unique(np.concatenate(parts))
+    return indices[(indices >= 0) & (indices < n)]
@@ -9,23 +9,25 @@ clr.AddReferenceToFile("IronPlot.dll")
 import System.Windows.Forms.DataVisualization as dv
 import System.Drawing as dr
 import System
-import numpy as np
 from System.Windows import Thickness, Visibility
 from IronPlot import *
-from IronPlot.Plotting3D import Plot3D
+from ironplot_arrays import todoublebuffer
 
 floatarray = System.Array[float]
-
-numpyAvailable = True
-try:
-    import numpy as np
-except ImportError:
-    numpyAvailable = False
+# Custom property of radial series holding their number of angular bins, for radialappend:
+binsProperty = "IronPlotAngularBins"
     
     
-def radial(theta, r, **kwargs):
+def radial(theta, r, bins=None, **kwargs):
    """ Create a radial plot (or overwite current plot if hold is set)
+   theta (degrees) and r are bound to the chart in one call, not point by point.
+   Long traces are first decimated to screen resolution: the circle is divided into bins angular bins
+   (by default one per pixel of circumference) and of each run of points in one bin only the first, last,
+   least and greatest radius points are kept. bins = 0 keeps every point.
+   Further revolutions can be added with radialappend.
    """
+   theta = todoublebuffer(theta, 1)
+   r = todoublebuffer(r, 1)
    if len(theta) != len(r):
       raise ValueError('Arrays must be of the same length.')
    if PlotContext.CurrentWindowIndex == None:
@@ -39,12 +41,28 @@ def radial(theta, r, **kwargs):
       PlotContext.AddPlot(host)
    else:
       # Add to current plot
-	  chart = PlotContext.CurrentPlot.Chart
+      chart = PlotContext.CurrentPlot.Chart
+   if bins is None:
+      bins = PolarSeries.ScreenBins(chart)
    seriesName = "Series" + str(chart.Series.Count)
    series = dv.Charting.Series(ChartType = dv.Charting.SeriesChartType.Polar, Name = seriesName)
+   series[binsProperty] = str(bins)
    chart.Series.Add(series)
-   for a, b in zip(theta, r):
-      chart.Series[seriesName].Points.AddXY(float(a), float(b))
+   PolarSeries.Bind(series, theta, r, bins)
    # Apply kwargs
    setprops(series, **kwargs)
-   return series
\ No newline at end of file
+   return series
+
+
+def radialappend(series, theta, r, bins=None):
+   """ Append points (e.g. a new revolution) to a series made by radial, without rebinding the points
+   already there. The new points are decimated as for radial, with the same number of bins unless given.
+   Can be called from any thread.
+   """
+   theta = todoublebuffer(theta, 1)
+   r = todoublebuffer(r, 1)
+   if len(theta) != len(r):
+      raise ValueError('Arrays must be of the same length.')
+   if bins is None:
+      bins = int(series[binsProperty] or 0)
+   dispatch(lambda: PolarSeries.Append(series, theta, r, bins))
@@ -0,0 +1,647 @@
+""" Out-of-process plotting: a plot server fed through shared memory.
+
+A PlotServer runs in its own process, owns the plots and their windows (PlotContext
+and the UI thread started by ironplot_windows) and runs the plot commands that client
+scripts send it over a local socket. A crash or a long computation in a client does
+not take the plots down or stall their rendering, and clients can be plain CPython
+with NumPy.
+Commands are small JSON messages; arrays are not sent through the socket or pickled.
+A client puts each array in named shared memory and sends only its name, offset, dtype,
+shape and strides. Arrays made with PlotClient.sharedarray already live in shared
+memory and are read by the server in place, without any copy; other
+arrays are copied once into a scratch segment of the client, and the server takes its
+own copy, since the scratch segment is reused by the next command.
+Objects that cannot be sent back (plots, curves, axes) stay in the server and are
+returned as RemoteObject handles, whose properties and methods are used as if local:
+    client = connect()
+    curve = client.plot(x, y, '-r')
+    curve.Title = 'Signal'
+    client.append(curve, xnew, ynew)
+Each client has its own connection and server thread, so several producers can update
+plots concurrently; their commands are run one at a time on the UI thread. Handles are
+shared by all clients until released.
+The server only listens on the loopback interface, and only serves clients that send the token it
+makes for each session, which it writes to a file that only the user can read (see tokenpath);
+connect reads it from there. Clients can only reach objects of the types of the plotting library
+(HANDLEMODULES), and only their public attributes.
+localserver() starts a stand-in in the calling process, with the headless backend
+(ironplot_headless), so that clients can be tested without a display or .NET.
+Run this module as a script to start a server:
+    ipy ironplot_server.py [--port PORT] [--headless]
+This module does not use .NET, so that it can be imported by clients under CPython.
+"""
+from __future__ import print_function
+import binascii
+import itertools
+import json
+import mmap
+import os
+import re
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import array as pyarray
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+numpyAvailable = True
+try:
+    import numpy as np
+except ImportError:
+    numpyAvailable = False
+
+DEFAULTPORT = 50410
+# Commands a server accepts, if present in its backend:
+COMMANDS = ('plot', 'plot_many', 'scatter', 'append', 'interpolate', 'nearest', 'select', 'image', 'plot3d',
+            'xlabel', 'ylabel', 'title', 'equalaxes', 'window', 'currentplot', 'tab', 'hold', 'subplot', 'linkaxes',
+            'figure', 'savefig', 'close', 'profiling', 'stats', 'savetrace')
+# Array offsets in shared memory are aligned to this many bytes:
+ALIGNMENT = 64
+MINSCRATCHBYTES = 1 << 20
+# Without NumPy, 1D arrays of these dtypes are read into array.array:
+TYPECODES = {'f8': 'd', 'f4': 'f', 'i4': 'i', 'u4': 'I', 'i2': 'h', 'u2': 'H', 'i1': 'b', 'u1': 'B'}
+# On POSIX, shared memory segments are files in this directory:
+SHAREDDIRECTORY = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+LENGTH = struct.Struct('>I')
+# Names of the shared memory segments made by clients (see PlotClient.newname):
+SEGMENTNAME = re.compile(r'^ironplot-\d+-[0-9a-f]+-\d+$')
+# Commands return handles only to objects of types defined in these modules (or namespaces):
+HANDLEMODULES = ('IronPlot', 'ironplot_headless')
+
+try:
+    scalartypes = (bool, int, long, float, basestring)
+    stringtypes = basestring
+except NameError:
+    scalartypes = (bool, int, float, str)
+    stringtypes = str
+
+
+class RemoteError(RuntimeError):
+    """ An exception raised by a command in the plot server.
+    """
+    pass
+
+
+class SharedSegment(object):
+    """ A block of named shared memory: created by its owner (a client) and opened by name in other processes.
+    On Windows it is a named file mapping; elsewhere a file in SHAREDDIRECTORY, removed when its owner closes it.
+    """
+
+    def __init__(self, name, size, create=False):
+        if not isinstance(name, stringtypes) or not SEGMENTNAME.match(name):
+            raise ValueError('Invalid shared memory segment name %r' % (name,))
+        self.name = name
+        self.size = size
+        self.owner = create
+        if os.name == 'nt':
+            self.buffer = mmap.mmap(-1, size, tagname=name)
+            return
+        directory = os.path.realpath(SHAREDDIRECTORY)
+        path = os.path.join(directory, name)
+        if os.path.dirname(os.path.realpath(path)) != directory:
+            raise ValueError('Shared memory segment %s is outside %s' % (name, SHAREDDIRECTORY))
+        flags = os.O_RDWR | getattr(os, 'O_NOFOLLOW', 0) | (os.O_CREAT | os.O_EXCL if create else 0)
+        descriptor = os.open(path, flags, 0o600)
+        try:
+            if create:
+                os.ftruncate(descriptor, size)
+            self.buffer = mmap.mmap(descriptor, size)
+        finally:
+            os.close(descriptor)
+
+    def ndarray(self, dtype, shape, offset=0, strides=None):
+        return np.ndarray(shape, dtype, buffer=self.buffer, offset=offset, strides=strides)
+
+    def address(self):
+        """ Address of the start of the segment in this process.
+        """
+        return np.frombuffer(self.buffer, np.uint8, 1).__array_interface__['data'][0]
+
+    def close(self):
+        try:
+            self.buffer.close()
+        except BufferError:
+            # Arrays still use the memory; it is unmapped when they are collected.
+            pass
+        if self.owner and os.name != 'nt':
+            try:
+                os.unlink(os.path.join(SHAREDDIRECTORY, self.name))
+            except OSError:
+                pass
+
+
+def sendmessage(connection, message):
+    data = json.dumps(message).encode('utf-8')
+    connection.sendall(LENGTH.pack(len(data)) + data)
+
+
+def receivebytes(connection, count):
+    chunks = []
+    while count > 0:
+        chunk = connection.recv(min(count, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        count -= len(chunk)
+    return b''.join(chunks)
+
+
+def receivemessage(connection):
+    """ The next message from connection, or None if it has been closed.
+    """
+    header = receivebytes(connection, LENGTH.size)
+    if header is None:
+        return None
+    data = receivebytes(connection, LENGTH.unpack(header)[0])
+    if data is None:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+def tokenpath(port):
+    """ The file holding the token of the server on port, in a directory of the user's home that only the user can read.
+    """
+    return os.path.join(os.path.expanduser('~'), '.ironplot', 'server-%d.token' % port)
+
+
+def writetoken(path, token):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    if os.path.exists(path):
+        os.unlink(path)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        os.write(descriptor, token.encode('ascii'))
+    finally:
+        os.close(descriptor)
+
+
+def readtoken(path):
+    with open(path, 'rb') as file:
+        return file.read().decode('ascii').strip()
+
+
+def sametoken(a, b):
+    """ Whether tokens a and b are equal, compared in a time that does not depend on where they differ.
+    """
+    if not isinstance(a, stringtypes) or len(a) != len(b):
+        return False
+    difference = 0
+    for x, y in zip(a, b):
+        difference |= ord(x) ^ ord(y)
+    return difference == 0
+
+
+def arrayextent(array):
+    """ The first and last + 1 addresses of the bytes of array.
+    """
+    start = end = array.__array_interface__['data'][0]
+    for length, stride in zip(array.shape, array.strides):
+        if length == 0:
+            return start, start
+        if stride < 0:
+            start += stride * (length - 1)
+        else:
+            end += stride * (length - 1)
+    return start, end + array.itemsize
+
+
+class RemoteObject(object):
+    """ An object that lives in the plot server: getting and setting its attributes and calling its
+    methods are commands sent to the server.
+    """
+
+    def __init__(self, client, handle, typename):
+        object.__setattr__(self, '_client', client)
+        object.__setattr__(self, '_handle', handle)
+        object.__setattr__(self, '_typename', typename)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self._client.request({'command': 'get', 'handle': self._handle, 'name': name}, self, name)
+
+    def __setattr__(self, name, value):
+        self._client.request({'command': 'set', 'handle': self._handle, 'name': name}, args=[value])
+
+    def __call__(self, *args, **kwargs):
+        return self._client.request({'command': 'invoke', 'handle': self._handle}, args=args, kwargs=kwargs)
+
+    def __repr__(self):
+        return '<remote %s %d>' % (self._typename, self._handle)
+
+
+class RemoteMethod(object):
+    def __init__(self, client, handle, name):
+        self.client = client
+        self.handle = handle
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return self.client.request({'command': 'method', 'handle': self.handle, 'name': self.name}, args=args, kwargs=kwargs)
+
+
+class PlotClient(object):
+    """ A connection to a plot server. Plot commands are its methods, e.g. client.plot(x, y, '-or'),
+    and return what the command returns in the server: numbers, strings and lists as they are,
+    other objects as RemoteObject handles.
+    A client may be shared by threads, but its commands are sent one at a time; give each producer
+    its own client to update plots concurrently.
+    """
+
+    def __init__(self, address=('127.0.0.1', DEFAULTPORT), token=None):
+        if token is None:
+            token = readtoken(tokenpath(address[1]))
+        self.connection = socket.create_connection(address)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sendmessage(self.connection, {'command': 'hello', 'token': token})
+        reply = receivemessage(self.connection)
+        if reply is None or 'error' in reply:
+            self.connection.close()
+            raise RemoteError(reply['error'] if reply else 'Plot server closed the connection')
+        self.lock = threading.Lock()
+        self.prefix = 'ironplot-%d-%x-' % (os.getpid(), id(self))
+        self.counter = itertools.count()
+        self.shared = []
+        self.scratch = None
+        self.scratchused = 0
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def call(self, name, *args, **kwargs):
+        """ Run the server's command name with args and kwargs and return its result.
+        """
+        return self.request({'command': 'call', 'name': name}, args=args, kwargs=kwargs)
+
+    def release(self, remote):
+        """ Let the server forget the object of a RemoteObject handle.
+        """
+        self.request({'command': 'release', 'handle': remote._handle})
+
+    def sharedarray(self, shape, dtype='float64'):
+        """ A zero-filled NumPy array in shared memory, which commands read in place, without copying.
+        Reuse it for the data of later commands rather than making a new one for each.
+        """
+        dtype = np.dtype(dtype)
+        count = 1
+        for length in (shape if isinstance(shape, tuple) else (shape,)):
+            count *= length
+        segment = SharedSegment(self.newname(), max(count * dtype.itemsize, 1), create=True)
+        self.shared.append((segment, segment.address()))
+        return segment.ndarray(dtype, shape)
+
+    def newname(self):
+        return self.prefix + str(next(self.counter))
+
+    def sharedreference(self, array):
+        """ The segment and offset of array if it lies within a segment made by sharedarray, else None.
+        """
+        start, end = arrayextent(array)
+        for segment, address in self.shared:
+            if address <= start and end <= address + segment.size:
+                return segment, array.__array_interface__['data'][0] - address
+        return None
+
+    def scratchcopy(self, array):
+        """ Copy array into the next free space of the scratch segment and return the segment and offset.
+        """
+        offset = -(-self.scratchused // ALIGNMENT) * ALIGNMENT
+        self.scratch.ndarray(array.dtype, array.shape, offset)[...] = array
+        self.scratchused = offset + array.nbytes
+        return self.scratch, offset
+
+    def scratchsize(self, values):
+        """ Bytes of scratch space needed by the arrays of values that are not in shared memory.
+        """
+        total = 0
+        for value in values:
+            if isinstance(value, (list, tuple)):
+                total += self.scratchsize(value)
+            elif isinstance(value, dict):
+                total += self.scratchsize(value.values())
+            elif numpyAvailable and isinstance(value, np.ndarray) and value.dtype.kind in 'biufM':
+                if self.sharedreference(value) is None:
+                    total += -(-value.nbytes // ALIGNMENT) * ALIGNMENT
+        return total
+
+    def encode(self, value):
+        if isinstance(value, RemoteObject):
+            return {'__handle__': value._handle}
+        if isinstance(value, (list, tuple)):
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            return dict((key, self.encode(item)) for key, item in value.items())
+        if numpyAvailable and isinstance(value, np.generic):
+            return value.item()
+        if numpyAvailable and isinstance(value, np.ndarray):
+            if value.dtype.kind not in 'biufM':
+                return value.tolist()
+            reference = self.sharedreference(value)
+            copy = reference is None
+            if copy:
+                reference = self.scratchcopy(value)
+            segment, offset = reference
+            return {'__array__': {'segment': segment.name, 'size': segment.size, 'offset': offset, 'copy': copy,
+                                  'dtype': value.dtype.str, 'shape': list(value.shape),
+                                  'strides': None if copy else list(value.strides)}}
+        if isinstance(value, pyarray.array):
+            return value.tolist()
+        return value
+
+    def decode(self, value, parent=None, name=None):
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if isinstance(value, dict):
+            if '__handle__' in value:
+                return RemoteObject(self, value['__handle__'], value['type'])
+            if '__callable__' in value:
+                return RemoteMethod(self, parent._handle, name)
+            if '__dict__' in value:
+                return dict((self.decode(key), self.decode(item)) for key, item in value['__dict__'])
+        return value
+
+    def request(self, message, parent=None, name=None, args=(), kwargs=None):
+        with self.lock:
+            # The scratch segment is made big enough for all the arrays of the command before any is copied.
+            needed = self.scratchsize(list(args) + list((kwargs or {}).values()))
+            if needed and (self.scratch is None or needed > self.scratch.size):
+                if self.scratch is not None:
+                    self.scratch.close()
+                self.scratch = SharedSegment(self.newname(), max(MINSCRATCHBYTES, 2 * needed), create=True)
+            self.scratchused = 0
+            message['args'] = self.encode(list(args))
+            message['kwargs'] = self.encode(kwargs or {})
+            sendmessage(self.connection, message)
+            reply = receivemessage(self.connection)
+        if reply is None:
+            raise RemoteError('Plot server closed the connection')
+        if 'error' in reply:
+            raise RemoteError(reply['error'])
+        return self.decode(reply['result'], parent, name)
+
+    def close(self):
+        self.connection.close()
+        for segment, address in self.shared:
+            segment.close()
+        self.shared = []
+        if self.scratch is not None:
+            self.scratch.close()
+            self.scratch = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def connect(address=('127.0.0.1', DEFAULTPORT), token=None):
+    """ Connect to a plot server (by default, on this machine at DEFAULTPORT) and return a PlotClient.
+    token is that of the server, by default read from its token file (see tokenpath).
+    """
+    return PlotClient(address, token)
+
+
+def lockexecutor():
+    """ An executor that runs commands one at a time on the calling thread.
+    """
+    lock = threading.Lock()
+
+    def execute(function):
+        with lock:
+            return function()
+    return execute
+
+
+def dispatchexecutor(dispatch):
+    """ An executor that runs commands on the UI thread, with a blocking dispatch function as that of
+    ironplot_windows (which does not return the function's result).
+    """
+    def execute(function):
+        outcome = {}
+
+        def run():
+            try:
+                outcome['result'] = function()
+            except Exception as e:
+                outcome['error'] = e
+        dispatch(run)
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+    return execute
+
+
+class CommandHandler(socketserver.BaseRequestHandler):
+    """ Runs the commands of one client connection.
+    """
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.segments = {}
+
+    def handle(self):
+        # Nothing is run for a client until it has sent the token of the session:
+        message = receivemessage(self.request)
+        if message is None:
+            return
+        if not (isinstance(message, dict) and message.get('command') == 'hello'
+                and sametoken(message.get('token'), self.server.token)):
+            sendmessage(self.request, {'error': 'PermissionError: Invalid plot server token'})
+            return
+        sendmessage(self.request, {'result': None})
+        while True:
+            message = receivemessage(self.request)
+            if message is None:
+                return
+            try:
+                reply = {'result': self.server.run(message, self.decode)}
+            except Exception as e:
+                reply = {'error': '%s: %s' % (type(e).__name__, e)}
+            sendmessage(self.request, reply)
+
+    def finish(self):
+        for segment in self.segments.values():
+            segment.close()
+
+    def segment(self, name, size):
+        segment = self.segments.get(name)
+        if segment is None or segment.size != size:
+            segment = self.segments[name] = SharedSegment(name, size)
+        return segment
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if '__handle__' in value:
+            return self.server.resolve(value['__handle__'])
+        if '__array__' in value:
+            return self.decodearray(value['__array__'])
+        return dict((str(key), self.decode(item)) for key, item in value.items())
+
+    def decodearray(self, spec):
+        segment = self.segment(spec['segment'], spec['size'])
+        dtype, shape = spec['dtype'], tuple(spec['shape'])
+        strides = tuple(spec['strides']) if spec['strides'] is not None else None
+        if numpyAvailable:
+            array = segment.ndarray(dtype, shape, spec['offset'], strides)
+            return array.copy() if spec['copy'] else array
+        if len(shape) != 1 or (strides is not None and strides[0] != int(dtype[2:])) or dtype[1:] not in TYPECODES:
+            raise TypeError('Arrays of dtype %s and shape %s need NumPy in the plot server' % (dtype, shape))
+        result = pyarray.array(TYPECODES[dtype[1:]])
+        data = segment.buffer[spec['offset']:spec['offset'] + shape[0] * result.itemsize]
+        if hasattr(result, 'frombytes'):
+            result.frombytes(data)
+        else:
+            result.fromstring(data)
+        return result
+
+
+class PlotServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """ Serves plot commands to clients on a local socket, one thread per client.
+    commands maps command names to functions; execute(function) runs a command (on the UI thread,
+    for interactive plots) and returns its result. Clients must first send token, by default a new
+    random one that is written to tokenpath(port) until the server is closed.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, commands, execute, port=DEFAULTPORT, token=None):
+        socketserver.TCPServer.__init__(self, ('127.0.0.1', port), CommandHandler)
+        self.commands = commands
+        self.execute = execute
+        self.objects = {}
+        self.handles = itertools.count(1)
+        self.objectslock = threading.Lock()
+        self.tokenfile = None
+        if token is None:
+            token = binascii.hexlify(os.urandom(16)).decode('ascii')
+            self.tokenfile = tokenpath(self.server_address[1])
+            writetoken(self.tokenfile, token)
+        self.token = token
+
+    @property
+    def address(self):
+        return self.server_address
+
+    def resolve(self, handle):
+        with self.objectslock:
+            if handle not in self.objects:
+                raise KeyError('No object with handle %d (it may have been released)' % handle)
+            return self.objects[handle]
+
+    def run(self, message, decode):
+        command = message['command']
+        args = decode(message['args'])
+        kwargs = decode(message['kwargs'])
+        if command == 'call':
+            if message['name'] not in self.commands:
+                raise NameError('Plot server has no command %s' % message['name'])
+            function = self.commands[message['name']]
+            return self.encode(self.execute(lambda: function(*args, **kwargs)))
+        if command == 'release':
+            with self.objectslock:
+                self.objects.pop(message['handle'], None)
+            return None
+        target = self.resolve(message['handle'])
+        name = message.get('name', '')
+        if command != 'invoke' and (not isinstance(name, stringtypes) or name.startswith('_')):
+            raise AttributeError('Plot server objects have no public attribute %r' % (name,))
+        if command == 'get':
+            value = self.execute(lambda: getattr(target, name))
+            return {'__callable__': True} if callable(value) and not isinstance(value, type) else self.encode(value)
+        if command == 'set':
+            return self.execute(lambda: setattr(target, name, args[0]))
+        if command == 'method':
+            return self.encode(self.execute(lambda: getattr(target, name)(*args, **kwargs)))
+        if command == 'invoke':
+            return self.encode(self.execute(lambda: target(*args, **kwargs)))
+        raise ValueError('Unknown plot server command %s' % command)
+
+    def encode(self, value):
+        """ value as JSON: numbers, strings, lists and dictionaries as they are, objects of the plotting library
+        (see HANDLEMODULES) as handles.
+        """
+        if value is None or isinstance(value, scalartypes):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            return {'__dict__': [[self.encode(key), self.encode(item)] for key, item in value.items()]}
+        if numpyAvailable and isinstance(value, (np.ndarray, np.generic)) and value.dtype.kind in 'biuf':
+            return value.tolist()
+        module = getattr(type(value), '__module__', None) or ''
+        if not any(module == allowed or module.startswith(allowed + '.') for allowed in HANDLEMODULES):
+            raise TypeError('Plot server does not return objects of type %s' % type(value).__name__)
+        with self.objectslock:
+            handle = next(self.handles)
+            self.objects[handle] = value
+        return {'__handle__': handle, 'type': type(value).__name__}
+
+    def start(self):
+        """ Serve clients on a background thread.
+        """
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def server_close(self):
+        socketserver.TCPServer.server_close(self)
+        if self.tokenfile is not None:
+            try:
+                os.unlink(self.tokenfile)
+            except OSError:
+                pass
+            self.tokenfile = None
+
+
+def backendcommands(backend):
+    return dict((name, getattr(backend, name)) for name in COMMANDS if hasattr(backend, name))
+
+
+def localserver(port=0):
+    """ Start a stand-in plot server on a background thread of this process, rendering with the
+    headless backend (see ironplot_headless); port 0 picks a free port. Returns the PlotServer:
+    connect(server.address) to use it, server.stop() to stop it.
+    """
+    import ironplot_headless
+    return PlotServer(backendcommands(ironplot_headless), lockexecutor(), port).start()
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve plot commands from other processes.')
+    parser.add_argument('--port', type=int, default=DEFAULTPORT)
+    parser.add_argument('--headless', action='store_true', help='render with the headless backend')
+    options = parser.parse_args(argv)
+    if options.headless:
+        os.environ['IRONPLOT_BACKEND'] = 'headless'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ironplot
+    execute = dispatchexecutor(ironplot.dispatch) if hasattr(ironplot, 'dispatch') else lockexecutor()
+    server = PlotServer(backendcommands(ironplot), execute, options.port)
+    print('Serving plots on %s:%d' % server.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
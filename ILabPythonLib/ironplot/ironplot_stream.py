@@ -0,0 +1,75 @@
+""" Batching of streamed data for live curves.
+
+A source such as a generator typically produces many small chunks of data.
+Feeding each one to Plot2DCurve.Append would cost a dispatcher call and a redraw
+per chunk, so chunks are instead joined into one pair of arrays per time
+interval. Each redraw then costs a single Append of the new points, whatever
+the rate of the source.
+"""
+import time
+from ironplot_arrays import numpyAvailable, isarraylike, asdoublearray
+
+if numpyAvailable:
+    import numpy as np
+
+
+def aschunk(data):
+    """ Return data (a number or array-like) as a 1D float64 array
+    (a list of floats without NumPy).
+    """
+    if not isarraylike(data):
+        data = [data]
+    if numpyAvailable:
+        return asdoublearray(data, 1)
+    return [float(value) for value in data]
+
+
+def joinchunks(chunks):
+    """ Join a list of chunks made by aschunk into one.
+    """
+    if numpyAvailable:
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    joined = []
+    for chunk in chunks:
+        joined.extend(chunk)
+    return joined
+
+
+def batches(source, interval=0.05, clock=time.time):
+    """ Iterate over the (x, y) pairs of source, where x and y are numbers or arrays of the same length,
+    and yield them joined into one (x, y) pair of arrays for every interval seconds, followed by
+    any remainder when source is exhausted.
+    The interval is checked as each pair arrives, so a source that stalls also delays its last batch.
+    """
+    xs, ys = [], []
+    # Single points are collected in lists and converted together.
+    xPoints, yPoints = [], []
+    last = clock()
+    for x, y in source:
+        if isarraylike(x) or isarraylike(y):
+            if xPoints:
+                xs.append(aschunk(xPoints))
+                ys.append(aschunk(yPoints))
+                xPoints, yPoints = [], []
+            x, y = aschunk(x), aschunk(y)
+            if len(x) != len(y):
+                raise ValueError('Component vectors\' lengths must be equal')
+            xs.append(x)
+            ys.append(y)
+        else:
+            xPoints.append(x)
+            yPoints.append(y)
+        now = clock()
+        if now - last >= interval:
+            if xPoints:
+                xs.append(aschunk(xPoints))
+                ys.append(aschunk(yPoints))
+                xPoints, yPoints = [], []
+            yield joinchunks(xs), joinchunks(ys)
+            xs, ys = [], []
+            last = now
+    if xPoints:
+        xs.append(aschunk(xPoints))
+        ys.append(aschunk(yPoints))
+    if xs:
+        yield joinchunks(xs), joinchunks(ys)
@@ -0,0 +1,218 @@
+""" Error-bounded decimation of surfaces on regular grids.
+
+NumPy reference implementation of IronPlot.Plotting3D.SurfaceDecimation, used by
+SurfaceModel3D for large grids. The grid is covered by a quadtree of nodes
+(squares of 2^k cells aligned to multiples of 2^k, clipped at the edges of the
+grid); a node becomes a leaf once it can be drawn as two triangles to within
+the tolerance. A leaf's edges also take the corners of smaller neighbouring
+leaves that lie on them (so the mesh has no cracks or T-junctions), and the
+tolerance allows for this: the vertical error of every sample is at most
+tolerance. Errors are measured in grid index space, which is the vertical
+error for evenly spaced x and y.
+
+z is an array of shape (rows, columns): rows are v and columns u in SurfaceModel3D.
+Vertices are numbered by their flat index in z, row * columns + column.
+"""
+import numpy as np
+from ironplot_arrays import asdoublearray
+
+LEVELS = 17
+# Largest number of samples gathered at a time when measuring node errors:
+CHUNKSAMPLES = 1 << 22
+
+
+def nodeerrors(z, i0, j0, i1, j1, size):
+    """ Largest vertical error of the samples of each node, and of the samples on its boundary,
+    when the node is drawn as the two triangles (i0, j0), (i1, j0), (i1, j1) and (i1, j1), (i0, j1), (i0, j0).
+    """
+    steps = np.arange(size + 1)
+    interior = np.empty(len(i0))
+    boundary = np.empty(len(i0))
+    chunk = max(1, CHUNKSAMPLES // (size + 1) ** 2)
+    for start in range(0, len(i0), chunk):
+        part = slice(start, start + chunk)
+        a0, b0, a1, b1 = i0[part, None], j0[part, None], i1[part, None], j1[part, None]
+        # Indices beyond a clipped node repeat its last row or column:
+        u = np.minimum(a0 + steps, a1)
+        v = np.minimum(b0 + steps, b1)
+        samples = z[v[:, :, None], u[:, None, :]]
+        z1, z2, z3, z4 = [c[:, :, None] for c in (z[b0, a0], z[b0, a1], z[b1, a1], z[b1, a0])]
+        fu = ((u - a0) / (a1 - a0).astype(float))[:, None, :]
+        fv = ((v - b0) / (b1 - b0).astype(float))[:, :, None]
+        lower = z1 + fu * (z2 - z1) + fv * (z3 - z2)
+        upper = z1 + fv * (z4 - z1) + fu * (z3 - z4)
+        error = np.abs(samples - np.where(fu >= fv, lower, upper))
+        interior[part] = error.max(axis=(1, 2))
+        boundary[part] = np.maximum(np.maximum(error[:, 0, :].max(axis=1), error[:, -1, :].max(axis=1)),
+                                    np.maximum(error[:, :, 0].max(axis=1), error[:, :, -1].max(axis=1)))
+    return interior, boundary
+
+
+def leaves(z, tolerance):
+    """ (i0, j0, i1, j1) of the leaves of the quadtree for the given tolerance.
+    A node is a leaf if the error of its samples plus the error of its boundary samples is within tolerance:
+    boundary samples that become vertices (corners of neighbouring leaves) move the surface by at most the latter.
+    """
+    rows, columns = z.shape
+    size = 1
+    while size < max(rows, columns) - 1:
+        size *= 2
+    i0 = np.zeros(1, dtype=np.int64)
+    j0 = np.zeros(1, dtype=np.int64)
+    found = []
+    while len(i0):
+        i1 = np.minimum(i0 + size, columns - 1)
+        j1 = np.minimum(j0 + size, rows - 1)
+        if size == 1:
+            split = np.zeros(len(i0), dtype=bool)
+        else:
+            interior, boundary = nodeerrors(z, i0, j0, i1, j1, size)
+            # NaN errors split down to single cells:
+            split = ~(interior + boundary <= tolerance)
+        keep = ~split
+        found.append((i0[keep], j0[keep], i1[keep], j1[keep]))
+        size //= 2
+        children = [(i0[split] + di, j0[split] + dj, i1[split], j1[split]) for dj in (0, size) for di in (0, size)]
+        children = [(ci[(ci < ce) & (cj < cf)], cj[(ci < ce) & (cj < cf)]) for ci, cj, ce, cf in children]
+        i0 = np.concatenate([ci for ci, cj in children])
+        j0 = np.concatenate([cj for ci, cj in children])
+    return tuple(np.concatenate([leaf[k] for leaf in found]) for k in range(4))
+
+
+def chains(first, last, keys, lo, hi, reverse):
+    """ For each leaf, the vertex first, keys[lo:hi] (reversed if reverse) and the vertex last, concatenated.
+    Returns the flat array and the start of each leaf's chain within it.
+    """
+    inner = hi - lo
+    lengths = inner + 2
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    flat = np.empty(lengths.sum(), dtype=np.int64)
+    flat[starts] = first
+    flat[starts + lengths - 1] = last
+    owner = np.repeat(np.arange(len(inner)), inner)
+    offset = np.arange(inner.sum()) - np.repeat(np.cumsum(inner) - inner, inner)
+    source = np.where(reverse, hi[owner] - 1 - offset, lo[owner] + offset)
+    flat[starts[owner] + 1 + offset] = keys[source]
+    return flat, starts
+
+
+def fan(apex, flat, starts, pairs):
+    """ Triangles (apex, flat[k + 1], flat[k]) for k from each start to start + pairs - 1.
+    """
+    owner = np.repeat(np.arange(len(pairs)), pairs)
+    k = starts[owner] + np.arange(pairs.sum()) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+    return np.column_stack([apex[owner], flat[k + 1], flat[k]])
+
+
+def decimate(z, tolerance=0.0):
+    """ Decimated mesh of the surface z, with vertical error at most tolerance (0 gives every sample).
+    Returns (vertices, triangles): the flat indices in z of the vertices used, ascending,
+    and an array of shape (triangles, 3) of indices into vertices, wound as in SurfaceModel3D.
+    """
+    z = asdoublearray(z, 2)
+    rows, columns = z.shape
+    if rows < 2 or columns < 2:
+        raise ValueError('Surface must have at least two rows and two columns.')
+    i0, j0, i1, j1 = leaves(z, tolerance)
+    p1, p2, p3, p4 = j0 * columns + i0, j0 * columns + i1, j1 * columns + i1, j1 * columns + i0
+    vertices = np.unique(np.concatenate([p1, p2, p3, p4]))
+    # The same vertices ordered by column then row, for walking vertical edges:
+    byColumn = np.sort((vertices % columns) * rows + vertices // columns)
+    byColumnFlat = (byColumn % rows) * columns + byColumn // rows
+
+    def horizontal(row, a, b, first, last, reverse):
+        lo = np.searchsorted(vertices, row * columns + a, 'right')
+        hi = np.searchsorted(vertices, row * columns + b, 'left')
+        return chains(first, last, vertices, lo, hi, reverse)
+
+    def vertical(column, a, b, first, last, reverse):
+        lo = np.searchsorted(byColumn, column * rows + a, 'right')
+        hi = np.searchsorted(byColumn, column * rows + b, 'left')
+        return chains(first, last, byColumnFlat, lo, hi, reverse)
+
+    triangles = []
+    # Each leaf is two triangles split by the diagonal p1-p3; the vertices on their edges are fanned in.
+    for (chainA, startsA), (chainB, startsB), apex in [
+            (horizontal(j0, i0, i1, p1, p2, False), vertical(i1, j0, j1, p2, p3, False), p3),
+            (horizontal(j1, i0, i1, p3, p4, True), vertical(i0, j0, j1, p4, p1, True), p1)]:
+        lengthsA = np.diff(np.concatenate([startsA, [len(chainA)]]))
+        lengthsB = np.diff(np.concatenate([startsB, [len(chainB)]]))
+        triangles.append(fan(apex, chainA, startsA, lengthsA - 2))
+        triangles.append(fan(chainA[startsA + lengthsA - 2], chainB, startsB, lengthsB - 1))
+    triangles = np.concatenate(triangles)
+    return vertices, np.searchsorted(vertices, triangles)
+
+
+def maxerror(z, vertices, triangles):
+    """ Largest vertical error, over every sample of z, of a mesh returned by decimate.
+    inf if the triangles do not exactly cover the grid (an uncovered sample, or overlapping triangles).
+    """
+    z = asdoublearray(z, 2)
+    rows, columns = z.shape
+    corners = np.asarray(vertices)[np.asarray(triangles)]
+    u, v = (corners % columns).astype(float), (corners // columns).astype(float)
+    height = z.ravel()[corners]
+    area = (u[:, 1] - u[:, 0]) * (v[:, 2] - v[:, 0]) - (u[:, 2] - u[:, 0]) * (v[:, 1] - v[:, 0])
+    if np.any(area == 0) or not np.isclose(np.abs(area).sum() / 2, (rows - 1) * (columns - 1)):
+        return np.inf
+    umin, vmin = u.min(axis=1).astype(np.int64), v.min(axis=1).astype(np.int64)
+    widths = u.max(axis=1).astype(np.int64) - umin + 1
+    counts = widths * (v.max(axis=1).astype(np.int64) - vmin + 1)
+    covered = np.zeros(z.shape, dtype=bool)
+    worst = 0.0
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(corners):
+        stop = max(start + 1, np.searchsorted(ends, ends[start] - counts[start] + CHUNKSAMPLES, 'right'))
+        part = slice(start, stop)
+        n = counts[part]
+        owner = np.repeat(np.arange(start, stop), n)
+        offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        pu = umin[owner] + offset % widths[owner]
+        pv = vmin[owner] + offset // widths[owner]
+        weights = []
+        for a, b in ((1, 2), (2, 0), (0, 1)):
+            weights.append(((u[owner, a] - pu) * (v[owner, b] - pv) - (u[owner, b] - pu) * (v[owner, a] - pv))
+                           / area[owner])
+        inside = (weights[0] >= 0) & (weights[1] >= 0) & (weights[2] >= 0)
+        surface = sum(w * height[owner, k] for k, w in enumerate(weights))
+        error = np.abs(z[pv, pu] - surface)[inside]
+        if len(error):
+            worst = max(worst, error.max())
+        covered[pv[inside], pu[inside]] = True
+        start = stop
+    return worst if covered.all() else np.inf
+
+
+class SurfaceDecimation(object):
+    """ SurfaceDecimation(z, levels=LEVELS): decimated meshes of a surface for a range of tolerances.
+    Level k has tolerance (range of z) / 2^k, except the last, which has every sample.
+    Meshes are made when first asked for and kept.
+    """
+
+    def __init__(self, z, levels=LEVELS):
+        self.z = asdoublearray(z, 2)
+        finite = self.z[np.isfinite(self.z)]
+        self.range = float(finite.max() - finite.min()) if len(finite) else 0.0
+        self.levels = levels
+        self.meshes = {}
+
+    def tolerance(self, level):
+        return 0.0 if level >= self.levels - 1 else self.range * 0.5 ** level
+
+    def chooselevel(self, pixelsperunit, pixeltolerance=1.0):
+        """ The coarsest level whose vertical error is at most pixeltolerance screen pixels,
+        where a unit of z is pixelsperunit pixels on screen.
+        """
+        target = pixeltolerance / float(pixelsperunit)
+        level = 0
+        while level < self.levels - 1 and self.tolerance(level) > target:
+            level += 1
+        return level
+
+    def mesh(self, level):
+        """ (vertices, triangles) of a level, as for decimate.
+        """
+        if level not in self.meshes:
+            self.meshes[level] = decimate(self.z, self.tolerance(level))
+        return self.meshes[level]
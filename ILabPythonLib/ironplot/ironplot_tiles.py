@@ -0,0 +1,181 @@
+""" Tiled, multi-level colour index pyramids for images larger than memory.
+
+buildpyramid streams a 2D array (typically a numpy.memmap of a raw binary
+file) in strips of rows and writes the directory read by IronPlot.ImagePyramid:
+a header, pyramid.txt, and one file per level of little-endian uint16 colour
+map indices (level0.u16 is full resolution; each level above halves the width
+and height, rounding up, by averaging 2x2 blocks and ignoring NaNs). Levels are
+added until the whole image fits in one tile. Only one strip of the source is
+in memory at a time.
+The image is an array of shape (height, width); row 0 is at the bottom of the plot.
+TilePyramid reads a pyramid back, tile by tile, for headless use.
+"""
+import os
+import numpy as np
+from ironplot_arrays import asdoublearray
+from ironplot_colour import checknorm, quantise, lookuptable, tobgra32, colourmap
+
+HEADER = 'pyramid.txt'
+
+
+def openraw(path, shape, dtype='<f8', offset=0):
+    """ Read-only numpy.memmap of a raw binary image file of the given (height, width) shape and dtype.
+    """
+    return np.memmap(path, dtype=np.dtype(dtype), mode='r', offset=offset, shape=tuple(shape))
+
+
+def levelshapes(shape, tilesize):
+    """ (height, width) of each level of the pyramid for an image of the given shape.
+    """
+    height, width = shape
+    shapes = [(height, width)]
+    while max(height, width) > tilesize:
+        height, width = (height + 1) // 2, (width + 1) // 2
+        shapes.append((height, width))
+    return shapes
+
+
+def levelpath(directory, level):
+    return os.path.join(directory, 'level%d.u16' % level)
+
+
+def striplimits(data, norm, striprows):
+    """ As ironplot_colour.limits, a strip of rows at a time.
+    """
+    log = checknorm(norm)
+    lo, hi = np.inf, -np.inf
+    for start in range(0, data.shape[0], striprows):
+        strip = asdoublearray(data[start:start + striprows])
+        valid = np.isfinite(strip)
+        if log:
+            valid &= strip > 0
+        if valid.any():
+            values = strip[valid]
+            lo, hi = min(lo, values.min()), max(hi, values.max())
+    if lo > hi:
+        return (1.0, 10.0) if log else (0.0, 1.0)
+    return float(lo), float(hi)
+
+
+def reduce2(rows):
+    """ Means of the 2x2 blocks of rows (an even number of rows), ignoring NaNs.
+    An odd last column is averaged on its own.
+    """
+    height, width = rows.shape
+    if width % 2:
+        rows = np.concatenate([rows, np.full((height, 1), np.nan)], axis=1)
+    blocks = rows.reshape(height // 2, 2, -1, 2)
+    valid = ~np.isnan(blocks)
+    total = np.where(valid, blocks, 0.0).sum(axis=(1, 3))
+    count = valid.sum(axis=(1, 3))
+    with np.errstate(invalid='ignore'):
+        return total / count
+
+
+def buildpyramid(data, directory, tilesize=256, clim=None, norm='linear', ncolours=256, striprows=1024):
+    """ Write the index pyramid of the 2D array data to directory (which is created if necessary).
+    clim = (min, max) are the values mapped to the first and last colours (by default the limits of the data,
+    found in a first pass); norm is 'linear' or 'log'. Returns the (min, max) used.
+    """
+    if len(data.shape) != 2:
+        raise ValueError('Image must be 2 dimensional.')
+    if striprows < 2 or striprows % 2:
+        raise ValueError('striprows must be even.')
+    if clim is None:
+        clim = striplimits(data, norm, striprows)
+    clim = (float(clim[0]), float(clim[1]))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    shapes = levelshapes(data.shape, tilesize)
+    levels = [np.memmap(levelpath(directory, k), dtype='<u2', mode='w+', shape=shape) for k, shape in enumerate(shapes)]
+    written = [0] * len(levels)
+    # A row of each level waiting for its partner before it can be reduced:
+    pending = [None] * len(levels)
+
+    def push(k, rows):
+        levels[k][written[k]:written[k] + len(rows)] = quantise(rows, clim, norm, ncolours)
+        written[k] += len(rows)
+        if k + 1 == len(levels):
+            return
+        if pending[k] is not None:
+            rows = np.concatenate([pending[k], rows])
+            pending[k] = None
+        if len(rows) % 2:
+            pending[k] = rows[-1:]
+            rows = rows[:-1]
+        if len(rows):
+            push(k + 1, reduce2(rows))
+
+    for start in range(0, data.shape[0], striprows):
+        push(0, asdoublearray(data[start:start + striprows], 2))
+    for k in range(len(levels) - 1):
+        if pending[k] is not None:
+            # An odd last row is averaged on its own:
+            rows = np.concatenate([pending[k], np.full_like(pending[k], np.nan)])
+            pending[k] = None
+            push(k + 1, reduce2(rows))
+    for level in levels:
+        level.flush()
+    del levels
+    header = [('width', shapes[0][1]), ('height', shapes[0][0]), ('levels', len(shapes)), ('tilesize', tilesize),
+              ('ncolours', ncolours), ('min', repr(clim[0])), ('max', repr(clim[1])), ('norm', norm)]
+    with open(os.path.join(directory, HEADER), 'w') as f:
+        f.write(''.join('%s = %s\n' % item for item in header))
+    return clim
+
+
+class TilePyramid(object):
+    """ TilePyramid(directory): read access to a pyramid written by buildpyramid, as IronPlot.ImagePyramid.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        header = {}
+        with open(os.path.join(directory, HEADER)) as f:
+            for line in f:
+                if '=' in line:
+                    key, value = line.split('=', 1)
+                    header[key.strip()] = value.strip()
+        self.tilesize = int(header['tilesize'])
+        self.ncolours = int(header['ncolours'])
+        self.clim = (float(header['min']), float(header['max']))
+        self.norm = header.get('norm', 'linear')
+        shapes = levelshapes((int(header['height']), int(header['width'])), self.tilesize)
+        if len(shapes) != int(header['levels']):
+            raise ValueError('Pyramid header is inconsistent.')
+        self.levels = [np.memmap(levelpath(directory, k), dtype='<u2', mode='r', shape=shape)
+                       for k, shape in enumerate(shapes)]
+
+    def tiles(self, level):
+        """ Number of tiles (down, across) of a level.
+        """
+        height, width = self.levels[level].shape
+        return (-(-height // self.tilesize), -(-width // self.tilesize))
+
+    def chooselevel(self, pixelsperscreenpixel):
+        """ The coarsest level with at least one pixel per screen pixel, as ImagePyramid.ChooseLevel.
+        """
+        level = 0
+        while level < len(self.levels) - 1 and 2 ** (level + 1) <= pixelsperscreenpixel:
+            level += 1
+        return level
+
+    def tilesinview(self, level, x0, x1, y0, y1):
+        """ (tilex, tiley) of the tiles of a level that cover full-resolution pixel columns x0 to x1 and rows y0 to y1.
+        """
+        span = float(self.tilesize * 2 ** level)
+        down, across = self.tiles(level)
+        xs = range(max(0, int(np.floor(x0 / span))), min(across, int(np.ceil(x1 / span))))
+        ys = range(max(0, int(np.floor(y0 / span))), min(down, int(np.ceil(y1 / span))))
+        return [(tx, ty) for ty in ys for tx in xs]
+
+    def tile(self, level, tilex, tiley):
+        """ Colour map indices of a tile, shape (rows, columns); edge tiles may be smaller than tilesize.
+        """
+        size = self.tilesize
+        return np.array(self.levels[level][tiley * size:(tiley + 1) * size, tilex * size:(tilex + 1) * size])
+
+    def tilebgra32(self, level, tilex, tiley, maptype='jet'):
+        """ BGRA32 bytes of a tile, as TiledImage draws it.
+        """
+        return tobgra32(self.tile(level, tilex, tiley), lookuptable(colourmap(maptype, self.ncolours)))
@@ -1,4 +1,6 @@
 import clr
+import sys
+import traceback
 
 clr.AddReferenceByPartialName("PresentationCore")
 clr.AddReferenceByPartialName("PresentationFramework")
@@ -18,6 +20,7 @@ from System.Threading import *
 from System.Windows.Threading import *
 from IronPython.Runtime import PythonContext
 from IronPython.Compiler import CallTarget0
+from ironplot_dispatch import DispatchQueue, DEFAULTMAXPENDING
 
 def setprops(object, **kwargs):
    """ Set properties of specified object
@@ -62,13 +65,74 @@ if currentDispatcher is None:
 	else:
 		clr.SetCommandDispatcher(currentDispatcher)
 
+asyncqueue = None
+asyncconsole = False
+
 def DispatchConsoleCommand(consoleCommand):
     if consoleCommand:
-        dispatcher.Invoke(DispatcherPriority.Normal, consoleCommand)
+        if asyncconsole:
+            dispatchqueue().submit(consoleCommand).add_done_callback(reportconsoleerror)
+        else:
+            dispatcher.Invoke(DispatcherPriority.Normal, consoleCommand)
 	
+def reportconsoleerror(future):
+    """ Write the exception of a console command posted in asyncmode to the console, since no one waits for it.
+    """
+    error = future.exception()
+    if error is not None:
+        sys.stderr.write(''.join(traceback.format_exception_only(type(error), error)))
+
 def dispatch(function):
     dispatcher.Invoke(DispatcherPriority.Normal, CallTarget0(function))
 
+def post(function):
+    dispatcher.BeginInvoke(DispatcherPriority.Normal, CallTarget0(function))
+
+def ondispatcher(function):
+    """ Call function on the UI thread (at once, if called on it) and return its result.
+    If the console's commands were already sent to a UI thread before this module was imported, call it directly.
+    """
+    if currentDispatcher is not None or dispatcher.CheckAccess():
+        return function()
+    return dispatcher.Invoke(DispatcherPriority.Normal, CallTarget0(function))
+
+def dispatchqueue(maxpending=None):
+    """ The DispatchQueue of non-blocking calls to the UI thread (see ironplot_dispatch).
+    If maxpending is given, it becomes the bound of the queue.
+    """
+    global asyncqueue
+    if asyncqueue is None:
+        asyncqueue = DispatchQueue(post, maxpending or DEFAULTMAXPENDING)
+    elif maxpending:
+        asyncqueue.maxpending = maxpending
+    return asyncqueue
+
+def dispatchasync(function, key=None, block=True, timeout=None):
+    """ Run function on the UI thread without waiting for it: returns a DispatchFuture of its result,
+    which can also be awaited with asyncio.
+    Calls with the same key (e.g. the plot they update) are coalesced: a call still waiting is replaced by the newest.
+    If too many calls are waiting, block until there is room (or raise RuntimeError if block is False).
+    e.g. dispatchasync(lambda: setprops(curve, Title = status), key = curve)
+    """
+    return dispatchqueue().submit(function, key, block, timeout)
+
+def dispatchstats():
+    """ Queue depth, coalescing and latency counters of dispatchasync (see DispatchQueue.stats).
+    """
+    return dispatchqueue().stats()
+
+def asyncmode(*args):
+    """ Set to True to post console commands to the UI thread without waiting for them; False to wait.
+    The argument is taken as a truth value (e.g. 1 or 0). With no argument, return the current mode.
+    """
+    global asyncconsole
+    if len(args) > 1:
+        raise TypeError('asyncmode takes at most 1 argument (%d given)' % len(args))
+    if len(args) == 1:
+        asyncconsole = bool(args[0])
+    else:
+        return asyncconsole
+
 if currentDispatcher is None:
     clr.SetCommandDispatcher(DispatchConsoleCommand)
     
@@ -113,6 +113,11 @@ namespace IronPlot
         // PlotPanel object to which the axis belongs.
         internal PlotPanel PlotPanel;
 
+        /// <summary>
+        /// The group of axes whose range this axis shares, or null.
+        /// </summary>
+        public LinkedAxes LinkedAxes { get; internal set; }
+
         // Whether this is one of the innermost axes, or an additional axis.
         internal bool IsInnermost = false;
         internal double AxisThickness = 0;
@@ -157,13 +162,14 @@ namespace IronPlot
             }
             else if (axis2DLocal.AxisType == AxisType.Date)
             {
-               if (desiredRange.Min < Axis.minDate || desiredRange.Max >= Axis.maxDate)
+               if (!axis2DLocal.IsDateInRange(desiredRange.Min) || !axis2DLocal.IsDateInRange(desiredRange.Max))
                    axis2DLocal.SetValue(RangeProperty, e.OldValue); 
             }
             double length = Math.Abs(desiredRange.Length);
             if ((Math.Abs(desiredRange.Min) / length > 1e10) || (Math.Abs(desiredRange.Max) / length > 1e10)) axis2DLocal.SetValue(RangeProperty, e.OldValue);    
             axis2DLocal.DeriveTicks();
             if (axis2DLocal.PlotPanel != null) axis2DLocal.PlotPanel.InvalidateMeasure();
+            if (axis2DLocal.LinkedAxes != null) axis2DLocal.LinkedAxes.OnRangeChanged(axis2DLocal);
         }
 
         Binding axisBinding;
@@ -289,8 +295,10 @@ namespace IronPlot
         {
             // Make sure the labels are up to date
             if (!LabelsVisible) return;
+            RenderMark layoutStart = RenderProfiler.Start();
             TextBlock currentTextBlock;
             bool isFirstNewItem = true;
+            int changedLabels = 0;
             for (int i = 0; i < Ticks.Length; ++i)
             {
                 // Reuse the text blocks wherever possible (we do not want to keep adding and taking away TextBlocks
@@ -318,11 +326,14 @@ namespace IronPlot
                     AddTextToBlock(currentTextBlock, i);
                     currentTextBlock.Visibility = Visibility.Visible;
                     TickLabelCache[i].CacheKey = LabelText[i].Key;
+                    changedLabels++;
                 }
                 currentTextBlock.Measure(new Size(Double.PositiveInfinity, Double.PositiveInfinity));
             }
             axisLabel.Measure(new Size(Double.PositiveInfinity, Double.PositiveInfinity));
             SetToShowAllLabels();
+            // Points in and out are the labels and the labels whose text changed:
+            RenderProfiler.Stop(this, RenderStage.LabelLayout, layoutStart, Ticks.Length, changedLabels);
         }
 
         // Calculate thickness of axis (size in direction penpendicular to axis vector).
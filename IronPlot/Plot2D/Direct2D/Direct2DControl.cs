@@ -43,7 +43,7 @@ namespace IronPlot
 
         protected override void CreateDirectImage()
         {
-            directImage = new Direct2DImage();
+            directImage = new Direct2DImage() { ProfileOwner = this };
         }
 
         protected override void OnVisibleChanged_Visible()
@@ -12,6 +12,9 @@ namespace IronPlot
     {
         internal List<DirectPath> paths;
 
+        // The element this image draws for, to which its timings are attributed by the RenderProfiler.
+        internal object ProfileOwner;
+
         System.Windows.Threading.DispatcherTimer timer = new System.Windows.Threading.DispatcherTimer(); 
 
         public Direct2DImage()
@@ -39,6 +42,7 @@ namespace IronPlot
 
         protected override void Draw()
         {
+            RenderMark drawStart = RenderProfiler.Start();
             RenderTarget.BeginDraw();
             RenderTarget.Transform = Matrix3x2.Identity;
             Random random = new Random();
@@ -67,6 +71,7 @@ namespace IronPlot
             RenderTarget.EndDraw();
             graphicsDeviceService10.CopyTextureAcross();
             graphicsDeviceService10.Device.Flush();
+            RenderProfiler.Stop(ProfileOwner ?? this, RenderStage.Direct2DDraw, drawStart, paths.Count, -1);
         }
     }
 }
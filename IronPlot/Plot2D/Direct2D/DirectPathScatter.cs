@@ -28,21 +28,24 @@ namespace IronPlot
 
         public void RenderScatterGeometry(RenderTarget renderTarget)
         {
-            double[] x = curve.X;
-            double[] y = curve.Y;
-            int length = x.Length;
+            double[] x = curve.x;
+            double[] y = curve.y;
+            int length = curve.n;
             double xScale, xOffset, yScale, yOffset;
             xScale = graphToCanvas.Matrix.M11;
             xOffset = graphToCanvas.Matrix.OffsetX - this.xOffsetMarker;
             yScale = graphToCanvas.Matrix.M22;
             yOffset = graphToCanvas.Matrix.OffsetY - this.yOffsetMarker;
             bool[] include = curve.includeMarker;
+            int[] indices = curve.MarkerIndices(graphToCanvas.Matrix);
+            if (indices != null) length = indices.Length;
             StrokeStyleProperties properties = new StrokeStyleProperties();
             properties.LineJoin = LineJoin.MiterOrBevel;
             StrokeStyle strokeStyle = new StrokeStyle(renderTarget.Factory, properties);
-            for (int i = 0; i < length; ++i)
+            for (int j = 0; j < length; ++j)
             {
-                if (include[i])
+                int i = indices != null ? indices[j] : curve.start + j;
+                if (indices != null || include[i])
                 {
                     renderTarget.Transform = (Matrix3x2)Matrix.Translation((float)(x[i] * xScale + xOffset), (float)(y[i] * yScale + yOffset), 0);
                     renderTarget.FillGeometry(Geometry, FillBrush);
@@ -0,0 +1,107 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Diagnostic counter of the frames (arrange passes) of a plot, of how often curve geometry was moved
+    /// by a transform rather than rebuilt during pan and zoom gestures, and of the layout passes skipped
+    /// while the plot was dormant.
+    /// </summary>
+    public class FrameRateCounter
+    {
+        Queue<long> recentFrames = new Queue<long>();
+        long gestureStart = -1, gestureEnd;
+        int gestureFrames;
+
+        public long Frames { get; private set; }
+
+        /// <summary>
+        /// Frames of the last second.
+        /// </summary>
+        public double FramesPerSecond
+        {
+            get
+            {
+                DiscardOldFrames(Stopwatch.GetTimestamp());
+                return recentFrames.Count;
+            }
+        }
+
+        /// <summary>
+        /// Frames of the most recent completed pan or zoom gesture.
+        /// </summary>
+        public int LastGestureFrames { get; private set; }
+
+        /// <summary>
+        /// Frame rate over the most recent completed pan or zoom gesture.
+        /// </summary>
+        public double LastGestureFramesPerSecond { get; private set; }
+
+        /// <summary>
+        /// Number of times curve geometry was moved by a transform instead of being rebuilt.
+        /// </summary>
+        public long GeometriesMoved { get; private set; }
+
+        public long GeometriesRebuilt { get; private set; }
+
+        /// <summary>
+        /// Number of layout passes skipped because the plot was hidden or scrolled out of view.
+        /// </summary>
+        public long DormantFrames { get; private set; }
+
+        public void Reset()
+        {
+            recentFrames.Clear();
+            gestureStart = -1; gestureFrames = 0;
+            Frames = 0; LastGestureFrames = 0; LastGestureFramesPerSecond = 0;
+            GeometriesMoved = 0; GeometriesRebuilt = 0; DormantFrames = 0;
+        }
+
+        internal void Frame(bool interacting)
+        {
+            long now = Stopwatch.GetTimestamp();
+            Frames++;
+            recentFrames.Enqueue(now);
+            DiscardOldFrames(now);
+            if (!interacting) return;
+            if (gestureStart < 0) gestureStart = now;
+            gestureEnd = now;
+            gestureFrames++;
+        }
+
+        internal void GestureEnded()
+        {
+            if (gestureStart < 0) return;
+            LastGestureFrames = gestureFrames;
+            double seconds = (double)(gestureEnd - gestureStart) / Stopwatch.Frequency;
+            LastGestureFramesPerSecond = seconds > 0 ? (gestureFrames - 1) / seconds : 0;
+            gestureStart = -1; gestureFrames = 0;
+        }
+
+        internal void GeometryMoved()
+        {
+            GeometriesMoved++;
+        }
+
+        internal void GeometryRebuilt()
+        {
+            GeometriesRebuilt++;
+        }
+
+        internal void DormantFrame()
+        {
+            DormantFrames++;
+        }
+
+        private void DiscardOldFrames(long now)
+        {
+            while (recentFrames.Count > 0 && now - recentFrames.Peek() > Stopwatch.Frequency) recentFrames.Dequeue();
+        }
+    }
+}
@@ -27,9 +27,22 @@ namespace IronPlot
             StreamGeometry streamGeometry = new StreamGeometry();
             StreamGeometryContext context = streamGeometry.Open();
             int lines = 0;
-            for (int i = 0; i < curve.x.Length; ++i)
+            int[] indices = curve.decimatedIndices;
+            if (indices != null)
             {
-                if (i == 0)
+                for (int j = 0; j < indices.Length; ++j)
+                {
+                    int i = indices[j];
+                    if (j == 0) context.BeginFigure(new Point(tempX[i], tempY[i]), false, false);
+                    else context.LineTo(new Point(tempX[i], tempY[i]), true, false);
+                }
+                context.Close();
+                return streamGeometry;
+            }
+            int end = curve.start + curve.n;
+            for (int i = curve.start; i < end; ++i)
+            {
+                if (i == curve.start)
                 {
                     context.BeginFigure(new Point(tempX[i], tempY[i]), false, false);
                 }
@@ -46,6 +59,44 @@ namespace IronPlot
             return streamGeometry;
         }
 
+        /// <summary>
+        /// A single frozen geometry with a figure for each of the curves, so that they are drawn as one Path.
+        /// Points are written straight into the geometry, without intermediate arrays or segment objects.
+        /// </summary>
+        public static StreamGeometry StreamGeometryFromCurves(IEnumerable<Curve> curves, MatrixTransform graphToCanvas)
+        {
+            double xScale = graphToCanvas.Matrix.M11, xOffset = graphToCanvas.Matrix.OffsetX;
+            double yScale = graphToCanvas.Matrix.M22, yOffset = graphToCanvas.Matrix.OffsetY;
+            StreamGeometry streamGeometry = new StreamGeometry();
+            using (StreamGeometryContext context = streamGeometry.Open())
+            {
+                foreach (Curve curve in curves)
+                {
+                    if (curve.n == 0) continue;
+                    int[] indices = curve.decimatedIndices;
+                    int first = (indices != null && indices.Length > 0) ? indices[0] : curve.start;
+                    context.BeginFigure(new Point(curve.xTransformed[first] * xScale + xOffset, curve.yTransformed[first] * yScale + yOffset), false, false);
+                    if (indices != null)
+                    {
+                        for (int j = 1; j < indices.Length; ++j)
+                        {
+                            int i = indices[j];
+                            context.LineTo(new Point(curve.xTransformed[i] * xScale + xOffset, curve.yTransformed[i] * yScale + yOffset), true, false);
+                        }
+                    }
+                    else for (int i = first + 1; i < curve.start + curve.n; ++i)
+                    {
+                        if (curve.includeLinePoint[i])
+                        {
+                            context.LineTo(new Point(curve.xTransformed[i] * xScale + xOffset, curve.yTransformed[i] * yScale + yOffset), true, false);
+                        }
+                    }
+                }
+            }
+            streamGeometry.Freeze();
+            return streamGeometry;
+        }
+
         public static PathGeometry PathGeometryFromCurve(Curve curve, MatrixTransform graphToCanvas)
         {
             double xScale, xOffset, yScale, yOffset;
@@ -63,12 +114,25 @@ namespace IronPlot
             }
 
             PathGeometry pathGeometry = new PathGeometry();
+            if (curve.n == 0) return pathGeometry;
             PathFigure pathFigure = new PathFigure();
             LineSegment lineSegment;
-            double xCanvas = curve.xTransformed[0] * xScale + xOffset;
-            double yCanvas = curve.yTransformed[0] * yScale + yOffset;
+            int[] indices = curve.decimatedIndices;
+            int start = (indices != null && indices.Length > 0) ? indices[0] : curve.start;
+            double xCanvas = curve.xTransformed[start] * xScale + xOffset;
+            double yCanvas = curve.yTransformed[start] * yScale + yOffset;
             pathFigure.StartPoint = new Point(xCanvas, yCanvas);
-            for (int i = 1; i < curve.x.Length; ++i)
+            if (indices != null)
+            {
+                for (int j = 1; j < indices.Length; ++j)
+                {
+                    int i = indices[j];
+                    xCanvas = curve.xTransformed[i] * xScale + xOffset;
+                    yCanvas = curve.yTransformed[i] * yScale + yOffset;
+                    pathFigure.Segments.Add(new LineSegment(new Point(xCanvas, yCanvas), true));
+                }
+            }
+            else for (int i = start + 1; i < curve.start + curve.n; ++i)
             {
                 if (curve.includeLinePoint[i])
                 {
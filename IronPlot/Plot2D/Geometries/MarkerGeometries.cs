@@ -90,9 +90,12 @@ namespace IronPlot
             Geometry markerGeometry = LegendMarkerGeometry(markersType, markersSize);
             if (markerGeometry == null) return null;
             markerGeometry.Freeze();
-            for (int i = 0; i < curve.xTransformed.Length; ++i)
+            int[] indices = curve.MarkerIndices(graphToCanvas.Matrix);
+            int count = indices != null ? indices.Length : curve.n;
+            for (int j = 0; j < count; ++j)
             {
-                if (!curve.includeMarker[i]) continue;
+                int i = indices != null ? indices[j] : curve.start + j;
+                if (indices == null && !curve.includeMarker[i]) continue;
                 double xCanvas = curve.xTransformed[i] * xScale + xOffset;
                 double yCanvas = curve.yTransformed[i] * yScale + yOffset;
                 Geometry newMarker = markerGeometry.Clone();
@@ -0,0 +1,89 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Collections.ObjectModel;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// A group of axes, typically on different plots of a grid, that share one range: a pan or zoom of
+    /// any of them is applied to all. The plots of the group pan and zoom together, moving their curve
+    /// geometry during the gesture and rebuilding it in one layout pass when the view settles (see
+    /// PlotPanel.FastInteraction). An axis belongs to at most one group.
+    /// </summary>
+    public class LinkedAxes
+    {
+        List<Axis2D> axes = new List<Axis2D>();
+        bool updating = false;
+
+        public LinkedAxes()
+        {
+        }
+
+        public LinkedAxes(IEnumerable<Axis2D> axes)
+        {
+            foreach (Axis2D axis in axes) Add(axis);
+        }
+
+        public ReadOnlyCollection<Axis2D> Axes
+        {
+            get { return axes.AsReadOnly(); }
+        }
+
+        /// <summary>
+        /// Add axis to the group, removing it from any other group. It takes the range of the axes
+        /// already in the group.
+        /// </summary>
+        public void Add(Axis2D axis)
+        {
+            if (axis.LinkedAxes == this) return;
+            if (axis.LinkedAxes != null) axis.LinkedAxes.Remove(axis);
+            axes.Add(axis);
+            axis.LinkedAxes = this;
+            if (axes.Count > 1) axis.SetValue(Axis2D.RangeProperty, axes[0].GetValue(Axis2D.RangeProperty));
+        }
+
+        public void Remove(Axis2D axis)
+        {
+            if (axes.Remove(axis)) axis.LinkedAxes = null;
+        }
+
+        public void Clear()
+        {
+            foreach (Axis2D axis in axes) axis.LinkedAxes = null;
+            axes.Clear();
+        }
+
+        /// <summary>
+        /// Apply the range of source to the other axes of the group.
+        /// </summary>
+        internal void OnRangeChanged(Axis2D source)
+        {
+            if (updating) return;
+            updating = true;
+            try
+            {
+                object range = source.GetValue(Axis2D.RangeProperty);
+                foreach (Axis2D axis in axes)
+                {
+                    if (axis != source) axis.SetValue(Axis2D.RangeProperty, range);
+                }
+            }
+            finally
+            {
+                updating = false;
+            }
+        }
+
+        /// <summary>
+        /// The plot panels of the group's axes.
+        /// </summary>
+        internal IEnumerable<PlotPanel> PlotPanels
+        {
+            get { return axes.Where(t => t.PlotPanel != null).Select(t => t.PlotPanel).Distinct(); }
+        }
+    }
+}
@@ -58,6 +58,51 @@ namespace IronPlot
             get { return (bool)PlotPanel.GetValue(PlotPanel.UseDirect2DProperty); }
         }
 
+        /// <summary>
+        /// If true, curves are moved rather than redrawn while the plot is panned or zoomed, and are redrawn once the view settles.
+        /// </summary>
+        public bool FastInteraction
+        {
+            set
+            {
+                PlotPanel.SetValue(PlotPanel.FastInteractionProperty, value);
+            }
+            get { return (bool)PlotPanel.GetValue(PlotPanel.FastInteractionProperty); }
+        }
+
+        /// <summary>
+        /// Time in seconds without a pan or zoom after which the view is considered settled and curves are redrawn.
+        /// </summary>
+        public double InteractionSettleTime
+        {
+            set
+            {
+                PlotPanel.SetValue(PlotPanel.InteractionSettleTimeProperty, value);
+            }
+            get { return (double)PlotPanel.GetValue(PlotPanel.InteractionSettleTimeProperty); }
+        }
+
+        /// <summary>
+        /// If true, the plot is not laid out or drawn while it is hidden (e.g. on an unselected tab) or scrolled out of view,
+        /// and catches up when it is shown.
+        /// </summary>
+        public bool SleepWhenHidden
+        {
+            set
+            {
+                PlotPanel.SetValue(PlotPanel.SleepWhenHiddenProperty, value);
+            }
+            get { return (bool)PlotPanel.GetValue(PlotPanel.SleepWhenHiddenProperty); }
+        }
+
+        /// <summary>
+        /// Frame rate and geometry counts of the plot, for diagnosing interactive performance.
+        /// </summary>
+        public FrameRateCounter FrameRateCounter
+        {
+            get { return PlotPanel.FrameRateCounter; }
+        }
+
         public Axes2D Axes
         {
             get { return PlotPanel.Axes; }
@@ -165,6 +210,7 @@ namespace IronPlot
             {
                 DrawingVisual drawingVisual = new DrawingVisual();
                 DrawingContext drawingContext = drawingVisual.RenderOpen();
+                PlotPanel.Wake();
                 this.UpdateLayout();
                 VisualBrush sourceBrush = new VisualBrush(this);
                 double scale = dpi / 96.0;
@@ -218,6 +264,7 @@ namespace IronPlot
                 if (direct2D) UseDirect2D = false;
                 try
                 {
+                    PlotPanel.Wake();
                     UpdateLayout();
                     xpsWriter.Write(PlotPanel);
                     xpsDoc.Close();
@@ -283,6 +330,156 @@ namespace IronPlot
             return plot2DCurve;
         }
 
+        /// <summary>
+        /// Add many lines in one call: each row of ys is a line plotted against x (see Plot2DLines).
+        /// The lines are a single item, so the axes and layout are updated once for all of them.
+        /// </summary>
+        public Plot2DLines AddLines(double[] x, double[,] ys)
+        {
+            Plot2DLines plot2DLines = new Plot2DLines(x, ys);
+            this.Children.Add(plot2DLines);
+            return plot2DLines;
+        }
+
+        public Plot2DLines AddLines(double[] x, double[,] ys, string[] styles)
+        {
+            Plot2DLines plot2DLines = new Plot2DLines(x, ys) { Styles = styles };
+            this.Children.Add(plot2DLines);
+            return plot2DLines;
+        }
+
+        public Plot2DLines AddLines(object x, object ys)
+        {
+            Plot2DLines plot2DLines = new Plot2DLines(x, ys);
+            this.Children.Add(plot2DLines);
+            return plot2DLines;
+        }
+
+        public Plot2DLines AddLines(object x, object ys, string[] styles)
+        {
+            Plot2DLines plot2DLines = new Plot2DLines(x, ys) { Styles = styles };
+            this.Children.Add(plot2DLines);
+            return plot2DLines;
+        }
+
+        public Plot2DLines AddLines(object ys)
+        {
+            Plot2DLines plot2DLines = new Plot2DLines(ys);
+            this.Children.Add(plot2DLines);
+            return plot2DLines;
+        }
+
+        /// <summary>
+        /// Add a scatter plot drawn as a density image (see DensityScatter), for large numbers of points.
+        /// </summary>
+        public DensityScatter AddDensityScatter(double[] x, double[] y)
+        {
+            DensityScatter densityScatter = new DensityScatter(x, y);
+            this.Children.Add(densityScatter);
+            return densityScatter;
+        }
+
+        public DensityScatter AddDensityScatter(double[] x, double[] y, int[] categories)
+        {
+            DensityScatter densityScatter = new DensityScatter(x, y, categories);
+            this.Children.Add(densityScatter);
+            return densityScatter;
+        }
+
+        public DensityScatter AddDensityScatter(object x, object y)
+        {
+            DensityScatter densityScatter = new DensityScatter(x, y);
+            this.Children.Add(densityScatter);
+            return densityScatter;
+        }
+
+        public DensityScatter AddDensityScatter(object x, object y, object categories)
+        {
+            DensityScatter densityScatter = new DensityScatter(x, y, categories);
+            this.Children.Add(densityScatter);
+            return densityScatter;
+        }
+
+        /// <summary>
+        /// Add contour lines of z at levels (see Plot2DContour).
+        /// </summary>
+        public Plot2DContour AddContour(double[] x, double[] y, double[,] z, double[] levels)
+        {
+            Plot2DContour contour = new Plot2DContour(x, y, z, levels);
+            this.Children.Add(contour);
+            return contour;
+        }
+
+        public Plot2DContour AddContour(double[,] z, double[] levels)
+        {
+            Plot2DContour contour = new Plot2DContour(z, levels);
+            this.Children.Add(contour);
+            return contour;
+        }
+
+        public Plot2DContour AddContour(object x, object y, object z, object levels)
+        {
+            Plot2DContour contour = new Plot2DContour(x, y, z, levels);
+            this.Children.Add(contour);
+            return contour;
+        }
+
+        public Plot2DContour AddContour(object z, object levels)
+        {
+            Plot2DContour contour = new Plot2DContour(z, levels);
+            this.Children.Add(contour);
+            return contour;
+        }
+
+        /// <summary>
+        /// Add bars from barStart to barEnd, centred on barPosition with width barThickness (see Bars).
+        /// </summary>
+        public Bars AddBars(double[] barStart, double[] barEnd, double[] barPosition, double[] barThickness, BarType barType)
+        {
+            Bars bars = new Bars(barStart, barEnd, barPosition, barThickness, barType);
+            this.Children.Add(bars);
+            return bars;
+        }
+
+        /// <summary>
+        /// Add vertical bars of barLength at 0, 1, 2...
+        /// </summary>
+        public Bars AddBars(double[] barLength)
+        {
+            int n = barLength.Length;
+            return AddBars(new double[n], barLength, MathHelper.Counter(n).SumWith(-1.0), Enumerable.Repeat(0.8, n).ToArray(), BarType.Vertical);
+        }
+
+        public Bars AddBars(object barLength)
+        {
+            return AddBars(Plotting.Array(barLength));
+        }
+
+        /// <summary>
+        /// Add bars of the counts of a histogram, which follow it as data are added.
+        /// </summary>
+        public Bars AddHistogram(Histogram histogram)
+        {
+            Bars bars = new Bars(histogram);
+            this.Children.Add(bars);
+            return bars;
+        }
+
+        /// <summary>
+        /// Add an image of the counts of a 2-D histogram with evenly spaced cells, which follows it as points are added.
+        /// </summary>
+        public FalseColourImage AddHistogram2D(Histogram2D histogram)
+        {
+            if (!histogram.XUniform || !histogram.YUniform) throw new ArgumentException("A histogram shown as an image must have evenly spaced cells");
+            double[] xEdges = histogram.XEdges, yEdges = histogram.YEdges;
+            FalseColourImage falseColour = new FalseColourImage(new Rect(new Point(xEdges[0], yEdges[0]),
+                new Point(xEdges[xEdges.Length - 1], yEdges[yEdges.Length - 1])), histogram.Counts, true);
+            falseColour.Histogram = histogram;
+            histogram.Changed += (sender, e) => falseColour.SetData(histogram.Counts);
+            this.Children.Add(falseColour);
+            return falseColour;
+        }
+
         public FalseColourImage AddFalseColourImage(double[,] image)
         {
             FalseColourImage falseColour = new FalseColourImage(image);
@@ -316,6 +513,73 @@ namespace IronPlot
             return falseColour;
         }
 
+        /// <summary>
+        /// Add a tiled image for an image pyramid on disk (see ImagePyramid).
+        /// </summary>
+        public TiledImage AddTiledImage(string directory)
+        {
+            TiledImage tiledImage = new TiledImage(directory);
+            this.Children.Add(tiledImage);
+            return tiledImage;
+        }
+
+        public TiledImage AddTiledImage(string directory, Rect bounds)
+        {
+            TiledImage tiledImage = new TiledImage(directory, bounds);
+            this.Children.Add(tiledImage);
+            return tiledImage;
+        }
+
         #endregion ConvenienceMethods
+
+        #region Selection
+
+        /// <summary>
+        /// The k points of the curves of the plot nearest point (in data coordinates of each curve's axes), nearest
+        /// on screen first, as (curve, index into the curve's X and Y) pairs.
+        /// </summary>
+        public List<KeyValuePair<Plot2DCurve, int>> NearestPoints(Point point, int k)
+        {
+            List<Tuple<double, Plot2DCurve, int>> candidates = new List<Tuple<double, Plot2DCurve, int>>();
+            foreach (Plot2DCurve curve in children.OfType<Plot2DCurve>())
+            {
+                double[] distances;
+                int[] indices = curve.NearestIndices(point, k, out distances);
+                for (int i = 0; i < indices.Length; ++i) candidates.Add(Tuple.Create(distances[i], curve, indices[i]));
+            }
+            return candidates.OrderBy(candidate => candidate.Item1).Take(k)
+                .Select(candidate => new KeyValuePair<Plot2DCurve, int>(candidate.Item2, candidate.Item3)).ToList();
+        }
+
+        /// <summary>
+        /// The points of the curves of the plot inside region (in data coordinates), as the indices (ascending) of
+        /// the selected points of each curve that has any.
+        /// </summary>
+        public Dictionary<Plot2DCurve, int[]> SelectRegion(Rect region)
+        {
+            Dictionary<Plot2DCurve, int[]> selection = new Dictionary<Plot2DCurve, int[]>();
+            foreach (Plot2DCurve curve in children.OfType<Plot2DCurve>())
+            {
+                int[] indices = curve.IndicesInRegion(region);
+                if (indices.Length > 0) selection.Add(curve, indices);
+            }
+            return selection;
+        }
+
+        /// <summary>
+        /// The points of the curves of the plot inside a polygon such as a lasso (in data coordinates), as for SelectRegion.
+        /// </summary>
+        public Dictionary<Plot2DCurve, int[]> SelectPolygon(IList<Point> polygon)
+        {
+            Dictionary<Plot2DCurve, int[]> selection = new Dictionary<Plot2DCurve, int[]>();
+            foreach (Plot2DCurve curve in children.OfType<Plot2DCurve>())
+            {
+                int[] indices = curve.IndicesInPolygon(polygon);
+                if (indices.Length > 0) selection.Add(curve, indices);
+            }
+            return selection;
+        }
+
+        #endregion Selection
     }
 }
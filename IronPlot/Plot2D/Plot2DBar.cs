@@ -7,188 +7,210 @@ using System.Text;
 using System.Windows;
 using System.Windows.Controls;
 using System.Windows.Data;
-using System.Windows.Documents;
-using System.Windows.Input;
 using System.Windows.Media;
-using System.Windows.Media.Imaging;
-using System.Windows.Navigation;
-using System.Windows.Shapes;
-using ILNumerics;
-using ILNumerics.Storage;
-using ILNumerics.BuiltInFunctions;
-using ILNumerics.Exceptions; 
-using System.Windows.Xps;
-//using System.Windows.Xps.Packaging;
-//using System.Windows.Xps.Serialization;
-using System.Printing;
-using System.Threading;
-using System.Windows.Threading;
-using System.ComponentModel;
-
-namespace ILab.Plot
+
+namespace IronPlot
 {
     public enum BarType { Horizontal, Vertical }
-    
-    public class Bars : UIElement, IBoundable
-    {
-        protected Plot2D plot2D;
 
-        protected List<Path> rectangles;
-        
-        public List<Path> Paths
-        {
-            get { return rectangles; }
-        }
+    /// <summary>
+    /// Bars from barStart to barEnd (along y for vertical bars, along x for horizontal ones), centred on barPosition
+    /// across them with width barThickness, all drawn as a single path.
+    /// Bars made from a Histogram show its counts, and follow them as data are added to it.
+    /// </summary>
+    public class Bars : Plot2DItem
+    {
+        double[] barStart, barEnd, barPosition, barThickness;
+        BarType barType;
+        Histogram histogram;
+        PlotPath path;
 
         #region DependencyProperties
-
-        public static readonly DependencyProperty BoundsProperty =
-            DependencyProperty.Register("BoundsProperty",
-            typeof(Rect), typeof(Bars),
-            new PropertyMetadata(new Rect(0, 0, 10, 10)));
-
         public static readonly DependencyProperty FillProperty =
-            DependencyProperty.Register("FillProperty",
+            DependencyProperty.Register("Fill",
             typeof(Brush), typeof(Bars),
             new PropertyMetadata(Brushes.SlateBlue));
 
         public static readonly DependencyProperty StrokeProperty =
-            DependencyProperty.Register("StrokeProperty",
+            DependencyProperty.Register("Stroke",
             typeof(Brush), typeof(Bars),
             new PropertyMetadata(Brushes.Black));
 
         public static readonly DependencyProperty StrokeThicknessProperty =
-            DependencyProperty.Register("StrokeThicknessProperty",
+            DependencyProperty.Register("StrokeThickness",
             typeof(double), typeof(Bars),
             new PropertyMetadata(1.0));
 
         public Brush Fill
         {
-            set
-            {
-                SetValue(FillProperty, value);
-            }
+            set { SetValue(FillProperty, value); }
             get { return (Brush)GetValue(FillProperty); }
         }
-        
+
         public Brush Stroke
         {
-            set
-            {
-                SetValue(StrokeProperty, value);
-            }
+            set { SetValue(StrokeProperty, value); }
             get { return (Brush)GetValue(StrokeProperty); }
         }
 
         public double StrokeThickness
         {
-            set
-            {
-                SetValue(StrokeThicknessProperty, value);
-            }
+            set { SetValue(StrokeThicknessProperty, value); }
             get { return (double)GetValue(StrokeThicknessProperty); }
         }
+        #endregion
 
-        public Rect Bounds
+        public Bars(double[] barStart, double[] barEnd, double[] barPosition, double[] barThickness, BarType barType)
+        {
+            int n = barStart.Length;
+            if (barEnd.Length != n || barPosition.Length != n || barThickness.Length != n)
+                throw new ArgumentException("Bar starts, ends, positions and thicknesses must have the same lengths");
+            this.barStart = (double[])barStart.Clone(); this.barEnd = (double[])barEnd.Clone();
+            this.barPosition = (double[])barPosition.Clone(); this.barThickness = (double[])barThickness.Clone();
+            this.barType = barType;
+            path = new PlotPath() { StrokeLineJoin = PenLineJoin.Miter };
+            path.SetBinding(PlotPath.FillProperty, new Binding("Fill") { Source = this, Mode = BindingMode.OneWay });
+            path.SetBinding(PlotPath.StrokeProperty, new Binding("Stroke") { Source = this, Mode = BindingMode.OneWay });
+            path.SetBinding(PlotPath.StrokeThicknessProperty, new Binding("StrokeThickness") { Source = this, Mode = BindingMode.OneWay });
+            UpdateBounds();
+        }
+
+        /// <summary>
+        /// Vertical bars of the counts of a histogram, each spanning its bin.
+        /// </summary>
+        public Bars(Histogram histogram)
+            : this(new double[histogram.Counts.Length], histogram.Counts, histogram.Centres,
+                histogram.Edges.Skip(1).Zip(histogram.Edges, (right, left) => right - left).ToArray(), BarType.Vertical)
         {
+            this.histogram = histogram;
+            histogram.Changed += OnHistogramChanged;
+        }
+
+        /// <summary>
+        /// The histogram shown by the bars, or null.
+        /// </summary>
+        public Histogram Histogram
+        {
+            get { return histogram; }
+        }
+
+        /// <summary>
+        /// Get or set the ends of the bars, e.g. to show new values without making new bars.
+        /// </summary>
+        public double[] BarEnd
+        {
+            get { return (double[])barEnd.Clone(); }
             set
             {
-                SetValue(BoundsProperty, (Rect)value);
+                if (value.Length != barEnd.Length) throw new ArgumentException("There must be an end for each bar");
+                barEnd = (double[])value.Clone();
+                UpdateBounds();
+                if (host != null) host.InvalidateArrange();
             }
-            get { return (Rect)GetValue(BoundsProperty); }
         }
 
-        #endregion
+        private void OnHistogramChanged(object sender, EventArgs e)
+        {
+            BarEnd = histogram.Counts;
+        }
 
-        public Bars(Plot2D plot2D, ILArray<double> barStart, ILArray<double> barEnd, ILArray<double> barPosition, ILArray<double> barThickness, BarType barType)
+        private void UpdateBounds()
         {
-            this.plot2D = plot2D;
-            int n = barStart.Length;
-            rectangles = new List<Path>();
-            Geometry geometry;
-            Path rectangle;
-            Rect bounds = new Rect();
-            Rect rectangleBounds = new Rect();
-            for (int i = 0; i < n; ++i)
+            if (barStart.Length == 0)
             {
-                rectangle = new Path();
-                rectangles.Add(rectangle);
-                if (barType == BarType.Horizontal)
-                {
-                    rectangleBounds = new Rect(new Point(barStart.GetValue(i), barPosition.GetValue(i) + barThickness.GetValue(i) / 2),
-                        new Point(barEnd.GetValue(i), barPosition.GetValue(i) - barThickness.GetValue(i) / 2));
-                }
-                else
+                bounds = new Rect(0, 0, 1, 1);
+                return;
+            }
+            double alongMin = Math.Min(barStart.Min(), barEnd.Min()), alongMax = Math.Max(barStart.Max(), barEnd.Max());
+            double acrossMin = barPosition.Zip(barThickness, (position, thickness) => position - thickness / 2).Min();
+            double acrossMax = barPosition.Zip(barThickness, (position, thickness) => position + thickness / 2).Max();
+            bounds = (barType == BarType.Vertical) ? new Rect(new Point(acrossMin, alongMin), new Point(acrossMax, alongMax))
+                : new Rect(new Point(alongMin, acrossMin), new Point(alongMax, acrossMax));
+        }
+
+        protected override void OnHostChanged(PlotPanel host)
+        {
+            base.OnHostChanged(host);
+            if (this.host != null)
+            {
+                try
                 {
-                    rectangleBounds = new Rect(new Point(barPosition.GetValue(i) + barThickness.GetValue(i) / 2, barStart.GetValue(i)),
-                        new Point(barPosition.GetValue(i) - barThickness.GetValue(i) / 2, barEnd.GetValue(i)));
+                    RemoveElements();
                 }
-                geometry = new RectangleGeometry(rectangleBounds);
-                rectangle.Data = geometry;
-                geometry.Transform = plot2D.GraphToCanvas;
-                rectangle.Fill = (Brush)(this.GetValue(FillProperty));
-                rectangle.StrokeThickness = (double)(this.GetValue(StrokeThicknessProperty));
-                rectangle.Stroke = (Brush)(this.GetValue(StrokeProperty));
-                if (i == 0) bounds = rectangleBounds;
-                else
+                catch (Exception)
                 {
-                    bounds.Union(rectangleBounds);
+                    // Just swallow any exception
                 }
             }
-            Bounds = bounds;
-            SetBindings();
-        }
-
-        protected void SetBindings()
-        {
-            Binding fillBinding = new Binding("FillProperty");
-            Binding strokeBinding = new Binding("StrokeProperty");
-            Binding strokeThicknessBinding = new Binding("StrokeThicknessProperty");
-            fillBinding.Source = this;
-            strokeBinding.Source = this;
-            strokeThicknessBinding.Source = this;
-            fillBinding.Mode = BindingMode.OneWay;
-            strokeBinding.Mode = BindingMode.OneWay;
-            strokeThicknessBinding.Mode = BindingMode.OneWay;
-            foreach (Path rectangle in rectangles)
+            this.host = host;
+            if (this.host != null) AddElements();
+        }
+
+        private void AddElements()
+        {
+            path.SetValue(Canvas.ZIndexProperty, 200);
+            host.Canvas.Children.Add(path);
+        }
+
+        private void RemoveElements()
+        {
+            host.Canvas.Children.Remove(path);
+        }
+
+        internal override void BeforeArrange()
+        {
+            Matrix graphToCanvas = Axis2D.GraphToCanvasLinear(xAxis, yAxis).Matrix;
+            Func<double, double> xTransform = xAxis.GraphTransform, yTransform = yAxis.GraphTransform;
+            StreamGeometry geometry = new StreamGeometry();
+            using (StreamGeometryContext context = geometry.Open())
             {
-                rectangle.SetBinding(Rectangle.FillProperty, fillBinding);
-                rectangle.SetBinding(Rectangle.StrokeProperty, strokeBinding);
-                rectangle.SetBinding(Rectangle.StrokeThicknessProperty, strokeThicknessBinding);
+                for (int i = 0; i < barStart.Length; ++i)
+                {
+                    double across0 = barPosition[i] - barThickness[i] / 2, across1 = barPosition[i] + barThickness[i] / 2;
+                    double x0, x1, y0, y1;
+                    if (barType == BarType.Vertical) { x0 = across0; x1 = across1; y0 = barStart[i]; y1 = barEnd[i]; }
+                    else { x0 = barStart[i]; x1 = barEnd[i]; y0 = across0; y1 = across1; }
+                    double left = xTransform(x0) * graphToCanvas.M11 + graphToCanvas.OffsetX;
+                    double right = xTransform(x1) * graphToCanvas.M11 + graphToCanvas.OffsetX;
+                    double bottom = yTransform(y0) * graphToCanvas.M22 + graphToCanvas.OffsetY;
+                    double top = yTransform(y1) * graphToCanvas.M22 + graphToCanvas.OffsetY;
+                    context.BeginFigure(new Point(left, bottom), true, true);
+                    context.PolyLineTo(new Point[] { new Point(right, bottom), new Point(right, top), new Point(left, top) }, true, false);
+                }
             }
+            geometry.Freeze();
+            path.Data = geometry;
         }
-    }
 
-    public partial class Plot2D : ContentControl
-    {
-        protected List<Bars> barsList = new List<Bars>();
+        internal override void ReleaseGeometry()
+        {
+            path.Data = null;
+        }
 
-        public List<Bars> BarsList
+        public override Rect TightBounds
         {
-            get { return barsList; }
+            get
+            {
+                return TransformRect(bounds, xAxis.CanvasTransform, yAxis.CanvasTransform);
+            }
         }
 
-        public Bars AddBars(ILArray<double> barStart, ILArray<double> barEnd, ILArray<double> barPosition, ILArray<double> barThickness, BarType barType)
+        public override Rect PaddedBounds
         {
-            int n = barStart.Dimensions[0];
-            if (barThickness.IsScalar) barThickness = ILMath.ones(n) * barThickness;
-            Bars bars = new Bars(this, barStart, barEnd, barPosition, barThickness, barType);
-            barsList.Add(bars);
-            foreach (Path rectangle in bars.Paths)
+            get
             {
-                canvas.Children.Add(rectangle);
-                IBoundableFromChild.Add((object)(rectangle), bars);
+                return TransformRect(bounds, xAxis.CanvasTransform, yAxis.CanvasTransform);
             }
-            if (graphToCanvas.Matrix.M11 != 0) ViewedRegion = GetCanvasChildrenBounds();
-            else ViewedRegion = bars.Bounds;
-            return bars;
         }
 
-        public Bars AddBars(ILArray<double> barLength)
+        private Rect TransformRect(Rect rect, Func<double, double> transformX, Func<double, double> transformY)
+        {
+            return new Rect(new Point(transformX(rect.Left), transformY(rect.Top)), new Point(transformX(rect.Right), transformY(rect.Bottom)));
+        }
+
+        public Rect Bounds
         {
-            if (!barLength.IsVector && !barLength.IsScalar) { throw new ILArgumentException("Argument must be a vector or scalar"); }
-            int n = barLength.Dimensions[0];
-            return AddBars(ILMath.zeros(n), barLength, ILMath.counter(n) - 1.0, 0.8, BarType.Vertical);
+            get { return bounds; }
         }
     }
 }
@@ -0,0 +1,287 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Windows;
+using System.Windows.Controls;
+using System.Windows.Data;
+using System.Windows.Media;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Contour lines of a grid (see Contouring), with each level drawn as a single path.
+    /// The contours of a set of levels are found when the levels are first shown and kept, so changing the stroke,
+    /// thickness, dash or colour map, or going back to levels shown before, does not find them again.
+    /// Lines are coloured by level through the colour map, unless Stroke is set.
+    /// </summary>
+    public class Plot2DContour : Plot2DItem
+    {
+        double[] x, y;
+        double[,] z;
+        double[] levels;
+        ContourLevel[] contours;
+        // The contours of each set of levels shown so far, keyed by the levels:
+        Dictionary<string, ContourLevel[]> contourCache = new Dictionary<string, ContourLevel[]>();
+        List<PlotPath> paths = new List<PlotPath>();
+        ColourMap colourMap = new ColourMap(ColourMapType.Jet, 256);
+
+        #region DependencyProperties
+        public static readonly DependencyProperty StrokeThicknessProperty =
+            DependencyProperty.Register("StrokeThickness",
+            typeof(double), typeof(Plot2DContour),
+            new PropertyMetadata(1.0));
+
+        public static readonly DependencyProperty StrokeProperty =
+            DependencyProperty.Register("Stroke",
+            typeof(Brush), typeof(Plot2DContour),
+            new PropertyMetadata(null, OnStrokeChanged));
+
+        public static readonly DependencyProperty QuickStrokeDashProperty =
+            DependencyProperty.Register("QuickStrokeDash",
+            typeof(QuickStrokeDash), typeof(Plot2DContour),
+            new PropertyMetadata(QuickStrokeDash.Solid));
+
+        public double StrokeThickness
+        {
+            set { SetValue(StrokeThicknessProperty, value); }
+            get { return (double)GetValue(StrokeThicknessProperty); }
+        }
+
+        /// <summary>
+        /// The stroke of all the levels; null (the default) colours each level through the colour map.
+        /// </summary>
+        public Brush Stroke
+        {
+            set { SetValue(StrokeProperty, value); }
+            get { return (Brush)GetValue(StrokeProperty); }
+        }
+
+        public QuickStrokeDash QuickStrokeDash
+        {
+            set { SetValue(QuickStrokeDashProperty, value); }
+            get { return (QuickStrokeDash)GetValue(QuickStrokeDashProperty); }
+        }
+
+        protected static void OnStrokeChanged(DependencyObject obj, DependencyPropertyChangedEventArgs e)
+        {
+            ((Plot2DContour)obj).SetStrokes();
+        }
+        #endregion
+
+        /// <summary>
+        /// Contours of z[row, column], sampled at x[column] and y[row], at levels.
+        /// </summary>
+        public Plot2DContour(double[] x, double[] y, double[,] z, double[] levels)
+        {
+            int rows = z.GetLength(0), columns = z.GetLength(1);
+            if (x.Length != columns || y.Length != rows) throw new ArgumentException("x must have a value for each column of z and y one for each row");
+            this.x = x; this.y = y; this.z = z;
+            bounds = new Rect(new Point(x.Min(), y.Min()), new Point(x.Max(), y.Max()));
+            Levels = levels;
+        }
+
+        /// <summary>
+        /// Contours at levels of z plotted against its column and row indices.
+        /// </summary>
+        public Plot2DContour(double[,] z, double[] levels)
+            : this(MathHelper.Counter(z.GetLength(1)).SumWith(-1.0), MathHelper.Counter(z.GetLength(0)).SumWith(-1.0), z, levels) { }
+
+        /// <summary>
+        /// General arrays (e.g. NumPy arrays), as for FalseColourImage.
+        /// </summary>
+        public Plot2DContour(object x, object y, object z, object levels)
+            : this(Plotting.Array(x), Plotting.Array(y), (double[,])GeneralArray.ToDoubleArray(z), Plotting.Array(levels)) { }
+
+        public Plot2DContour(object z, object levels) : this((double[,])GeneralArray.ToDoubleArray(z), Plotting.Array(levels)) { }
+
+        /// <summary>
+        /// Get or set the levels of the contours, ascending.
+        /// </summary>
+        public double[] Levels
+        {
+            get { return (double[])levels.Clone(); }
+            set
+            {
+                double[] newLevels = (double[])value.Clone();
+                string key = String.Join(",", newLevels.Select(level => level.ToString("R")));
+                ContourLevel[] newContours;
+                if (!contourCache.TryGetValue(key, out newContours))
+                {
+                    newContours = Contouring.Contours(x, y, z, newLevels);
+                    contourCache.Add(key, newContours);
+                }
+                PlotPanel currentHost = host;
+                if (currentHost != null) RemoveElements();
+                levels = newLevels; contours = newContours;
+                CreatePaths();
+                if (currentHost == null) return;
+                AddElements();
+                currentHost.InvalidateArrange();
+            }
+        }
+
+        /// <summary>
+        /// Show count levels evenly spaced between the minimum and maximum of the data.
+        /// </summary>
+        public void SetLevels(int count)
+        {
+            Levels = Contouring.Levels(z, count);
+        }
+
+        /// <summary>
+        /// The contours of the current levels.
+        /// </summary>
+        public ContourLevel[] Contours
+        {
+            get { return (ContourLevel[])contours.Clone(); }
+        }
+
+        /// <summary>
+        /// The colour map of the levels, from the lowest level to the highest.
+        /// </summary>
+        public ColourMap ColourMap
+        {
+            get { return colourMap; }
+            set
+            {
+                colourMap = value;
+                SetStrokes();
+            }
+        }
+
+        /// <summary>
+        /// Forget the contours of levels other than the current ones.
+        /// </summary>
+        public void ClearCache()
+        {
+            string key = String.Join(",", levels.Select(level => level.ToString("R")));
+            ContourLevel[] current = contourCache[key];
+            contourCache.Clear();
+            contourCache.Add(key, current);
+        }
+
+        private void CreatePaths()
+        {
+            paths.Clear();
+            for (int k = 0; k < contours.Length; ++k)
+            {
+                PlotPath path = new PlotPath() { StrokeLineJoin = PenLineJoin.Bevel };
+                path.SetBinding(PlotPath.StrokeThicknessProperty, new Binding("StrokeThickness") { Source = this, Mode = BindingMode.OneWay });
+                path.SetBinding(PlotPath.QuickStrokeDashProperty, new Binding("QuickStrokeDash") { Source = this, Mode = BindingMode.OneWay });
+                paths.Add(path);
+            }
+            SetStrokes();
+        }
+
+        private void SetStrokes()
+        {
+            Brush stroke = (Brush)GetValue(StrokeProperty);
+            int[] colours = colourMap.ToIntArray();
+            for (int k = 0; k < paths.Count; ++k)
+            {
+                if (stroke != null)
+                {
+                    paths[k].Stroke = stroke;
+                    continue;
+                }
+                int index = paths.Count == 1 ? colours.Length / 2 : (int)Math.Round((double)k * (colours.Length - 1) / (paths.Count - 1));
+                int colour = colours[index];
+                SolidColorBrush brush = new SolidColorBrush(Color.FromRgb((byte)(colour >> 16), (byte)(colour >> 8), (byte)colour));
+                brush.Freeze();
+                paths[k].Stroke = brush;
+            }
+        }
+
+        protected override void OnHostChanged(PlotPanel host)
+        {
+            base.OnHostChanged(host);
+            if (this.host != null)
+            {
+                try
+                {
+                    RemoveElements();
+                }
+                catch (Exception)
+                {
+                    // Just swallow any exception
+                }
+            }
+            this.host = host;
+            if (this.host != null) AddElements();
+        }
+
+        private void AddElements()
+        {
+            foreach (PlotPath path in paths)
+            {
+                path.SetValue(Canvas.ZIndexProperty, 200);
+                host.Canvas.Children.Add(path);
+            }
+        }
+
+        private void RemoveElements()
+        {
+            foreach (PlotPath path in paths) host.Canvas.Children.Remove(path);
+        }
+
+        internal override void BeforeArrange()
+        {
+            Matrix graphToCanvas = Axis2D.GraphToCanvasLinear(xAxis, yAxis).Matrix;
+            Func<double, double> xTransform = xAxis.GraphTransform, yTransform = yAxis.GraphTransform;
+            for (int k = 0; k < contours.Length; ++k)
+            {
+                ContourLevel contour = contours[k];
+                StreamGeometry geometry = new StreamGeometry();
+                using (StreamGeometryContext context = geometry.Open())
+                {
+                    for (int line = 0; line < contour.PolylineCount; ++line)
+                    {
+                        for (int i = contour.Starts[line]; i < contour.Starts[line + 1]; ++i)
+                        {
+                            Point point = new Point(xTransform(contour.X[i]) * graphToCanvas.M11 + graphToCanvas.OffsetX,
+                                yTransform(contour.Y[i]) * graphToCanvas.M22 + graphToCanvas.OffsetY);
+                            if (i == contour.Starts[line]) context.BeginFigure(point, false, false);
+                            else context.LineTo(point, true, false);
+                        }
+                    }
+                }
+                geometry.Freeze();
+                paths[k].Data = geometry;
+            }
+        }
+
+        internal override void ReleaseGeometry()
+        {
+            foreach (PlotPath path in paths) path.Data = null;
+        }
+
+        public override Rect TightBounds
+        {
+            get
+            {
+                return TransformRect(bounds, xAxis.CanvasTransform, yAxis.CanvasTransform);
+            }
+        }
+
+        public override Rect PaddedBounds
+        {
+            get
+            {
+                return TransformRect(bounds, xAxis.CanvasTransform, yAxis.CanvasTransform);
+            }
+        }
+
+        private Rect TransformRect(Rect rect, Func<double, double> transformX, Func<double, double> transformY)
+        {
+            return new Rect(new Point(transformX(rect.Left), transformY(rect.Top)), new Point(transformX(rect.Right), transformY(rect.Bottom)));
+        }
+
+        public Rect Bounds
+        {
+            get { return bounds; }
+        }
+    }
+}
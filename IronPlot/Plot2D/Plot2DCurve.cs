@@ -35,6 +35,9 @@ namespace IronPlot
         private DirectPath lineD2D;
         private DirectPathScatter markersD2D;
 
+        // graphToCanvas of the WPF line and markers geometry, or null if it cannot be moved (see MoveGeometry).
+        private Matrix? geometryGraphToCanvas = null;
+
         #region DependencyProperties
         public static readonly DependencyProperty MarkersTypeProperty =
             DependencyProperty.Register("MarkersType",
@@ -202,6 +205,7 @@ namespace IronPlot
         protected static void OnMarkersChanged(DependencyObject obj, DependencyPropertyChangedEventArgs e)
         {
             ((Plot2DCurve)obj).UpdateLegendMarkers();
+            ((Plot2DCurve)obj).geometryGraphToCanvas = null;
             if (((Plot2DCurve)obj).Plot != null)
                 ((Plot2DCurve)obj).Plot.PlotPanel.InvalidateArrange();
         }
@@ -221,7 +225,7 @@ namespace IronPlot
         {
             Point canvasPosition = (Point)e.NewValue;
             Plot2DCurve localCurve = (Plot2DCurve)obj;
-            if (Double.IsNaN(canvasPosition.X) || !localCurve.AnnotationEnabled)
+            if (Double.IsNaN(canvasPosition.X) || !localCurve.AnnotationEnabled || localCurve.curve.Count == 0)
             {
                 localCurve.annotation.Visibility = Visibility.Collapsed;
                 return;
@@ -229,6 +233,11 @@ namespace IronPlot
             else localCurve.annotation.Visibility = Visibility.Visible;
             int index;
             Point curveCanvas = localCurve.SnappedCanvasPoint(canvasPosition, out index);
+            if (index < 0)
+            {
+                localCurve.annotation.Visibility = Visibility.Collapsed;
+                return;
+            }
             localCurve.annotation.Annotation = localCurve.AnnotationFromPoint(new Point(localCurve.curve.x[index], localCurve.curve.y[index]));
             localCurve.annotation.SetValue(Canvas.LeftProperty, curveCanvas.X);
             localCurve.annotation.SetValue(Canvas.TopProperty, curveCanvas.Y);
@@ -265,7 +274,7 @@ namespace IronPlot
             if (this.host != null)
             {
                 AddElements();
-                curve.Transform(xAxis.GraphTransform, yAxis.GraphTransform);
+                curve.Transform(xAxis.AxisType, yAxis.AxisType);
                 // Add binding:
                 bindingDirect2D = new Binding("UseDirect2D") { Source = host, Mode = BindingMode.OneWay };
                 BindingOperations.SetBinding(this, Plot2DCurve.UseDirect2DProperty, bindingDirect2D);
@@ -387,46 +396,177 @@ namespace IronPlot
 
         internal override void OnAxisTypeChanged()
         {
-            curve.Transform(xAxis.GraphTransform, yAxis.GraphTransform);
+            curve.Transform(xAxis.AxisType, yAxis.AxisType);
             SetBounds();
         }
 
         internal override void BeforeArrange()
         {
+            RenderMark arrangeStart = RenderProfiler.Start();
             graphToCanvas.Matrix = new Matrix(xAxis.Scale, 0, 0, -yAxis.Scale, -xAxis.Offset - xAxis.AxisPadding.Lower, yAxis.Offset + yAxis.AxisTotalLength - yAxis.AxisPadding.Upper);
             canvasToGraph = (MatrixTransform)(graphToCanvas.Inverse); 
-            Curve.FilterMinMax(canvasToGraph, new Rect(new Point(xAxis.Min, yAxis.Min), new Point(xAxis.Max, yAxis.Max)));
-            if (host.UseDirect2D == true && !host.direct2DControl.InitializationFailed)
+            Rect viewBounds = new Rect(new Point(xAxis.Min, yAxis.Min), new Point(xAxis.Max, yAxis.Max));
+            bool useDirect2D = host.UseDirect2D == true && !host.direct2DControl.InitializationFailed;
+            if (!useDirect2D && host.IsInteracting && curve.IsFilteredFor(viewBounds) && MoveGeometry())
+            {
+                host.FrameRateCounter.GeometryMoved();
+                RenderProfiler.Stop(this, RenderStage.CurveArrange, arrangeStart, curve.n, -1);
+            }
+            else RebuildGeometry(viewBounds, useDirect2D, arrangeStart);
+            if (curve.n == 0) return;
+            Point annotationPoint = graphToCanvas.Transform(new Point(curve.xTransformed[curve.start], curve.yTransformed[curve.start]));
+            annotation.SetValue(Canvas.TopProperty, annotationPoint.Y); annotation.SetValue(Canvas.LeftProperty, annotationPoint.X);
+        }
+
+        internal override void ReleaseGeometry()
+        {
+            line.Data = null;
+            markers.Data = null;
+            geometryGraphToCanvas = null;
+        }
+
+        /// <summary>
+        /// During a pan or zoom, move the existing line and markers geometry to the new view with a transform,
+        /// instead of filtering the points and rebuilding it. The geometry's own Transform is used (rather than a
+        /// RenderTransform) so that stroke thicknesses are unchanged; marker shapes do scale with a zoom until
+        /// the geometry is rebuilt. Returns false if there is no geometry that can be moved.
+        /// </summary>
+        private bool MoveGeometry()
+        {
+            if (geometryGraphToCanvas == null || !geometryGraphToCanvas.Value.HasInverse || line.Data == null) return false;
+            Matrix geometryToCanvas = geometryGraphToCanvas.Value;
+            geometryToCanvas.Invert();
+            geometryToCanvas.Append(graphToCanvas.Matrix);
+            MatrixTransform transform = new MatrixTransform(geometryToCanvas);
+            transform.Freeze();
+            line.Data.Transform = transform;
+            if (markers.Data != null) markers.Data.Transform = transform;
+            return true;
+        }
+
+        private void RebuildGeometry(Rect viewBounds, bool useDirect2D, RenderMark arrangeStart)
+        {
+            RenderMark stageStart = RenderProfiler.Start();
+            Curve.FilterMinMax(canvasToGraph, viewBounds);
+            int linePoints = RenderProfiler.Enabled ? curve.LinePointCount() : -1;
+            RenderProfiler.Stop(this, RenderStage.FilterMinMax, stageStart, curve.n, linePoints);
+            MarkersType markersType = (MarkersType)GetValue(MarkersTypeProperty);
+            if (useDirect2D)
             {
+                stageStart = RenderProfiler.Start();
                 lineD2D.Geometry = curve.ToDirect2DPathGeometry(lineD2D.Factory, graphToCanvas);
-                markersD2D.SetGeometry((MarkersType)GetValue(MarkersTypeProperty), (double)GetValue(MarkersSizeProperty));
+                RenderProfiler.Stop(this, RenderStage.LineGeometry, stageStart, curve.n, linePoints);
+                stageStart = RenderProfiler.Start();
+                markersD2D.SetGeometry(markersType, (double)GetValue(MarkersSizeProperty));
+                RenderProfiler.Stop(this, RenderStage.MarkerGeometry, stageStart);
                 //host.direct2DControl.RequestRender();
+                geometryGraphToCanvas = null;
             }
             else
             {
+                stageStart = RenderProfiler.Start();
                 line.Data = LineGeometries.PathGeometryFromCurve(curve, graphToCanvas);
-                markers.Data = MarkerGeometries.MarkersAsGeometry(Curve, graphToCanvas, (MarkersType)GetValue(MarkersTypeProperty), (double)GetValue(MarkersSizeProperty));
+                RenderProfiler.Stop(this, RenderStage.LineGeometry, stageStart, curve.n, linePoints);
+                stageStart = RenderProfiler.Start();
+                Geometry markersGeometry = MarkerGeometries.MarkersAsGeometry(Curve, graphToCanvas, markersType, (double)GetValue(MarkersSizeProperty));
+                // The markers geometry is frozen: wrap it so that MoveGeometry can give it a transform.
+                markers.Data = markersGeometry == null ? null : new GeometryGroup() { Children = new GeometryCollection() { markersGeometry } };
+                RenderProfiler.Stop(this, RenderStage.MarkerGeometry, stageStart);
+                geometryGraphToCanvas = graphToCanvas.Matrix;
             }
-            Point annotationPoint = graphToCanvas.Transform(new Point(curve.xTransformed[0], curve.yTransformed[0]));
-            annotation.SetValue(Canvas.TopProperty, annotationPoint.Y); annotation.SetValue(Canvas.LeftProperty, annotationPoint.X);
-        }
-
-        internal Point SnappedCanvasPoint(Point canvasPoint, out int index)
+            host.FrameRateCounter.GeometryRebuilt();
+            RenderProfiler.Stop(this, RenderStage.CurveArrange, arrangeStart, curve.n, linePoints);
+        }
+
+        internal Point SnappedCanvasPoint(Point canvasPoint, out int index)
+        {
+            index = CurveIndexFromCanvasPoint(canvasPoint);
+            if (index < 0) return new Point(Double.NaN, Double.NaN);
+            return graphToCanvas.Transform(new Point(curve.xTransformed[index], curve.yTransformed[index]));
+        }
+
+        /// <summary>
+        /// Index into the curve arrays of the point nearest canvasPoint on screen, or -1 if there is none.
+        /// </summary>
+        internal int CurveIndexFromCanvasPoint(Point canvasPoint)
+        {
+            Point graphPoint = canvasToGraph.Transform(canvasPoint);
+            int index = curve.NearestIndex(graphPoint.X, graphPoint.Y, Math.Abs(graphToCanvas.Matrix.M11), Math.Abs(graphToCanvas.Matrix.M22));
+            return index < 0 ? -1 : curve.start + index;
+        }
+
+        /// <summary>
+        /// Indices (into X and Y) of the k points nearest point, given in data coordinates, nearest first.
+        /// Distance is measured on screen, so the scales and any log axes are taken into account.
+        /// </summary>
+        public int[] NearestIndices(Point point, int k)
+        {
+            double[] distances;
+            return NearestIndices(point, k, out distances);
+        }
+
+        /// <summary>
+        /// Indices (into X and Y) of the k points nearest point, nearest first, and their distances on screen.
+        /// </summary>
+        public int[] NearestIndices(Point point, int k, out double[] distances)
+        {
+            Point graphPoint = GraphPoint(point);
+            double xScale = Math.Abs(graphToCanvas.Matrix.M11), yScale = Math.Abs(graphToCanvas.Matrix.M22);
+            // Before the curve is first drawn, measure in graph units:
+            if (xScale == 0 || yScale == 0) xScale = yScale = 1;
+            int[] indices = curve.NearestIndices(graphPoint.X, graphPoint.Y, k, xScale, yScale, out distances);
+            for (int i = 0; i < distances.Length; ++i) distances[i] = Math.Sqrt(distances[i]);
+            return indices;
+        }
+
+        /// <summary>
+        /// Indices (into X and Y), ascending, of the points inside region, given in data coordinates.
+        /// </summary>
+        public int[] IndicesInRegion(Rect region)
+        {
+            Point corner1 = GraphPoint(region.TopLeft), corner2 = GraphPoint(region.BottomRight);
+            return curve.IndicesInRegion(Math.Min(corner1.X, corner2.X), Math.Max(corner1.X, corner2.X),
+                Math.Min(corner1.Y, corner2.Y), Math.Max(corner1.Y, corner2.Y));
+        }
+
+        /// <summary>
+        /// Indices (into X and Y), ascending, of the points inside the polygon (e.g. a lasso), given in data coordinates.
+        /// The edges of the polygon are straight on screen.
+        /// </summary>
+        public int[] IndicesInPolygon(IEnumerable<Point> polygon)
+        {
+            Point[] vertices = polygon.Select(vertex => GraphPoint(vertex)).ToArray();
+            return curve.IndicesInPolygon(vertices.Select(vertex => vertex.X).ToArray(), vertices.Select(vertex => vertex.Y).ToArray());
+        }
+
+        /// <summary>
+        /// A point in data coordinates in the transformed (graph) coordinates of the curve.
+        /// </summary>
+        private Point GraphPoint(Point point)
+        {
+            if (xAxis == null || yAxis == null) return point;
+            return new Point(xAxis.GraphTransform(point.X), yAxis.GraphTransform(point.Y));
+        }
+
+        /// <summary>
+        /// Append points to the curve, for example as they are acquired, and redraw.
+        /// Only the new points are processed: see Curve.Append.
+        /// </summary>
+        public void Append(object x, object y)
         {
-            index = CurveIndexFromCanvasPoint(canvasPoint);
-            return graphToCanvas.Transform(new Point(curve.xTransformed[index], curve.yTransformed[index]));
+            Append(x, y, false);
         }
 
-        internal int CurveIndexFromCanvasPoint(Point canvasPoint)
+        /// <summary>
+        /// Append points to the curve and redraw, optionally rescaling the axes to fit all items of the plot.
+        /// </summary>
+        public void Append(object x, object y, bool rescaleAxes)
         {
-            Point graphPoint = canvasToGraph.Transform(canvasPoint);
-            double value = curve.SortedValues == SortedValues.X ? graphPoint.X : graphPoint.Y;
-            int index = Curve.GetInterpolatedIndex(curve.TransformedSorted, value);
-            if (index == (curve.xTransformed.Length - 1)) return curve.SortedToUnsorted[curve.xTransformed.Length - 1]; 
-            // otherwise return nearest:
-            if ((curve.TransformedSorted[index + 1] - value) < (value - curve.TransformedSorted[index]))
-                return curve.SortedToUnsorted[index + 1];
-            else return curve.SortedToUnsorted[index];
+            curve.Append(Plotting.Array(x), Plotting.Array(y));
+            SetBounds();
+            if (host == null) return;
+            if (rescaleAxes) host.SetAxesRangesFromChildren();
+            host.InvalidateArrange();
         }
 
         private void SetBounds()
@@ -523,43 +663,57 @@ namespace IronPlot
 
         protected void SetStrokePropertiesFromLineProperty(string lineProperty)
         {
-            if (lineProperty == "") lineProperty = "-";
+            QuickStrokeDash quickStrokeDash;
+            MarkersType markersType;
+            Brush stroke;
+            ParseQuickLine(lineProperty, out quickStrokeDash, out markersType, out stroke);
+            SetValue(QuickStrokeDashProperty, quickStrokeDash);
+            SetValue(MarkersTypeProperty, markersType);
+            SetValue(StrokeProperty, stroke);
+        }
+
+        /// <summary>
+        /// Parse line properties in <line><markers><colour> notation, as for QuickLine.
+        /// </summary>
+        internal static void ParseQuickLine(string lineProperty, out QuickStrokeDash quickStrokeDash, out MarkersType markersType, out Brush stroke)
+        {
+            if (String.IsNullOrEmpty(lineProperty)) lineProperty = "-";
             int currentIndex = 0;
             // First check for line type
             string firstTwo = null; string firstOne = null;
             if (lineProperty.Length >= 2) firstTwo = lineProperty.Substring(0, 2);
             if (lineProperty.Length >= 1) firstOne = lineProperty.Substring(0, 1);
-            if (firstTwo == "--") { SetValue(QuickStrokeDashProperty, QuickStrokeDash.Dash); currentIndex = 2; }
-            else if (firstTwo == "-.") { SetValue(QuickStrokeDashProperty, QuickStrokeDash.DashDot); currentIndex = 2; }
-            else if (firstOne == ":") { SetValue(QuickStrokeDashProperty, QuickStrokeDash.Dot); currentIndex = 1; }
-            else if (firstOne == "-") { SetValue(QuickStrokeDashProperty, QuickStrokeDash.Solid); currentIndex = 1; }
-            else SetValue(QuickStrokeDashProperty, QuickStrokeDash.None);
+            if (firstTwo == "--") { quickStrokeDash = QuickStrokeDash.Dash; currentIndex = 2; }
+            else if (firstTwo == "-.") { quickStrokeDash = QuickStrokeDash.DashDot; currentIndex = 2; }
+            else if (firstOne == ":") { quickStrokeDash = QuickStrokeDash.Dot; currentIndex = 1; }
+            else if (firstOne == "-") { quickStrokeDash = QuickStrokeDash.Solid; currentIndex = 1; }
+            else quickStrokeDash = QuickStrokeDash.None;
             // 
             // Next check for markers type
             string marker = null;
             if (lineProperty.Length >= currentIndex + 1) marker = lineProperty.Substring(currentIndex, 1);
-            if (marker == "s") { SetValue(MarkersTypeProperty, MarkersType.Square); currentIndex++; }
-            else if (marker == "o") { SetValue(MarkersTypeProperty, MarkersType.Circle); currentIndex++; }
-            else if (marker == "^") { SetValue(MarkersTypeProperty, MarkersType.TrianglePointUp); currentIndex++; }
-            else SetValue(MarkersTypeProperty, MarkersType.None);
+            if (marker == "s") { markersType = MarkersType.Square; currentIndex++; }
+            else if (marker == "o") { markersType = MarkersType.Circle; currentIndex++; }
+            else if (marker == "^") { markersType = MarkersType.TrianglePointUp; currentIndex++; }
+            else markersType = MarkersType.None;
             //
             // If no line and no marker, assume solid line
-            if ((MarkersType == MarkersType.None) && (this.QuickStrokeDash == QuickStrokeDash.None))
+            if ((markersType == MarkersType.None) && (quickStrokeDash == QuickStrokeDash.None))
             {
-                QuickStrokeDash = QuickStrokeDash.Solid;
+                quickStrokeDash = QuickStrokeDash.Solid;
             }
             // Finally check for colour
             string colour = null;
             if (lineProperty.Length >= currentIndex + 1) colour = lineProperty.Substring(currentIndex, 1);
-            if (colour == "r") SetValue(StrokeProperty, Brushes.Red);
-            else if (colour == "g") SetValue(StrokeProperty, Brushes.Green);
-            else if (colour == "b") SetValue(StrokeProperty, Brushes.Blue);
-            else if (colour == "y") SetValue(StrokeProperty, Brushes.Yellow);
-            else if (colour == "c") SetValue(StrokeProperty, Brushes.Cyan);
-            else if (colour == "m") SetValue(StrokeProperty, Brushes.Magenta);
-            else if (colour == "k") SetValue(StrokeProperty, Brushes.Black);
-            else if (colour == "w") SetValue(StrokeProperty, Brushes.White);
-            else SetValue(StrokeProperty, Brushes.Black);
+            if (colour == "r") stroke = Brushes.Red;
+            else if (colour == "g") stroke = Brushes.Green;
+            else if (colour == "b") stroke = Brushes.Blue;
+            else if (colour == "y") stroke = Brushes.Yellow;
+            else if (colour == "c") stroke = Brushes.Cyan;
+            else if (colour == "m") stroke = Brushes.Magenta;
+            else if (colour == "k") stroke = Brushes.Black;
+            else if (colour == "w") stroke = Brushes.White;
+            else stroke = Brushes.Black;
         }
 
         protected void BindToThis(PlotPath target, bool includeFill, bool includeDotDash)
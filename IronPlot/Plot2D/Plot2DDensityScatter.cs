@@ -0,0 +1,297 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Windows;
+using System.Windows.Controls;
+using System.Windows.Media;
+using System.Windows.Media.Imaging;
+using System.Windows.Shapes;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Scatter plot of a large number of points drawn as a density image: the points are counted into a grid
+    /// with one cell per screen pixel of the view (see DensityBinning), and the counts are shaded through a colour map.
+    /// This needs no geometry per point, so millions of points are drawn in about the time it takes to count them.
+    /// The points are binned again only when the view or its size on screen changes.
+    /// With categories, each cell has the mean colour of the categories of its points, with opacity from its count.
+    /// </summary>
+    public class DensityScatter : Plot2DItem
+    {
+        // Largest number of cells across the grid, whatever the size of the view on screen.
+        public const int MaximumCells = 4096;
+
+        double[] x, y;
+        int[] categories;
+        int categoryCount = 1;
+        int[] categoryColours;
+        ColourMap colourMap;
+        ColourNormalisation colourNormalisation = ColourNormalisation.Log;
+        ColourBar colourBar = null;
+        int[] counts;
+        int maxCount;
+        Path imageRectangle;
+        WriteableBitmap bitmap;
+        MatrixTransform graphToCanvas = new MatrixTransform(Matrix.Identity);
+        // The region and grid size of the current counts; empty if the points must be binned again:
+        Rect binnedRegion = Rect.Empty;
+        int columns, rows;
+
+        /// <summary>
+        /// Default colours of the categories (blue, red, green, cyan, magenta, yellow and black), as packed RGB values.
+        /// </summary>
+        public static readonly int[] DefaultCategoryColours = new int[] { 0x0000FF, 0xFF0000, 0x008000, 0x00FFFF, 0xFF00FF, 0xFFFF00, 0x000000 };
+
+        public DensityScatter(double[] x, double[] y) : this(x, y, null) { }
+
+        public DensityScatter(object x, object y) : this(Plotting.Array(x), Plotting.Array(y), null) { }
+
+        /// <summary>
+        /// Categories given as numbers (e.g. a float64 buffer from Python) are rounded to integers.
+        /// </summary>
+        public DensityScatter(object x, object y, object categories)
+            : this(Plotting.Array(x), Plotting.Array(y), Plotting.Array(categories).Select(c => (int)Math.Round(c)).ToArray()) { }
+
+        /// <summary>
+        /// categories[i] (from 0) is the category of point i; a null categories gives a single category shaded through the
+        /// colour map.
+        /// </summary>
+        public DensityScatter(double[] x, double[] y, int[] categories)
+        {
+            if (x.Length != y.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            this.x = x; this.y = y;
+            bounds = FiniteBounds(x, y);
+            imageRectangle = new Path();
+            imageRectangle.RenderTransform = graphToCanvas;
+            RenderOptions.SetBitmapScalingMode(imageRectangle, BitmapScalingMode.NearestNeighbor);
+            colourMap = new ColourMap(ColourMapType.Jet, 256);
+            if (categories != null) Categories = categories;
+            else colourBar = new ColourBar(colourMap);
+        }
+
+        /// <summary>
+        /// The category of each point (from 0), or null for a single category.
+        /// </summary>
+        public int[] Categories
+        {
+            get { return categories; }
+            set
+            {
+                if (value != null && value.Length != x.Length) throw new ArgumentException("There must be a category for each point");
+                categories = value;
+                categoryCount = (value == null || value.Length == 0) ? 1 : Math.Max(1, value.Max() + 1);
+                if (categoryColours == null || categoryColours.Length < categoryCount)
+                {
+                    categoryColours = new int[categoryCount];
+                    for (int i = 0; i < categoryCount; ++i) categoryColours[i] = DefaultCategoryColours[i % DefaultCategoryColours.Length];
+                }
+                Rebin();
+            }
+        }
+
+        /// <summary>
+        /// Colours of the categories, as packed RGB values (0xRRGGBB).
+        /// </summary>
+        public int[] CategoryColours
+        {
+            get { return categoryColours; }
+            set
+            {
+                if (value.Length < categoryCount) throw new ArgumentException("There must be a colour for each category");
+                categoryColours = value;
+                Rebin();
+            }
+        }
+
+        public ColourMap ColourMap
+        {
+            get { return colourMap; }
+            set
+            {
+                colourMap = value;
+                Reshade();
+            }
+        }
+
+        /// <summary>
+        /// Whether counts are mapped to colours (or, with categories, opacity) linearly or logarithmically (the default).
+        /// </summary>
+        public ColourNormalisation ColourNormalisation
+        {
+            get { return colourNormalisation; }
+            set
+            {
+                colourNormalisation = value;
+                Reshade();
+            }
+        }
+
+        /// <summary>
+        /// The counts of the current view (see DensityBinning), and the size of their grid.
+        /// </summary>
+        public int[] Counts
+        {
+            get { return counts; }
+        }
+
+        public int Columns
+        {
+            get { return columns; }
+        }
+
+        public int Rows
+        {
+            get { return rows; }
+        }
+
+        /// <summary>
+        /// The largest count of a cell in the current view, which takes the last colour of the colour map.
+        /// </summary>
+        public int MaxCount
+        {
+            get { return maxCount; }
+        }
+
+        public Path Rectangle
+        {
+            get { return imageRectangle; }
+        }
+
+        public override Rect TightBounds
+        {
+            get { return bounds; }
+        }
+
+        public override Rect PaddedBounds
+        {
+            get
+            {
+                Rect padded = bounds;
+                padded.Inflate(0.05 * bounds.Width, 0.05 * bounds.Height);
+                return padded;
+            }
+        }
+
+        public void OnColourMapChanged(object sender, RoutedEventArgs e)
+        {
+            Reshade();
+        }
+
+        protected override void OnHostChanged(PlotPanel host)
+        {
+            base.OnHostChanged(host);
+            if (this.host != null)
+            {
+                try
+                {
+                    this.host.Canvas.Children.Remove(imageRectangle);
+                    if (colourBar != null)
+                    {
+                        this.host.Annotations.Remove(colourBar);
+                        colourBar.ColourMapChanged -= OnColourMapChanged;
+                    }
+                }
+                catch (Exception)
+                {
+                    // Just swallow any exception
+                }
+            }
+            this.host = host;
+            if (host != null)
+            {
+                host.Canvas.Children.Add(imageRectangle);
+                if (colourBar != null)
+                {
+                    host.Annotations.Add(colourBar);
+                    colourBar.ColourMapChanged += OnColourMapChanged;
+                }
+            }
+        }
+
+        internal override void BeforeArrange()
+        {
+            graphToCanvas.Matrix = Axis2D.GraphToCanvasLinear(xAxis, yAxis).Matrix;
+            Rect region = new Rect(new Point(xAxis.Min, yAxis.Min), new Point(xAxis.Max, yAxis.Max));
+            region.Intersect(bounds);
+            if (region.IsEmpty)
+            {
+                imageRectangle.Visibility = Visibility.Hidden;
+                return;
+            }
+            imageRectangle.Visibility = Visibility.Visible;
+            // One cell per screen pixel:
+            int newColumns = Math.Max(1, Math.Min(MaximumCells, (int)Math.Ceiling(region.Width * xAxis.Scale)));
+            int newRows = Math.Max(1, Math.Min(MaximumCells, (int)Math.Ceiling(region.Height * yAxis.Scale)));
+            if (region == binnedRegion && newColumns == columns && newRows == rows) return;
+            // A point has no width, so if all points are on a line the region is widened to one cell:
+            if (region.Width == 0) region = new Rect(region.X - 0.5 / xAxis.Scale, region.Y, 1 / xAxis.Scale, region.Height);
+            if (region.Height == 0) region = new Rect(region.X, region.Y - 0.5 / yAxis.Scale, region.Width, 1 / yAxis.Scale);
+            Bin(region, newColumns, newRows);
+        }
+
+        /// <summary>
+        /// Count the points of the region and draw them.
+        /// </summary>
+        private void Bin(Rect region, int newColumns, int newRows)
+        {
+            columns = newColumns; rows = newRows;
+            binnedRegion = region;
+            // In graph coordinates, the Top of a Rect is its smallest y.
+            counts = DensityBinning.Bin(x, y, categories, categoryCount, region.Left, region.Top, region.Width, region.Height, columns, rows);
+            maxCount = DensityBinning.MaxCount(counts, columns * rows);
+            imageRectangle.Data = new RectangleGeometry(region);
+            Reshade();
+        }
+
+        /// <summary>
+        /// Draw the current counts with the current colours.
+        /// </summary>
+        private void Reshade()
+        {
+            if (counts == null) return;
+            int[] pixels = (categories == null)
+                ? DensityBinning.Shade(counts, maxCount, colourNormalisation, ColourIndexing.LookupTable(colourMap.ToIntArray(), 255))
+                : DensityBinning.ShadeCategories(counts, columns * rows, maxCount, colourNormalisation, categoryColours);
+            if (bitmap == null || bitmap.PixelWidth != columns || bitmap.PixelHeight != rows)
+            {
+                bitmap = new WriteableBitmap(columns, rows, 96, 96, PixelFormats.Bgra32, null);
+                imageRectangle.Fill = new ImageBrush(bitmap);
+            }
+            bitmap.WritePixels(new Int32Rect(0, 0, columns, rows), pixels, 4 * columns, 0);
+            if (colourBar != null)
+            {
+                colourBar.Min = 1;
+                colourBar.Max = Math.Max(maxCount, 2);
+            }
+        }
+
+        /// <summary>
+        /// Bin the points again when next arranged, e.g. after the categories have changed.
+        /// </summary>
+        private void Rebin()
+        {
+            binnedRegion = Rect.Empty;
+            counts = null;
+            if (host != null) host.InvalidateArrange();
+        }
+
+        private static Rect FiniteBounds(double[] x, double[] y)
+        {
+            double xMin = Double.PositiveInfinity, xMax = Double.NegativeInfinity;
+            double yMin = Double.PositiveInfinity, yMax = Double.NegativeInfinity;
+            for (int i = 0; i < x.Length; ++i)
+            {
+                if (Double.IsNaN(x[i]) || Double.IsInfinity(x[i]) || Double.IsNaN(y[i]) || Double.IsInfinity(y[i])) continue;
+                if (x[i] < xMin) xMin = x[i];
+                if (x[i] > xMax) xMax = x[i];
+                if (y[i] < yMin) yMin = y[i];
+                if (y[i] > yMax) yMax = y[i];
+            }
+            if (xMin > xMax) return new Rect(0, 0, 1, 1);
+            return new Rect(new Point(xMin, yMin), new Point(xMax, yMax));
+        }
+    }
+}
@@ -29,7 +29,12 @@ namespace IronPlot
     public class FalseColourImage : Plot2DItem
     {
         ColourBar colourBar = null;
-        IEnumerable<double> underlyingData;
+        // The data in pixel order: width values per row.
+        double[] underlyingData;
+        // The data values mapped to the first and last colours of the colour map:
+        double colourMin, colourMax;
+        bool fixedColourLimits = false;
+        ColourNormalisation colourNormalisation = ColourNormalisation.Linear;
 
         int width;
         int height;
@@ -44,6 +49,7 @@ namespace IronPlot
         volatile bool updateInProgress = false;
         DispatcherTimer colourMapUpdateTimer;
         IntPtr backBuffer;
+        int backBufferStride;
         private delegate void AfterUpdateCallback();
 
         internal override void BeforeArrange()
@@ -95,11 +101,78 @@ namespace IronPlot
         {
             get { return colourMap; }
             set { 
+                bool lengthChanged = (value.Length != colourMap.Length);
                 colourMap = value;
-                colourMapUpdateTimer.Start();    
+                if (lengthChanged) UpdateIndices();
+                else colourMapUpdateTimer.Start();    
             }
         }
 
+        /// <summary>
+        /// Whether data values are mapped to colours linearly or logarithmically.
+        /// With log normalisation, values that are not positive are transparent, as are NaNs.
+        /// </summary>
+        public ColourNormalisation ColourNormalisation
+        {
+            get { return colourNormalisation; }
+            set
+            {
+                colourNormalisation = value;
+                UpdateIndices();
+            }
+        }
+
+        /// <summary>
+        /// The data value mapped to the first colour of the colour map.
+        /// </summary>
+        public double ColourMin
+        {
+            get { return colourMin; }
+        }
+
+        /// <summary>
+        /// The data value mapped to the last colour of the colour map.
+        /// </summary>
+        public double ColourMax
+        {
+            get { return colourMax; }
+        }
+
+        /// <summary>
+        /// Fix the data values mapped to the first and last colours of the colour map, rather than
+        /// using the range of the data. Values outside the range take the first or last colour.
+        /// </summary>
+        public void SetColourLimits(double min, double max)
+        {
+            colourMin = min; colourMax = max;
+            fixedColourLimits = true;
+            UpdateIndices();
+        }
+
+        /// <summary>
+        /// Map the range of the data to the colour map (the default).
+        /// </summary>
+        public void AutoColourLimits()
+        {
+            fixedColourLimits = false;
+            UpdateIndices();
+        }
+
+        /// <summary>
+        /// Replace the data with values of the same size, indexed [x, y] as for the constructors, and redraw.
+        /// </summary>
+        public void SetData(double[,] data)
+        {
+            if (data.GetLength(0) != width || data.GetLength(1) != height) throw new ArgumentException("Data must be the same size as the image");
+            underlyingData = data.ToFlatArray(EnumerationOrder2D.ColumnMajor);
+            UpdateIndices();
+        }
+
+        /// <summary>
+        /// The histogram shown by the image, if it was added by Plot2D.AddHistogram2D; the image follows its counts.
+        /// </summary>
+        public Histogram2D Histogram { get; internal set; }
+
         public static readonly DependencyProperty BoundsProperty =
             DependencyProperty.Register("Bounds",
             typeof(Rect), typeof(FalseColourImage),
@@ -134,7 +207,7 @@ namespace IronPlot
 
         public FalseColourImage(double[,] underlyingData)
         {
-            this.underlyingData = underlyingData.ArrayEnumerator(EnumerationOrder2D.RowMajor);
+            this.underlyingData = underlyingData.ToFlatArray(EnumerationOrder2D.RowMajor);
             width = underlyingData.GetLength(0);
             height = underlyingData.GetLength(1);
             Initialize(true);
@@ -143,7 +216,7 @@ namespace IronPlot
         public FalseColourImage(IEnumerable<object> underlyingData)
         {
             Array array = GeneralArray.ToDoubleArray(underlyingData);
-            this.underlyingData = ((double[,])array).ArrayEnumerator(EnumerationOrder2D.ColumnMajor);
+            this.underlyingData = ((double[,])array).ToFlatArray(EnumerationOrder2D.ColumnMajor);
             width = array.GetLength(0);
             height = array.GetLength(1);
             Initialize(true);
@@ -151,7 +224,7 @@ namespace IronPlot
 
         internal FalseColourImage(Rect bounds, double[,] underlyingData, bool newColourBar)
         {
-            this.underlyingData = underlyingData.ArrayEnumerator(EnumerationOrder2D.ColumnMajor);
+            this.underlyingData = underlyingData.ToFlatArray(EnumerationOrder2D.ColumnMajor);
             width = underlyingData.GetLength(0);
             height = underlyingData.GetLength(1);
             Initialize(newColourBar);
@@ -161,7 +234,7 @@ namespace IronPlot
         internal FalseColourImage(Rect bounds, IEnumerable<object> underlyingData, bool newColourBar)
         {
             Array array = GeneralArray.ToDoubleArray(underlyingData);
-            this.underlyingData = ((double[,])array).ArrayEnumerator(EnumerationOrder2D.ColumnMajor);
+            this.underlyingData = ((double[,])array).ToFlatArray(EnumerationOrder2D.ColumnMajor);
             width = array.GetLength(0);
             height = array.GetLength(1);
             Initialize(newColourBar);
@@ -231,7 +304,12 @@ namespace IronPlot
             }
 #endif
             if (!useILArray) indices = UnderlyingToIndexArray(colourMap.Length);
-            writeableBitmap = new WriteableBitmap(IndexArrayToBitmapSource());
+            writeableBitmap = new WriteableBitmap(width, height, 96, 96, PixelFormats.Bgra32, null);
+            writeableBitmap.Lock();
+            ColourIndexing.WriteBgra32(indices, ColourIndexing.LookupTable(colourMap.ToIntArray(), 255),
+                writeableBitmap.BackBuffer, width, height, writeableBitmap.BackBufferStride);
+            writeableBitmap.AddDirtyRect(new Int32Rect(0, 0, width, height));
+            writeableBitmap.Unlock();
             imageBrush = new ImageBrush(writeableBitmap);
             imageRectangle.Fill = imageBrush;
             Bounds = new Rect(0, 0, writeableBitmap.PixelWidth, writeableBitmap.PixelHeight);
@@ -247,42 +325,48 @@ namespace IronPlot
 #endif
                 if (!useILArray)
                 {
-                    colourBar.Min = underlyingData.Min();
-                    colourBar.Max = underlyingData.Max();
+                    colourBar.Min = colourMin;
+                    colourBar.Max = colourMax;
                 }
             }
         }
 
+        /// <summary>
+        /// Quantise data to indices into a colour map of nIndices colours, spanning the range of the data.
+        /// NaNs are given the index nIndices (see ColourIndexing).
+        /// </summary>
         public static UInt16[] IEnumerableToIndexArray(IEnumerable<double> data, int width, int height, int nIndices)
         {
-            double max = data.Max();
-            double min = data.Min();
-            double Scale = (nIndices - 1) / (max - min);
-            int count = width * height;
-            int index = 0;
-            UInt16[] indices = new UInt16[count];
-            foreach (double value in data)
-            {
-                indices[index] = (UInt16)((value - min) * Scale);
-                index++;
-            }
-            return indices;
+            double[] values = data as double[] ?? data.Take(width * height).ToArray();
+            double min, max;
+            ColourIndexing.Limits(values, ColourNormalisation.Linear, out min, out max);
+            return ColourIndexing.Quantise(values, min, max, ColourNormalisation.Linear, nIndices);
         }
 
         public UInt16[] UnderlyingToIndexArray(int nIndices)
         {
-            double max = underlyingData.Max();
-            double min = underlyingData.Min();
-            double Scale = (nIndices - 1) / (max - min);
-            int count = width * height; 
-            int index = 0;
-            UInt16[] indices = new UInt16[count];
-            foreach (double value in underlyingData)
+            if (!fixedColourLimits) ColourIndexing.Limits(underlyingData, colourNormalisation, out colourMin, out colourMax);
+            return ColourIndexing.Quantise(underlyingData, colourMin, colourMax, colourNormalisation, nIndices);
+        }
+
+        /// <summary>
+        /// Re-quantise the data after the colour limits or normalisation have changed, and redraw.
+        /// </summary>
+        private void UpdateIndices()
+        {
+#if ILNumerics
+            if (useILArray) indices = UnderlyingILArrayToIndexArray(colourMap.Length);
+#endif
+            if (!useILArray)
             {
-                indices[index] = (UInt16)((value - min) * Scale);
-                index++;
+                indices = UnderlyingToIndexArray(colourMap.Length);
+                if (colourBar != null)
+                {
+                    colourBar.Min = colourMin;
+                    colourBar.Max = colourMax;
+                }
             }
-            return indices;
+            colourMapUpdateTimer.Start();
         }
 
 #if ILNumerics 
@@ -380,48 +464,15 @@ namespace IronPlot
             object state = new object();
             writeableBitmap.Lock();
             backBuffer = writeableBitmap.BackBuffer;
+            backBufferStride = writeableBitmap.BackBufferStride;
             updateInProgress = true;
             ThreadPool.QueueUserWorkItem(new WaitCallback(UpdateWriteableBitmap), (object)state);
         }
 
-        private BitmapSource IndexArrayToBitmapSource()
-        {
-            // Define parameters used to create the BitmapSource.
-            PixelFormat pf = PixelFormats.Bgr32;
-            int bytes = (pf.BitsPerPixel + 7) / 8;
-            int rawStride = (width * bytes);
-            byte[] rawImage = new byte[rawStride * height];
-            int byteIndex = 0;
-            byte[,] cmap = colourMap.ToByteArray();
-            foreach (UInt16 magnitude in indices)
-            {
-                rawImage[byteIndex] = cmap[magnitude, 3];
-                rawImage[byteIndex + 1] = cmap[magnitude, 2];
-                rawImage[byteIndex + 2] = cmap[magnitude, 1];
-                rawImage[byteIndex + 3] = cmap[magnitude, 0];
-                byteIndex += bytes;
-            }
-            // Create a BitmapSource.
-            BitmapSource bitmap = BitmapSource.Create(width, height,
-                96, 96, pf, null,
-                rawImage, rawStride);
-
-            return bitmap;
-        }
-
         private void UpdateWriteableBitmap(Object state)
         {
-            unsafe
-            {
-                int* pBackBuffer = (int*)backBuffer;
-                PixelFormat pf = PixelFormats.Bgr32;
-                int bytes = (pf.BitsPerPixel + 7) / 8;
-                for (int i = 0; i < indices.Length; ++i)
-                {
-                    *pBackBuffer = updateColourMap[indices[i]];
-                    pBackBuffer++;
-                }
-            }
+            ColourIndexing.WriteBgra32(indices, ColourIndexing.LookupTable(updateColourMap, 255),
+                backBuffer, width, height, backBufferStride);
             Dispatcher.BeginInvoke(System.Windows.Threading.DispatcherPriority.Background,
                 new AfterUpdateCallback(AfterUpdateWriteableBitmap));
         }
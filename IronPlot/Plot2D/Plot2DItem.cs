@@ -61,6 +61,11 @@ namespace IronPlot
             }
         }
 
+        internal PlotPanel Host
+        {
+            get { return host; }
+        }
+
         public Plot2D Plot
         {
             get
@@ -118,6 +123,14 @@ namespace IronPlot
 
         internal abstract void BeforeArrange();
 
+        /// <summary>
+        /// Drop geometry while the host is dormant (hidden or scrolled out of view); it is rebuilt
+        /// by the next BeforeArrange once the host is shown.
+        /// </summary>
+        internal virtual void ReleaseGeometry()
+        {
+        }
+
         internal virtual void OnRender()
         {
         }
@@ -0,0 +1,443 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Collections.ObjectModel;
+using System.Linq;
+using System.Text;
+using System.Windows;
+using System.Windows.Controls;
+using System.Windows.Data;
+using System.Windows.Media;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Many lines plotted against one x array, added to a plot as a single item (see Plot2D.AddLines).
+    /// The curves share the x values, which are transformed and checked for sorting once for all of them.
+    /// Lines with the same style are drawn as one geometry (or one Direct2D path), and adding the item
+    /// updates the axes and layout of the plot once for the whole batch.
+    /// </summary>
+    public class Plot2DLines : Plot2DItem
+    {
+        protected MatrixTransform graphToCanvas = new MatrixTransform(Matrix.Identity);
+        protected MatrixTransform canvasToGraph = new MatrixTransform(Matrix.Identity);
+
+        private Curve[] curves;
+        private string[] styles = new string[] { "-k" };
+        private string[] titles = new string[0];
+
+        // The lines that share a style, and the elements that draw them.
+        private class LinesLayer
+        {
+            internal QuickStrokeDash QuickStrokeDash;
+            internal MarkersType MarkersType;
+            internal Brush Stroke;
+            internal List<Curve> Curves = new List<Curve>();
+            internal PlotPath Line;
+            internal PlotPath Markers;
+            internal DirectPath LineD2D;
+            internal List<DirectPathScatter> MarkersD2D;
+        }
+
+        private List<LinesLayer> layers = new List<LinesLayer>();
+        private List<LegendItem> legendItems = new List<LegendItem>();
+        Binding bindingDirect2D;
+
+        #region DependencyProperties
+        public static readonly DependencyProperty StrokeThicknessProperty =
+            DependencyProperty.Register("StrokeThickness",
+            typeof(double), typeof(Plot2DLines),
+            new PropertyMetadata(1.0));
+
+        public static readonly DependencyProperty MarkersSizeProperty =
+            DependencyProperty.Register("MarkersSize",
+            typeof(double), typeof(Plot2DLines),
+            new PropertyMetadata(10.0,
+                OnMarkersChanged));
+
+        public static readonly DependencyProperty MarkersFillProperty =
+            DependencyProperty.Register("MarkersFill",
+            typeof(Brush), typeof(Plot2DLines),
+            new PropertyMetadata(Brushes.Transparent));
+
+        public static readonly DependencyProperty UseDirect2DProperty =
+            DependencyProperty.Register("UseDirect2D",
+            typeof(bool), typeof(Plot2DLines),
+            new PropertyMetadata(false, OnUseDirect2DChanged));
+
+        public double StrokeThickness
+        {
+            set
+            {
+                SetValue(StrokeThicknessProperty, value);
+            }
+            get { return (double)GetValue(StrokeThicknessProperty); }
+        }
+
+        public double MarkersSize
+        {
+            set
+            {
+                SetValue(MarkersSizeProperty, value);
+            }
+            get { return (double)GetValue(MarkersSizeProperty); }
+        }
+
+        public Brush MarkersFill
+        {
+            set
+            {
+                SetValue(MarkersFillProperty, value);
+            }
+            get { return (Brush)GetValue(MarkersFillProperty); }
+        }
+
+        protected static void OnMarkersChanged(DependencyObject obj, DependencyPropertyChangedEventArgs e)
+        {
+            // The legend markers depend on the size:
+            ((Plot2DLines)obj).Rebuild();
+        }
+
+        protected static void OnUseDirect2DChanged(DependencyObject obj, DependencyPropertyChangedEventArgs e)
+        {
+            Plot2DLines lines = (Plot2DLines)obj;
+            if (lines.host == null) return;
+            lines.RemoveElements((bool)e.OldValue);
+            lines.AddElements();
+        }
+        #endregion
+
+        public Plot2DLines(double[] x, double[,] ys)
+        {
+            int count = ys.GetLength(0), length = ys.GetLength(1);
+            if (count == 0) throw new ArgumentException("At least one line is required");
+            if (length != x.Length) throw new ArgumentException("Each row of ys must have the same length as x");
+            curves = new Curve[count];
+            for (int k = 0; k < count; ++k)
+            {
+                double[] y = new double[length];
+                Buffer.BlockCopy(ys, k * length * sizeof(double), y, 0, length * sizeof(double));
+                curves[k] = k == 0 ? new Curve(x, y) : new Curve(curves[0], y);
+            }
+            CreateLayers();
+        }
+
+        public Plot2DLines(object x, object ys) : this(Plotting.Array(x), Lines(ys)) { }
+
+        /// <summary>
+        /// Lines plotted against 0, 1, 2, ...
+        /// </summary>
+        public Plot2DLines(object ys) : this(Lines(ys)) { }
+
+        private Plot2DLines(double[,] ys) : this(MathHelper.Counter(ys.GetLength(1)).SumWith(-1.0), ys) { }
+
+        /// <summary>
+        /// A general array (e.g. a NumPy array or a list of lists) of lines as a matrix with one row per line.
+        /// </summary>
+        internal static double[,] Lines(object ys)
+        {
+            if (ys is double[,]) return (double[,])ys;
+            Array array = GeneralArray.ToDoubleArray(ys);
+            if (array.Rank == 2) return (double[,])array;
+            double[] y = (double[])array;
+            double[,] lines = new double[1, y.Length];
+            Buffer.BlockCopy(y, 0, lines, 0, y.Length * sizeof(double));
+            return lines;
+        }
+
+        /// <summary>
+        /// The curves, one per line. All have the same x values.
+        /// </summary>
+        public ReadOnlyCollection<Curve> Curves
+        {
+            get { return new ReadOnlyCollection<Curve>(curves); }
+        }
+
+        public int Count
+        {
+            get { return curves.Length; }
+        }
+
+        /// <summary>
+        /// Get or set the line of each curve in <line><markers><colour> notation (see Plot2DCurve.QuickLine).
+        /// If there are fewer styles than curves, they are repeated in turn.
+        /// </summary>
+        public string[] Styles
+        {
+            get { return (string[])styles.Clone(); }
+            set
+            {
+                styles = (value == null || value.Length == 0) ? new string[] { "-k" } : (string[])value.Clone();
+                Rebuild();
+            }
+        }
+
+        /// <summary>
+        /// Get or set legend titles, one per curve; curves without a title (or with an empty one) are not in the legend.
+        /// </summary>
+        public string[] Titles
+        {
+            get { return (string[])titles.Clone(); }
+            set
+            {
+                titles = value == null ? new string[0] : (string[])value.Clone();
+                Rebuild();
+            }
+        }
+
+        private void Rebuild()
+        {
+            bool useDirect2D = (bool)GetValue(UseDirect2DProperty);
+            if (host != null) RemoveElements(useDirect2D);
+            CreateLayers();
+            if (host == null) return;
+            AddElements();
+            host.InvalidateArrange();
+        }
+
+        /// <summary>
+        /// Group the curves by style, each group to be drawn as one geometry.
+        /// </summary>
+        private void CreateLayers()
+        {
+            layers.Clear();
+            legendItems.Clear();
+            var layerLookup = new Dictionary<Tuple<QuickStrokeDash, MarkersType, Brush>, LinesLayer>();
+            for (int k = 0; k < curves.Length; ++k)
+            {
+                QuickStrokeDash quickStrokeDash;
+                MarkersType markersType;
+                Brush stroke;
+                Plot2DCurve.ParseQuickLine(styles[k % styles.Length], out quickStrokeDash, out markersType, out stroke);
+                var key = Tuple.Create(quickStrokeDash, markersType, stroke);
+                LinesLayer layer;
+                if (!layerLookup.TryGetValue(key, out layer))
+                {
+                    layer = new LinesLayer() { QuickStrokeDash = quickStrokeDash, MarkersType = markersType, Stroke = stroke };
+                    layer.Line = CreatePath(layer, false);
+                    layer.Markers = CreatePath(layer, true);
+                    layer.Line.StrokeLineJoin = PenLineJoin.Bevel;
+                    layerLookup.Add(key, layer);
+                    layers.Add(layer);
+                }
+                layer.Curves.Add(curves[k]);
+                if (k < titles.Length && !String.IsNullOrEmpty(titles[k])) legendItems.Add(CreateLegendItem(layer, titles[k]));
+            }
+        }
+
+        private PlotPath CreatePath(LinesLayer layer, bool isMarkers)
+        {
+            PlotPath path = new PlotPath() { Stroke = layer.Stroke };
+            path.SetBinding(PlotPath.StrokeThicknessProperty, new Binding("StrokeThickness") { Source = this, Mode = BindingMode.OneWay });
+            if (isMarkers) path.SetBinding(PlotPath.FillProperty, new Binding("MarkersFill") { Source = this, Mode = BindingMode.OneWay });
+            else path.QuickStrokeDash = layer.QuickStrokeDash;
+            return path;
+        }
+
+        private LegendItem CreateLegendItem(LinesLayer layer, string title)
+        {
+            LegendItem legendItem = new LegendItem() { Title = title };
+            Grid legendItemGrid = new Grid();
+            PlotPath legendLine = CreatePath(layer, false);
+            PlotPath legendMarker = CreatePath(layer, true);
+            legendMarker.HorizontalAlignment = HorizontalAlignment.Center; legendMarker.VerticalAlignment = VerticalAlignment.Center;
+            legendLine.HorizontalAlignment = HorizontalAlignment.Center; legendLine.VerticalAlignment = VerticalAlignment.Center;
+            legendLine.Data = new LineGeometry(new Point(0, 0), new Point(30, 0));
+            double markersSize = (double)GetValue(MarkersSizeProperty);
+            legendMarker.Data = MarkerGeometries.LegendMarkerGeometry(layer.MarkersType, markersSize);
+            if (legendMarker.Data != null) legendMarker.Data.Transform = new TranslateTransform(markersSize / 2, markersSize / 2);
+            legendItemGrid.Children.Add(legendLine);
+            legendItemGrid.Children.Add(legendMarker);
+            legendItem.Content = legendItemGrid;
+            return legendItem;
+        }
+
+        protected override void OnHostChanged(PlotPanel host)
+        {
+            base.OnHostChanged(host);
+            if (this.host != null)
+            {
+                try
+                {
+                    RemoveElements((bool)GetValue(UseDirect2DProperty));
+                    this.host = host;
+                    BindingOperations.ClearBinding(this, Plot2DLines.UseDirect2DProperty);
+                }
+                catch (Exception)
+                {
+                    // Just swallow any exception
+                }
+            }
+            else this.host = host;
+            if (this.host != null)
+            {
+                Transform();
+                AddElements();
+                bindingDirect2D = new Binding("UseDirect2D") { Source = host, Mode = BindingMode.OneWay };
+                BindingOperations.SetBinding(this, Plot2DLines.UseDirect2DProperty, bindingDirect2D);
+            }
+            SetBounds();
+        }
+
+        private void AddElements()
+        {
+            if ((bool)GetValue(UseDirect2DProperty) == false)
+            {
+                foreach (LinesLayer layer in layers)
+                {
+                    layer.Line.SetValue(Canvas.ZIndexProperty, 200);
+                    layer.Markers.SetValue(Canvas.ZIndexProperty, 200);
+                    host.Canvas.Children.Add(layer.Line);
+                    host.Canvas.Children.Add(layer.Markers);
+                }
+            }
+            else if (!host.direct2DControl.InitializationFailed)
+            {
+                foreach (LinesLayer layer in layers)
+                {
+                    if (layer.LineD2D == null)
+                    {
+                        layer.LineD2D = new DirectPath() { Stroke = layer.Stroke, QuickStrokeDash = layer.QuickStrokeDash };
+                        layer.LineD2D.SetBinding(DirectPath.StrokeThicknessProperty, new Binding("StrokeThickness") { Source = this, Mode = BindingMode.OneWay });
+                    }
+                    host.direct2DControl.AddPath(layer.LineD2D);
+                    // Direct2D markers are drawn curve by curve.
+                    if (layer.MarkersType == MarkersType.None) continue;
+                    if (layer.MarkersD2D == null)
+                    {
+                        layer.MarkersD2D = new List<DirectPathScatter>();
+                        foreach (Curve curve in layer.Curves)
+                        {
+                            DirectPathScatter markersD2D = new DirectPathScatter() { Curve = curve, Stroke = layer.Stroke };
+                            markersD2D.SetBinding(DirectPath.StrokeThicknessProperty, new Binding("StrokeThickness") { Source = this, Mode = BindingMode.OneWay });
+                            markersD2D.SetBinding(DirectPath.FillProperty, new Binding("MarkersFill") { Source = this, Mode = BindingMode.OneWay });
+                            layer.MarkersD2D.Add(markersD2D);
+                        }
+                    }
+                    foreach (DirectPathScatter markersD2D in layer.MarkersD2D)
+                    {
+                        markersD2D.GraphToCanvas = graphToCanvas;
+                        host.direct2DControl.AddPath(markersD2D);
+                    }
+                }
+            }
+            Legend legend = Plot.Legend;
+            foreach (LegendItem legendItem in legendItems) legend.Items.Add(legendItem);
+        }
+
+        private void RemoveElements(bool removeDirect2DComponents)
+        {
+            foreach (LinesLayer layer in layers)
+            {
+                if (removeDirect2DComponents)
+                {
+                    if (host.direct2DControl.InitializationFailed) continue;
+                    if (layer.LineD2D != null) host.direct2DControl.RemovePath(layer.LineD2D);
+                    if (layer.MarkersD2D != null)
+                    {
+                        foreach (DirectPathScatter markersD2D in layer.MarkersD2D) host.direct2DControl.RemovePath(markersD2D);
+                    }
+                }
+                else
+                {
+                    host.Canvas.Children.Remove(layer.Line);
+                    host.Canvas.Children.Remove(layer.Markers);
+                }
+            }
+            Legend legend = Plot.Legend;
+            foreach (LegendItem legendItem in legendItems) legend.Items.Remove(legendItem);
+        }
+
+        /// <summary>
+        /// Transform the curves for the axes: the x values once, then the y values of each curve.
+        /// </summary>
+        private void Transform()
+        {
+            curves[0].Transform(xAxis.AxisType, yAxis.AxisType);
+            for (int k = 1; k < curves.Length; ++k) curves[k].TransformShared(curves[0], yAxis.AxisType);
+        }
+
+        internal override void OnAxisTypeChanged()
+        {
+            Transform();
+            SetBounds();
+        }
+
+        internal override void BeforeArrange()
+        {
+            graphToCanvas.Matrix = new Matrix(xAxis.Scale, 0, 0, -yAxis.Scale, -xAxis.Offset - xAxis.AxisPadding.Lower, yAxis.Offset + yAxis.AxisTotalLength - yAxis.AxisPadding.Upper);
+            canvasToGraph = (MatrixTransform)(graphToCanvas.Inverse);
+            Rect viewBounds = new Rect(new Point(xAxis.Min, yAxis.Min), new Point(xAxis.Max, yAxis.Max));
+            foreach (Curve curve in curves) curve.FilterMinMax(canvasToGraph, viewBounds);
+            double markersSize = (double)GetValue(MarkersSizeProperty);
+            if (host.UseDirect2D == true && !host.direct2DControl.InitializationFailed)
+            {
+                foreach (LinesLayer layer in layers)
+                {
+                    layer.LineD2D.Geometry = Curve.ToDirect2DPathGeometry(layer.LineD2D.Factory, layer.Curves, graphToCanvas);
+                    if (layer.MarkersD2D == null) continue;
+                    foreach (DirectPathScatter markersD2D in layer.MarkersD2D) markersD2D.SetGeometry(layer.MarkersType, markersSize);
+                }
+            }
+            else
+            {
+                foreach (LinesLayer layer in layers)
+                {
+                    layer.Line.Data = LineGeometries.StreamGeometryFromCurves(layer.Curves, graphToCanvas);
+                    if (layer.MarkersType == MarkersType.None) continue;
+                    GeometryGroup markers = new GeometryGroup();
+                    foreach (Curve curve in layer.Curves)
+                    {
+                        Geometry curveMarkers = MarkerGeometries.MarkersAsGeometry(curve, graphToCanvas, layer.MarkersType, markersSize);
+                        if (curveMarkers != null) markers.Children.Add(curveMarkers);
+                    }
+                    markers.Freeze();
+                    layer.Markers.Data = markers;
+                }
+            }
+        }
+
+        internal override void ReleaseGeometry()
+        {
+            foreach (LinesLayer layer in layers)
+            {
+                layer.Line.Data = null;
+                layer.Markers.Data = null;
+            }
+        }
+
+        private void SetBounds()
+        {
+            bounds = curves.Length == 0 ? new Rect(0, 0, 0, 0) : curves[0].Bounds();
+            for (int k = 1; k < curves.Length; ++k) bounds.Union(curves[k].Bounds());
+        }
+
+        public override Rect TightBounds
+        {
+            get
+            {
+                return TransformRect(bounds, xAxis.CanvasTransform, yAxis.CanvasTransform);
+            }
+        }
+
+        public override Rect PaddedBounds
+        {
+            get
+            {
+                Rect paddedBounds = new Rect(bounds.Left - 0.05 * bounds.Width, bounds.Top - 0.05 * bounds.Height, bounds.Width * 1.1, bounds.Height * 1.1);
+                return TransformRect(paddedBounds, xAxis.CanvasTransform, yAxis.CanvasTransform);
+            }
+        }
+
+        private Rect TransformRect(Rect rect, Func<double, double> transformX, Func<double, double> transformY)
+        {
+            return new Rect(new Point(transformX(rect.Left), transformY(rect.Top)), new Point(transformX(rect.Right), transformY(rect.Bottom)));
+        }
+
+        public Rect Bounds
+        {
+            get { return bounds; }
+        }
+    }
+}
@@ -0,0 +1,250 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Windows;
+using System.Windows.Controls;
+using System.Windows.Media;
+using System.Windows.Media.Imaging;
+using System.Windows.Shapes;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// False-colour image backed by an ImagePyramid on disk, for images too large to load.
+    /// Only the tiles covering the current view are shown, from the pyramid level closest to screen resolution.
+    /// Decoded tiles are kept in an LRU cache whose memory use is capped by CacheCapacity.
+    /// Row 0 of the image is at the bottom of Bounds, as for FalseColourImage.
+    /// Dispose releases the pyramid (deleting it if Pyramid.DeleteOnDispose is set); the image then shows nothing.
+    /// </summary>
+    public class TiledImage : Plot2DItem, IDisposable
+    {
+        ImagePyramid pyramid;
+        ColourMap colourMap;
+        int[] lookupTable;
+        ColourBar colourBar = null;
+        UInt16[] tileIndices;
+        TileCache<Tuple<int, int, int>, WriteableBitmap> cache;
+        // Tiles currently on the canvas, keyed by (level, tile x, tile y):
+        Dictionary<Tuple<int, int, int>, Path> visibleTiles = new Dictionary<Tuple<int, int, int>, Path>();
+        MatrixTransform graphToCanvas = new MatrixTransform(Matrix.Identity);
+        int currentLevel = 0;
+        bool disposed = false;
+
+        public TiledImage(string directory) : this(new ImagePyramid(directory)) { }
+
+        public TiledImage(string directory, Rect bounds) : this(new ImagePyramid(directory))
+        {
+            Bounds = bounds;
+        }
+
+        public TiledImage(ImagePyramid pyramid)
+        {
+            this.pyramid = pyramid;
+            bounds = new Rect(0, 0, pyramid.Width(0), pyramid.Height(0));
+            tileIndices = new UInt16[pyramid.TileSize * pyramid.TileSize];
+            cache = new TileCache<Tuple<int, int, int>, WriteableBitmap>(256L * 1024 * 1024);
+            colourMap = new ColourMap(ColourMapType.Jet, pyramid.ColourCount);
+            lookupTable = ColourIndexing.LookupTable(colourMap.ToIntArray(), 255);
+            colourBar = new ColourBar(colourMap);
+            colourBar.Min = pyramid.ColourMin;
+            colourBar.Max = pyramid.ColourMax;
+        }
+
+        public ImagePyramid Pyramid
+        {
+            get { return pyramid; }
+        }
+
+        /// <summary>
+        /// Position and size of the image in graph coordinates.
+        /// </summary>
+        public Rect Bounds
+        {
+            get { return bounds; }
+            set
+            {
+                bounds = value;
+                RemoveTiles();
+                if (host != null) host.InvalidateArrange();
+            }
+        }
+
+        public override Rect TightBounds
+        {
+            get { return bounds; }
+        }
+
+        public override Rect PaddedBounds
+        {
+            get { return bounds; }
+        }
+
+        /// <summary>
+        /// Maximum memory in bytes used by decoded tiles that are kept for reuse.
+        /// </summary>
+        public long CacheCapacity
+        {
+            get { return cache.Capacity; }
+            set { cache.Capacity = value; }
+        }
+
+        /// <summary>
+        /// Cache of decoded tiles, keyed by (level, tile x, tile y).
+        /// </summary>
+        public TileCache<Tuple<int, int, int>, WriteableBitmap> Cache
+        {
+            get { return cache; }
+        }
+
+        /// <summary>
+        /// Pyramid level currently shown (0 is full resolution).
+        /// </summary>
+        public int Level
+        {
+            get { return currentLevel; }
+        }
+
+        /// <summary>
+        /// The colour map must have the number of colours the pyramid was built for (Pyramid.ColourCount).
+        /// </summary>
+        public ColourMap ColourMap
+        {
+            get { return colourMap; }
+            set
+            {
+                if (value.Length != pyramid.ColourCount) throw new ArgumentException("Colour map must have " + pyramid.ColourCount + " colours");
+                colourMap = value;
+                OnColourMapChanged(this, null);
+            }
+        }
+
+        public void OnColourMapChanged(object sender, RoutedEventArgs e)
+        {
+            lookupTable = ColourIndexing.LookupTable(colourMap.ToIntArray(), 255);
+            cache.Clear();
+            RemoveTiles();
+            if (host != null) host.InvalidateArrange();
+        }
+
+        protected override void OnHostChanged(PlotPanel host)
+        {
+            base.OnHostChanged(host);
+            if (this.host != null)
+            {
+                RemoveTiles();
+                try
+                {
+                    this.host.Annotations.Remove(colourBar);
+                    colourBar.ColourMapChanged -= OnColourMapChanged;
+                }
+                catch (Exception)
+                {
+                    // Just swallow any exception
+                }
+            }
+            this.host = host;
+            if (host != null)
+            {
+                host.Annotations.Add(colourBar);
+                colourBar.ColourMapChanged += OnColourMapChanged;
+            }
+        }
+
+        internal override void BeforeArrange()
+        {
+            graphToCanvas.Matrix = Axis2D.GraphToCanvasLinear(xAxis, yAxis).Matrix;
+            if (disposed) RemoveTiles();
+            else UpdateTiles();
+        }
+
+        public void Dispose()
+        {
+            if (disposed) return;
+            disposed = true;
+            RemoveTiles();
+            cache.Clear();
+            pyramid.Dispose();
+        }
+
+        /// <summary>
+        /// Show the tiles that cover the view, at the level closest to screen resolution, and remove the rest.
+        /// </summary>
+        private void UpdateTiles()
+        {
+            Rect view = new Rect(new Point(xAxis.Min, yAxis.Min), new Point(xAxis.Max, yAxis.Max));
+            view.Intersect(bounds);
+            if (view.IsEmpty || bounds.Width <= 0 || bounds.Height <= 0)
+            {
+                RemoveTiles();
+                return;
+            }
+            // Size of a full-resolution pixel in graph units:
+            double pixelWidth = bounds.Width / pyramid.Width(0), pixelHeight = bounds.Height / pyramid.Height(0);
+            double pixelsPerScreenPixel = Math.Max(1 / (pixelWidth * xAxis.Scale), 1 / (pixelHeight * yAxis.Scale));
+            int level = pyramid.ChooseLevel(pixelsPerScreenPixel);
+            currentLevel = level;
+            double tileWidth = pixelWidth * pyramid.TileSize * (1L << level);
+            double tileHeight = pixelHeight * pyramid.TileSize * (1L << level);
+            int tileX0 = Math.Max(0, (int)Math.Floor((view.Left - bounds.Left) / tileWidth));
+            int tileX1 = Math.Min(pyramid.TilesX(level) - 1, (int)Math.Ceiling((view.Right - bounds.Left) / tileWidth) - 1);
+            int tileY0 = Math.Max(0, (int)Math.Floor((view.Top - bounds.Top) / tileHeight));
+            int tileY1 = Math.Min(pyramid.TilesY(level) - 1, (int)Math.Ceiling((view.Bottom - bounds.Top) / tileHeight) - 1);
+            Dictionary<Tuple<int, int, int>, Path> tiles = new Dictionary<Tuple<int, int, int>, Path>();
+            for (int tileY = tileY0; tileY <= tileY1; ++tileY)
+            {
+                for (int tileX = tileX0; tileX <= tileX1; ++tileX)
+                {
+                    Tuple<int, int, int> key = Tuple.Create(level, tileX, tileY);
+                    Path tile;
+                    if (visibleTiles.TryGetValue(key, out tile)) visibleTiles.Remove(key);
+                    else
+                    {
+                        WriteableBitmap bitmap = GetTile(key);
+                        double left = bounds.Left + tileX * tileWidth, bottom = bounds.Top + tileY * tileHeight;
+                        Rect tileBounds = new Rect(left, bottom,
+                            Math.Min(bitmap.PixelWidth * pixelWidth * (1L << level), bounds.Right - left),
+                            Math.Min(bitmap.PixelHeight * pixelHeight * (1L << level), bounds.Bottom - bottom));
+                        tile = new Path() { Data = new RectangleGeometry(tileBounds), Fill = new ImageBrush(bitmap) };
+                        tile.RenderTransform = graphToCanvas;
+                        RenderOptions.SetBitmapScalingMode(tile, BitmapScalingMode.NearestNeighbor);
+                        host.Canvas.Children.Add(tile);
+                    }
+                    tiles.Add(key, tile);
+                }
+            }
+            RemoveTiles();
+            visibleTiles = tiles;
+        }
+
+        /// <summary>
+        /// The decoded tile, from the cache if possible.
+        /// </summary>
+        private WriteableBitmap GetTile(Tuple<int, int, int> key)
+        {
+            WriteableBitmap bitmap;
+            if (cache.TryGetValue(key, out bitmap)) return bitmap;
+            int width, height;
+            pyramid.ReadTile(key.Item1, key.Item2, key.Item3, tileIndices, out width, out height);
+            bitmap = new WriteableBitmap(width, height, 96, 96, PixelFormats.Bgra32, null);
+            bitmap.Lock();
+            ColourIndexing.WriteBgra32(tileIndices, lookupTable, bitmap.BackBuffer, width, height, bitmap.BackBufferStride);
+            bitmap.AddDirtyRect(new Int32Rect(0, 0, width, height));
+            bitmap.Unlock();
+            bitmap.Freeze();
+            cache.Add(key, bitmap, 4L * width * height);
+            return bitmap;
+        }
+
+        private void RemoveTiles()
+        {
+            if (host != null)
+            {
+                foreach (Path tile in visibleTiles.Values) host.Canvas.Children.Remove(tile);
+            }
+            visibleTiles.Clear();
+        }
+    }
+}
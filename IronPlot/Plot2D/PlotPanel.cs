@@ -54,6 +54,21 @@ namespace IronPlot
             typeof(bool), typeof(PlotPanel),
             new PropertyMetadata(false, OnUseDirect2DChanged));
 
+        public static readonly DependencyProperty FastInteractionProperty =
+            DependencyProperty.Register("FastInteraction",
+            typeof(bool), typeof(PlotPanel),
+            new PropertyMetadata(true));
+
+        public static readonly DependencyProperty InteractionSettleTimeProperty =
+            DependencyProperty.Register("InteractionSettleTime",
+            typeof(double), typeof(PlotPanel),
+            new PropertyMetadata(0.15));
+
+        public static readonly DependencyProperty SleepWhenHiddenProperty =
+            DependencyProperty.Register("SleepWhenHidden",
+            typeof(bool), typeof(PlotPanel),
+            new PropertyMetadata(true, OnSleepWhenHiddenChanged));
+
         internal bool UseDirect2D
         {
             set
@@ -121,6 +136,7 @@ namespace IronPlot
             direct2DControl = null;
             //
             if (!(this is ColourBarPanel)) this.AddInteractionEvents();
+            this.AddDormancyEvents();
             this.AddSelectionRectangle();
             this.InitialiseChildenCollection();
             marginChangeTimer = new DispatcherTimer(TimeSpan.FromSeconds(0.0), DispatcherPriority.Normal, marginChangeTimer_Tick, this.Dispatcher);
@@ -128,6 +144,7 @@ namespace IronPlot
 
         Size sizeOnMeasure;
         Size sizeAfterMeasure;
+        Size? measureResult = null;
 
         /// <summary>
         /// For each PlotPanel, place the axes.
@@ -140,6 +157,8 @@ namespace IronPlot
 
         protected override Size MeasureOverride(Size availableSize)
         {
+            // While dormant, keep the last layout unless the space available has changed.
+            if (IsDormant && measureResult != null && availableSize == sizeOnMeasure) return measureResult.Value;
             sizeOnMeasure = availableSize;
             AvailableSize = availableSize;
             var allAxes = Axes.XAxes.Concat(Axes.YAxes);
@@ -166,6 +185,7 @@ namespace IronPlot
             //availableSize.Height = Math.Max(Math.Max(axesRegion.Height + AnnotationsTop.DesiredSize.Height + AnnotationsBottom.DesiredSize.Height, AnnotationsLeft.DesiredSize.Height), AnnotationsRight.DesiredSize.Height);
             //availableSize.Width = Math.Max(Math.Max(axesRegion.Width + AnnotationsLeft.DesiredSize.Width + AnnotationsRight.DesiredSize.Width, AnnotationsTop.DesiredSize.Width), AnnotationsBottom.DesiredSize.Width);
             sizeAfterMeasure = AvailableSize;
+            measureResult = availableSize;
             return availableSize;
         }
 
@@ -186,7 +206,13 @@ namespace IronPlot
 
         protected override Size ArrangeOverride(Size finalSize)
         {
-            //Stopwatch watch = new Stopwatch(); watch.Start();
+            if (IsDormant)
+            {
+                // Nothing is drawn; the panel is laid out again when it wakes.
+                FrameRateCounter.DormantFrame();
+                return finalSize;
+            }
+            RenderMark arrangeStart = RenderProfiler.Start();
             if (!(finalSize == sizeOnMeasure || finalSize == sizeAfterMeasure))
             {
                 // Set legendRegion:
@@ -219,6 +245,8 @@ namespace IronPlot
                 direct2DControl.Arrange(CanvasLocation);
                 direct2DControl.RequestRender();
             }
+            RenderProfiler.Stop(this, RenderStage.PanelArrange, arrangeStart, plotItems.Count, -1);
+            FrameRateCounter.Frame(IsInteracting);
             return finalSize;
         }
 
@@ -47,6 +47,14 @@ namespace IronPlot
                     child.Host = this;
                 }
             }
+            SetAxesRangesFromChildren();
+        }
+
+        /// <summary>
+        /// Set the range of each axis to fit the items that use it.
+        /// </summary>
+        internal void SetAxesRangesFromChildren()
+        {
             var allAxes = Axes.XAxes.Concat(Axes.YAxes);
             foreach (Axis2D axis in allAxes)
             {
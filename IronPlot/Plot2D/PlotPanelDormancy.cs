@@ -0,0 +1,117 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Windows;
+using System.Windows.Controls;
+using System.Windows.Media;
+
+namespace IronPlot
+{
+    public partial class PlotPanel : PlotPanelBase
+    {
+        // A plot that is hidden (e.g. on an unselected tab) or scrolled out of view in a ScrollViewer is
+        // dormant: its items keep no geometry and layout passes skip it, apart from any change of its size.
+        // It is laid out again when it is shown.
+        private bool dormant = false;
+        private List<ScrollViewer> scrollViewers = new List<ScrollViewer>();
+
+        /// <summary>
+        /// Whether the panel is hidden or scrolled out of view, and so not being drawn.
+        /// </summary>
+        internal bool IsDormant
+        {
+            get { return dormant; }
+        }
+
+        protected void AddDormancyEvents()
+        {
+            IsVisibleChanged += new DependencyPropertyChangedEventHandler(PlotPanel_IsVisibleChanged);
+            Loaded += new RoutedEventHandler(PlotPanel_Loaded);
+            Unloaded += new RoutedEventHandler(PlotPanel_Unloaded);
+        }
+
+        protected static void OnSleepWhenHiddenChanged(DependencyObject obj, DependencyPropertyChangedEventArgs e)
+        {
+            ((PlotPanel)obj).UpdateDormancy();
+        }
+
+        void PlotPanel_IsVisibleChanged(object sender, DependencyPropertyChangedEventArgs e)
+        {
+            UpdateDormancy();
+        }
+
+        void PlotPanel_Loaded(object sender, RoutedEventArgs e)
+        {
+            RemoveScrollViewerEvents();
+            DependencyObject parent = VisualTreeHelper.GetParent(this);
+            while (parent != null)
+            {
+                if (parent is ScrollViewer)
+                {
+                    ScrollViewer scrollViewer = (ScrollViewer)parent;
+                    scrollViewer.ScrollChanged += new ScrollChangedEventHandler(scrollViewer_ScrollChanged);
+                    scrollViewers.Add(scrollViewer);
+                }
+                parent = VisualTreeHelper.GetParent(parent);
+            }
+            UpdateDormancy();
+        }
+
+        void PlotPanel_Unloaded(object sender, RoutedEventArgs e)
+        {
+            RemoveScrollViewerEvents();
+        }
+
+        void scrollViewer_ScrollChanged(object sender, ScrollChangedEventArgs e)
+        {
+            UpdateDormancy();
+        }
+
+        private void RemoveScrollViewerEvents()
+        {
+            foreach (ScrollViewer scrollViewer in scrollViewers) scrollViewer.ScrollChanged -= new ScrollChangedEventHandler(scrollViewer_ScrollChanged);
+            scrollViewers.Clear();
+        }
+
+        /// <summary>
+        /// Whether the panel overlaps the visible region of each ScrollViewer that contains it.
+        /// </summary>
+        private bool IsInViewport()
+        {
+            foreach (ScrollViewer scrollViewer in scrollViewers)
+            {
+                if (!scrollViewer.IsAncestorOf(this)) continue;
+                Rect bounds = TransformToAncestor(scrollViewer).TransformBounds(new Rect(RenderSize));
+                if (!bounds.IntersectsWith(new Rect(scrollViewer.RenderSize))) return false;
+            }
+            return true;
+        }
+
+        private void UpdateDormancy()
+        {
+            bool sleep = (bool)GetValue(SleepWhenHiddenProperty) && (!IsVisible || !IsInViewport());
+            if (sleep == dormant) return;
+            if (sleep)
+            {
+                dormant = true;
+                foreach (Plot2DItem item in plotItems) item.ReleaseGeometry();
+            }
+            else Wake();
+        }
+
+        /// <summary>
+        /// Lay out and draw a dormant panel, catching up on changes made while it was dormant. Used when the
+        /// panel is shown, and before it is copied or printed.
+        /// </summary>
+        internal void Wake()
+        {
+            if (!dormant) return;
+            dormant = false;
+            InvalidateMeasure();
+            InvalidateArrange();
+        }
+    }
+}
@@ -36,6 +36,17 @@ namespace IronPlot
         private Point currentPosition;
         DispatcherTimer mousePositionTimer = new DispatcherTimer();
 
+        // While the view is being panned or zoomed, curves move their existing geometry where they can; it is
+        // rebuilt once the view has been still for InteractionSettleTime seconds, or the gesture ends.
+        private bool viewMoving = false;
+        DispatcherTimer settleTimer = new DispatcherTimer();
+        internal FrameRateCounter FrameRateCounter = new FrameRateCounter();
+
+        internal bool IsInteracting
+        {
+            get { return viewMoving && (bool)GetValue(FastInteractionProperty); }
+        }
+
         protected void AddInteractionEvents()
         {
             Canvas.MouseLeftButtonUp += new MouseButtonEventHandler(LeftClickEnd);
@@ -48,6 +59,7 @@ namespace IronPlot
 
             mousePositionTimer.Interval = TimeSpan.FromSeconds(0.05);
             mousePositionTimer.Tick += new EventHandler(mousePositionTimer_Tick);
+            settleTimer.Tick += new EventHandler(settleTimer_Tick);
         }
 
         internal void AddAxisInteractionEvents(IEnumerable<Axis2D> axes)
@@ -148,6 +160,7 @@ namespace IronPlot
                 (mouseDragCurrentPoint.X - mouseDragStartPoint.X),
                 (mouseDragCurrentPoint.Y - mouseDragStartPoint.Y));
 
+            ViewMoved();
             int index = 0;
             foreach (Axis2D axis in axesBeingDragged)
             {
@@ -169,6 +182,7 @@ namespace IronPlot
             {
                 this.Cursor = Cursors.Arrow;
                 dragging = false;
+                ViewSettled();
                 marginChangeTimer.Interval = TimeSpan.FromSeconds(0.2);
                 marginChangeTimer.Start();
             }
@@ -236,6 +250,7 @@ namespace IronPlot
             Point canvasPosition = e.GetPosition(Canvas);
             double factor = Math.Pow(1.4, delta);
             //
+            ViewMoved();
             List<Axis2D> zoomAxes;
             if (isSingleAxis) zoomAxes = new List<Axis2D>() { sender as Axis2D };
             else zoomAxes = Axes.XAxes.Concat(Axes.YAxes).ToList();
@@ -274,6 +289,50 @@ namespace IronPlot
             }
         }
 
+        // Plots with linked axes (see LinkedAxes) pan and zoom together, so they start and finish
+        // interacting together.
+        private void ViewMoved()
+        {
+            foreach (PlotPanel panel in LinkedPlotPanels()) panel.StartViewMoving();
+        }
+
+        private void ViewSettled()
+        {
+            foreach (PlotPanel panel in LinkedPlotPanels()) panel.EndViewMoving();
+        }
+
+        /// <summary>
+        /// This panel and the panels with axes linked to its axes.
+        /// </summary>
+        private IEnumerable<PlotPanel> LinkedPlotPanels()
+        {
+            return new PlotPanel[] { this }.Concat(Axes.XAxes.Concat(Axes.YAxes)
+                .Where(t => t.LinkedAxes != null).SelectMany(t => t.LinkedAxes.PlotPanels)).Distinct();
+        }
+
+        private void StartViewMoving()
+        {
+            viewMoving = true;
+            settleTimer.Stop();
+            settleTimer.Interval = TimeSpan.FromSeconds((double)GetValue(InteractionSettleTimeProperty));
+            settleTimer.Start();
+        }
+
+        private void EndViewMoving()
+        {
+            settleTimer.Stop();
+            if (!viewMoving) return;
+            viewMoving = false;
+            FrameRateCounter.GestureEnded();
+            // Rebuild geometry for the final view:
+            InvalidateArrange();
+        }
+
+        void settleTimer_Tick(object sender, EventArgs e)
+        {
+            ViewSettled();
+        }
+
         protected void marginChangeTimer_Tick(Object sender, EventArgs e)
         {
             marginChangeTimer.Stop();
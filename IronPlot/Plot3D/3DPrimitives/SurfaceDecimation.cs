@@ -0,0 +1,238 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot.Plotting3D
+{
+    /// <summary>
+    /// Error-bounded decimation of a surface on a regular grid of lengthU by lengthV samples
+    /// (z[v * lengthU + u]), for drawing large surfaces.
+    /// The grid is covered by a quadtree of nodes (squares of 2^k cells aligned to multiples of 2^k, clipped at the
+    /// edges of the grid); a node becomes a leaf once it can be drawn as two triangles to within the tolerance.
+    /// A leaf's edges also take the corners of smaller neighbouring leaves that lie on them, so the mesh has no cracks,
+    /// and the tolerance allows for this: the vertical error of every sample is at most the tolerance.
+    /// Errors are measured in grid index space, which is the vertical error for evenly spaced x and y.
+    /// Level k has tolerance (range of z) / 2^k, except the last level, which has every sample.
+    /// </summary>
+    public class SurfaceDecimation
+    {
+        public const int DefaultLevels = 17;
+
+        double[] z;
+        int lengthU, lengthV, levels;
+        double range;
+        Dictionary<int, Tuple<int[], int[]>> meshes = new Dictionary<int, Tuple<int[], int[]>>();
+
+        public SurfaceDecimation(double[] z, int lengthU, int lengthV) : this(z, lengthU, lengthV, DefaultLevels) { }
+
+        public SurfaceDecimation(double[] z, int lengthU, int lengthV, int levels)
+        {
+            if (z.Length != lengthU * lengthV) throw new ArgumentException("Length of z must be lengthU * lengthV");
+            if (lengthU < 2 || lengthV < 2) throw new ArgumentException("Surface must have at least two rows and two columns");
+            this.z = z; this.lengthU = lengthU; this.lengthV = lengthV; this.levels = levels;
+            double min = double.PositiveInfinity, max = double.NegativeInfinity;
+            foreach (double value in z)
+            {
+                if (double.IsNaN(value) || double.IsInfinity(value)) continue;
+                if (value < min) min = value;
+                if (value > max) max = value;
+            }
+            range = max >= min ? max - min : 0;
+        }
+
+        public int Levels
+        {
+            get { return levels; }
+        }
+
+        public double Tolerance(int level)
+        {
+            return level >= levels - 1 ? 0 : range * Math.Pow(0.5, level);
+        }
+
+        /// <summary>
+        /// The coarsest level whose vertical error is at most pixelTolerance screen pixels,
+        /// where a unit of z is pixelsPerUnit pixels on screen.
+        /// </summary>
+        public int ChooseLevel(double pixelsPerUnit, double pixelTolerance)
+        {
+            double target = pixelTolerance / pixelsPerUnit;
+            int level = 0;
+            while (level < levels - 1 && Tolerance(level) > target) level++;
+            return level;
+        }
+
+        /// <summary>
+        /// The mesh of a level, as for Decimate. Meshes are made when first asked for and kept.
+        /// </summary>
+        public void Mesh(int level, out int[] vertices, out int[] triangles)
+        {
+            Tuple<int[], int[]> mesh;
+            lock (meshes)
+            {
+                if (!meshes.TryGetValue(level, out mesh))
+                {
+                    Decimate(z, lengthU, lengthV, Tolerance(level), out vertices, out triangles);
+                    mesh = Tuple.Create(vertices, triangles);
+                    meshes.Add(level, mesh);
+                }
+            }
+            vertices = mesh.Item1; triangles = mesh.Item2;
+        }
+
+        /// <summary>
+        /// Decimated mesh of z with vertical error at most tolerance (0 gives every sample).
+        /// vertices are the indices in z of the vertices used, ascending; triangles holds three indices into vertices
+        /// for each triangle, wound as in SurfaceModel3D.
+        /// </summary>
+        public static void Decimate(double[] z, int lengthU, int lengthV, double tolerance, out int[] vertices, out int[] triangles)
+        {
+            List<int[]> leaves = Leaves(z, lengthU, lengthV, tolerance);
+            bool[] isVertex = new bool[z.Length];
+            foreach (int[] leaf in leaves)
+            {
+                isVertex[leaf[1] * lengthU + leaf[0]] = true; isVertex[leaf[1] * lengthU + leaf[2]] = true;
+                isVertex[leaf[3] * lengthU + leaf[2]] = true; isVertex[leaf[3] * lengthU + leaf[0]] = true;
+            }
+            int[] vertexIndex = new int[z.Length];
+            List<int> vertexList = new List<int>();
+            for (int i = 0; i < z.Length; ++i)
+            {
+                if (isVertex[i])
+                {
+                    vertexIndex[i] = vertexList.Count;
+                    vertexList.Add(i);
+                }
+            }
+            List<int> triangleList = new List<int>();
+            List<int> chainA = new List<int>(), chainB = new List<int>();
+            foreach (int[] leaf in leaves)
+            {
+                int i0 = leaf[0], j0 = leaf[1], i1 = leaf[2], j1 = leaf[3];
+                int p1 = j0 * lengthU + i0, p2 = j0 * lengthU + i1, p3 = j1 * lengthU + i1, p4 = j1 * lengthU + i0;
+                // Each leaf is two triangles split by the diagonal p1-p3; the vertices on their edges are fanned in.
+                Chain(isVertex, p1, p2, 1, chainA);
+                Chain(isVertex, p2, p3, lengthU, chainB);
+                Fan(p3, chainA, chainB, vertexIndex, triangleList);
+                Chain(isVertex, p3, p4, -1, chainA);
+                Chain(isVertex, p4, p1, -lengthU, chainB);
+                Fan(p1, chainA, chainB, vertexIndex, triangleList);
+            }
+            vertices = vertexList.ToArray();
+            triangles = triangleList.ToArray();
+        }
+
+        /// <summary>
+        /// (i0, j0, i1, j1) of the leaves of the quadtree. A node is a leaf if the error of its samples plus the error
+        /// of its boundary samples is within tolerance: boundary samples that become vertices (corners of neighbouring
+        /// leaves) move the surface by at most the latter.
+        /// </summary>
+        private static List<int[]> Leaves(double[] z, int lengthU, int lengthV, double tolerance)
+        {
+            int size = 1;
+            while (size < Math.Max(lengthU, lengthV) - 1) size *= 2;
+            List<int[]> leaves = new List<int[]>();
+            List<int[]> nodes = new List<int[]>() { new int[] { 0, 0, Math.Min(size, lengthU - 1), Math.Min(size, lengthV - 1) } };
+            while (nodes.Count > 0)
+            {
+                bool[] split = new bool[nodes.Count];
+                if (size > 1)
+                {
+                    Parallel.For(0, nodes.Count, k =>
+                    {
+                        double interior, boundary;
+                        NodeErrors(z, lengthU, nodes[k], out interior, out boundary);
+                        // NaN errors split down to single cells:
+                        split[k] = !(interior + boundary <= tolerance);
+                    });
+                }
+                size /= 2;
+                List<int[]> children = new List<int[]>();
+                for (int k = 0; k < nodes.Count; ++k)
+                {
+                    int[] node = nodes[k];
+                    if (!split[k])
+                    {
+                        leaves.Add(node);
+                        continue;
+                    }
+                    for (int j = node[1]; j < node[3]; j += size)
+                    {
+                        for (int i = node[0]; i < node[2]; i += size)
+                        {
+                            children.Add(new int[] { i, j, Math.Min(i + size, node[2]), Math.Min(j + size, node[3]) });
+                        }
+                    }
+                }
+                nodes = children;
+            }
+            return leaves;
+        }
+
+        /// <summary>
+        /// Largest vertical error of the samples of a node, and of the samples on its boundary, when it is drawn as
+        /// the two triangles (i0, j0), (i1, j0), (i1, j1) and (i1, j1), (i0, j1), (i0, j0).
+        /// </summary>
+        private static void NodeErrors(double[] z, int lengthU, int[] node, out double interior, out double boundary)
+        {
+            int i0 = node[0], j0 = node[1], i1 = node[2], j1 = node[3];
+            double z1 = z[j0 * lengthU + i0], z2 = z[j0 * lengthU + i1], z3 = z[j1 * lengthU + i1], z4 = z[j1 * lengthU + i0];
+            double width = i1 - i0, height = j1 - j0;
+            interior = 0; boundary = 0;
+            for (int j = j0; j <= j1; ++j)
+            {
+                double fv = (j - j0) / height;
+                bool edgeRow = j == j0 || j == j1;
+                int index = j * lengthU + i0;
+                for (int i = i0; i <= i1; ++i, ++index)
+                {
+                    double fu = (i - i0) / width;
+                    double surface = fu >= fv ? z1 + fu * (z2 - z1) + fv * (z3 - z2) : z1 + fv * (z4 - z1) + fu * (z3 - z4);
+                    double error = Math.Abs(z[index] - surface);
+                    if (double.IsNaN(error))
+                    {
+                        interior = boundary = double.NaN;
+                        return;
+                    }
+                    if (error > interior) interior = error;
+                    if ((edgeRow || i == i0 || i == i1) && error > boundary) boundary = error;
+                }
+            }
+        }
+
+        /// <summary>
+        /// The vertices along the edge from first to last, taking steps of step.
+        /// </summary>
+        private static void Chain(bool[] isVertex, int first, int last, int step, List<int> chain)
+        {
+            chain.Clear();
+            chain.Add(first);
+            for (int i = first + step; i != last; i += step)
+            {
+                if (isVertex[i]) chain.Add(i);
+            }
+            chain.Add(last);
+        }
+
+        /// <summary>
+        /// Triangulate the triangle (chainA[0], chainB[0], apex) with the vertices of its two edges chainA and chainB:
+        /// apex is fanned to all but the last step of chainA, and the last vertex before chainB to chainB.
+        /// </summary>
+        private static void Fan(int apex, List<int> chainA, List<int> chainB, int[] vertexIndex, List<int> triangles)
+        {
+            for (int k = 0; k < chainA.Count - 2; ++k)
+            {
+                triangles.Add(vertexIndex[apex]); triangles.Add(vertexIndex[chainA[k + 1]]); triangles.Add(vertexIndex[chainA[k]]);
+            }
+            int pivot = chainA[chainA.Count - 2];
+            for (int k = 0; k < chainB.Count - 1; ++k)
+            {
+                triangles.Add(vertexIndex[pivot]); triangles.Add(vertexIndex[chainB[k + 1]]); triangles.Add(vertexIndex[chainB[k]]);
+            }
+        }
+    }
+}
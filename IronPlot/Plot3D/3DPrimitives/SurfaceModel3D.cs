@@ -50,6 +50,23 @@ namespace IronPlot.Plotting3D
         protected UInt16[] colourMapIndices;
         protected List<SharpDX.Direct3D9.Light> lights;
 
+        // Level of detail: when decimation is not null, the surface is drawn as the triangles meshTriangles
+        // (indices into meshVertices, which are indices of modelVertices) of level lodLevel.
+        SurfaceDecimation decimation;
+        int[] meshVertices, meshTriangles;
+        int lodLevel = -1;
+        bool lodUpdateInProgress = false;
+
+        /// <summary>
+        /// Grids with at least this many samples are drawn with LevelOfDetail on by default.
+        /// </summary>
+        public static int LevelOfDetailThreshold = 1000000;
+
+        /// <summary>
+        /// Until the surface is first drawn, the range of z is assumed to span this many pixels.
+        /// </summary>
+        const double initialPixels = 500;
+
         private static readonly DependencyProperty SurfaceShadingProperty =
             DependencyProperty.Register("SurfaceShading",
             typeof(SurfaceShading),
@@ -68,6 +85,18 @@ namespace IronPlot.Plotting3D
             typeof(SurfaceModel3D),
             new PropertyMetadata((byte)0, OnTransparencyChanged));
 
+        private static readonly DependencyProperty LevelOfDetailProperty =
+            DependencyProperty.Register("LevelOfDetail",
+            typeof(bool),
+            typeof(SurfaceModel3D),
+            new PropertyMetadata(false, OnLevelOfDetailChanged));
+
+        private static readonly DependencyProperty LevelOfDetailToleranceProperty =
+            DependencyProperty.Register("LevelOfDetailTolerance",
+            typeof(double),
+            typeof(SurfaceModel3D),
+            new PropertyMetadata(1.0, OnLevelOfDetailToleranceChanged));
+
         public List<SharpDX.Direct3D9.Light> Lights
         {
             get 
@@ -97,6 +126,41 @@ namespace IronPlot.Plotting3D
             set { SetValue(TransparencyProperty, value); }
             get { return (byte)GetValue(TransparencyProperty); }
         }
+
+        /// <summary>
+        /// If true, the surface is drawn as a decimated mesh (see SurfaceDecimation) whose vertical error
+        /// on screen is at most LevelOfDetailTolerance pixels. The mesh is refined as the view zooms in.
+        /// </summary>
+        public bool LevelOfDetail
+        {
+            set { SetValue(LevelOfDetailProperty, value); }
+            get { return (bool)GetValue(LevelOfDetailProperty); }
+        }
+
+        /// <summary>
+        /// Largest vertical error, in pixels, of the decimated mesh drawn when LevelOfDetail is true.
+        /// </summary>
+        public double LevelOfDetailTolerance
+        {
+            set { SetValue(LevelOfDetailToleranceProperty, value); }
+            get { return (double)GetValue(LevelOfDetailToleranceProperty); }
+        }
+
+        /// <summary>
+        /// Level of the decimated mesh currently drawn, or -1 if LevelOfDetail is false.
+        /// </summary>
+        public int Level
+        {
+            get { return lodLevel; }
+        }
+
+        /// <summary>
+        /// The decimated meshes of the surface, or null if LevelOfDetail is false.
+        /// </summary>
+        public SurfaceDecimation Decimation
+        {
+            get { return decimation; }
+        }
         
         static void OnSurfaceShadingChanged(DependencyObject obj, DependencyPropertyChangedEventArgs args)
         {
@@ -121,6 +185,39 @@ namespace IronPlot.Plotting3D
             surface.RequestRender(EventArgs.Empty);
         }
 
+        static void OnLevelOfDetailChanged(DependencyObject obj, DependencyPropertyChangedEventArgs args)
+        {
+            SurfaceModel3D surface = obj as SurfaceModel3D;
+            if (surface.modelVertices == null) return;
+            lock (surface.updateLocker)
+            {
+                if ((bool)args.NewValue)
+                {
+                    surface.decimation = new SurfaceDecimation(surface.modelVertices.Select(p => p.Z).ToArray(), surface.lengthU, surface.lengthV);
+                    double range = surface.bounds.Maximum.Z - surface.bounds.Minimum.Z;
+                    surface.SetMeshLevel(surface.decimation.ChooseLevel(initialPixels / range, surface.LevelOfDetailTolerance));
+                }
+                else
+                {
+                    surface.decimation = null;
+                    surface.meshVertices = null; surface.meshTriangles = null;
+                    surface.lodLevel = -1;
+                }
+            }
+            // Otherwise still being constructed:
+            if (surface.vertices == null) return;
+            surface.CreateVertsAndInds();
+            surface.SetColorFromIndices();
+            surface.RecreateBuffers();
+            surface.RequestRender(EventArgs.Empty);
+        }
+
+        static void OnLevelOfDetailToleranceChanged(DependencyObject obj, DependencyPropertyChangedEventArgs args)
+        {
+            SurfaceModel3D surface = obj as SurfaceModel3D;
+            surface.RequestRender(EventArgs.Empty);
+        }
+
         protected override void OnModelToWorldChanged()
         {
             TransformVertsAndInds();
@@ -259,6 +356,7 @@ namespace IronPlot.Plotting3D
             bounds = new Cuboid(x.Min(), y.Min(), z.Min(), x.Max(), y.Max(), z.Max());
             Cuboid modelBounds = new Cuboid(new System.Windows.Media.Media3D.Point3D(-10, -10, -10), new System.Windows.Media.Media3D.Point3D(10, 10, 10));
             UpdateModelVertices(x, y, z, xLength, yLength);
+            if (xLength * yLength >= LevelOfDetailThreshold) LevelOfDetail = true;
             CreateVertsAndInds();
             colourMap = new ColourMap(ColourMapType.HSV, 256);
             colourMapIndices = FalseColourImage.IEnumerableToIndexArray(z, xLength, yLength, 256);
@@ -329,11 +427,8 @@ namespace IronPlot.Plotting3D
 
         private void UpdateColours(object state)
         {
-            lock (updateLocker)
-            {
-                SetColorFromIndices();
-                RecreateBuffers();
-            }
+            SetColorFromIndices();
+            RecreateBuffers();
             Dispatcher.BeginInvoke(new Action(delegate()
             {
                 RequestRender(EventArgs.Empty);
@@ -343,7 +438,11 @@ namespace IronPlot.Plotting3D
 
         protected void CreateVertsAndInds()
         {
-            if (SurfaceShading == SurfaceShading.Smooth)
+            if (decimation != null)
+            {
+                UpdateVertsAndIndsMesh(ModelToWorld.Value, SurfaceShading, false, false);
+            }
+            else if (SurfaceShading == SurfaceShading.Smooth)
             {
                 int newVerticesLength = lengthU * lengthV * 2; // assume two-sided
                 int newIndicesLength = 2 * 6 * (lengthU - 1) * (lengthV - 1);
@@ -403,7 +502,11 @@ namespace IronPlot.Plotting3D
 
         protected void TransformVertsAndInds()
         {
-            if (SurfaceShading == SurfaceShading.Smooth)
+            if (decimation != null)
+            {
+                UpdateVertsAndIndsMesh(ModelToWorld.Value, SurfaceShading, true, false);
+            }
+            else if (SurfaceShading == SurfaceShading.Smooth)
             {
                 UpdateVertsAndIndsSmooth(true, false);
             }
@@ -439,6 +542,81 @@ namespace IronPlot.Plotting3D
         {
         }
 
+        private void SetMeshLevel(int level)
+        {
+            decimation.Mesh(level, out meshVertices, out meshTriangles);
+            lodLevel = level;
+        }
+
+        /// <summary>
+        /// Number of pixels on screen spanned by a unit of z, at the point of the surface's bounds nearest the camera.
+        /// </summary>
+        private double PixelsPerUnit()
+        {
+            Matrix3D modelToWorld = ModelToWorld.Value;
+            double worldPerUnit = modelToWorld.Transform(new Vector3D(0, 0, 1)).Length;
+            SharpDX.Matrix projection = viewportImage.Projection;
+            double pixelsPerWorld = projection.M22 * graphicsDevice.Viewport.Height / 2.0;
+            if (projection.M34 != 0)
+            {
+                // Perspective: divide by the distance in front of the camera.
+                SharpDX.Matrix view = viewportImage.View;
+                double depth = double.MaxValue;
+                for (int corner = 0; corner < 8; ++corner)
+                {
+                    Point3D point = modelToWorld.Transform(new Point3D(
+                        (corner & 1) == 0 ? bounds.Minimum.X : bounds.Maximum.X,
+                        (corner & 2) == 0 ? bounds.Minimum.Y : bounds.Maximum.Y,
+                        (corner & 4) == 0 ? bounds.Minimum.Z : bounds.Maximum.Z));
+                    Vector3 camera = Vector3.TransformCoordinate(new Vector3((float)point.X, (float)point.Y, (float)point.Z), view);
+                    depth = Math.Min(depth, -camera.Z);
+                }
+                pixelsPerWorld /= Math.Max(depth, 0.01);
+            }
+            return worldPerUnit * pixelsPerWorld;
+        }
+
+        /// <summary>
+        /// Start making the mesh of the level that suits the current view, if it is not the one drawn.
+        /// The current mesh is drawn until the new one is ready.
+        /// </summary>
+        private void CheckLevelOfDetail()
+        {
+            if (decimation == null || lodUpdateInProgress || viewportImage == null) return;
+            int level = decimation.ChooseLevel(PixelsPerUnit(), LevelOfDetailTolerance);
+            if (level == lodLevel) return;
+            lodUpdateInProgress = true;
+            ThreadPool.QueueUserWorkItem(new WaitCallback(UpdateLevelOfDetail),
+                Tuple.Create(level, SurfaceShading, (byte)(255 - Transparency), ModelToWorld.Value));
+        }
+
+        private void UpdateLevelOfDetail(object state)
+        {
+            Tuple<int, SurfaceShading, byte, Matrix3D> update = (Tuple<int, SurfaceShading, byte, Matrix3D>)state;
+            SurfaceDecimation current = decimation;
+            if (current != null)
+            {
+                int[] newVertices, newTriangles;
+                current.Mesh(update.Item1, out newVertices, out newTriangles);
+                lock (updateLocker)
+                {
+                    if (decimation == current)
+                    {
+                        meshVertices = newVertices; meshTriangles = newTriangles;
+                        lodLevel = update.Item1;
+                        UpdateVertsAndIndsMesh(update.Item4, update.Item2, false, false);
+                        SetColorFromIndices(update.Item2, update.Item3);
+                        RecreateBuffers();
+                    }
+                }
+            }
+            Dispatcher.BeginInvoke(new Action(delegate()
+            {
+                lodUpdateInProgress = false;
+                RequestRender(EventArgs.Empty);
+            }));
+        }
+
         /// <summary>
         /// Draws the primitive model, using the specified effect. Unlike the other
         /// Draw overload where you just specify the world/view/projection matrices
@@ -447,8 +625,20 @@ namespace IronPlot.Plotting3D
         /// </summary>
         public override void Draw()
         {
+            RenderMark drawStart = RenderProfiler.Start();
             base.Draw();
+            CheckLevelOfDetail();
+            lock (updateLocker)
+            {
+                DrawBuffers();
+            }
+            // Points in and out are the vertices and triangles drawn:
+            RenderProfiler.Stop(viewportImage != null ? (object)viewportImage.ViewPort3D : this, RenderStage.SurfaceDraw, drawStart,
+                vertexBufferLength, indexBufferLength / 3);
+        }
 
+        private void DrawBuffers()
+        {
             if (vertexBuffer == null || indexBuffer == null) return;
 
             graphicsDevice.SetRenderState(RenderState.SpecularEnable, true);
@@ -479,7 +669,7 @@ namespace IronPlot.Plotting3D
             graphicsDevice.SetRenderState(RenderState.DestinationBlend, Blend.InverseSourceAlpha);
             graphicsDevice.SetRenderState(RenderState.SeparateAlphaBlendEnable, false);
             graphicsDevice.SetRenderState(RenderState.CullMode, Cull.Counterclockwise);
-            int primitiveCount = indices.Length / 3;
+            int primitiveCount = indexBufferLength / 3;
 
             graphicsDevice.SetRenderState(RenderState.Lighting, true);
 
@@ -492,7 +682,7 @@ namespace IronPlot.Plotting3D
                 graphicsDevice.SetRenderState(RenderState.FillMode, FillMode.Wireframe);
                 if (MeshLines == MeshLines.Triangles)
                 {
-                    graphicsDevice.DrawIndexedPrimitive(PrimitiveType.TriangleList, 0, 0, vertices.Length, 0, primitiveCount);
+                    graphicsDevice.DrawIndexedPrimitive(PrimitiveType.TriangleList, 0, 0, vertexBufferLength, 0, primitiveCount);
                 }
                 //else graphicsDevice.DrawIndexedPrimitives(PrimitiveType.LineStrip, 0, 0, vertices.Length, 0, 1);
             }
@@ -503,7 +693,7 @@ namespace IronPlot.Plotting3D
                 graphicsDevice.SetRenderState(RenderState.DiffuseMaterialSource, ColorSource.Color1);
                 graphicsDevice.SetRenderState(RenderState.SpecularMaterialSource, ColorSource.Color1);
                 graphicsDevice.SetRenderState(RenderState.FillMode, FillMode.Solid);
-                graphicsDevice.DrawIndexedPrimitive(PrimitiveType.TriangleList, 0, 0, vertices.Length, 0, primitiveCount);
+                graphicsDevice.DrawIndexedPrimitive(PrimitiveType.TriangleList, 0, 0, vertexBufferLength, 0, primitiveCount);
             }
         }
 
@@ -256,25 +256,137 @@ namespace IronPlot.Plotting3D
             }
         }
 
-        protected void SetColorFromIndices()
+        /// <summary>
+        /// Vertices and indices of the decimated mesh (meshVertices and meshTriangles), two-sided.
+        /// Smooth shading shares vertices between triangles; otherwise each triangle has its own three vertices.
+        /// </summary>
+        protected void UpdateVertsAndIndsMesh(Matrix3D modelToWorld, SurfaceShading surfaceShading, bool updateVerticesOnly, bool oneSided)
         {
             lock (updateLocker)
             {
-                SurfaceShading surfaceShading = SurfaceShading.Smooth;
-                byte opacity = 255;
-                Dispatcher.Invoke(new Action(delegate()
+                int triangleCount = meshTriangles.Length / 3;
+                int numVertices = surfaceShading == SurfaceShading.Smooth ? 2 * meshVertices.Length : 3 * triangleCount;
+                if (vertices == null || vertices.Length != numVertices)
+                {
+                    vertices = new VertexPositionNormalColor[numVertices];
+                    updateVerticesOnly = false;
+                }
+                if (indices == null || indices.Length != 6 * triangleCount)
+                {
+                    indices = new int[6 * triangleCount];
+                    updateVerticesOnly = false;
+                }
+                Vector3[] positions = new Vector3[meshVertices.Length];
+                for (int i = 0; i < meshVertices.Length; ++i)
+                {
+                    Point3D worldPoint = modelToWorld.Transform(modelVertices[meshVertices[i]]);
+                    positions[i] = new Vector3((float)worldPoint.X, (float)worldPoint.Y, (float)worldPoint.Z);
+                }
+                int reverseSideOffset = 3 * triangleCount;
+                if (surfaceShading == SurfaceShading.Smooth)
                 {
-                    surfaceShading = SurfaceShading;
-                    opacity = (byte)(255 - (byte)GetValue(TransparencyProperty));
-                }));
+                    int indexOff = meshVertices.Length;
+                    for (int i = 0; i < indexOff; ++i)
+                    {
+                        vertices[i].Position = positions[i];
+                        vertices[i].Normal = new Vector3(0f, 0f, 0f);
+                    }
+                    if (!updateVerticesOnly)
+                    {
+                        for (int i = 0; i < reverseSideOffset; i += 3)
+                        {
+                            indices[i] = meshTriangles[i];
+                            indices[i + 1] = meshTriangles[i + 1];
+                            indices[i + 2] = meshTriangles[i + 2];
+                            indices[i + reverseSideOffset] = indexOff + meshTriangles[i + 2];
+                            indices[i + 1 + reverseSideOffset] = indexOff + meshTriangles[i + 1];
+                            indices[i + 2 + reverseSideOffset] = indexOff + meshTriangles[i];
+                        }
+                    }
+                    // Go through triangles and add normal to all vertices
+                    Vector3 normal;
+                    for (int i = 0; i < reverseSideOffset; i += 3)
+                    {
+                        Vector3 vec1, vec2;
+                        vec1 = positions[meshTriangles[i + 2]] - positions[meshTriangles[i + 1]];
+                        vec2 = positions[meshTriangles[i + 2]] - positions[meshTriangles[i]];
+                        normal = Vector3.Cross(vec1, vec2);
+                        normal.Normalize();
+                        vertices[meshTriangles[i]].Normal += normal;
+                        vertices[meshTriangles[i + 1]].Normal += normal;
+                        vertices[meshTriangles[i + 2]].Normal += normal;
+                    }
+                    for (int i = 0; i < indexOff; ++i)
+                    {
+                        vertices[i + indexOff].Position = vertices[i].Position;
+                        vertices[i + indexOff].Normal = -vertices[i].Normal;
+                    }
+                }
+                else
+                {
+                    for (int i = 0; i < reverseSideOffset; i += 3)
+                    {
+                        Vector3 point1 = positions[meshTriangles[i]], point2 = positions[meshTriangles[i + 1]], point3 = positions[meshTriangles[i + 2]];
+                        Vector3 normal = Vector3.Cross(point3 - point2, point3 - point1);
+                        vertices[i].Position = point1; vertices[i].Normal = normal;
+                        vertices[i + 1].Position = point2; vertices[i + 1].Normal = normal;
+                        vertices[i + 2].Position = point3; vertices[i + 2].Normal = normal;
+                    }
+                    if (!updateVerticesOnly)
+                    {
+                        for (int i = 0; i < reverseSideOffset; i += 3)
+                        {
+                            indices[i] = i; indices[i + 1] = i + 1; indices[i + 2] = i + 2;
+                            indices[i + reverseSideOffset] = i + 2;
+                            indices[i + 1 + reverseSideOffset] = i + 1;
+                            indices[i + 2 + reverseSideOffset] = i;
+                        }
+                    }
+                }
+            }
+        }
+
+        protected void SetColorFromIndices()
+        {
+            // Read the properties before taking the lock: Draw takes it on the UI thread.
+            SurfaceShading surfaceShading = SurfaceShading.Smooth;
+            byte opacity = 255;
+            Dispatcher.Invoke(new Action(delegate()
+            {
+                surfaceShading = SurfaceShading;
+                opacity = (byte)(255 - (byte)GetValue(TransparencyProperty));
+            }));
+            lock (updateLocker)
+            {
                 SetColorFromIndices(surfaceShading, opacity);
             }
         }
 
         protected void SetColorFromIndices(SurfaceShading surfaceShading, byte opacity)
         {
-            int[] cmap = colourMap.ToIntArray();
-            if (surfaceShading == SurfaceShading.Smooth)
+            // Masked (NaN) indices take the extra, black, entry of the lookup table.
+            int[] cmap = ColourIndexing.LookupTable(colourMap.ToIntArray(), 0);
+            if (meshVertices != null)
+            {
+                if (surfaceShading == SurfaceShading.Smooth)
+                {
+                    int indexOff = meshVertices.Length;
+                    for (int i = 0; i < indexOff; ++i)
+                    {
+                        int colour = (opacity << 24) | cmap[colourMapIndices[meshVertices[i]]];
+                        vertices[i].Color = colour;
+                        vertices[i + indexOff].Color = colour;
+                    }
+                }
+                else
+                {
+                    for (int i = 0; i < meshTriangles.Length; ++i)
+                    {
+                        vertices[i].Color = (opacity << 24) | cmap[colourMapIndices[meshVertices[meshTriangles[i]]]];
+                    }
+                }
+            }
+            else if (surfaceShading == SurfaceShading.Smooth)
             {
                 int index = 0;
                 int indexOff = colourMapIndices.Length;
@@ -163,76 +163,134 @@ namespace IronPlot
                 dimensions[i] = (int)dynamicArray.Dims[i];
                 length *= dimensions[i];
             }
-
-            // Treat double precision data as special case and keep everything fast.
-            if (dynamicArray.dtype.name == "float64")
+            if (dimensions.Length != 1 && dimensions.Length != 2)
             {
-                try
-                {
-                    // If necessary get a contiguous, C-type double precision array:
-                    if (!dynamicArray.flags.contiguous)
-                    {
-                        newArray = dynamicArray.copy("C");
-                    }
-                }
-                catch (Exception)
-                {
-                    throw new Exception("Failed to change input array into contiguous array.");
-                }
-                IntPtr start;
-                if (newArray == null) start = dynamicArray.UnsafeAddress;
-                else start = newArray.UnsafeAddress;
+                throw new Exception("Array must be one or two dimensionsal.");
+            }
 
-                if (dimensions.Length == 1)
-                {
-                    managedArray = new double[dimensions[0]];
-                    fixed (double* newArrayPointer = (double[])managedArray)
-                    {
-                        double* currentPosition = newArrayPointer;
-                        double* numpyPointer = (double*)start;
-                        double* endPointer = newArrayPointer + length;
-                        while (currentPosition != endPointer)
-                        {
-                            *currentPosition = *numpyPointer;
-                            currentPosition++;
-                            numpyPointer++;
-                        }
-                    }
-                }
-                else if (dimensions.Length == 2)
+            // Everything is brought into a contiguous, C-type double precision array by NumPy in one bulk step
+            // (a cast and/or copy for other dtypes or strided views) and then block-copied: there is no per-element
+            // call back into Python.
+            try
+            {
+                if (dynamicArray.dtype.name != "float64")
                 {
-                    managedArray = new double[dimensions[0], dimensions[1]];
-                    fixed (double* newArrayPointer = (double[,])managedArray)
-                    {
-                        double* currentPosition = newArrayPointer;
-                        double* numpyPointer = (double*)start;
-                        double* endPointer = newArrayPointer + length;
-                        while (currentPosition != endPointer)
-                        {
-                            *currentPosition = *numpyPointer;
-                            currentPosition++;
-                            numpyPointer++;
-                        }
-                    }
+                    newArray = dynamicArray.astype("float64");
+                    if (!newArray.flags.contiguous) newArray = newArray.copy("C");
                 }
-                else
+                else if (!dynamicArray.flags.contiguous)
                 {
-                    throw new Exception("Array must be one or two dimensionsal.");
+                    newArray = dynamicArray.copy("C");
                 }
-                if (newArray != null) newArray.Dispose();
             }
-            else
+            catch (Exception)
             {
+                newArray = null;
                 managedArray = Array.CreateInstance(typeof(double), dimensions);
                 IndexEnumerator enumerator = new IndexEnumerator(dimensions);
                 while (enumerator.MoveNext())
                 {
-                    managedArray.SetValue(dynamicArray.item(enumerator.CurrentObjectIndices), enumerator.CurrentIndices);
+                    managedArray.SetValue(Convert.ToDouble(dynamicArray.item(enumerator.CurrentObjectIndices)), enumerator.CurrentIndices);
                 }
+                return managedArray;
+            }
+            IntPtr start;
+            if (newArray == null) start = dynamicArray.UnsafeAddress;
+            else start = newArray.UnsafeAddress;
+
+            if (dimensions.Length == 1)
+            {
+                managedArray = new double[dimensions[0]];
+                if (length > 0) Marshal.Copy(start, (double[])managedArray, 0, length);
             }
+            else
+            {
+                managedArray = new double[dimensions[0], dimensions[1]];
+                fixed (double* newArrayPointer = (double[,])managedArray)
+                {
+                    CopyDoubles((double*)start, newArrayPointer, length);
+                }
+            }
+            if (newArray != null) newArray.Dispose();
             return managedArray;
         }
 
+        /// <summary>
+        /// Copy values into a NumPy array in one block: the array must be a contiguous float64 array of the same length,
+        /// e.g. from numpy.empty(len(values)). This is the way back from IronPlot to NumPy without per-element calls.
+        /// </summary>
+        public static void CopyToNumpyArray(double[] values, object numpyArray)
+        {
+            dynamic dynamicArray = numpyArray;
+            if (dynamicArray.dtype.name != "float64" || !dynamicArray.flags.contiguous)
+            {
+                throw new ArgumentException("NumPy array must be contiguous and float64.");
+            }
+            int length = 1;
+            for (int i = 0; i < dynamicArray.Dims.Length; ++i) length *= (int)dynamicArray.Dims[i];
+            if (length != values.Length) throw new ArgumentException("NumPy array must be the same length as the values.");
+            IntPtr start = dynamicArray.UnsafeAddress;
+            if (length > 0) Marshal.Copy(values, 0, start, length);
+        }
+
+        /// <summary>
+        /// Copy indices into a NumPy array in one block: the array must be a contiguous int32 array of the same length,
+        /// e.g. from numpy.empty(len(values), dtype = numpy.int32).
+        /// </summary>
+        public static void CopyToNumpyArray(int[] values, object numpyArray)
+        {
+            dynamic dynamicArray = numpyArray;
+            if (dynamicArray.dtype.name != "int32" || !dynamicArray.flags.contiguous)
+            {
+                throw new ArgumentException("NumPy array must be contiguous and int32.");
+            }
+            int length = 1;
+            for (int i = 0; i < dynamicArray.Dims.Length; ++i) length *= (int)dynamicArray.Dims[i];
+            if (length != values.Length) throw new ArgumentException("NumPy array must be the same length as the values.");
+            IntPtr start = dynamicArray.UnsafeAddress;
+            if (length > 0) Marshal.Copy(values, 0, start, length);
+        }
+
+        /// <summary>
+        /// Copy a contiguous int64 NumPy array (e.g. a view of a datetime64[ns] array) into a new long[] in one block.
+        /// </summary>
+        public static long[] ToInt64Array(object numpyArray)
+        {
+            dynamic dynamicArray = numpyArray;
+            if (dynamicArray.dtype.name != "int64" || !dynamicArray.flags.contiguous)
+            {
+                throw new ArgumentException("NumPy array must be contiguous and int64.");
+            }
+            int length = 1;
+            for (int i = 0; i < dynamicArray.Dims.Length; ++i) length *= (int)dynamicArray.Dims[i];
+            long[] values = new long[length];
+            IntPtr start = dynamicArray.UnsafeAddress;
+            if (length > 0) Marshal.Copy(start, values, 0, length);
+            return values;
+        }
+
+        /// <summary>
+        /// Copy a block of doubles between unmanaged buffers, eight at a time.
+        /// </summary>
+        internal unsafe static void CopyDoubles(double* source, double* destination, int length)
+        {
+            double* endPointer = destination + length;
+            double* blockEndPointer = destination + (length & ~7);
+            while (destination != blockEndPointer)
+            {
+                destination[0] = source[0]; destination[1] = source[1];
+                destination[2] = source[2]; destination[3] = source[3];
+                destination[4] = source[4]; destination[5] = source[5];
+                destination[6] = source[6]; destination[7] = source[7];
+                destination += 8; source += 8;
+            }
+            while (destination != endPointer)
+            {
+                *destination = *source;
+                destination++; source++;
+            }
+        }
+
         /// <summary>
         /// For fast enumerations, this must be a IList of ILists, not a IList of IEnumerables
         /// </summary>
@@ -128,8 +128,13 @@ namespace IronPlot
         internal double MinTransformed;
         internal double MaxTransformed;
 
-        protected static double minDate = DateTime.MinValue.AddYears(100).ToOADate();
-        protected static double maxDate = DateTime.MaxValue.ToOADate();
+        /// <summary>
+        /// The origin of OLE Automation dates: the default DateOrigin, for which the values of a Date axis are OADates.
+        /// </summary>
+        public static readonly DateTime OADateOrigin = new DateTime(1899, 12, 30);
+
+        // Values of a Date axis are days from dateOrigin.
+        protected DateTime dateOrigin = OADateOrigin;
 
         public static DependencyProperty AxisTypeProperty =
             DependencyProperty.Register("AxisType",
@@ -210,6 +215,50 @@ namespace IronPlot
             get { return (Func<double, string>)GetValue(FormatOverrideProperty); }
         }
 
+        /// <summary>
+        /// The date of value zero on a Date axis, whose values are days from this date (OADates by default).
+        /// Data with high time resolution, e.g. NumPy datetime64, are plotted relative to a nearby origin so that
+        /// they keep their precision as doubles.
+        /// </summary>
+        public DateTime DateOrigin
+        {
+            set
+            {
+                dateOrigin = value;
+                if (AxisType == AxisType.Date)
+                {
+                    DeriveTicks();
+                    UpdateTicksAndLabels();
+                }
+            }
+            get { return dateOrigin; }
+        }
+
+        /// <summary>
+        /// The date of a value of a Date axis (to the resolution of DateTime, 100 ns).
+        /// </summary>
+        public DateTime ToDateTime(double value)
+        {
+            return dateOrigin.AddTicks((long)Math.Round(value * TimeSpan.TicksPerDay));
+        }
+
+        /// <summary>
+        /// The value on a Date axis of a date.
+        /// </summary>
+        public double FromDateTime(DateTime date)
+        {
+            return (date.Ticks - dateOrigin.Ticks) / (double)TimeSpan.TicksPerDay;
+        }
+
+        /// <summary>
+        /// True if value is a date that can be shown on a Date axis.
+        /// </summary>
+        internal bool IsDateInRange(double value)
+        {
+            double ticks = dateOrigin.Ticks + value * TimeSpan.TicksPerDay;
+            return ticks >= DateTime.MinValue.AddYears(100).Ticks && ticks < DateTime.MaxValue.Ticks;
+        }
+
         public abstract double Min { get; set; }
 
         public abstract double Max { get; set; }
@@ -232,21 +281,8 @@ namespace IronPlot
 
         protected virtual void OnAxisTypeChanged()
         {
-            switch (AxisType)
-            {
-                case AxisType.Log:
-                    GraphTransform = value => Math.Log10(value);
-                    CanvasTransform = value => Math.Pow(10.0, value);
-                    break;
-                case AxisType.LinearReversed:
-                    GraphTransform = value => -value;
-                    CanvasTransform = value => -value;
-                    break;
-                default:
-                    GraphTransform = value => value;
-                    CanvasTransform = value => value;
-                    break;
-            }
+            GraphTransform = AxisTransforms.GraphTransform(AxisType);
+            CanvasTransform = AxisTransforms.CanvasTransform(AxisType);
             DeriveTicks();
             UpdateTicksAndLabels();
         }
@@ -259,6 +295,13 @@ namespace IronPlot
 
 
         internal virtual void DeriveTicks()
+        {
+            RenderMark deriveStart = RenderProfiler.Start();
+            DeriveTicksForType();
+            RenderProfiler.Stop(this, RenderStage.DeriveTicks, deriveStart, -1, Ticks == null ? 0 : Ticks.Length);
+        }
+
+        private void DeriveTicksForType()
         {
             MaxTransformed = GraphTransform(Max);
             MinTransformed = GraphTransform(Min);
@@ -291,17 +334,17 @@ namespace IronPlot
         {
             // We find the most appropriate tick interval given the maximum number of ticks.
             // First we find the minimum interval.
-            DateTime start = DateTime.FromOADate(Min);
-            DateTime end = DateTime.FromOADate(Max);
+            // Ticks are found as dates and placed at their values relative to the DateOrigin.
             double minInterval = (Max - Min) / NumberOfTicks;
             // If this is 1 year or more, we increase interval to a nice number of years (1, 2 or 5 x10^n).
             // The first point is the start of a years
             DateTime currentDate;
-            List<DateTime> ticksDateTime = new List<DateTime>();
             List<double> ticks = new List<double>();
             List<LabelText> labelText = new List<LabelText>();
             try
             {
+                DateTime start = ToDateTime(Min);
+                DateTime end = ToDateTime(Max);
                 if (minInterval > 365)
                 {
                     int yearsInterval = IntervalFromRange((int)(minInterval / 365));
@@ -311,8 +354,7 @@ namespace IronPlot
                     currentDate = currentDate.AddYears(modulus == 0 ? 0 : -modulus + yearsInterval);
                     while (currentDate <= end)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
+                        ticks.Add(FromDateTime(currentDate));
                         labelText.Add(new LabelText(DateString(currentDate)));
                         currentDate = currentDate.AddYears(yearsInterval);
                     }
@@ -334,8 +376,7 @@ namespace IronPlot
                     currentDate = currentDate.AddMonths(modulus == 0 ? 0 : -modulus + monthsInterval);
                     while (currentDate <= end)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
+                        ticks.Add(FromDateTime(currentDate));
                         labelText.Add(new LabelText(DateString(currentDate)));
                         currentDate = currentDate.AddMonths(monthsInterval);
                     }
@@ -350,8 +391,7 @@ namespace IronPlot
                     currentDate = currentDate.AddDays(modulus == 0 ? 0 : -modulus + daysInterval);
                     while (currentDate <= end)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
+                        ticks.Add(FromDateTime(currentDate));
                         labelText.Add(new LabelText(DateString(currentDate)));
                         currentDate = currentDate.AddDays(daysInterval);
                     }
@@ -374,8 +414,7 @@ namespace IronPlot
                     currentDate = currentDate.AddHours(modulus == 0 ? 0 : -modulus + hoursInterval);
                     while (currentDate <= end)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
+                        ticks.Add(FromDateTime(currentDate));
                         labelText.Add(new LabelText(TimeString(currentDate)));
                         currentDate = currentDate.AddHours(hoursInterval);
                     }
@@ -386,7 +425,7 @@ namespace IronPlot
                     DateTime startInWholeMinutes = new DateTime(start.Year, start.Month, start.Day, start.Hour, start.Minute, 0);
                     int minutesInterval;
                     currentDate = (start > startInWholeMinutes) ? startInWholeMinutes.AddMinutes(1) : startInWholeMinutes;
-                    double minIntervalMinutes = minInterval * 1400;
+                    double minIntervalMinutes = minInterval * 1440;
                     if (minIntervalMinutes < 1) { minutesInterval = 1; }
                     else if (minIntervalMinutes < 2) { minutesInterval = 2; }
                     else if (minIntervalMinutes < 5) { minutesInterval = 5; }
@@ -397,8 +436,7 @@ namespace IronPlot
                     currentDate = currentDate.AddMinutes(modulus == 0 ? 0 : -modulus + minutesInterval);
                     while (currentDate <= end)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
+                        ticks.Add(FromDateTime(currentDate));
                         labelText.Add(new LabelText(TimeString(currentDate)));
                         currentDate = currentDate.AddMinutes(minutesInterval);
                     }
@@ -420,28 +458,28 @@ namespace IronPlot
                     currentDate = currentDate.AddSeconds(modulus == 0 ? 0 : -modulus + secondsInterval);
                     while (currentDate <= end)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
+                        ticks.Add(FromDateTime(currentDate));
                         labelText.Add(new LabelText(LongTimeString(currentDate)));
                         currentDate = currentDate.AddSeconds(secondsInterval);
                     }
                 }
                 // ...and display time
-                // If less, just display seconds.
+                // If less, just display seconds. These ticks are worked out in seconds from the whole second
+                // at the start, so intervals finer than DateTime resolves still work.
                 else
                 {
                     DateTime startInWholeSeconds = new DateTime(start.Year, start.Month, start.Day, start.Hour, start.Minute, start.Second);
-                    double secondsStart = start.Subtract(startInWholeSeconds).TotalSeconds;
-                    double secondsEnd = end.Subtract(startInWholeSeconds).TotalSeconds;
+                    double originSeconds = FromDateTime(startInWholeSeconds) * 86400;
+                    double secondsStart = Min * 86400 - originSeconds;
+                    double secondsEnd = Max * 86400 - originSeconds;
                     DecomposedNumber firstTick, interval;
                     IntervalFromRange(new Range(secondsStart, secondsEnd), minInterval * 86400, out interval, out firstTick);
-                    currentDate = startInWholeSeconds.AddSeconds(firstTick.Value);
-                    while (currentDate <= end)
+                    for (int k = 0; ; ++k)
                     {
-                        ticksDateTime.Add(currentDate);
-                        ticks.Add(currentDate.ToOADate());
-                        labelText.Add(new LabelText(LongTimeString(currentDate, -interval.Exponent)));
-                        currentDate = currentDate.AddSeconds(interval.Value);
+                        double seconds = firstTick.Value + k * interval.Value;
+                        if (seconds > secondsEnd) break;
+                        ticks.Add((originSeconds + seconds) / 86400);
+                        labelText.Add(new LabelText(LongTimeString(startInWholeSeconds, seconds, Math.Max(0, -interval.Exponent))));
                     }
                 }
             }
@@ -466,10 +504,15 @@ namespace IronPlot
             return DateString(date) + "\r" + date.ToString("HH:mm:ss");
         }
 
-        private string LongTimeString(DateTime date, int secondsDecimalPlaces)
+        /// <summary>
+        /// Label of the time the given (possibly fractional) number of seconds after wholeSecond.
+        /// </summary>
+        private string LongTimeString(DateTime wholeSecond, double seconds, int secondsDecimalPlaces)
         {
-            double seconds = date.Second + (double)date.Millisecond / 1000;
-            return DateString(date) + "\r" + date.ToString("HH:mm") + ":" + seconds.ToString("F" + secondsDecimalPlaces.ToString());
+            double wholeSeconds = Math.Floor(seconds);
+            DateTime date = wholeSecond.AddSeconds(wholeSeconds);
+            double secondsInMinute = date.Second + (seconds - wholeSeconds);
+            return DateString(date) + "\r" + date.ToString("HH:mm") + ":" + secondsInMinute.ToString("F" + secondsDecimalPlaces.ToString());
         }
 
         protected virtual void DeriveTicksLinear()
@@ -0,0 +1,94 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// The transforms from data to graph coordinates for each AxisType: log10 for log axes, negation for reversed
+    /// axes and the identity otherwise (date axes are OLE Automation dates, so linear).
+    /// Arrays are transformed in bulk, in parallel chunks, rather than by calling a delegate per element.
+    /// </summary>
+    public static class AxisTransforms
+    {
+        const int ChunkSize = 65536;
+
+        public static Func<double, double> GraphTransform(AxisType axisType)
+        {
+            switch (axisType)
+            {
+                case AxisType.Log: return value => Math.Log10(value);
+                case AxisType.LinearReversed: return value => -value;
+                default: return value => value;
+            }
+        }
+
+        public static Func<double, double> CanvasTransform(AxisType axisType)
+        {
+            switch (axisType)
+            {
+                case AxisType.Log: return value => Math.Pow(10.0, value);
+                case AxisType.LinearReversed: return value => -value;
+                default: return value => value;
+            }
+        }
+
+        /// <summary>
+        /// True if the graph transform of axisType is the identity, so that graph coordinates are the data themselves.
+        /// </summary>
+        public static bool IsIdentity(AxisType axisType)
+        {
+            return axisType != AxisType.Log && axisType != AxisType.LinearReversed;
+        }
+
+        /// <summary>
+        /// True if the graph transform of axisType keeps ascending values ascending, so that sortedness of
+        /// the data carries over to the transformed values.
+        /// </summary>
+        public static bool PreservesOrder(AxisType axisType)
+        {
+            return axisType != AxisType.LinearReversed;
+        }
+
+        /// <summary>
+        /// Transform elements start (inclusive) to end (exclusive) of values, also finding the minimum and maximum
+        /// of the transformed values, ignoring NaNs (min > max if there are none). The result is indexed as values;
+        /// for an identity transform it is values itself.
+        /// </summary>
+        public static double[] Transform(double[] values, int start, int end, AxisType axisType, out double min, out double max)
+        {
+            double[] transformed = IsIdentity(axisType) ? values : new double[values.Length];
+            int chunks = Math.Max(1, (end - start + ChunkSize - 1) / ChunkSize);
+            double[] chunkMin = new double[chunks], chunkMax = new double[chunks];
+            Action<int> transformChunk = chunk =>
+            {
+                int from = start + chunk * ChunkSize, to = Math.Min(end, from + ChunkSize);
+                double localMin = Double.PositiveInfinity, localMax = Double.NegativeInfinity;
+                switch (axisType)
+                {
+                    case AxisType.Log:
+                        for (int i = from; i < to; ++i) transformed[i] = Math.Log10(values[i]);
+                        break;
+                    case AxisType.LinearReversed:
+                        for (int i = from; i < to; ++i) transformed[i] = -values[i];
+                        break;
+                }
+                for (int i = from; i < to; ++i)
+                {
+                    double value = transformed[i];
+                    if (value < localMin) localMin = value;
+                    if (value > localMax) localMax = value;
+                }
+                chunkMin[chunk] = localMin; chunkMax[chunk] = localMax;
+            };
+            if (chunks == 1) transformChunk(0);
+            else Parallel.For(0, chunks, transformChunk);
+            min = chunkMin.Min(); max = chunkMax.Max();
+            return transformed;
+        }
+    }
+}
@@ -0,0 +1,155 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    public enum ColourNormalisation { Linear, Log }
+
+    /// <summary>
+    /// Batched conversion of data to colour map indices, and of indices to packed BGRA32 pixels,
+    /// used by FalseColourImage and SurfaceModel3D. Each stage is a single pass over the data, split into
+    /// bands of rows that are processed in parallel.
+    /// Values that cannot be coloured (NaN and, for log normalisation, values that are not positive) are
+    /// masked: they are given the index nIndices, which the lookup table maps to transparent.
+    /// ironplot_colour.py is the NumPy equivalent and produces identical indices and pixels.
+    /// </summary>
+    public static class ColourIndexing
+    {
+        // Minimum number of elements processed by each parallel task.
+        const int MinimumBandSize = 32768;
+
+        /// <summary>
+        /// The smallest and largest values in data, in a single pass, ignoring NaN and infinite values
+        /// and, for log normalisation, values that are not positive.
+        /// If there are no such values, min is 0 and max is 1 (or 1 and 10 for log normalisation).
+        /// </summary>
+        public static void Limits(double[] data, ColourNormalisation normalisation, out double min, out double max)
+        {
+            int bands = BandCount(data.Length, 1);
+            double[] bandMin = new double[bands], bandMax = new double[bands];
+            bool log = (normalisation == ColourNormalisation.Log);
+            ForEachBand(data.Length, bands, (band, start, end) =>
+            {
+                double localMin = Double.PositiveInfinity, localMax = Double.NegativeInfinity;
+                for (int i = start; i < end; ++i)
+                {
+                    double value = data[i];
+                    // NaN fails both comparisons.
+                    if (value < localMin && (value > 0 || !log) && !Double.IsInfinity(value)) localMin = value;
+                    if (value > localMax && (value > 0 || !log) && !Double.IsInfinity(value)) localMax = value;
+                }
+                bandMin[band] = localMin; bandMax[band] = localMax;
+            });
+            min = bandMin.Min(); max = bandMax.Max();
+            if (min > max)
+            {
+                min = log ? 1 : 0;
+                max = log ? 10 : 1;
+            }
+        }
+
+        /// <summary>
+        /// Quantise data to indices into a colour map of nIndices colours: min maps to the first colour
+        /// and max to the last, linearly or logarithmically. Values outside the limits take the first or last colour;
+        /// masked values take index nIndices. If max is not greater than min, all unmasked values take the first colour.
+        /// </summary>
+        public static UInt16[] Quantise(double[] data, double min, double max, ColourNormalisation normalisation, int nIndices)
+        {
+            UInt16[] indices = new UInt16[data.Length];
+            Quantise(data, indices, min, max, normalisation, nIndices);
+            return indices;
+        }
+
+        public static void Quantise(double[] data, UInt16[] indices, double min, double max, ColourNormalisation normalisation, int nIndices)
+        {
+            if (nIndices < 1 || nIndices > UInt16.MaxValue) throw new ArgumentException("Number of colours must be between 1 and 65535");
+            if (indices.Length < data.Length) throw new ArgumentException("Index array is shorter than the data");
+            bool log = (normalisation == ColourNormalisation.Log);
+            double offset = log ? Math.Log10(min) : min;
+            double range = (log ? Math.Log10(max) : max) - offset;
+            double scale = (range > 0) ? (nIndices - 1) / range : 0;
+            ForEachBand(data.Length, BandCount(data.Length, 1), (band, start, end) =>
+            {
+                double last = nIndices - 1;
+                UInt16 masked = (UInt16)nIndices;
+                for (int i = start; i < end; ++i)
+                {
+                    double value = data[i];
+                    if (log) value = (value > 0) ? Math.Log10(value) : Double.NaN;
+                    double position = (value - offset) * scale;
+                    if (position >= last) indices[i] = (UInt16)last;
+                    else if (position >= 0) indices[i] = (UInt16)position;
+                    else if (position < 0) indices[i] = 0;
+                    else indices[i] = Double.IsNaN(value) ? masked : (UInt16)0;
+                }
+            });
+        }
+
+        /// <summary>
+        /// Packed BGRA32 lookup table for a colour map of packed RGB values (as returned by ColourMap.ToIntArray):
+        /// the colours with the given alpha, followed by one transparent entry for masked indices.
+        /// </summary>
+        public static int[] LookupTable(int[] colourMap, byte alpha)
+        {
+            int[] table = new int[colourMap.Length + 1];
+            for (int i = 0; i < colourMap.Length; ++i) table[i] = (alpha << 24) | (colourMap[i] & 0xFFFFFF);
+            return table;
+        }
+
+        /// <summary>
+        /// Write the pixels for indices, width per row, into a BGRA32 buffer (e.g. the back buffer of a WriteableBitmap)
+        /// whose rows are stride bytes apart.
+        /// </summary>
+        public static unsafe void WriteBgra32(UInt16[] indices, int[] table, IntPtr buffer, int width, int height, int stride)
+        {
+            if (indices.Length < width * height) throw new ArgumentException("Index array is smaller than the image");
+            ForEachBand(height, BandCount(height, width), (band, start, end) =>
+            {
+                for (int row = start; row < end; ++row)
+                {
+                    int* pixel = (int*)((byte*)buffer + (long)row * stride);
+                    int index = row * width;
+                    for (int column = 0; column < width; ++column) pixel[column] = table[indices[index + column]];
+                }
+            });
+        }
+
+        /// <summary>
+        /// The pixels for indices as an array of packed BGRA32 values.
+        /// </summary>
+        public static int[] ToBgra32(UInt16[] indices, int[] table)
+        {
+            int[] pixels = new int[indices.Length];
+            ForEachBand(indices.Length, BandCount(indices.Length, 1), (band, start, end) =>
+            {
+                for (int i = start; i < end; ++i) pixels[i] = table[indices[i]];
+            });
+            return pixels;
+        }
+
+        private static int BandCount(int rows, int rowLength)
+        {
+            long bands = (long)rows * rowLength / MinimumBandSize;
+            return (int)Math.Max(1, Math.Min(Math.Min(bands, rows), 4 * Environment.ProcessorCount));
+        }
+
+        /// <summary>
+        /// Call body(band, startRow, endRow) for each of bands contiguous bands of rows, in parallel.
+        /// </summary>
+        private static void ForEachBand(int rows, int bands, Action<int, int, int> body)
+        {
+            if (bands <= 1)
+            {
+                body(0, 0, rows);
+                return;
+            }
+            Parallel.For(0, bands, band =>
+                body(band, (int)((long)rows * band / bands), (int)((long)rows * (band + 1) / bands)));
+        }
+    }
+}
@@ -0,0 +1,252 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// The contours of a grid at one level, as polylines: polyline k is the points (X[i], Y[i]) for i from
+    /// Starts[k] to Starts[k + 1] - 1. Closed polylines end with their first point.
+    /// </summary>
+    public class ContourLevel
+    {
+        public double Level { get; internal set; }
+        public double[] X { get; internal set; }
+        public double[] Y { get; internal set; }
+        public int[] Starts { get; internal set; }
+
+        public int PolylineCount
+        {
+            get { return Starts.Length - 1; }
+        }
+    }
+
+    /// <summary>
+    /// Contour lines of a grid by marching squares, used by Plot2DContour. z[row, column] is sampled at x[column]
+    /// and y[row], with row 0 at the bottom. All levels are found in one pass over the grid, split into bands of
+    /// rows that are processed in parallel: each sample is ranked among the levels once, and a cell makes a segment
+    /// for each level between the lowest and highest ranks of its corners, so cells that cross no level cost no more
+    /// than the ranking. Cells with a NaN corner have no contours.
+    /// Segments run between crossings of cell edges and are oriented so that values above the level are on their
+    /// left, so each crossing starts one segment and ends at most one other; the segments of each level are then
+    /// stitched into polylines (levels in parallel).
+    /// ironplot_contour.py is the NumPy equivalent and finds the same polylines.
+    /// </summary>
+    public static class Contouring
+    {
+        // Minimum number of cells in each band of rows processed in parallel.
+        const int MinimumBandCells = 65536;
+
+        // Number of segments for each cell case, and the (from, to) edges of each. Corners are numbered anticlockwise
+        // from the bottom left, and edge k joins corner k to corner k + 1 (bottom, right, top, left). The case is the
+        // sum of 2^k over the corners k above the level, plus 16 for saddles (cases 5 and 10) with the centre above.
+        static readonly int[] segmentCounts = new int[32];
+        static readonly int[,,] segmentEdges = new int[32, 2, 2];
+
+        static Contouring()
+        {
+            for (int c = 0; c < 32; ++c)
+            {
+                var exits = new List<int>(); var entries = new List<int>();
+                for (int k = 0; k < 4; ++k)
+                {
+                    bool above = ((c >> k) & 1) == 1, nextAbove = ((c >> ((k + 1) % 4)) & 1) == 1;
+                    if (above && !nextAbove) exits.Add(k);
+                    if (!above && nextAbove) entries.Add(k);
+                }
+                // Entries and exits alternate round the cell: saddles with the centre above pair each exit with the
+                // next entry (joining the corners above); otherwise with the previous one.
+                for (int s = 0; s < exits.Count; ++s)
+                {
+                    int exit = exits[s];
+                    int pick = 0;
+                    for (int e = 1; e < entries.Count; ++e)
+                    {
+                        int distance = (entries[e] - exit + 4) % 4, best = (entries[pick] - exit + 4) % 4;
+                        if ((c >= 16 || exits.Count == 1) ? distance < best : distance > best) pick = e;
+                    }
+                    segmentEdges[c, s, 0] = exit; segmentEdges[c, s, 1] = entries[pick];
+                }
+                segmentCounts[c] = exits.Count;
+            }
+        }
+
+        /// <summary>
+        /// count levels evenly spaced strictly between the minimum and maximum (ignoring NaNs) of z.
+        /// </summary>
+        public static double[] Levels(double[,] z, int count)
+        {
+            if (count < 1) throw new ArgumentException("There must be at least one level");
+            double min = Double.PositiveInfinity, max = Double.NegativeInfinity;
+            foreach (double value in z)
+            {
+                if (value < min) min = value;
+                if (value > max) max = value;
+            }
+            double[] levels = new double[count];
+            for (int k = 0; k < count; ++k) levels[k] = min + (max - min) * (k + 1) / (count + 1);
+            return levels;
+        }
+
+        /// <summary>
+        /// The contours of z at each of levels, which must be ascending.
+        /// </summary>
+        public static ContourLevel[] Contours(double[] x, double[] y, double[,] z, double[] levels)
+        {
+            int rows = z.GetLength(0), columns = z.GetLength(1);
+            if (x.Length != columns || y.Length != rows) throw new ArgumentException("x must have a value for each column of z and y one for each row");
+            for (int k = 1; k < levels.Length; ++k) if (!(levels[k] > levels[k - 1])) throw new ArgumentException("Levels must be ascending");
+            int levelCount = levels.Length;
+            ContourLevel[] contours = new ContourLevel[levelCount];
+            if (rows < 2 || columns < 2)
+            {
+                for (int k = 0; k < levelCount; ++k) contours[k] = new ContourLevel() { Level = levels[k], X = new double[0], Y = new double[0], Starts = new int[] { 0 } };
+                return contours;
+            }
+            // Start and end edges of the segments of each band, for each level:
+            int bands = (int)Math.Max(1, Math.Min((long)(rows - 1) * columns / MinimumBandCells, 4 * Environment.ProcessorCount));
+            bands = Math.Min(bands, rows - 1);
+            var starts = new List<int>[bands, levelCount];
+            var ends = new List<int>[bands, levelCount];
+            Parallel.For(0, bands, band =>
+            {
+                for (int k = 0; k < levelCount; ++k) { starts[band, k] = new List<int>(); ends[band, k] = new List<int>(); }
+                BandSegments(z, levels, (int)((long)(rows - 1) * band / bands), (int)((long)(rows - 1) * (band + 1) / bands),
+                    starts, ends, band);
+            });
+            Parallel.For(0, levelCount, k =>
+            {
+                var levelStarts = new List<int>(); var levelEnds = new List<int>();
+                for (int band = 0; band < bands; ++band) { levelStarts.AddRange(starts[band, k]); levelEnds.AddRange(ends[band, k]); }
+                contours[k] = Stitch(x, y, z, levels[k], levelStarts, levelEnds);
+            });
+            return contours;
+        }
+
+        /// <summary>
+        /// Add the start and end edges of the segments of the cells of rows first to last - 1 to starts[band, level]
+        /// and ends[band, level]. Horizontal edges (row * (columns - 1) + column) are numbered before vertical edges
+        /// (row * columns + column).
+        /// </summary>
+        private static void BandSegments(double[,] z, double[] levels, int first, int last, List<int>[,] starts, List<int>[,] ends, int band)
+        {
+            int columns = z.GetLength(1);
+            int horizontal = z.GetLength(0) * (columns - 1);
+            // Number of levels at or below each sample of the rows below and above the cells (-1 for NaN):
+            int[] below = new int[columns], above = new int[columns];
+            RankRow(z, levels, first, below);
+            int[] corners = new int[4];
+            int[] sides = new int[4];
+            for (int row = first; row < last; ++row)
+            {
+                RankRow(z, levels, row + 1, above);
+                for (int column = 0; column < columns - 1; ++column)
+                {
+                    corners[0] = below[column]; corners[1] = below[column + 1]; corners[2] = above[column + 1]; corners[3] = above[column];
+                    int lowest = Math.Min(Math.Min(corners[0], corners[1]), Math.Min(corners[2], corners[3]));
+                    int highest = Math.Max(Math.Max(corners[0], corners[1]), Math.Max(corners[2], corners[3]));
+                    if (lowest < 0 || highest == lowest) continue;
+                    sides[0] = row * (columns - 1) + column; sides[1] = horizontal + row * columns + column + 1;
+                    sides[2] = (row + 1) * (columns - 1) + column; sides[3] = horizontal + row * columns + column;
+                    for (int k = lowest; k < highest; ++k)
+                    {
+                        int c = 0;
+                        for (int corner = 0; corner < 4; ++corner) if (corners[corner] > k) c |= 1 << corner;
+                        if (c == 5 || c == 10)
+                        {
+                            double centre = 0.25 * (z[row, column] + z[row, column + 1] + z[row + 1, column + 1] + z[row + 1, column]);
+                            if (centre >= levels[k]) c += 16;
+                        }
+                        for (int s = 0; s < segmentCounts[c]; ++s)
+                        {
+                            starts[band, k].Add(sides[segmentEdges[c, s, 0]]);
+                            ends[band, k].Add(sides[segmentEdges[c, s, 1]]);
+                        }
+                    }
+                }
+                int[] swap = below; below = above; above = swap;
+            }
+        }
+
+        private static void RankRow(double[,] z, double[] levels, int row, int[] ranks)
+        {
+            for (int column = 0; column < ranks.Length; ++column)
+            {
+                double value = z[row, column];
+                if (Double.IsNaN(value) || Double.IsInfinity(value)) { ranks[column] = -1; continue; }
+                // The sample is above level k if its rank is more than k:
+                int lo = 0, hi = levels.Length;
+                while (lo < hi)
+                {
+                    int mid = (lo + hi) >> 1;
+                    if (levels[mid] <= value) lo = mid + 1;
+                    else hi = mid;
+                }
+                ranks[column] = lo;
+            }
+        }
+
+        /// <summary>
+        /// Join the segments of one level into polylines: those that are not continued from another segment are
+        /// followed first, then closed loops, from their lowest numbered segment.
+        /// </summary>
+        private static ContourLevel Stitch(double[] x, double[] y, double[,] z, double level, List<int> starts, List<int> ends)
+        {
+            int n = starts.Count;
+            var segmentStarting = new Dictionary<int, int>(n);
+            for (int i = 0; i < n; ++i) segmentStarting[starts[i]] = i;
+            int[] next = new int[n];
+            bool[] continued = new bool[n];
+            for (int i = 0; i < n; ++i)
+            {
+                int j;
+                if (segmentStarting.TryGetValue(ends[i], out j)) { next[i] = j; continued[j] = true; }
+                else next[i] = -1;
+            }
+            bool[] visited = new bool[n];
+            var points = new List<int>(n + n / 8);
+            var polylineStarts = new List<int>() { 0 };
+            for (int pass = 0; pass < 2; ++pass)
+            {
+                for (int head = 0; head < n; ++head)
+                {
+                    if (visited[head] || (pass == 0 && continued[head])) continue;
+                    int i = head, last = head;
+                    while (i >= 0 && !visited[i])
+                    {
+                        visited[i] = true;
+                        points.Add(starts[i]);
+                        last = i;
+                        i = next[i];
+                    }
+                    points.Add(ends[last]);
+                    polylineStarts.Add(points.Count);
+                }
+            }
+            double[] px = new double[points.Count], py = new double[points.Count];
+            int rows = z.GetLength(0), columns = z.GetLength(1);
+            int horizontal = rows * (columns - 1);
+            for (int p = 0; p < points.Count; ++p)
+            {
+                int edge = points[p];
+                if (edge < horizontal)
+                {
+                    int row = edge / (columns - 1), column = edge % (columns - 1);
+                    double t = (level - z[row, column]) / (z[row, column + 1] - z[row, column]);
+                    px[p] = x[column] + t * (x[column + 1] - x[column]); py[p] = y[row];
+                }
+                else
+                {
+                    int row = (edge - horizontal) / columns, column = (edge - horizontal) % columns;
+                    double t = (level - z[row, column]) / (z[row + 1, column] - z[row, column]);
+                    px[p] = x[column]; py[p] = y[row] + t * (y[row + 1] - y[row]);
+                }
+            }
+            return new ContourLevel() { Level = level, X = px, Y = py, Starts = polylineStarts.ToArray() };
+        }
+    }
+}
@@ -9,41 +9,64 @@ using System.Windows.Media;
 
 namespace IronPlot
 {
-    public enum SortedValues { X, Y }
-    
     public partial class Curve
     {
         internal double[] x, y;
         internal double[] xTransformed, yTransformed;
-        internal SortedValues SortedValues;
-        internal double[] TransformedSorted;
-        internal int[] SortedToUnsorted;
 
         internal bool[] includeLinePoint; // Whether or not to include the point in the line Geometry.
         internal bool[] includeMarker; // Whether or not to include the marker in the Geometry.
         protected byte[] pointRegion;
-        protected int n;
+        // The points of the curve are elements start to start + n - 1 of the arrays above. The arrays may be longer
+        // if the curve is appended to (see CurveAppend.cs).
+        internal int start;
+        internal int n;
+
+        // Graph transforms of the axes, kept so that appended points can be transformed.
+        protected Func<double, double> graphTransformX, graphTransformY;
+        // Whether the transformed x values are sorted ascending.
+        protected bool xSorted;
+        // Bounds of the transformed values, ignoring NaNs.
+        protected double xMin, xMax, yMin, yMax;
+        protected bool boundsStale = true;
+
+        // For long curves with sorted x values, the min/max level-of-detail pyramid is used in place of
+        // includeLinePoint: only the points in decimatedIndices are joined by the line. Markers are drawn
+        // at the points given by MarkerIndices.
+        internal const int PyramidThreshold = 10000;
+        protected MinMaxPyramid pyramid;
+        internal int[] decimatedIndices;
 
         protected Matrix cachedTransform = Matrix.Identity;
         protected Rect cachedRegion = new Rect(0, 0, 0, 0);
+        // End of the range of points that have been filtered for cachedRegion.
+        protected int filteredEnd;
 
         public double[] X
         {
-            get { return x; }
+            get { return Segment(x); }
         }
         
         public double[] Y
         {
-            get { return y; }
+            get { return Segment(y); }
+        }
+
+        /// <summary>
+        /// Number of points in the curve.
+        /// </summary>
+        public int Count
+        {
+            get { return n; }
         }
         
         public Curve(double[] x, double[] y)
         {
             this.x = x; this.y = y;
             Validate();
-            Transform(null, null);
+            n = x.Length;
             PrepareLineData(x.Length);
-            DetermineSorted();
+            Transform(AxisType.Linear, AxisType.Linear);
         }
 
         public Curve(IEnumerable<double> x, IEnumerable<double> y)
@@ -56,55 +79,94 @@ namespace IronPlot
                 this.x[i] = x.ElementAt(i);
                 this.y[i] = y.ElementAt(i);
             }
-            Transform(null, null);
+            n = count;
             PrepareLineData(count);
-            DetermineSorted();
+            Transform(AxisType.Linear, AxisType.Linear);
+        }
+
+        /// <summary>
+        /// A curve with the same x values as shared, for many curves plotted against one x array (see Plot2DLines).
+        /// The x values, their transformed values and whether they are sorted are not copied or worked out again.
+        /// </summary>
+        internal Curve(Curve shared, double[] y)
+        {
+            if (y.Length != shared.n) throw new ArgumentException("Component vectors' lengths must be equal");
+            this.x = shared.x; this.y = y;
+            n = shared.n;
+            PrepareLineData(n);
+            TransformShared(shared, shared.yAxisType);
+        }
+
+        /// <summary>
+        /// Copy of the points of the curve from an array, or the array itself if the curve occupies all of it.
+        /// </summary>
+        private double[] Segment(double[] array)
+        {
+            if (start == 0 && n == array.Length) return array;
+            double[] segment = new double[n];
+            Array.Copy(array, start, segment, 0, n);
+            return segment;
         }
 
         public Rect Bounds()
         {
-            return new Rect(new Point(xTransformed.Min(), yTransformed.Min()), new Point(xTransformed.Max(), yTransformed.Max()));
+            if (boundsStale) UpdateBounds();
+            if (n == 0 || xMin > xMax || yMin > yMax) return new Rect(0, 0, 0, 0);
+            return new Rect(new Point(xMin, yMin), new Point(xMax, yMax));
         }
 
-        private void PrepareLineData(int length)
+        private void UpdateBounds()
         {
-            n = length;
-            includeLinePoint = new bool[length];
-            includeMarker = new bool[length];
-            pointRegion = new byte[length];
-            for (int i = 0; i < length; ++i)
+            int end = start + n;
+            xMin = Double.PositiveInfinity; xMax = Double.NegativeInfinity;
+            yMin = Double.PositiveInfinity; yMax = Double.NegativeInfinity;
+            if (UsePyramid && !Double.IsNaN(xTransformed[start]) && !Double.IsNaN(xTransformed[end - 1]))
             {
-                includeLinePoint[i] = true;
-                includeMarker[i] = true;
+                // Sorted x: the x bounds are the end points and the y bounds come from the pyramid.
+                EnsurePyramid();
+                int minIndex, maxIndex;
+                pyramid.MinMax(start, end, out minIndex, out maxIndex);
+                xMin = xTransformed[start]; xMax = xTransformed[end - 1];
+                if (minIndex >= 0) { yMin = yTransformed[minIndex]; yMax = yTransformed[maxIndex]; }
             }
+            else ExtendBounds(start, end);
+            boundsStale = false;
         }
 
         /// <summary>
-        /// Determine if either x or y values are sorted; if neither, sort x.
+        /// Extend the bounds to include points from (inclusive) to end (exclusive).
         /// </summary>
-        private void DetermineSorted()
+        private void ExtendBounds(int from, int end)
         {
-            SortedToUnsorted = Enumerable.Range(0, xTransformed.Length).ToArray();
-            if (IsSorted(xTransformed))
-            {
-                TransformedSorted = xTransformed;
-                SortedValues = SortedValues.X;
-            }
-            else if (IsSorted(yTransformed))
+            for (int i = from; i < end; ++i)
             {
-                TransformedSorted = yTransformed;
-                SortedValues = SortedValues.Y;
+                double value = xTransformed[i];
+                if (value < xMin) xMin = value;
+                if (value > xMax) xMax = value;
+                value = yTransformed[i];
+                if (value < yMin) yMin = value;
+                if (value > yMax) yMax = value;
             }
-            else
+        }
+
+        private void PrepareLineData(int length)
+        {
+            includeLinePoint = new bool[length];
+            includeMarker = new bool[length];
+            pointRegion = new byte[length];
+            for (int i = 0; i < length; ++i)
             {
-                TransformedSorted = (double[])xTransformed.Clone();
-                Array.Sort(TransformedSorted, SortedToUnsorted);
+                includeLinePoint[i] = true;
+                includeMarker[i] = true;
             }
         }
 
-        private bool IsSorted(double[] array)
+        /// <summary>
+        /// True if array is sorted ascending from index from (inclusive) to end (exclusive).
+        /// </summary>
+        private bool IsSorted(double[] array, int from, int end)
         {
-            for (int i = 1; i < array.Length - 1; ++i)
+            for (int i = from + 1; i < end; ++i)
             {
                 if (array[i] < array[i - 1]) return false;
             }
@@ -119,34 +181,45 @@ namespace IronPlot
             }
         }
 
-        internal void Transform(Func<double, double> graphTransformX, Func<double, double> graphTransformY)
+        private void ResetDerived()
         {
-            if (graphTransformX == null)
-            {
-                xTransformed = x;
-            }
-            else
-            {
-                int length = x.Length;
-                xTransformed = new double[length];
-                for (int i = 0; i < length; ++i) xTransformed[i] = graphTransformX(x[i]);
-            }
-            if (graphTransformY == null)
-            {
-                yTransformed = y;
-            }
-            else
-            {
-                int length = y.Length;
-                yTransformed = new double[length];
-                for (int i = 0; i < length; ++i) yTransformed[i] = graphTransformY(y[i]);
-            }
-            DetermineSorted();
+            spatialIndex = null;
+            boundsStale = true;
+            pyramid = null;
+            decimatedIndices = null;
+            cachedRegion = new Rect(0, 0, 0, 0);
+        }
+
+        /// <summary>
+        /// True if the level-of-detail pyramid can be used: x values sorted ascending and enough points to make it worthwhile.
+        /// </summary>
+        internal bool UsePyramid
+        {
+            get { return (n >= PyramidThreshold) && xSorted; }
+        }
+
+        /// <summary>
+        /// Select the points to draw using the min/max pyramid: at most four per pixel column of the region
+        /// from xViewMin to xViewMax, visiting O(columns * log n) points.
+        /// </summary>
+        protected void FilterPyramid(MatrixTransform canvasToGraph, double xViewMin, double xViewMax)
+        {
+            EnsurePyramid();
+            // Columns are aligned with canvas pixels: canvas x = p maps to graph x = p * M11 + OffsetX.
+            double columnWidth = Math.Abs(canvasToGraph.Matrix.M11);
+            double offset = canvasToGraph.Matrix.OffsetX;
+            double xStart = offset + Math.Floor((xViewMin - offset) / columnWidth) * columnWidth;
+            int columns = (int)Math.Ceiling((xViewMax - xStart) / columnWidth);
+            decimatedIndices = pyramid.Decimate(xStart, columnWidth, Math.Max(columns, 1));
         }
 
         public void FilterMinMax(MatrixTransform canvasToGraph, Rect viewBounds)
         {
-            if (xTransformed.Length <= 2) return;
+            if (n <= 2)
+            {
+                decimatedIndices = null;
+                return;
+            }
             // We do not need to re-evaluate the set of lines if the view is contained by the cached region
             // and the size of the region is not significantly changed.
             double width = Math.Max(viewBounds.Width, canvasToGraph.Matrix.M11 * 500);
@@ -158,15 +231,102 @@ namespace IronPlot
             double widthRatio = canvasToGraph.Matrix.M11 /cachedTransform.M11; 
             double heightRatio = canvasToGraph.Matrix.M22 /cachedTransform.M22; 
             if (ContainsRegion(cachedRegion, viewBounds) && (widthRatio > 0.9) && (widthRatio < 1.1)
-                && (heightRatio > 0.9) && (heightRatio < 1.1)) return;
+                && (heightRatio > 0.9) && (heightRatio < 1.1))
+            {
+                // Only points appended since the last evaluation need to be filtered.
+                if (filteredEnd < start + n) FilterAppended(canvasToGraph);
+                return;
+            }
             cachedRegion = new Rect(new Point(xViewMin, yViewMin), new Point(xViewMax, yViewMax));
             cachedTransform.M11 = canvasToGraph.Matrix.M11;
             cachedTransform.M22 = canvasToGraph.Matrix.M22;
+            filteredEnd = start;
+            FilterAppended(canvasToGraph);
+        }
+
+        /// <summary>
+        /// True if viewBounds lies within the region for which the points were last filtered and no points have been
+        /// appended since, so that geometry made from the filtered points can still draw the view.
+        /// </summary>
+        internal bool IsFilteredFor(Rect viewBounds)
+        {
+            return n > 2 && filteredEnd == start + n && ContainsRegion(cachedRegion, viewBounds);
+        }
+
+        /// <summary>
+        /// Number of points of the line left by the last filtration.
+        /// </summary>
+        internal int LinePointCount()
+        {
+            if (decimatedIndices != null) return decimatedIndices.Length;
+            if (n <= 2) return n;
+            int count = 1;
+            for (int i = start + 1; i < start + n; ++i) if (includeLinePoint[i]) count++;
+            return count;
+        }
+
+        /// <summary>
+        /// When the pyramid is used, the indices of the points to draw markers at: every point in the cached region,
+        /// less those in the same canvas pixel as one already included, whose markers would cover the same pixels.
+        /// Null when the pyramid is not used, in which case includeMarker gives the markers to draw.
+        /// </summary>
+        internal int[] MarkerIndices(Matrix graphToCanvas)
+        {
+            if (decimatedIndices == null) return null;
+            double xScale = graphToCanvas.M11, xOffset = graphToCanvas.OffsetX;
+            double yScale = graphToCanvas.M22, yOffset = graphToCanvas.OffsetY;
+            double xViewMax = cachedRegion.Right, yViewMin = cachedRegion.Top, yViewMax = cachedRegion.Bottom;
+            List<int> indices = new List<int>();
+            // x is sorted, so the points of each pixel column are consecutive: only the cells of the current column are kept.
+            HashSet<long> cells = new HashSet<long>();
+            long column = long.MinValue;
+            for (int i = pyramid.LowerBound(cachedRegion.Left); i < start + n && xTransformed[i] <= xViewMax; ++i)
+            {
+                double yValue = yTransformed[i];
+                if (!(yValue >= yViewMin && yValue <= yViewMax)) continue;
+                long cellX = (long)Math.Floor(xTransformed[i] * xScale + xOffset);
+                if (cellX != column)
+                {
+                    cells.Clear();
+                    column = cellX;
+                }
+                if (cells.Add((long)Math.Floor(yValue * yScale + yOffset))) indices.Add(i);
+            }
+            return indices.ToArray();
+        }
 
+        /// <summary>
+        /// Filter the points from filteredEnd to the end of the curve for the cached region.
+        /// </summary>
+        private void FilterAppended(MatrixTransform canvasToGraph)
+        {
+            int end = start + n;
+            if (UsePyramid)
+            {
+                FilterPyramid(canvasToGraph, cachedRegion.Left, cachedRegion.Right);
+            }
+            else
+            {
+                // Start from the last point already filtered, so that the join is filtered too.
+                // If the pyramid was used before, all points must be filtered.
+                int from = (decimatedIndices != null) ? start : Math.Max(start, filteredEnd - 1);
+                decimatedIndices = null;
+                FilterMinMaxRange(canvasToGraph, from, end);
+            }
+            filteredEnd = end;
+        }
+
+        /// <summary>
+        /// Min-max filtration of points from (inclusive) to end (exclusive) for the cached region.
+        /// </summary>
+        private void FilterMinMaxRange(MatrixTransform canvasToGraph, int from, int end)
+        {
+            double xViewMin = cachedRegion.Left, xViewMax = cachedRegion.Right;
+            double yViewMin = cachedRegion.Top, yViewMax = cachedRegion.Bottom;
             // Exclude all line points by default: these will subsequently be added as necessary.
             // Include those marker points that are in the cached region and make note of region.
-            int nPoints = includeLinePoint.Length;
-            for (int j = 0; j < nPoints; ++j)
+            int nPoints = end;
+            for (int j = from; j < nPoints; ++j)
             {
                 includeLinePoint[j] = false;
                 includeMarker[j] = false;
@@ -190,7 +350,7 @@ namespace IronPlot
             double deltaY = Math.Abs(canvasToGraph.Matrix.M22) * 0.25;
             double deltaX2 = Math.Abs(canvasToGraph.Matrix.M11) * 0.75;
             double deltaY2 = Math.Abs(canvasToGraph.Matrix.M22) * 0.75;
-            int i = 0;
+            int i = from;
             byte region = pointRegion[i]; byte newRegion;
             while (true)
             {
@@ -297,12 +457,6 @@ namespace IronPlot
                 if (i == (nPoints - 1)) break;
                 region = pointRegion[i];
             }
-            int included = 0;
-            for (int j = 0; j < includeLinePoint.Length; ++j)
-            {
-                if (includeLinePoint[j] == true) ++included;
-            }
-
         }
 
         protected bool ContainsRegion(Rect container, Rect contained)
@@ -315,6 +469,7 @@ namespace IronPlot
 
         public void FilterLinInterp(MatrixTransform canvasToGraph)
         {
+            Compact();
             for (int j = 0; j < includeLinePoint.Length; ++j)
             {
                 includeLinePoint[j] = true;
@@ -327,11 +482,11 @@ namespace IronPlot
             int toPotentiallyExclude = 0;
             double cutOffX = Math.Abs(canvasToGraph.Matrix.M11);
             double cutOffY = Math.Abs(canvasToGraph.Matrix.M22);
-            while ((nExcluded < (this.X.Length - 100)) && newlyExcluded)
+            while ((nExcluded < (n - 100)) && newlyExcluded)
             {
                 newlyExcluded = false;
                 i = 0; x1 = x[0]; y1 = y[0];
-                while (i < (this.X.Length - 4))
+                while (i < (n - 4))
                 {
                     ++i; // Find new point to potentially miss out
                     while (!includeLinePoint[i])
@@ -339,7 +494,7 @@ namespace IronPlot
                         i += 1;
                     }
                     toPotentiallyExclude = i;
-                    if (i > this.X.Length - 4) break;  
+                    if (i > n - 4) break;  
                     x2 = x[i];
                     y2 = y[i];
                     ++i; // Find new point to draw line to
@@ -364,7 +519,7 @@ namespace IronPlot
                 }
             }
             int totalExcluded = nExcluded;
-            int remaining = this.X.Length - nExcluded;
+            int remaining = n - nExcluded;
         }
 
     }
@@ -0,0 +1,168 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Windows;
+
+namespace IronPlot
+{
+    public partial class Curve
+    {
+        // If greater than zero, only the most recent window points are kept.
+        protected int window;
+
+        /// <summary>
+        /// Create an empty curve for data that arrives over time, to be added with Append.
+        /// The arrays backing the curve initially hold capacity points and grow as required.
+        /// If window is greater than zero, only the most recent window points are kept: the backing arrays are
+        /// then fixed at (at least) twice the window, and the oldest points are discarded in one block when they fill.
+        /// </summary>
+        public Curve(int capacity, int window)
+        {
+            if (capacity < 0 || window < 0) throw new ArgumentException("Capacity and window must not be negative");
+            this.window = window;
+            int length = Math.Max(Math.Max(capacity, 2 * window), 16);
+            x = new double[length]; y = new double[length];
+            n = 0;
+            PrepareLineData(length);
+            Transform(AxisType.Linear, AxisType.Linear);
+        }
+
+        /// <summary>
+        /// Number of points the curve can hold before its arrays are reallocated or, for a rolling window, compacted.
+        /// </summary>
+        public int Capacity
+        {
+            get { return x.Length; }
+        }
+
+        /// <summary>
+        /// Maximum number of points kept, or zero if all points are kept.
+        /// </summary>
+        public int Window
+        {
+            get { return window; }
+        }
+
+        /// <summary>
+        /// Append points to the end of the curve.
+        /// Only the new points are copied and transformed, and the bounds, sortedness, level-of-detail pyramid and
+        /// filtering are updated for the new points only, so the cost is proportional to the number of points appended.
+        /// </summary>
+        public void Append(double[] x, double[] y)
+        {
+            if (x.Length != y.Length)
+            {
+                throw new ArgumentException("Component vectors' lengths must be equal");
+            }
+            int count = x.Length, offset = 0;
+            if (window > 0 && count > window) { offset = count - window; count = window; }
+            if (count == 0) return;
+            EnsureSpace(count);
+            int end = start + n, newEnd = end + count;
+            Array.Copy(x, offset, this.x, end, count);
+            Array.Copy(y, offset, this.y, end, count);
+            if (graphTransformX != null) for (int i = end; i < newEnd; ++i) xTransformed[i] = graphTransformX(this.x[i]);
+            if (graphTransformY != null) for (int i = end; i < newEnd; ++i) yTransformed[i] = graphTransformY(this.y[i]);
+            for (int i = end; i < newEnd; ++i)
+            {
+                includeLinePoint[i] = true;
+                includeMarker[i] = true;
+            }
+            int from = Math.Max(start, end - 1);
+            spatialIndex = null;
+            xSorted = xSorted && IsSorted(xTransformed, from, newEnd);
+            if (!boundsStale) ExtendBounds(end, newEnd);
+            n += count;
+            if (window > 0 && n > window)
+            {
+                // The bounds only need to be found again if a discarded point was on them:
+                int discarded = n - window;
+                if (!boundsStale && OnBounds(start, start + discarded)) boundsStale = true;
+                start += discarded;
+                n = window;
+            }
+            if (pyramid != null)
+            {
+                pyramid.Extend(newEnd);
+                pyramid.Start = start;
+            }
+            ClearTransformCache();
+            linearSplineCoefficients = null;
+            cubicSplineCoefficients = null;
+            monotoneCubicSplineCoefficients = null;
+            hermiteSplineCoefficients = null;
+        }
+
+        /// <summary>
+        /// Make room for count more points at the end of the arrays: discard points that fall out of the window
+        /// and move the rest to the start of the arrays or, if there is still not enough space, into larger arrays.
+        /// This happens at most once every window (or current capacity) points, so the cost per point is constant.
+        /// </summary>
+        private void EnsureSpace(int count)
+        {
+            if (start + n + count <= x.Length) return;
+            int keep = (window > 0) ? Math.Max(0, Math.Min(n, window - count)) : n;
+            int length = x.Length;
+            if (keep + count > length) length = Math.Max(2 * length, keep + count);
+            if (!boundsStale && OnBounds(start, start + n - keep)) boundsStale = true;
+            Relocate(start + n - keep, keep, length);
+        }
+
+        /// <summary>
+        /// True if any of the points from (inclusive) to end (exclusive) is on the bounds, so that the bounds may
+        /// shrink once they are discarded. Checking only the discarded points keeps the cost of a rolling window
+        /// proportional to the number of points appended, whether or not x is sorted.
+        /// </summary>
+        private bool OnBounds(int from, int end)
+        {
+            for (int i = from; i < end; ++i)
+            {
+                double xValue = xTransformed[i], yValue = yTransformed[i];
+                if (xValue == xMin || xValue == xMax || yValue == yMin || yValue == yMax) return true;
+            }
+            return false;
+        }
+
+        /// <summary>
+        /// Move the points of the curve to the start of the arrays, if they do not start there already.
+        /// </summary>
+        protected void Compact()
+        {
+            if (start > 0) Relocate(start, n, x.Length);
+        }
+
+        /// <summary>
+        /// Move count points starting at from to the start of arrays of the given length.
+        /// </summary>
+        private void Relocate(int from, int count, int length)
+        {
+            bool sharedX = (xTransformed == x), sharedY = (yTransformed == y);
+            x = Relocate(x, from, count, length);
+            y = Relocate(y, from, count, length);
+            xTransformed = sharedX ? x : Relocate(xTransformed, from, count, length);
+            yTransformed = sharedY ? y : Relocate(yTransformed, from, count, length);
+            includeLinePoint = Relocate(includeLinePoint, from, count, length);
+            includeMarker = Relocate(includeMarker, from, count, length);
+            pointRegion = Relocate(pointRegion, from, count, length);
+            start = 0;
+            n = count;
+            xSorted = IsSorted(xTransformed, 0, n);
+            // The bounds are unchanged: points are only discarded by EnsureSpace, which checks them first.
+            ClearTransformCache();
+            spatialIndex = null;
+            pyramid = null;
+            decimatedIndices = null;
+            cachedRegion = new Rect(0, 0, 0, 0);
+        }
+
+        private static T[] Relocate<T>(T[] array, int from, int count, int length)
+        {
+            T[] destination = (length == array.Length) ? array : new T[length];
+            Array.Copy(array, from, destination, 0, count);
+            return destination;
+        }
+    }
+}
@@ -12,36 +12,57 @@ namespace IronPlot
     {
         public PathGeometry ToDirect2DPathGeometry(Factory factory, System.Windows.Media.MatrixTransform graphToCanvas)
         {
+            return ToDirect2DPathGeometry(factory, new Curve[] { this }, graphToCanvas);
+        }
+
+        /// <summary>
+        /// A single geometry with a figure for each of the curves, so that they can be drawn in one call.
+        /// </summary>
+        public static PathGeometry ToDirect2DPathGeometry(Factory factory, IEnumerable<Curve> curves, System.Windows.Media.MatrixTransform graphToCanvas)
+        {
+            PathGeometry geometry = new PathGeometry(factory);
+            using (GeometrySink sink = geometry.Open())
+            {
+                foreach (Curve curve in curves) curve.AddFigure(sink, graphToCanvas);
+                sink.Close();
+            }
+            return geometry;
+        }
+
+        private void AddFigure(GeometrySink sink, System.Windows.Media.MatrixTransform graphToCanvas)
+        {
+            if (n == 0) return;
             double xScale, xOffset, yScale, yOffset;
             xScale = graphToCanvas.Matrix.M11;
             xOffset = graphToCanvas.Matrix.OffsetX;
             yScale = graphToCanvas.Matrix.M22;
             yOffset = graphToCanvas.Matrix.OffsetY;
 
-            PathGeometry geometry = new PathGeometry(factory);
+            int[] indices = decimatedIndices;
+            int first = (indices != null && indices.Length > 0) ? indices[0] : start;
+            float xCanvas = (float)(xTransformed[first] * xScale + xOffset);
+            float yCanvas = (float)(yTransformed[first] * yScale + yOffset);
+            PointF p0 = new PointF(xCanvas, yCanvas);
 
-            using (GeometrySink sink = geometry.Open())
+            sink.BeginFigure(p0, FigureBegin.Hollow);
+            if (indices != null)
             {
-
-                float xCanvas = (float)(xTransformed[0] * xScale + xOffset);
-                float yCanvas = (float)(yTransformed[0] * yScale + yOffset);
-                PointF p0 = new PointF(xCanvas, yCanvas);
-
-                sink.BeginFigure(p0, FigureBegin.Hollow);
-                for (int i = 1; i < x.Length; ++i)
+                for (int j = 1; j < indices.Length; ++j)
                 {
-                    if (includeLinePoint[i])
-                    {
-                        xCanvas = (float)(xTransformed[i] * xScale + xOffset);
-                        yCanvas = (float)(yTransformed[i] * yScale + yOffset);
-                        sink.AddLine(new PointF(xCanvas, yCanvas));
-                    }
+                    int i = indices[j];
+                    sink.AddLine(new PointF((float)(xTransformed[i] * xScale + xOffset), (float)(yTransformed[i] * yScale + yOffset)));
                 }
-                sink.EndFigure(FigureEnd.Open);
-                sink.Close();
-
             }
-            return geometry;
+            else for (int i = first + 1; i < start + n; ++i)
+            {
+                if (includeLinePoint[i])
+                {
+                    xCanvas = (float)(xTransformed[i] * xScale + xOffset);
+                    yCanvas = (float)(yTransformed[i] * yScale + yOffset);
+                    sink.AddLine(new PointF(xCanvas, yCanvas));
+                }
+            }
+            sink.EndFigure(FigureEnd.Open);
         }
     }
 }
@@ -4,6 +4,7 @@ using System;
 using System.Collections.Generic;
 using System.Linq;
 using System.Text;
+using System.Threading.Tasks;
 using System.Windows;
 using System.Windows.Controls;
 using System.Windows.Data;
@@ -27,6 +28,13 @@ namespace IronPlot
     /// </remarks>
     public enum BoundaryType { Parabolic, FirstDerivativeSpecified, SecondDerivativeSpecified }
 
+    /// <summary>Interpolation methods for Curve.Interpolate</summary>
+    public enum InterpolationMethod { Linear, CubicSpline, MonotoneCubicSpline }
+
+    /// <summary>Values given by Curve.Interpolate outside the range of x: the end segments extended,
+    /// the end values held, or NaN</summary>
+    public enum Extrapolation { Extrapolate, Clamp, NaN }
+
     public partial class Curve
     {
         /// <summary>Sort a curve ascending in preparation for interpolation</summary>
@@ -34,7 +42,14 @@ namespace IronPlot
         /// </remarks>
         public void Sort()
         {
-            Array.Sort(x, y);
+            Array.Sort(x, y, start, n);
+            // The transformed values and interpolation coefficients are out of date:
+            ClearTransformCache();
+            Transform(xAxisType, yAxisType);
+            linearSplineCoefficients = null;
+            cubicSplineCoefficients = null;
+            monotoneCubicSplineCoefficients = null;
+            hermiteSplineCoefficients = null;
         }
         
         // Calculation coefficients once, interpolate multiple times
@@ -51,24 +66,7 @@ namespace IronPlot
         /// </remarks>
         public double[] GetValuesLinear(double[] xi)
         {
-            if (linearSplineCoefficients == null) UpdateLinearSplineCoefficients();
-            
-            double[] interpolatedValues = new double[xi.Length];
-            for (int i = 0; i < xi.Length; ++i)
-            {
-                double xit = xi[i];
-                int p = 0; int r = n - 1; int q = 0;       
-                while (p != r - 1)
-                {
-                    q = (p + r) / 2;
-                    if (x[q] >= xit) r = q;
-                    else p = q;
-                }
-                xit = xit - x[p];
-                q = p * 2;
-                interpolatedValues[i] = linearSplineCoefficients[q] + xit * linearSplineCoefficients[q + 1];
-            }
-            return interpolatedValues;
+            return Interpolate(xi, InterpolationMethod.Linear, Extrapolation.Extrapolate);
         }
 
         /// <summary>
@@ -79,9 +77,18 @@ namespace IronPlot
         /// <returns></returns>
         public static int GetInterpolatedIndex(double[] x, double xi)
         {
-            if (xi < x[0]) return 0;
-            else if (xi >= x[x.Length - 1]) return x.Length - 1; 
-            int p = 0; int r = x.Length - 1; int q = 0;
+            return GetInterpolatedIndex(x, 0, x.Length, xi);
+        }
+
+        /// <summary>
+        /// Return the lower index of the two indices of x that xi lies between, considering only
+        /// the elements of x from start (inclusive) to end (exclusive).
+        /// </summary>
+        public static int GetInterpolatedIndex(double[] x, int start, int end, double xi)
+        {
+            if (xi < x[start]) return start;
+            else if (xi >= x[end - 1]) return end - 1; 
+            int p = start; int r = end - 1; int q = 0;
             while (p != r - 1)
             {
                 q = (p + r) / 2;
@@ -135,24 +142,7 @@ namespace IronPlot
             BoundaryType rightBoundaryType, double rightBoundaryTypeParameter)
         {
             if (cubicSplineCoefficients == null) UpdateCubicSplineCoefficients(leftBoundaryType, leftBoundaryTypeParameter, rightBoundaryType, rightBoundaryTypeParameter);
-            
-            double[] interpolatedValues = new double[xi.Length];
-            for (int i = 0; i < xi.Length; ++i)
-            {
-                double xit = xi[i];
-                int p = 0; int r = n - 1; int q = 0;
-                while (p != r - 1)
-                {
-                    q = (p + r) / 2;
-                    if (x[q] >= xit) r = q;
-                    else p = q;
-                }
-                xit = xit - x[p];
-                q = p * 4;
-                interpolatedValues[i] = cubicSplineCoefficients[q] + xit * (cubicSplineCoefficients[q + 1]
-                    + xit * (cubicSplineCoefficients[q + 2] + xit * cubicSplineCoefficients[q + 3]));
-            }
-            return interpolatedValues;
+            return Interpolate(xi, InterpolationMethod.CubicSpline, Extrapolation.Extrapolate);
         }
 
         /// <summary>Calculates interpolated values using Monotone Piecewise Cubic Hermite Interpolation</summary>
@@ -162,30 +152,132 @@ namespace IronPlot
         /// </remarks>
         public double[] GetValuesMonotoneCubicSpline(double[] xi)
         {
-            if (monotoneCubicSplineCoefficients == null)  UpdateMonotoneCubicSplineCoefficients();
+            return Interpolate(xi, InterpolationMethod.MonotoneCubicSpline, Extrapolation.Extrapolate);
+        }
 
+        /// <summary>Calculates interpolated values at xi in bulk</summary>
+        /// <param name="xi">X values at which interpolated values are required, in any order</param>
+        /// <param name="method">Interpolation method; cubic splines are 'natural' unless coefficients were already
+        /// calculated with other boundary conditions</param>
+        /// <param name="extrapolation">Values outside the range of x</param>
+        /// <returns>Interpolated values; NaN where xi is NaN</returns>
+        /// <remarks><para>The x values of the curve must be ascending (see Sort).</para>
+        /// </remarks>
+        public double[] Interpolate(double[] xi, InterpolationMethod method, Extrapolation extrapolation)
+        {
             double[] interpolatedValues = new double[xi.Length];
-            for (int i = 0; i < xi.Length; ++i)
+            Interpolate(xi, interpolatedValues, method, extrapolation);
+            return interpolatedValues;
+        }
+
+        /// <summary>Calculates interpolated values at xi in bulk into interpolatedValues, which must be as long as xi</summary>
+        /// <remarks><para>The queries are split into chunks evaluated in parallel. Within a chunk, the segment of
+        /// each query is found by walking on from that of the previous query if the queries are ascending
+        /// (galloping, so that sparse queries cost O(log gap)), and by binary search otherwise, so that
+        /// resampling onto a sorted grid is a linear merge rather than a search per point.</para>
+        /// </remarks>
+        public void Interpolate(double[] xi, double[] interpolatedValues, InterpolationMethod method, Extrapolation extrapolation)
+        {
+            if (interpolatedValues.Length != xi.Length) throw new ArgumentException("Output must be the same length as xi");
+            if (n < 2) throw new ArgumentException("At least two points are needed for interpolation");
+            double[] coefficients; int stride;
+            switch (method)
+            {
+                case InterpolationMethod.Linear:
+                    if (linearSplineCoefficients == null) UpdateLinearSplineCoefficients();
+                    coefficients = linearSplineCoefficients; stride = 2;
+                    break;
+                case InterpolationMethod.CubicSpline:
+                    if (cubicSplineCoefficients == null) UpdateCubicSplineCoefficients(BoundaryType.SecondDerivativeSpecified, 0.0,
+                        BoundaryType.SecondDerivativeSpecified, 0.0);
+                    coefficients = cubicSplineCoefficients; stride = 4;
+                    break;
+                default:
+                    if (monotoneCubicSplineCoefficients == null) UpdateMonotoneCubicSplineCoefficients();
+                    coefficients = monotoneCubicSplineCoefficients; stride = 4;
+                    break;
+            }
+            // The coefficients are indexed from the first point of the curve, start (which is not 0 once a rolling
+            // window has discarded points).
+            int chunks = (xi.Length + InterpolationChunkSize - 1) / InterpolationChunkSize;
+            if (chunks <= 1) InterpolateChunk(xi, interpolatedValues, 0, xi.Length, coefficients, stride, extrapolation);
+            else Parallel.For(0, chunks, chunk =>
+            {
+                int from = chunk * InterpolationChunkSize;
+                InterpolateChunk(xi, interpolatedValues, from, Math.Min(xi.Length, from + InterpolationChunkSize), coefficients, stride, extrapolation);
+            });
+        }
+
+        const int InterpolationChunkSize = 65536;
+
+        private void InterpolateChunk(double[] xi, double[] interpolatedValues, int from, int to, double[] coefficients, int stride,
+            Extrapolation extrapolation)
+        {
+            int first = start, last = start + n - 1;
+            double xFirst = x[first], xLast = x[last];
+            double previous = Double.NaN;
+            int p = first;
+            for (int i = from; i < to; ++i)
             {
                 double xit = xi[i];
-                int p = 0; int r = n - 1; int q = 0;
-                while (p != r - 1)
+                if (Double.IsNaN(xit))
+                {
+                    interpolatedValues[i] = Double.NaN;
+                    continue;
+                }
+                if (extrapolation != Extrapolation.Extrapolate && (xit < xFirst || xit > xLast))
                 {
-                    q = (p + r) / 2;
-                    if (x[q] >= xit) r = q;
-                    else p = q;
+                    if (extrapolation == Extrapolation.NaN) interpolatedValues[i] = Double.NaN;
+                    else interpolatedValues[i] = xit < xFirst ? y[first] : y[last];
+                    continue;
                 }
-                xit = xit - x[p];
-                q = p * 4;
-                interpolatedValues[i] = monotoneCubicSplineCoefficients[q] + xit * (monotoneCubicSplineCoefficients[q + 1]
-                    + xit * (monotoneCubicSplineCoefficients[q + 2] + xit * monotoneCubicSplineCoefficients[q + 3]));
+                // p is the segment of xit: the last index with x[p] < xit, limited to start to start + n - 2.
+                if (xit >= previous) p = Gallop(p, xit);
+                else p = Segment(first, last - 1, xit);
+                previous = xit;
+                double dx = xit - x[p];
+                int q = (p - first) * stride;
+                if (stride == 2) interpolatedValues[i] = coefficients[q] + dx * coefficients[q + 1];
+                else interpolatedValues[i] = coefficients[q] + dx * (coefficients[q + 1] + dx * (coefficients[q + 2] + dx * coefficients[q + 3]));
             }
-            return interpolatedValues;
+        }
+
+        /// <summary>
+        /// The segment of xit, given that it is at or after segment p: steps of 1, 2, 4... then a binary search.
+        /// </summary>
+        private int Gallop(int p, double xit)
+        {
+            int last = start + n - 2;
+            if (p >= last || x[p + 1] >= xit) return p;
+            int step = 1, low = p + 1;
+            while (low + step <= last && x[low + step] < xit)
+            {
+                low += step;
+                step *= 2;
+            }
+            return Segment(low, Math.Min(low + step, last), xit);
+        }
+
+        /// <summary>
+        /// The segment of xit, given that it is between segments low and high (inclusive).
+        /// </summary>
+        private int Segment(int low, int high, double xit)
+        {
+            // Find the first index after low with x >= xit, up to high + 1:
+            int p = low, r = high + 1;
+            while (r - p > 1)
+            {
+                int q = (p + r) / 2;
+                if (x[q] >= xit) r = q;
+                else p = q;
+            }
+            return p;
         }
 
         /// <summary>Update or create coefficients for linear spline</summary>
         public void UpdateLinearSplineCoefficients()
         {
+            double[] x = Segment(this.x), y = Segment(this.y);
             linearSplineCoefficients = new double[2 * n];
             for (int i = 0; i <= n - 2; i++)
             {
@@ -198,6 +290,7 @@ namespace IronPlot
         public void UpdateCubicSplineCoefficients(BoundaryType leftBoundaryType, double leftBoundaryTypeParameter,
             BoundaryType rightBoundaryType, double rightBoundaryTypeParameter)
         {
+            double[] x = Segment(this.x), y = Segment(this.y);
             // TODO Raise error if < 2 points
             // Sort if points are unsorted?
 
@@ -288,10 +381,18 @@ namespace IronPlot
                 deriv[i] = (b[i] - a3[i] * deriv[i + 1]) / a2[i];
             }
 
-            cubicSplineCoefficients = GetHermiteSplineCoefficients(deriv);
+            cubicSplineCoefficients = GetHermiteSplineCoefficients(x, y, deriv);
         }
 
         protected double[] GetHermiteSplineCoefficients(double[] deriv)
+        {
+            return GetHermiteSplineCoefficients(Segment(x), Segment(y), deriv);
+        }
+
+        /// <summary>
+        /// Coefficients of the Hermite spline through the points (x[i], y[i]), i from 0 to n - 1, with derivatives deriv.
+        /// </summary>
+        protected double[] GetHermiteSplineCoefficients(double[] x, double[] y, double[] deriv)
         {
             double delta = 0;
             double delta2 = 0;
@@ -313,6 +414,7 @@ namespace IronPlot
 
         public void UpdateMonotoneCubicSplineCoefficients()
         {
+            double[] x = Segment(this.x), y = Segment(this.y);
             double[] a1 = new double[n]; // secant
             double[] a2 = new double[n]; // derivative
             a1[0] = (y[1] - y[0]) / (x[1] - x[0]);
@@ -338,7 +440,7 @@ namespace IronPlot
                     a2[i + 1] = tau * beta * a1[i];
                 }
             }
-            monotoneCubicSplineCoefficients = GetHermiteSplineCoefficients(a2);
+            monotoneCubicSplineCoefficients = GetHermiteSplineCoefficients(x, y, a2);
         }
     }
 }
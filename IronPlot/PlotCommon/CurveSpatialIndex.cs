@@ -0,0 +1,73 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    public partial class Curve
+    {
+        // Index of the transformed points, for picking; made when first needed and discarded when the points change.
+        protected SpatialIndex spatialIndex;
+
+        /// <summary>
+        /// Spatial index of the transformed values of the points of the curve. Its indices are those of xTransformed.
+        /// </summary>
+        internal SpatialIndex SpatialIndex
+        {
+            get
+            {
+                SpatialIndex index = spatialIndex;
+                if (index == null)
+                {
+                    index = new SpatialIndex(xTransformed, yTransformed, start, start + n);
+                    spatialIndex = index;
+                }
+                return index;
+            }
+        }
+
+        /// <summary>
+        /// Index (from the first point of the curve) of the point nearest the transformed point (x, y), where
+        /// distances are scaled by xScale and yScale (e.g. pixels per unit); -1 if the curve has no finite points.
+        /// </summary>
+        internal int NearestIndex(double x, double y, double xScale, double yScale)
+        {
+            int index = SpatialIndex.Nearest(x, y, xScale, yScale);
+            return index < 0 ? -1 : index - start;
+        }
+
+        /// <summary>
+        /// Indices (from the first point of the curve) of the k points nearest the transformed point (x, y),
+        /// nearest first, and their squared scaled distances.
+        /// </summary>
+        internal int[] NearestIndices(double x, double y, int k, double xScale, double yScale, out double[] distances)
+        {
+            return Relative(SpatialIndex.Nearest(x, y, k, xScale, yScale, out distances));
+        }
+
+        /// <summary>
+        /// Indices (from the first point of the curve), ascending, of the points with transformed values in a rectangle.
+        /// </summary>
+        internal int[] IndicesInRegion(double xMin, double xMax, double yMin, double yMax)
+        {
+            return Relative(SpatialIndex.InRectangle(xMin, xMax, yMin, yMax));
+        }
+
+        /// <summary>
+        /// Indices (from the first point of the curve), ascending, of the points with transformed values in a polygon.
+        /// </summary>
+        internal int[] IndicesInPolygon(double[] polygonX, double[] polygonY)
+        {
+            return Relative(SpatialIndex.InPolygon(polygonX, polygonY));
+        }
+
+        private int[] Relative(int[] indices)
+        {
+            if (start != 0) for (int i = 0; i < indices.Length; ++i) indices[i] -= start;
+            return indices;
+        }
+    }
+}
@@ -0,0 +1,124 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    public partial class Curve
+    {
+        /// <summary>
+        /// The transformed values of x or y for an axis type, with their bounds and (for x) whether they are sorted.
+        /// </summary>
+        protected class TransformedValues
+        {
+            internal double[] Values;
+            internal double Min, Max;
+            // Null until needed.
+            internal bool? Sorted;
+        }
+
+        // Transformed values for each axis type used so far, so that changing the axis type back and forth only
+        // transforms the points the first time; the identity types share the untransformed arrays.
+        // Appending points clears the caches (see ClearTransformCache).
+        protected Dictionary<AxisType, TransformedValues> xTransformCache = new Dictionary<AxisType, TransformedValues>();
+        protected Dictionary<AxisType, TransformedValues> yTransformCache = new Dictionary<AxisType, TransformedValues>();
+        protected Dictionary<Tuple<AxisType, AxisType>, MinMaxPyramid> pyramidCache = new Dictionary<Tuple<AxisType, AxisType>, MinMaxPyramid>();
+        protected AxisType xAxisType = AxisType.Linear, yAxisType = AxisType.Linear;
+
+        /// <summary>
+        /// Transform the points for axes of the given types. Transformed values are cached for each axis type.
+        /// </summary>
+        public void Transform(AxisType xAxisType, AxisType yAxisType)
+        {
+            TransformedValues xValues = Transformed(x, xAxisType, xTransformCache);
+            TransformedValues yValues = Transformed(y, yAxisType, yTransformCache);
+            if (xValues.Sorted == null)
+            {
+                // Sortedness of the data carries over if the transform preserves order:
+                if (xAxisType != AxisType.Linear && AxisTransforms.PreservesOrder(xAxisType))
+                    xValues.Sorted = IsSortedLinear();
+                else xValues.Sorted = IsSorted(xValues.Values, start, start + n);
+            }
+            SetTransformed(xAxisType, xValues, yAxisType, yValues, xValues.Sorted.Value);
+        }
+
+        /// <summary>
+        /// Transform a curve made with Curve(shared, y), taking the transformed x values from shared, which must
+        /// already have been transformed.
+        /// </summary>
+        internal void TransformShared(Curve shared, AxisType yAxisType)
+        {
+            TransformedValues xValues = new TransformedValues() { Values = shared.xTransformed, Min = shared.xMin, Max = shared.xMax };
+            TransformedValues yValues = Transformed(y, yAxisType, yTransformCache);
+            SetTransformed(shared.xAxisType, xValues, yAxisType, yValues, shared.xSorted);
+            // The x bounds of shared are those of its transformed values only while its bounds are not stale:
+            if (shared.boundsStale) boundsStale = true;
+        }
+
+        private void SetTransformed(AxisType xAxisType, TransformedValues xValues, AxisType yAxisType, TransformedValues yValues, bool xSorted)
+        {
+            this.xAxisType = xAxisType; this.yAxisType = yAxisType;
+            graphTransformX = AxisTransforms.IsIdentity(xAxisType) ? null : AxisTransforms.GraphTransform(xAxisType);
+            graphTransformY = AxisTransforms.IsIdentity(yAxisType) ? null : AxisTransforms.GraphTransform(yAxisType);
+            xTransformed = xValues.Values;
+            yTransformed = yValues.Values;
+            this.xSorted = xSorted;
+            ResetDerived();
+            xMin = xValues.Min; xMax = xValues.Max;
+            yMin = yValues.Min; yMax = yValues.Max;
+            boundsStale = false;
+        }
+
+        /// <summary>
+        /// The transformed values from the cache, transforming and adding them if not there.
+        /// </summary>
+        private TransformedValues Transformed(double[] values, AxisType axisType, Dictionary<AxisType, TransformedValues> cache)
+        {
+            TransformedValues transformed;
+            if (cache.TryGetValue(axisType, out transformed)) return transformed;
+            transformed = new TransformedValues();
+            transformed.Values = AxisTransforms.Transform(values, start, start + n, axisType, out transformed.Min, out transformed.Max);
+            cache.Add(axisType, transformed);
+            return transformed;
+        }
+
+        /// <summary>
+        /// True if the untransformed x values are sorted ascending; found once and kept in the cache.
+        /// </summary>
+        private bool IsSortedLinear()
+        {
+            TransformedValues linear = Transformed(x, AxisType.Linear, xTransformCache);
+            if (linear.Sorted == null) linear.Sorted = IsSorted(x, start, start + n);
+            return linear.Sorted.Value;
+        }
+
+        /// <summary>
+        /// Forget the transformed values and pyramids of all axis types, for example when the points change.
+        /// The current transformed arrays are kept.
+        /// </summary>
+        protected void ClearTransformCache()
+        {
+            xTransformCache.Clear();
+            yTransformCache.Clear();
+            pyramidCache.Clear();
+        }
+
+        /// <summary>
+        /// The min/max pyramid for the current axis types: made when first needed and kept until the points change.
+        /// </summary>
+        private void EnsurePyramid()
+        {
+            if (pyramid != null) return;
+            Tuple<AxisType, AxisType> key = Tuple.Create(xAxisType, yAxisType);
+            if (!pyramidCache.TryGetValue(key, out pyramid))
+            {
+                pyramid = new MinMaxPyramid(xTransformed, yTransformed, start + n);
+                pyramidCache.Add(key, pyramid);
+            }
+            pyramid.Start = start;
+        }
+    }
+}
@@ -0,0 +1,63 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Conversion of arrays of dates to values of a Date axis: days from the axis' DateOrigin.
+    /// Days from a nearby origin keep much finer resolution as doubles than OADates (days from 1899),
+    /// whose resolution near the present is about 0.5 microseconds.
+    /// </summary>
+    public static class DateTimeArrays
+    {
+        /// <summary>
+        /// The value NumPy uses for NaT (not a time) in datetime64 arrays.
+        /// </summary>
+        public const long NaT = long.MinValue;
+
+        const long nanosecondsPerDay = 86400L * 1000000000L;
+        const int chunkLength = 65536;
+        static readonly DateTime unixEpoch = new DateTime(1970, 1, 1);
+
+        /// <summary>
+        /// Days from origin of times given as nanoseconds since the Unix epoch (i.e. the int64 values of a
+        /// NumPy datetime64[ns] array). NaT gives NaN.
+        /// </summary>
+        public static double[] ToDays(long[] epochNanoseconds, DateTime origin)
+        {
+            // Nanoseconds of the origin since the epoch: whole and fractional days are separated so that no precision
+            // is lost for times far from the origin.
+            long originNanoseconds = (origin.Ticks - unixEpoch.Ticks) * 100;
+            double[] days = new double[epochNanoseconds.Length];
+            Parallel.For(0, (epochNanoseconds.Length + chunkLength - 1) / chunkLength, chunk =>
+            {
+                int end = Math.Min(epochNanoseconds.Length, (chunk + 1) * chunkLength);
+                for (int i = chunk * chunkLength; i < end; ++i)
+                {
+                    long value = epochNanoseconds[i];
+                    if (value == NaT) { days[i] = Double.NaN; continue; }
+                    long relative = value - originNanoseconds;
+                    long wholeDays = relative / nanosecondsPerDay;
+                    days[i] = wholeDays + (double)(relative - wholeDays * nanosecondsPerDay) / nanosecondsPerDay;
+                }
+            });
+            return days;
+        }
+
+        /// <summary>
+        /// Days from origin of dates.
+        /// </summary>
+        public static double[] ToDays(DateTime[] dates, DateTime origin)
+        {
+            long originTicks = origin.Ticks;
+            double[] days = new double[dates.Length];
+            for (int i = 0; i < dates.Length; ++i) days[i] = (dates[i].Ticks - originTicks) / (double)TimeSpan.TicksPerDay;
+            return days;
+        }
+    }
+}
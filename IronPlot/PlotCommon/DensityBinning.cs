@@ -0,0 +1,163 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Binning of scatter points into a grid of counts at screen resolution, and shading of the counts, used by
+    /// DensityScatter. Binning is a single pass over the points, split into chunks that are counted in parallel
+    /// into their own grids, which are then summed.
+    /// The grid covers the region from (left, bottom) of the given width and height in graph coordinates:
+    /// cell (column, row) is counts[row * columns + column], with row 0 at the bottom, as for FalseColourImage.
+    /// Points outside the region and points with NaN coordinates are not counted.
+    /// For categorised points, there is a grid for each category, one after the other.
+    /// ironplot_density.py is the NumPy equivalent and produces identical counts and pixels.
+    /// </summary>
+    public static class DensityBinning
+    {
+        // Minimum number of points counted by each parallel task.
+        const int MinimumChunkSize = 65536;
+        // Maximum memory in bytes of the grids of the parallel tasks.
+        const long MaximumScratchBytes = 256L * 1024 * 1024;
+        // Opacity of the least dense cells of categorised counts.
+        public const int MinimumAlpha = 64;
+
+        public static int[] Bin(double[] x, double[] y, double left, double bottom, double width, double height, int columns, int rows)
+        {
+            return Bin(x, y, null, 1, left, bottom, width, height, columns, rows);
+        }
+
+        /// <summary>
+        /// Counts of the points in each cell, for each category: categories[i] (from 0 to categoryCount - 1) is the
+        /// category of point i, or categories is null for a single category. Points of other categories are not counted.
+        /// </summary>
+        public static int[] Bin(double[] x, double[] y, int[] categories, int categoryCount,
+            double left, double bottom, double width, double height, int columns, int rows)
+        {
+            if (x.Length != y.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            if (categories != null && categories.Length != x.Length) throw new ArgumentException("There must be a category for each point");
+            if (columns < 1 || rows < 1 || categoryCount < 1) throw new ArgumentException("Grid must have at least one cell and one category");
+            int cells = columns * rows;
+            long gridBytes = 4L * cells * categoryCount;
+            int chunks = (int)Math.Max(1, Math.Min(Math.Min(x.Length / MinimumChunkSize, Environment.ProcessorCount),
+                MaximumScratchBytes / gridBytes));
+            int[][] grids = new int[chunks][];
+            double xScale = columns / width, yScale = rows / height;
+            ForEachChunk(x.Length, chunks, (chunk, start, end) =>
+            {
+                int[] grid = new int[cells * categoryCount];
+                for (int i = start; i < end; ++i)
+                {
+                    double u = (x[i] - left) * xScale, v = (y[i] - bottom) * yScale;
+                    // NaN fails the comparisons. Points on the right and top edges go in the last cells.
+                    if (!(u >= 0 && u <= columns && v >= 0 && v <= rows)) continue;
+                    int category = 0;
+                    if (categories != null)
+                    {
+                        category = categories[i];
+                        if (category < 0 || category >= categoryCount) continue;
+                    }
+                    grid[category * cells + Math.Min((int)v, rows - 1) * columns + Math.Min((int)u, columns - 1)]++;
+                }
+                grids[chunk] = grid;
+            });
+            int[] counts = grids[0];
+            for (int chunk = 1; chunk < chunks; ++chunk)
+            {
+                int[] grid = grids[chunk];
+                ForEachChunk(counts.Length, ChunkCount(counts.Length), (part, start, end) =>
+                {
+                    for (int i = start; i < end; ++i) counts[i] += grid[i];
+                });
+            }
+            return counts;
+        }
+
+        /// <summary>
+        /// The largest count of a cell (summed over the categories, of which there are counts.Length / cells).
+        /// </summary>
+        public static int MaxCount(int[] counts, int cells)
+        {
+            int max = 0;
+            for (int i = 0; i < cells; ++i)
+            {
+                int total = 0;
+                for (int index = i; index < counts.Length; index += cells) total += counts[index];
+                if (total > max) max = total;
+            }
+            return max;
+        }
+
+        /// <summary>
+        /// Packed BGRA32 pixels shading single-category counts through a lookup table (see ColourIndexing.LookupTable)
+        /// of nIndices colours: a count of 1 maps to the first colour and maxCount to the last, linearly or logarithmically.
+        /// Empty cells are transparent.
+        /// </summary>
+        public static int[] Shade(int[] counts, int maxCount, ColourNormalisation normalisation, int[] table)
+        {
+            int nIndices = table.Length - 1;
+            double[] values = new double[counts.Length];
+            for (int i = 0; i < counts.Length; ++i) values[i] = counts[i] > 0 ? counts[i] : Double.NaN;
+            UInt16[] indices = ColourIndexing.Quantise(values, 1, Math.Max(maxCount, 1), normalisation, nIndices);
+            return ColourIndexing.ToBgra32(indices, table);
+        }
+
+        /// <summary>
+        /// Packed BGRA32 pixels of categorised counts: each cell has the mean of the colours (packed RGB) of its categories,
+        /// weighted by their counts, and an opacity from MinimumAlpha (a count of 1) to 255 (maxCount), linearly or
+        /// logarithmically in the total count. Empty cells are transparent.
+        /// </summary>
+        public static int[] ShadeCategories(int[] counts, int cells, int maxCount, ColourNormalisation normalisation, int[] colours)
+        {
+            int categoryCount = counts.Length / cells;
+            if (colours.Length < categoryCount) throw new ArgumentException("There must be a colour for each category");
+            int[] pixels = new int[cells];
+            bool log = (normalisation == ColourNormalisation.Log);
+            double range = log ? Math.Log10(Math.Max(maxCount, 1)) : maxCount - 1;
+            ForEachChunk(cells, ChunkCount(cells), (part, start, end) =>
+            {
+                for (int i = start; i < end; ++i)
+                {
+                    double total = 0, red = 0, green = 0, blue = 0;
+                    for (int category = 0; category < categoryCount; ++category)
+                    {
+                        int count = counts[category * cells + i];
+                        if (count == 0) continue;
+                        int colour = colours[category];
+                        total += count;
+                        red += count * ((colour >> 16) & 0xFF); green += count * ((colour >> 8) & 0xFF); blue += count * (colour & 0xFF);
+                    }
+                    if (total == 0) continue;
+                    double level = (range > 0) ? (log ? Math.Log10(total) : total - 1) / range : 1;
+                    int alpha = MinimumAlpha + (int)(level * (255 - MinimumAlpha) + 0.5);
+                    pixels[i] = (alpha << 24) | ((int)(red / total + 0.5) << 16) | ((int)(green / total + 0.5) << 8) | (int)(blue / total + 0.5);
+                }
+            });
+            return pixels;
+        }
+
+        private static int ChunkCount(int length)
+        {
+            return (int)Math.Max(1, Math.Min(length / MinimumChunkSize, 4 * Environment.ProcessorCount));
+        }
+
+        /// <summary>
+        /// Call body(chunk, start, end) for each of chunks contiguous ranges of points, in parallel.
+        /// </summary>
+        private static void ForEachChunk(int length, int chunks, Action<int, int, int> body)
+        {
+            if (chunks <= 1)
+            {
+                body(0, 0, length);
+                return;
+            }
+            Parallel.For(0, chunks, chunk =>
+                body(chunk, (int)((long)length * chunk / chunks), (int)((long)length * (chunk + 1) / chunks)));
+        }
+    }
+}
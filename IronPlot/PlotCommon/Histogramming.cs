@@ -0,0 +1,313 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Counts of data in bins, used by Bars and FalseColourImage to show histograms. Counting is a single pass over
+    /// the data, split into chunks that are counted in parallel into their own counts, which are then summed; counts
+    /// of more data merge into existing counts in the same way (see Histogram and Histogram2D).
+    /// Bin k holds the values from edges[k] up to but not including edges[k + 1], except that the last bin includes
+    /// its right edge, as numpy.histogram; values outside the edges and NaNs are not counted. For evenly spaced edges
+    /// (uniform) the bins are found by arithmetic rather than by search, with the same results.
+    /// 2-D counts are indexed [x bin, y bin], as the data of FalseColourImage.
+    /// ironplot_hist.py is the NumPy equivalent and produces identical edges and counts.
+    /// </summary>
+    public static class Histogramming
+    {
+        // Minimum number of values counted by each parallel task.
+        const int MinimumChunkSize = 65536;
+        // Maximum memory in bytes of the counts of the parallel tasks.
+        const long MaximumScratchBytes = 256L * 1024 * 1024;
+
+        /// <summary>
+        /// The edges of bins evenly spaced from min to max, as numpy.linspace.
+        /// </summary>
+        public static double[] Edges(double min, double max, int bins)
+        {
+            if (bins < 1) throw new ArgumentException("There must be at least one bin");
+            if (!(max >= min)) throw new ArgumentException("The range must be ascending");
+            if (min == max) { min -= 0.5; max += 0.5; }
+            double[] edges = new double[bins + 1];
+            double step = (max - min) / bins;
+            for (int k = 0; k < bins; ++k) edges[k] = k * step + min;
+            edges[bins] = max;
+            return edges;
+        }
+
+        /// <summary>
+        /// The minimum and maximum of the finite values of data; 0 and 1 if there are none.
+        /// </summary>
+        public static void Range(double[] data, out double min, out double max)
+        {
+            int chunks = ChunkCount(data.Length);
+            double[] mins = new double[chunks], maxs = new double[chunks];
+            ForEachChunk(data.Length, chunks, (chunk, start, end) =>
+            {
+                double low = Double.PositiveInfinity, high = Double.NegativeInfinity;
+                for (int i = start; i < end; ++i)
+                {
+                    double value = data[i];
+                    if (Double.IsNaN(value) || Double.IsInfinity(value)) continue;
+                    if (value < low) low = value;
+                    if (value > high) high = value;
+                }
+                mins[chunk] = low; maxs[chunk] = high;
+            });
+            min = mins.Min(); max = maxs.Max();
+            if (min > max) { min = 0; max = 1; }
+        }
+
+        /// <summary>
+        /// Counts of data in the bins between edges.
+        /// </summary>
+        public static double[] Count(double[] data, double[] edges, bool uniform)
+        {
+            CheckEdges(edges);
+            int bins = edges.Length - 1;
+            int chunks = (int)Math.Max(1, Math.Min(ChunkCount(data.Length), MaximumScratchBytes / (4L * bins)));
+            int[][] partials = new int[chunks][];
+            ForEachChunk(data.Length, chunks, (chunk, start, end) =>
+            {
+                int[] partial = new int[bins];
+                double scale = bins / (edges[bins] - edges[0]);
+                for (int i = start; i < end; ++i)
+                {
+                    int bin = Bin(data[i], edges, uniform, scale);
+                    if (bin >= 0) partial[bin]++;
+                }
+                partials[chunk] = partial;
+            });
+            return Sum(partials, bins);
+        }
+
+        /// <summary>
+        /// Counts of the points (x[i], y[i]) in the cells between xEdges and yEdges, indexed [x bin, y bin].
+        /// </summary>
+        public static double[,] Count(double[] x, double[] y, double[] xEdges, double[] yEdges, bool xUniform, bool yUniform)
+        {
+            if (x.Length != y.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            CheckEdges(xEdges); CheckEdges(yEdges);
+            int xBins = xEdges.Length - 1, yBins = yEdges.Length - 1;
+            int cells = xBins * yBins;
+            int chunks = (int)Math.Max(1, Math.Min(ChunkCount(x.Length), MaximumScratchBytes / (4L * cells)));
+            int[][] partials = new int[chunks][];
+            ForEachChunk(x.Length, chunks, (chunk, start, end) =>
+            {
+                int[] partial = new int[cells];
+                double xScale = xBins / (xEdges[xBins] - xEdges[0]), yScale = yBins / (yEdges[yBins] - yEdges[0]);
+                for (int i = start; i < end; ++i)
+                {
+                    int xBin = Bin(x[i], xEdges, xUniform, xScale);
+                    if (xBin < 0) continue;
+                    int yBin = Bin(y[i], yEdges, yUniform, yScale);
+                    if (yBin >= 0) partial[xBin * yBins + yBin]++;
+                }
+                partials[chunk] = partial;
+            });
+            double[] sum = Sum(partials, cells);
+            double[,] counts = new double[xBins, yBins];
+            Buffer.BlockCopy(sum, 0, counts, 0, sum.Length * sizeof(double));
+            return counts;
+        }
+
+        internal static void CheckEdges(double[] edges)
+        {
+            if (edges.Length < 2) throw new ArgumentException("There must be at least one bin");
+            for (int k = 1; k < edges.Length; ++k) if (!(edges[k] > edges[k - 1])) throw new ArgumentException("Bin edges must be ascending");
+        }
+
+        /// <summary>
+        /// The bin of value, or -1 if it is outside the edges or NaN. scale is the number of bins over the range of the edges.
+        /// </summary>
+        private static int Bin(double value, double[] edges, bool uniform, double scale)
+        {
+            int bins = edges.Length - 1;
+            // NaN fails the comparison.
+            if (!(value >= edges[0] && value <= edges[bins])) return -1;
+            if (uniform)
+            {
+                int index = Math.Min((int)((value - edges[0]) * scale), bins - 1);
+                // Correct the bins of values that rounding put next to their own, as numpy.histogram:
+                if (value < edges[index]) index--;
+                else if (value >= edges[index + 1] && index != bins - 1) index++;
+                return index;
+            }
+            int lo = 0, hi = edges.Length;
+            while (lo < hi)
+            {
+                int mid = (lo + hi) >> 1;
+                if (edges[mid] <= value) lo = mid + 1;
+                else hi = mid;
+            }
+            return Math.Min(lo - 1, bins - 1);
+        }
+
+        private static double[] Sum(int[][] partials, int length)
+        {
+            double[] sum = new double[length];
+            ForEachChunk(length, ChunkCount(length), (part, start, end) =>
+            {
+                foreach (int[] partial in partials)
+                    for (int i = start; i < end; ++i) sum[i] += partial[i];
+            });
+            return sum;
+        }
+
+        private static int ChunkCount(int length)
+        {
+            return (int)Math.Max(1, Math.Min(length / MinimumChunkSize, 4 * Environment.ProcessorCount));
+        }
+
+        /// <summary>
+        /// Call body(chunk, start, end) for each of chunks contiguous ranges of values, in parallel.
+        /// </summary>
+        private static void ForEachChunk(int length, int chunks, Action<int, int, int> body)
+        {
+            if (chunks <= 1)
+            {
+                body(0, 0, length);
+                return;
+            }
+            Parallel.For(0, chunks, chunk =>
+                body(chunk, (int)((long)length * chunk / chunks), (int)((long)length * (chunk + 1) / chunks)));
+        }
+    }
+
+    /// <summary>
+    /// A histogram to which data can be added: the counts of the new data alone are found (see Histogramming) and
+    /// added to the counts so far. Changed is raised, on the thread that adds, after each addition.
+    /// </summary>
+    public class Histogram
+    {
+        public double[] Edges { get; private set; }
+        // Whether the edges are evenly spaced:
+        public bool Uniform { get; private set; }
+        public double[] Counts { get; private set; }
+        public event EventHandler Changed;
+
+        /// <summary>
+        /// An empty histogram with bins between edges.
+        /// </summary>
+        public Histogram(double[] edges)
+        {
+            Histogramming.CheckEdges(edges);
+            Edges = (double[])edges.Clone();
+            Counts = new double[edges.Length - 1];
+        }
+
+        /// <summary>
+        /// An empty histogram with bins evenly spaced from min to max.
+        /// </summary>
+        public Histogram(double min, double max, int bins)
+        {
+            Edges = Histogramming.Edges(min, max, bins);
+            Uniform = true;
+            Counts = new double[bins];
+        }
+
+        /// <summary>
+        /// The histogram of data in bins evenly spaced over its range.
+        /// </summary>
+        public Histogram(double[] data, int bins)
+        {
+            double min, max;
+            Histogramming.Range(data, out min, out max);
+            Edges = Histogramming.Edges(min, max, bins);
+            Uniform = true;
+            Counts = Histogramming.Count(data, Edges, true);
+        }
+
+        public double[] Centres
+        {
+            get { return Edges.Take(Counts.Length).Zip(Edges.Skip(1), (left, right) => 0.5 * (left + right)).ToArray(); }
+        }
+
+        /// <summary>
+        /// Count data into the bins.
+        /// </summary>
+        public void Add(double[] data)
+        {
+            AddCounts(Histogramming.Count(data, Edges, Uniform));
+        }
+
+        /// <summary>
+        /// Add counts found elsewhere (e.g. by ironplot_hist, or of another Histogram with the same edges).
+        /// </summary>
+        public void AddCounts(double[] counts)
+        {
+            if (counts.Length != Counts.Length) throw new ArgumentException("There must be a count for each bin");
+            for (int k = 0; k < counts.Length; ++k) Counts[k] += counts[k];
+            if (Changed != null) Changed(this, EventArgs.Empty);
+        }
+    }
+
+    /// <summary>
+    /// A 2-D histogram to which points can be added, as Histogram. Counts are indexed [x bin, y bin].
+    /// </summary>
+    public class Histogram2D
+    {
+        public double[] XEdges { get; private set; }
+        public double[] YEdges { get; private set; }
+        public bool XUniform { get; private set; }
+        public bool YUniform { get; private set; }
+        public double[,] Counts { get; private set; }
+        public event EventHandler Changed;
+
+        public Histogram2D(double[] xEdges, double[] yEdges)
+        {
+            Histogramming.CheckEdges(xEdges); Histogramming.CheckEdges(yEdges);
+            XEdges = (double[])xEdges.Clone(); YEdges = (double[])yEdges.Clone();
+            Counts = new double[xEdges.Length - 1, yEdges.Length - 1];
+        }
+
+        /// <summary>
+        /// An empty histogram with cells evenly spaced from xMin to xMax and yMin to yMax.
+        /// </summary>
+        public Histogram2D(double xMin, double xMax, int xBins, double yMin, double yMax, int yBins)
+        {
+            XEdges = Histogramming.Edges(xMin, xMax, xBins); YEdges = Histogramming.Edges(yMin, yMax, yBins);
+            XUniform = YUniform = true;
+            Counts = new double[xBins, yBins];
+        }
+
+        /// <summary>
+        /// The histogram of the points (x[i], y[i]) in cells evenly spaced over their ranges.
+        /// </summary>
+        public Histogram2D(double[] x, double[] y, int xBins, int yBins)
+        {
+            double xMin, xMax, yMin, yMax;
+            Histogramming.Range(x, out xMin, out xMax);
+            Histogramming.Range(y, out yMin, out yMax);
+            XEdges = Histogramming.Edges(xMin, xMax, xBins); YEdges = Histogramming.Edges(yMin, yMax, yBins);
+            XUniform = YUniform = true;
+            Counts = Histogramming.Count(x, y, XEdges, YEdges, true, true);
+        }
+
+        /// <summary>
+        /// Count the points (x[i], y[i]) into the cells.
+        /// </summary>
+        public void Add(double[] x, double[] y)
+        {
+            AddCounts(Histogramming.Count(x, y, XEdges, YEdges, XUniform, YUniform));
+        }
+
+        /// <summary>
+        /// Add counts found elsewhere (e.g. by ironplot_hist, or of another Histogram2D with the same edges).
+        /// </summary>
+        public void AddCounts(double[,] counts)
+        {
+            if (counts.GetLength(0) != Counts.GetLength(0) || counts.GetLength(1) != Counts.GetLength(1))
+                throw new ArgumentException("There must be a count for each cell");
+            int yBins = Counts.GetLength(1);
+            for (int i = 0; i < counts.GetLength(0); ++i)
+                for (int j = 0; j < yBins; ++j) Counts[i, j] += counts[i, j];
+            if (Changed != null) Changed(this, EventArgs.Empty);
+        }
+    }
+}
@@ -0,0 +1,197 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.IO;
+using System.IO.MemoryMappedFiles;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Multi-level (mip) pyramid of colour map indices for an image too large to hold in memory, stored on disk
+    /// and read through memory-mapped files. Level 0 is the full-resolution image and each level above halves
+    /// the width and height (rounding up). Levels are split into square tiles of TileSize pixels, so that only
+    /// the tiles covering a view need to be read.
+    /// The pyramid is a directory containing a header file, pyramid.txt, of 'key = value' lines, and one file
+    /// per level, level0.u16, level1.u16, ..., each holding the indices of that level as little-endian UInt16
+    /// values, row by row. ironplot_tiles.py builds pyramids from NumPy memmaps and raw binary files.
+    /// </summary>
+    public class ImagePyramid : IDisposable
+    {
+        public const string HeaderFile = "pyramid.txt";
+
+        string directory;
+        int tileSize;
+        int[] widths, heights;
+        MemoryMappedFile[] files;
+        MemoryMappedViewAccessor[] views;
+        Dictionary<string, string> header;
+
+        public ImagePyramid(string directory)
+        {
+            this.directory = directory;
+            header = ReadHeader(Path.Combine(directory, HeaderFile));
+            int width = HeaderInt("width"), height = HeaderInt("height"), levels = HeaderInt("levels");
+            tileSize = HeaderInt("tilesize");
+            if (width < 1 || height < 1 || levels < 1 || tileSize < 1) throw new FormatException("Invalid image pyramid header");
+            widths = new int[levels]; heights = new int[levels];
+            files = new MemoryMappedFile[levels]; views = new MemoryMappedViewAccessor[levels];
+            for (int level = 0; level < levels; ++level)
+            {
+                widths[level] = width; heights[level] = height;
+                string path = Path.Combine(directory, "level" + level.ToString(CultureInfo.InvariantCulture) + ".u16");
+                long length = 2L * width * height;
+                if (new FileInfo(path).Length < length) throw new FormatException("Image pyramid level " + level + " is incomplete");
+                // Shared, so that several images (or the process that built the pyramid) can read it at once.
+                FileStream stream = new FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read);
+                files[level] = MemoryMappedFile.CreateFromFile(stream, null, 0, MemoryMappedFileAccess.Read, null, HandleInheritability.None, false);
+                views[level] = files[level].CreateViewAccessor(0, length, MemoryMappedFileAccess.Read);
+                width = (width + 1) / 2; height = (height + 1) / 2;
+            }
+        }
+
+        private static Dictionary<string, string> ReadHeader(string path)
+        {
+            Dictionary<string, string> header = new Dictionary<string, string>();
+            foreach (string line in File.ReadAllLines(path))
+            {
+                int separator = line.IndexOf('=');
+                if (separator < 0) continue;
+                header[line.Substring(0, separator).Trim()] = line.Substring(separator + 1).Trim();
+            }
+            return header;
+        }
+
+        private int HeaderInt(string key)
+        {
+            return Int32.Parse(HeaderValue(key), CultureInfo.InvariantCulture);
+        }
+
+        private string HeaderValue(string key)
+        {
+            string value;
+            if (!header.TryGetValue(key, out value)) throw new FormatException("Image pyramid header has no " + key);
+            return value;
+        }
+
+        public string Directory
+        {
+            get { return directory; }
+        }
+
+        /// <summary>
+        /// Whether Dispose also deletes the directory of the pyramid, e.g. one built in a temporary directory.
+        /// </summary>
+        public bool DeleteOnDispose { get; set; }
+
+        public int Levels
+        {
+            get { return widths.Length; }
+        }
+
+        public int TileSize
+        {
+            get { return tileSize; }
+        }
+
+        /// <summary>
+        /// Number of colours the indices were quantised for; masked pixels have this index.
+        /// </summary>
+        public int ColourCount
+        {
+            get { return HeaderInt("ncolours"); }
+        }
+
+        /// <summary>
+        /// Data value mapped to the first colour.
+        /// </summary>
+        public double ColourMin
+        {
+            get { return Double.Parse(HeaderValue("min"), CultureInfo.InvariantCulture); }
+        }
+
+        /// <summary>
+        /// Data value mapped to the last colour.
+        /// </summary>
+        public double ColourMax
+        {
+            get { return Double.Parse(HeaderValue("max"), CultureInfo.InvariantCulture); }
+        }
+
+        public int Width(int level)
+        {
+            return widths[level];
+        }
+
+        public int Height(int level)
+        {
+            return heights[level];
+        }
+
+        public int TilesX(int level)
+        {
+            return (widths[level] + tileSize - 1) / tileSize;
+        }
+
+        public int TilesY(int level)
+        {
+            return (heights[level] + tileSize - 1) / tileSize;
+        }
+
+        /// <summary>
+        /// The coarsest level that still has at least one pixel per screen pixel, when each screen pixel
+        /// spans pixelsPerScreenPixel pixels of the full-resolution image.
+        /// </summary>
+        public int ChooseLevel(double pixelsPerScreenPixel)
+        {
+            int level = 0;
+            while (level < Levels - 1 && (double)(1L << (level + 1)) <= pixelsPerScreenPixel) level++;
+            return level;
+        }
+
+        /// <summary>
+        /// Read the indices of a tile, row by row, into indices (which must hold at least TileSize * TileSize values).
+        /// Tiles on the right and top edges may be smaller than TileSize: their size is returned in width and height.
+        /// </summary>
+        public void ReadTile(int level, int tileX, int tileY, UInt16[] indices, out int width, out int height)
+        {
+            if (tileX < 0 || tileX >= TilesX(level) || tileY < 0 || tileY >= TilesY(level)) throw new ArgumentOutOfRangeException("Tile is outside the image");
+            int left = tileX * tileSize, bottom = tileY * tileSize;
+            width = Math.Min(tileSize, widths[level] - left);
+            height = Math.Min(tileSize, heights[level] - bottom);
+            MemoryMappedViewAccessor view = views[level];
+            for (int row = 0; row < height; ++row)
+            {
+                long position = 2L * ((long)(bottom + row) * widths[level] + left);
+                view.ReadArray<UInt16>(position, indices, row * width, width);
+            }
+        }
+
+        public void Dispose()
+        {
+            for (int level = 0; level < views.Length; ++level)
+            {
+                if (views[level] != null) views[level].Dispose();
+                if (files[level] != null) files[level].Dispose();
+                views[level] = null; files[level] = null;
+            }
+            if (DeleteOnDispose && System.IO.Directory.Exists(directory))
+            {
+                try
+                {
+                    System.IO.Directory.Delete(directory, true);
+                }
+                catch (IOException)
+                {
+                    // Another process may still have the files open.
+                }
+                catch (UnauthorizedAccessException)
+                {
+                }
+            }
+        }
+    }
+}
@@ -105,6 +105,36 @@ namespace IronPlot
             }
         }
         
+        /// <summary>
+        /// Copy a 2D array into a 1D array, in the same order as ArrayEnumerator.
+        /// </summary>
+        public static T[] ToFlatArray<T>(this T[,] input, EnumerationOrder2D order)
+        {
+            int length0 = input.GetLength(0), length1 = input.GetLength(1);
+            T[] output = new T[length0 * length1];
+            if (order == EnumerationOrder2D.RowMajor)
+            {
+                // This is the memory layout of a 2D array.
+                if (typeof(T).IsPrimitive) Buffer.BlockCopy(input, 0, output, 0, Buffer.ByteLength(input));
+                else
+                {
+                    int index = 0;
+                    foreach (T item in input) output[index++] = item;
+                }
+            }
+            else
+            {
+                for (int i = 0; i < length0; ++i)
+                {
+                    for (int j = 0; j < length1; ++j)
+                    {
+                        output[j * length0 + i] = input[i, j];
+                    }
+                }
+            }
+            return output;
+        }
+
         public static double[] MultiplyBy(this double[] input, double multiplier)
         {
             for (int i = 0; i < input.Length; ++i) input[i] *= multiplier;
@@ -0,0 +1,179 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Multi-resolution min/max level-of-detail structure for a curve whose x values are sorted ascending.
+    /// Level 0 holds the indices of the minimum and maximum y values of each block of BlockSize points;
+    /// each subsequent level merges pairs of nodes of the level below.
+    /// For any x range split into pixel columns, Decimate returns the first, minimum, maximum and last point of
+    /// each column (at most four points per column), which renders identically to drawing every point.
+    /// Only O(columns * log n) points and nodes are visited.
+    /// </summary>
+    public class MinMaxPyramid
+    {
+        public const int BlockSize = 8;
+
+        double[] x, y;
+        int start, n;
+        // levels[k][2 * j] is the index of the minimum and levels[k][2 * j + 1] the index of the maximum
+        // of node j on level k; -1 if the node only contains NaNs. The levels are allocated for the full
+        // length of the arrays so that the pyramid can be extended as points are appended.
+        List<int[]> levels = new List<int[]>();
+
+        public MinMaxPyramid(double[] x, double[] y) : this(x, y, x.Length) { }
+
+        /// <summary>
+        /// Create a pyramid for the first count points of x and y.
+        /// </summary>
+        public MinMaxPyramid(double[] x, double[] y, int count)
+        {
+            this.x = x; this.y = y;
+            for (int nodes = x.Length / BlockSize; nodes > 0; nodes /= 2)
+            {
+                levels.Add(new int[2 * nodes]);
+                if (nodes == 1) break;
+            }
+            Extend(count);
+        }
+
+        public int Count
+        {
+            get { return n; }
+        }
+
+        public int Levels
+        {
+            get { return levels.Count; }
+        }
+
+        /// <summary>
+        /// Index of the first point considered by LowerBound and Decimate. Points before this
+        /// (for example those discarded from a rolling window) are ignored.
+        /// </summary>
+        public int Start
+        {
+            get { return start; }
+            set { start = value; }
+        }
+
+        /// <summary>
+        /// Extend the pyramid to cover the first count points, after points have been appended to x and y.
+        /// Only the nodes that have become complete are calculated, so this is O(number of new points).
+        /// </summary>
+        public void Extend(int count)
+        {
+            if (count > x.Length) throw new ArgumentException("Count exceeds the length of the arrays");
+            int oldNodes = n / BlockSize, newNodes = count / BlockSize;
+            n = count;
+            if (levels.Count == 0) return;
+            int[] level = levels[0];
+            for (int j = oldNodes; j < newNodes; ++j)
+            {
+                int minIndex = -1, maxIndex = -1;
+                int end = (j + 1) * BlockSize;
+                for (int i = j * BlockSize; i < end; ++i) Accumulate(i, i, ref minIndex, ref maxIndex);
+                level[2 * j] = minIndex; level[2 * j + 1] = maxIndex;
+            }
+            for (int k = 1; k < levels.Count; ++k)
+            {
+                int[] below = level;
+                level = levels[k];
+                oldNodes /= 2; newNodes /= 2;
+                if (oldNodes == newNodes) break;
+                for (int j = oldNodes; j < newNodes; ++j)
+                {
+                    int minIndex = below[4 * j], maxIndex = below[4 * j + 1];
+                    Accumulate(below[4 * j + 2], below[4 * j + 3], ref minIndex, ref maxIndex);
+                    level[2 * j] = minIndex; level[2 * j + 1] = maxIndex;
+                }
+            }
+        }
+
+        private void Accumulate(int candidateMin, int candidateMax, ref int minIndex, ref int maxIndex)
+        {
+            if (candidateMin >= 0 && !Double.IsNaN(y[candidateMin]) && (minIndex < 0 || y[candidateMin] < y[minIndex])) minIndex = candidateMin;
+            if (candidateMax >= 0 && !Double.IsNaN(y[candidateMax]) && (maxIndex < 0 || y[candidateMax] > y[maxIndex])) maxIndex = candidateMax;
+        }
+
+        /// <summary>
+        /// Find the indices of the minimum and maximum y values in the index range [start, end).
+        /// Both are -1 if the range is empty or contains only NaNs.
+        /// </summary>
+        public void MinMax(int start, int end, out int minIndex, out int maxIndex)
+        {
+            minIndex = -1; maxIndex = -1;
+            // Points up to the first block boundary, and after the last one:
+            int lo = Math.Min(end, (start + BlockSize - 1) / BlockSize * BlockSize);
+            int hi = Math.Max(lo, end / BlockSize * BlockSize);
+            for (int i = start; i < lo; ++i) Accumulate(i, i, ref minIndex, ref maxIndex);
+            for (int i = hi; i < end; ++i) Accumulate(i, i, ref minIndex, ref maxIndex);
+            // Whole blocks, climbing the levels:
+            lo /= BlockSize; hi /= BlockSize;
+            int k = 0;
+            while (lo < hi && k < levels.Count)
+            {
+                int[] level = levels[k];
+                if ((lo & 1) == 1) { Accumulate(level[2 * lo], level[2 * lo + 1], ref minIndex, ref maxIndex); lo++; }
+                if ((hi & 1) == 1) { hi--; Accumulate(level[2 * hi], level[2 * hi + 1], ref minIndex, ref maxIndex); }
+                lo /= 2; hi /= 2; k++;
+            }
+        }
+
+        /// <summary>
+        /// Index of the first point from Start with x greater than or equal to value.
+        /// </summary>
+        public int LowerBound(double value)
+        {
+            int p = start, r = n;
+            while (p < r)
+            {
+                int q = (p + r) >> 1;
+                if (x[q] < value) p = q + 1;
+                else r = q;
+            }
+            return p;
+        }
+
+        /// <summary>
+        /// Return the ascending indices of the points to draw for x from xStart to xStart + columns * columnWidth,
+        /// where each column is one pixel wide. The points either side of the range are also included, so that lines
+        /// leaving the range are drawn correctly.
+        /// </summary>
+        public int[] Decimate(double xStart, double columnWidth, int columns)
+        {
+            List<int> indices = new List<int>(4 * columns + 2);
+            int lower = LowerBound(xStart);
+            if (lower > start) indices.Add(lower - 1);
+            int columnStart = lower;
+            for (int c = 1; c <= columns; ++c)
+            {
+                int columnEnd = LowerBound(xStart + c * columnWidth);
+                if (columnEnd <= columnStart) continue;
+                int last = columnEnd - 1;
+                int minIndex, maxIndex;
+                if (columnEnd - columnStart <= 4)
+                {
+                    for (int i = columnStart; i < columnEnd; ++i) indices.Add(i);
+                }
+                else
+                {
+                    MinMax(columnStart, columnEnd, out minIndex, out maxIndex);
+                    indices.Add(columnStart);
+                    int first = Math.Min(minIndex, maxIndex), second = Math.Max(minIndex, maxIndex);
+                    if (first > columnStart && first < last) indices.Add(first);
+                    if (second > columnStart && second < last && second != first) indices.Add(second);
+                    indices.Add(last);
+                }
+                columnStart = columnEnd;
+            }
+            if (columnStart < n) indices.Add(columnStart);
+            return indices.ToArray();
+        }
+    }
+}
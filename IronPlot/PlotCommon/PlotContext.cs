@@ -174,8 +174,13 @@ namespace IronPlot
             windowDictionary.Remove(entry.Key);
             plotDictionaryLookup.Remove(entry.Value);
             Window windowToRemove = (Window)sender;
+            if (windowToRemove.Content is Grid) plotDictionaryLookup.Remove((Grid)windowToRemove.Content);
             if ((windowToRemove.Content != null) && (windowToRemove.Content.GetType() == typeof(TabControl)))
             {
+                foreach (TabItem tabItem in ((TabControl)windowToRemove.Content).Items.OfType<TabItem>())
+                {
+                    if (tabItem.Content is Grid) plotDictionaryLookup.Remove((Grid)tabItem.Content);
+                }
                 tabItemDictionaryLookup.Remove((TabControl)(windowToRemove.Content));
                 plotDictionaryLookup.Remove((TabControl)(windowToRemove.Content));
             }
@@ -301,23 +306,23 @@ namespace IronPlot
                 newGrid.ColumnDefinitions.Add(col);
             }
             Dictionary<int?, FrameworkElement> newPlotDictionary = new Dictionary<int?, FrameworkElement>(); ;
+            // Grids of plots are looked up by Grid, so that each tab of a window can have its own.
             if (currentTabItem != null)
             {
+                if (currentTabItem.Content is Grid) PlotContext.plotDictionaryLookup.Remove((Grid)currentTabItem.Content);
                 currentTabItem.Content = newGrid;
-                PlotContext.plotDictionaryLookup.Remove(currentTabItem);
-                
             }
             else if (currentWindow != null)
             {
+                if (currentWindow.Content is Grid) PlotContext.plotDictionaryLookup.Remove((Grid)currentWindow.Content);
                 currentWindow.Content = newGrid;
-                PlotContext.plotDictionaryLookup.Remove(currentWindow);
             }
             else
             {
                 OpenNextWindow();
                 currentWindow.Content = newGrid;
             }
-            PlotContext.plotDictionaryLookup.Add(currentWindow, newPlotDictionary);
+            PlotContext.plotDictionaryLookup.Add(newGrid, newPlotDictionary);
             PlotContext.plotDictionary = newPlotDictionary;
             PlotContext.currentGrid = newGrid;
             PlotContext.currentPlotIndex = 0;
@@ -333,6 +338,7 @@ namespace IronPlot
                 {
                     ((Grid)currentGrid).Children.Remove(oldPlot);
                     plotDictionary.Remove(currentPlotIndex);
+                    if (oldPlot is Plot2D) Unlink((Plot2D)oldPlot);
                 }
                 ((Grid)currentGrid).Children.Add(plot);
                 plotDictionary.Add(currentPlotIndex, plot);
@@ -353,6 +359,35 @@ namespace IronPlot
             currentPlot = plot;
         }
 
+        /// <summary>
+        /// Link the bottom x axes (if linkX) and the left y axes (if linkY) of the plots in the current grid, so that
+        /// they pan and zoom together; if false, unlink them. Plots added to the grid later are not linked.
+        /// </summary>
+        static public void LinkAxes(bool linkX, bool linkY)
+        {
+            if (currentGrid == null) throw new Exception("There is no current grid of plots.");
+            List<Plot2D> plots = ((Grid)currentGrid).Children.OfType<Plot2D>().ToList();
+            List<Axis2D> xAxes = plots.Select(t => (Axis2D)t.Axes.XAxes.Bottom).ToList();
+            List<Axis2D> yAxes = plots.Select(t => (Axis2D)t.Axes.YAxes.Left).ToList();
+            if (linkX) new LinkedAxes(xAxes);
+            else Unlink(xAxes);
+            if (linkY) new LinkedAxes(yAxes);
+            else Unlink(yAxes);
+        }
+
+        static void Unlink(Plot2D plot)
+        {
+            Unlink(plot.Axes.XAxes.Concat<Axis2D>(plot.Axes.YAxes));
+        }
+
+        static void Unlink(IEnumerable<Axis2D> axes)
+        {
+            foreach (Axis2D axis in axes)
+            {
+                if (axis.LinkedAxes != null) axis.LinkedAxes.Remove(axis);
+            }
+        }
+
         //GridSplitter 
     }
 }
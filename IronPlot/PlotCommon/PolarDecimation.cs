@@ -0,0 +1,72 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Min/max decimation of polar traces (angle in degrees, radius) to screen resolution.
+    /// The circle is divided into angular bins (e.g. one per pixel of circumference). The points are taken in order
+    /// and split into runs that stay in one bin: of each run only the first and last points and the points of least
+    /// and greatest radius are kept, in their original order, so that the drawn trace looks the same.
+    /// A trace of many revolutions keeps at most four points per bin per revolution.
+    /// Points with a NaN angle or radius are kept, so that gaps in the trace remain.
+    /// </summary>
+    public static class PolarDecimation
+    {
+        /// <summary>
+        /// Indices, ascending, of the points from start (inclusive) to end (exclusive) to keep.
+        /// </summary>
+        public static int[] Decimate(double[] theta, double[] r, int start, int end, int bins)
+        {
+            if (theta.Length != r.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            List<int> kept = new List<int>();
+            int runStart = start, runBin = -1;
+            for (int i = start; i < end; ++i)
+            {
+                int bin = (Double.IsNaN(theta[i]) || Double.IsNaN(r[i])) ? -1 : Bin(theta[i], bins);
+                if (bin == runBin && bin != -1) continue;
+                if (i > runStart) KeepRun(r, runStart, i, kept);
+                runStart = i; runBin = bin;
+            }
+            if (end > runStart) KeepRun(r, runStart, end, kept);
+            return kept.ToArray();
+        }
+
+        /// <summary>
+        /// A number of bins for a polar plot of the given diameter in pixels: one per pixel of circumference.
+        /// </summary>
+        public static int ScreenBins(double diameter)
+        {
+            return Math.Max(360, (int)Math.Ceiling(Math.PI * diameter));
+        }
+
+        private static int Bin(double theta, int bins)
+        {
+            double turn = (theta % 360.0) / 360.0;
+            if (turn < 0) turn += 1.0;
+            return Math.Min(bins - 1, (int)(turn * bins));
+        }
+
+        /// <summary>
+        /// Keep the first, least radius, greatest radius and last points of the run from start to end, in order.
+        /// </summary>
+        private static void KeepRun(double[] r, int start, int end, List<int> kept)
+        {
+            int minIndex = start, maxIndex = start;
+            for (int i = start + 1; i < end; ++i)
+            {
+                if (r[i] < r[minIndex]) minIndex = i;
+                if (r[i] > r[maxIndex]) maxIndex = i;
+            }
+            kept.Add(start);
+            int first = Math.Min(minIndex, maxIndex), second = Math.Max(minIndex, maxIndex);
+            if (first > start) kept.Add(first);
+            if (second > first && second > start) kept.Add(second);
+            if (end - 1 > second) kept.Add(end - 1);
+        }
+    }
+}
@@ -0,0 +1,74 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Windows.Forms.DataVisualization.Charting;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Bulk loading of polar (radial) chart series: whole arrays are decimated (see PolarDecimation) and handed to
+    /// the chart in one call, rather than one cross-runtime call and chart update per point.
+    /// </summary>
+    public static class PolarSeries
+    {
+        /// <summary>
+        /// Number of angular bins for the current size of chart: one per pixel of the circumference of the plot.
+        /// </summary>
+        public static int ScreenBins(Chart chart)
+        {
+            return PolarDecimation.ScreenBins(Math.Max(chart.Width, chart.Height));
+        }
+
+        /// <summary>
+        /// Replace the points of series by theta (degrees) and r, decimated to bins angular bins
+        /// (no decimation if bins is zero). Returns the number of points bound.
+        /// </summary>
+        public static int Bind(Series series, object theta, object r, int bins)
+        {
+            double[] xs, ys;
+            Prepare(theta, r, bins, out xs, out ys);
+            series.Points.DataBindXY(xs, ys);
+            return xs.Length;
+        }
+
+        /// <summary>
+        /// Add points (e.g. a new revolution) to the end of series, decimated as for Bind, leaving the existing points
+        /// as they are. The chart is updated once. Returns the number of points added.
+        /// </summary>
+        public static int Append(Series series, object theta, object r, int bins)
+        {
+            double[] xs, ys;
+            Prepare(theta, r, bins, out xs, out ys);
+            series.Points.SuspendUpdates();
+            try
+            {
+                for (int i = 0; i < xs.Length; ++i) series.Points.AddXY(xs[i], ys[i]);
+            }
+            finally
+            {
+                series.Points.ResumeUpdates();
+            }
+            return xs.Length;
+        }
+
+        private static void Prepare(object theta, object r, int bins, out double[] xs, out double[] ys)
+        {
+            double[] thetaArray = Plotting.Array(theta), rArray = Plotting.Array(r);
+            if (thetaArray.Length != rArray.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            if (bins <= 0)
+            {
+                xs = thetaArray; ys = rArray;
+                return;
+            }
+            int[] kept = PolarDecimation.Decimate(thetaArray, rArray, 0, thetaArray.Length, bins);
+            xs = new double[kept.Length]; ys = new double[kept.Length];
+            for (int i = 0; i < kept.Length; ++i)
+            {
+                xs[i] = thetaArray[kept[i]]; ys[i] = rArray[kept[i]];
+            }
+        }
+    }
+}
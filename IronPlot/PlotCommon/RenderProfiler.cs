@@ -0,0 +1,287 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Globalization;
+using System.IO;
+using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Text;
+using System.Threading;
+using System.Windows;
+using System.Windows.Media;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// The stages of drawing a plot that are timed by the RenderProfiler.
+    /// </summary>
+    public enum RenderStage
+    {
+        /// <summary>PlotPanel arrange pass, including the stages of its items and axes.</summary>
+        PanelArrange,
+        /// <summary>Plot2DCurve.BeforeArrange, including FilterMinMax and geometry stages.</summary>
+        CurveArrange,
+        FilterMinMax,
+        LineGeometry,
+        MarkerGeometry,
+        DeriveTicks,
+        /// <summary>Updating and measuring tick labels (the LabelCache).</summary>
+        LabelLayout,
+        Direct2DDraw,
+        SurfaceDraw
+    }
+
+    /// <summary>
+    /// One timed stage, as held in the RenderProfiler's ring buffer. Times are Stopwatch timestamps.
+    /// PointsIn and PointsOut are -1 where they do not apply. Owner is a weak reference to the element that
+    /// recorded the event, so that the buffer does not keep closed plots alive.
+    /// </summary>
+    public struct RenderEvent
+    {
+        public WeakReference Owner;
+        public RenderStage Stage;
+        public long Start;
+        public long Duration;
+        public int PointsIn;
+        public int PointsOut;
+        public long AllocatedBytes;
+        public int ThreadId;
+
+        public double Milliseconds
+        {
+            get { return Duration * 1000.0 / Stopwatch.Frequency; }
+        }
+    }
+
+    /// <summary>
+    /// Start of a stage, from RenderProfiler.Start.
+    /// </summary>
+    public struct RenderMark
+    {
+        internal long Timestamp;
+        internal long Allocated;
+    }
+
+    /// <summary>
+    /// Totals of one stage of one plot over the events in the RenderProfiler's buffer.
+    /// </summary>
+    public class RenderStageStats
+    {
+        public object Plot { get; internal set; }
+        public RenderStage Stage { get; internal set; }
+        public int Count { get; internal set; }
+        public double TotalMilliseconds { get; internal set; }
+        public double MaxMilliseconds { get; internal set; }
+        public double LastMilliseconds { get; internal set; }
+        /// <summary>Points in and out of the most recent event (-1 where they do not apply).</summary>
+        public int PointsIn { get; internal set; }
+        public int PointsOut { get; internal set; }
+        public long AllocatedBytes { get; internal set; }
+
+        public double MeanMilliseconds
+        {
+            get { return Count == 0 ? 0 : TotalMilliseconds / Count; }
+        }
+    }
+
+    /// <summary>
+    /// Low-overhead instrumentation of the stages of drawing plots. Each stage is bracketed by Start and Stop, which
+    /// record its duration, points in and out and the bytes allocated meanwhile into a fixed-size ring buffer.
+    /// When disabled (the default) Start and Stop return after testing one flag. Allocation is measured with
+    /// AppDomain resource monitoring, which is switched on when the profiler is first enabled; it counts
+    /// allocations on all threads and is only accurate to a few kilobytes.
+    /// </summary>
+    public static class RenderProfiler
+    {
+        public const int DefaultCapacity = 65536;
+
+        static volatile bool enabled = false;
+        static RenderEvent[] events = new RenderEvent[DefaultCapacity];
+        static long recorded = 0;
+        static object bufferLocker = new object();
+        // One weak reference per owner, made on its first event:
+        static ConditionalWeakTable<object, WeakReference> owners = new ConditionalWeakTable<object, WeakReference>();
+
+        public static bool Enabled
+        {
+            set
+            {
+                if (value && !AppDomain.MonitoringIsEnabled) AppDomain.MonitoringIsEnabled = true;
+                enabled = value;
+            }
+            get { return enabled; }
+        }
+
+        /// <summary>
+        /// Number of events kept: older events are overwritten. Setting this clears the buffer.
+        /// </summary>
+        public static int Capacity
+        {
+            set
+            {
+                if (value < 1) throw new ArgumentException("Capacity must be positive.");
+                lock (bufferLocker)
+                {
+                    events = new RenderEvent[value];
+                    recorded = 0;
+                }
+            }
+            get { return events.Length; }
+        }
+
+        public static RenderMark Start()
+        {
+            RenderMark mark = new RenderMark();
+            if (!enabled) return mark;
+            mark.Allocated = AppDomain.CurrentDomain.MonitoringTotalAllocatedMemorySize;
+            mark.Timestamp = Stopwatch.GetTimestamp();
+            return mark;
+        }
+
+        public static void Stop(object owner, RenderStage stage, RenderMark mark)
+        {
+            Stop(owner, stage, mark, -1, -1);
+        }
+
+        /// <summary>
+        /// Record the stage started at mark. Nothing is recorded if the profiler was disabled at the start.
+        /// </summary>
+        public static void Stop(object owner, RenderStage stage, RenderMark mark, int pointsIn, int pointsOut)
+        {
+            if (!enabled || mark.Timestamp == 0) return;
+            long end = Stopwatch.GetTimestamp();
+            RenderEvent renderEvent = new RenderEvent()
+            {
+                Owner = owner == null ? null : owners.GetValue(owner, key => new WeakReference(key)), Stage = stage, Start = mark.Timestamp, Duration = end - mark.Timestamp,
+                PointsIn = pointsIn, PointsOut = pointsOut,
+                AllocatedBytes = AppDomain.CurrentDomain.MonitoringTotalAllocatedMemorySize - mark.Allocated,
+                ThreadId = Thread.CurrentThread.ManagedThreadId
+            };
+            lock (bufferLocker)
+            {
+                events[recorded % events.Length] = renderEvent;
+                recorded++;
+            }
+        }
+
+        public static void Clear()
+        {
+            lock (bufferLocker)
+            {
+                Array.Clear(events, 0, events.Length);
+                recorded = 0;
+            }
+        }
+
+        /// <summary>
+        /// The events in the buffer, oldest first.
+        /// </summary>
+        public static RenderEvent[] Events()
+        {
+            lock (bufferLocker)
+            {
+                int count = (int)Math.Min(recorded, events.Length);
+                RenderEvent[] copy = new RenderEvent[count];
+                int first = (int)((recorded - count) % events.Length);
+                for (int i = 0; i < count; ++i) copy[i] = events[(first + i) % events.Length];
+                return copy;
+            }
+        }
+
+        /// <summary>
+        /// Totals by plot and stage of the events in the buffer. The plot is the Plot2D or Plot3D containing the
+        /// element that recorded the event, or the element itself if it is not (or no longer) in a plot.
+        /// Events of elements that have since been collected are left out.
+        /// Must be called on the thread of the plots.
+        /// </summary>
+        public static List<RenderStageStats> Summary()
+        {
+            Dictionary<object, object> plots = new Dictionary<object, object>();
+            Dictionary<Tuple<object, RenderStage>, RenderStageStats> stats = new Dictionary<Tuple<object, RenderStage>, RenderStageStats>();
+            List<RenderStageStats> summary = new List<RenderStageStats>();
+            foreach (RenderEvent renderEvent in Events())
+            {
+                object plot, owner = renderEvent.Owner == null ? null : renderEvent.Owner.Target;
+                if (owner == null)
+                {
+                    if (renderEvent.Owner != null) continue;
+                    plot = null;
+                }
+                else if (!plots.TryGetValue(owner, out plot))
+                {
+                    plot = PlotOf(owner);
+                    plots.Add(owner, plot);
+                }
+                Tuple<object, RenderStage> key = Tuple.Create(plot, renderEvent.Stage);
+                RenderStageStats stageStats;
+                if (!stats.TryGetValue(key, out stageStats))
+                {
+                    stageStats = new RenderStageStats() { Plot = plot, Stage = renderEvent.Stage };
+                    stats.Add(key, stageStats);
+                    summary.Add(stageStats);
+                }
+                double milliseconds = renderEvent.Milliseconds;
+                stageStats.Count++;
+                stageStats.TotalMilliseconds += milliseconds;
+                stageStats.MaxMilliseconds = Math.Max(stageStats.MaxMilliseconds, milliseconds);
+                stageStats.LastMilliseconds = milliseconds;
+                stageStats.PointsIn = renderEvent.PointsIn;
+                stageStats.PointsOut = renderEvent.PointsOut;
+                stageStats.AllocatedBytes += renderEvent.AllocatedBytes;
+            }
+            return summary;
+        }
+
+        /// <summary>
+        /// Write the events in the buffer as a Chrome trace (JSON, as read by chrome://tracing or Perfetto), so that
+        /// a whole interaction can be viewed on a timeline. Must be called on the thread of the plots.
+        /// </summary>
+        public static void WriteChromeTrace(string path)
+        {
+            RenderEvent[] copy = Events();
+            Dictionary<object, string> names = new Dictionary<object, string>();
+            int processId = Process.GetCurrentProcess().Id;
+            double microsecondsPerTick = 1e6 / Stopwatch.Frequency;
+            using (StreamWriter writer = new StreamWriter(path, false, new UTF8Encoding(false)))
+            {
+                writer.Write("{\"traceEvents\":[");
+                for (int i = 0; i < copy.Length; ++i)
+                {
+                    RenderEvent renderEvent = copy[i];
+                    string name = "";
+                    object owner = renderEvent.Owner == null ? null : renderEvent.Owner.Target;
+                    if (owner != null && !names.TryGetValue(owner, out name))
+                    {
+                        object plot = PlotOf(owner);
+                        name = plot.GetType().Name + " " + RuntimeHelpers.GetHashCode(plot).ToString("x8");
+                        names.Add(owner, name);
+                    }
+                    if (i > 0) writer.Write(",");
+                    writer.Write(String.Format(CultureInfo.InvariantCulture,
+                        "\r\n{{\"name\":\"{0}\",\"cat\":\"ironplot\",\"ph\":\"X\",\"ts\":{1:F3},\"dur\":{2:F3},\"pid\":{3},\"tid\":{4},"
+                        + "\"args\":{{\"plot\":\"{5}\",\"pointsIn\":{6},\"pointsOut\":{7},\"allocatedBytes\":{8}}}}}",
+                        renderEvent.Stage, renderEvent.Start * microsecondsPerTick, renderEvent.Duration * microsecondsPerTick,
+                        processId, renderEvent.ThreadId, name, renderEvent.PointsIn, renderEvent.PointsOut, renderEvent.AllocatedBytes));
+                }
+                writer.Write("\r\n],\"displayTimeUnit\":\"ms\"}");
+            }
+        }
+
+        private static object PlotOf(object owner)
+        {
+            DependencyObject current = owner as DependencyObject;
+            // Plot items are not in the visual tree: start from the panel that hosts them.
+            if (owner is Plot2DItem) current = ((Plot2DItem)owner).Host;
+            while (current != null)
+            {
+                if (current is Plot2D || current is IronPlot.Plotting3D.Plot3D) return current;
+                DependencyObject parent = LogicalTreeHelper.GetParent(current);
+                if (parent == null && (current is Visual || current is System.Windows.Media.Media3D.Visual3D)) parent = VisualTreeHelper.GetParent(current);
+                current = parent;
+            }
+            return owner;
+        }
+    }
+}
@@ -0,0 +1,353 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Two-dimensional index of points for picking: nearest point, k nearest points, and the points in a rectangle
+    /// or polygon (lasso). The points need not be sorted in either coordinate.
+    /// The index is a k-d tree held in flat arrays: the points are reordered so that each node is a contiguous range,
+    /// split at its middle along the wider side of its bounding box, down to leaves of at most LeafSize points.
+    /// Building takes O(n log n) (in parallel for large subtrees); a nearest point query visits O(log n) nodes.
+    /// Distances are measured with separate scales for x and y (e.g. screen pixels per unit), so that the nearest
+    /// point is the nearest on screen. Points with NaN or infinite coordinates are not indexed.
+    /// Indices are those of the arrays the index was built from.
+    /// </summary>
+    public class SpatialIndex
+    {
+        const int LeafSize = 32;
+        // Subtrees with more points than this are built in parallel.
+        const int ParallelBuildSize = 65536;
+
+        double[] xs, ys;
+        int[] order;
+        int count;
+        // Bounding box of each node; node k has children 2k + 1 and 2k + 2.
+        double[] nodeXMin, nodeXMax, nodeYMin, nodeYMax;
+
+        public SpatialIndex(double[] x, double[] y) : this(x, y, 0, x.Length) { }
+
+        /// <summary>
+        /// Index points start (inclusive) to end (exclusive) of x and y.
+        /// </summary>
+        public SpatialIndex(double[] x, double[] y, int start, int end)
+        {
+            if (x.Length != y.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            order = new int[end - start];
+            for (int i = start; i < end; ++i)
+            {
+                if (IsFinite(x[i]) && IsFinite(y[i])) order[count++] = i;
+            }
+            xs = new double[count]; ys = new double[count];
+            for (int k = 0; k < count; ++k) { xs[k] = x[order[k]]; ys[k] = y[order[k]]; }
+            int depth = 0;
+            while (((long)count + (1L << depth) - 1) >> depth > LeafSize) depth++;
+            int nodes = (1 << (depth + 1)) - 1;
+            nodeXMin = new double[nodes]; nodeXMax = new double[nodes];
+            nodeYMin = new double[nodes]; nodeYMax = new double[nodes];
+            if (count > 0) Build(0, 0, count);
+        }
+
+        /// <summary>
+        /// Number of points indexed.
+        /// </summary>
+        public int Count
+        {
+            get { return count; }
+        }
+
+        /// <summary>
+        /// Index of the point nearest (x, y), or -1 if there are no points.
+        /// Distance is measured in units of 1 / xScale along x and 1 / yScale along y.
+        /// </summary>
+        public int Nearest(double x, double y, double xScale, double yScale)
+        {
+            double[] distances;
+            int[] nearest = Nearest(x, y, 1, xScale, yScale, out distances);
+            return nearest.Length > 0 ? nearest[0] : -1;
+        }
+
+        /// <summary>
+        /// Indices of the k points nearest (x, y), nearest first, and their squared (scaled) distances.
+        /// </summary>
+        public int[] Nearest(double x, double y, int k, double xScale, double yScale, out double[] distances)
+        {
+            k = Math.Max(0, Math.Min(k, count));
+            // Max-heap of the best k so far, by squared distance:
+            double[] heapDistance = new double[k];
+            int[] heapIndex = new int[k];
+            int size = 0;
+            if (k > 0)
+            {
+                Stack<int> stack = new Stack<int>();
+                stack.Push(0);
+                while (stack.Count > 0)
+                {
+                    int node = stack.Pop();
+                    if (size == k && BoxDistance(node, x, y, xScale, yScale) >= heapDistance[0]) continue;
+                    int lo, hi;
+                    Range(node, out lo, out hi);
+                    if (hi - lo <= LeafSize)
+                    {
+                        for (int i = lo; i < hi; ++i)
+                        {
+                            double dx = (xs[i] - x) * xScale, dy = (ys[i] - y) * yScale;
+                            double distance = dx * dx + dy * dy;
+                            if (size < k) HeapPush(heapDistance, heapIndex, ref size, distance, i);
+                            else if (distance < heapDistance[0]) HeapReplace(heapDistance, heapIndex, size, distance, i);
+                        }
+                        continue;
+                    }
+                    // Visit the nearer child first: it is pushed last.
+                    int left = 2 * node + 1, right = 2 * node + 2;
+                    if (BoxDistance(left, x, y, xScale, yScale) <= BoxDistance(right, x, y, xScale, yScale))
+                    {
+                        stack.Push(right); stack.Push(left);
+                    }
+                    else
+                    {
+                        stack.Push(left); stack.Push(right);
+                    }
+                }
+            }
+            // Sort the heap, nearest first:
+            int[] result = new int[size];
+            distances = new double[size];
+            for (int j = size - 1; j >= 0; --j)
+            {
+                result[j] = order[heapIndex[0]];
+                distances[j] = heapDistance[0];
+                int last = size - 1;
+                heapDistance[0] = heapDistance[last]; heapIndex[0] = heapIndex[last];
+                size--;
+                SiftDown(heapDistance, heapIndex, size, 0);
+            }
+            return result;
+        }
+
+        /// <summary>
+        /// Indices, ascending, of the points with xMin &lt;= x &lt;= xMax and yMin &lt;= y &lt;= yMax.
+        /// </summary>
+        public int[] InRectangle(double xMin, double xMax, double yMin, double yMax)
+        {
+            List<int> positions = PositionsInRectangle(xMin, xMax, yMin, yMax);
+            int[] selected = new int[positions.Count];
+            for (int j = 0; j < selected.Length; ++j) selected[j] = order[positions[j]];
+            Array.Sort(selected);
+            return selected;
+        }
+
+        /// <summary>
+        /// Indices, ascending, of the points inside the polygon with vertices (polygonX[i], polygonY[i]) (even-odd rule).
+        /// Only the points in the bounding box of the polygon are tested.
+        /// </summary>
+        public int[] InPolygon(double[] polygonX, double[] polygonY)
+        {
+            if (polygonX.Length != polygonY.Length) throw new ArgumentException("Component vectors' lengths must be equal");
+            if (polygonX.Length < 3) return new int[0];
+            List<int> candidates = PositionsInRectangle(polygonX.Min(), polygonX.Max(), polygonY.Min(), polygonY.Max());
+            bool[] inside = new bool[candidates.Count];
+            Parallel.For(0, (candidates.Count + ParallelBuildSize - 1) / ParallelBuildSize, chunk =>
+            {
+                int end = Math.Min(candidates.Count, (chunk + 1) * ParallelBuildSize);
+                for (int j = chunk * ParallelBuildSize; j < end; ++j)
+                {
+                    int k = candidates[j];
+                    inside[j] = InsidePolygon(xs[k], ys[k], polygonX, polygonY);
+                }
+            });
+            List<int> selected = new List<int>();
+            for (int j = 0; j < candidates.Count; ++j)
+            {
+                if (inside[j]) selected.Add(order[candidates[j]]);
+            }
+            int[] result = selected.ToArray();
+            Array.Sort(result);
+            return result;
+        }
+
+        /// <summary>
+        /// Positions in the tree order of the points in the rectangle. Nodes entirely inside are taken whole.
+        /// </summary>
+        private List<int> PositionsInRectangle(double xMin, double xMax, double yMin, double yMax)
+        {
+            List<int> positions = new List<int>();
+            if (count == 0) return positions;
+            Stack<int> stack = new Stack<int>();
+            stack.Push(0);
+            while (stack.Count > 0)
+            {
+                int node = stack.Pop();
+                if (nodeXMin[node] > xMax || nodeXMax[node] < xMin || nodeYMin[node] > yMax || nodeYMax[node] < yMin) continue;
+                int lo, hi;
+                Range(node, out lo, out hi);
+                if (nodeXMin[node] >= xMin && nodeXMax[node] <= xMax && nodeYMin[node] >= yMin && nodeYMax[node] <= yMax)
+                {
+                    for (int i = lo; i < hi; ++i) positions.Add(i);
+                }
+                else if (hi - lo <= LeafSize)
+                {
+                    for (int i = lo; i < hi; ++i)
+                    {
+                        if (xs[i] >= xMin && xs[i] <= xMax && ys[i] >= yMin && ys[i] <= yMax) positions.Add(i);
+                    }
+                }
+                else
+                {
+                    stack.Push(2 * node + 2); stack.Push(2 * node + 1);
+                }
+            }
+            return positions;
+        }
+
+        private static bool InsidePolygon(double x, double y, double[] polygonX, double[] polygonY)
+        {
+            bool inside = false;
+            for (int i = 0, j = polygonX.Length - 1; i < polygonX.Length; j = i++)
+            {
+                if ((polygonY[i] > y) != (polygonY[j] > y)
+                    && x < (polygonX[j] - polygonX[i]) * (y - polygonY[i]) / (polygonY[j] - polygonY[i]) + polygonX[i])
+                    inside = !inside;
+            }
+            return inside;
+        }
+
+        /// <summary>
+        /// Build the subtree of node, for points lo (inclusive) to hi (exclusive) of the tree order.
+        /// </summary>
+        private void Build(int node, int lo, int hi)
+        {
+            double xMin = Double.PositiveInfinity, xMax = Double.NegativeInfinity;
+            double yMin = Double.PositiveInfinity, yMax = Double.NegativeInfinity;
+            for (int i = lo; i < hi; ++i)
+            {
+                if (xs[i] < xMin) xMin = xs[i];
+                if (xs[i] > xMax) xMax = xs[i];
+                if (ys[i] < yMin) yMin = ys[i];
+                if (ys[i] > yMax) yMax = ys[i];
+            }
+            nodeXMin[node] = xMin; nodeXMax[node] = xMax; nodeYMin[node] = yMin; nodeYMax[node] = yMax;
+            if (hi - lo <= LeafSize) return;
+            int mid = lo + (hi - lo) / 2;
+            // Split the wider side, relative to the extent of the whole index:
+            bool splitX = (xMax - xMin) * (nodeYMax[0] - nodeYMin[0]) >= (yMax - yMin) * (nodeXMax[0] - nodeXMin[0]);
+            Select(splitX ? xs : ys, lo, hi - 1, mid);
+            if (hi - lo > ParallelBuildSize)
+            {
+                Parallel.Invoke(() => Build(2 * node + 1, lo, mid), () => Build(2 * node + 2, mid, hi));
+            }
+            else
+            {
+                Build(2 * node + 1, lo, mid);
+                Build(2 * node + 2, mid, hi);
+            }
+        }
+
+        /// <summary>
+        /// Reorder points left to right (inclusive) so that the point at nth has the value of key it would have if sorted,
+        /// with no greater values before it and no smaller values after it (quickselect).
+        /// </summary>
+        private void Select(double[] key, int left, int right, int nth)
+        {
+            while (right > left)
+            {
+                int middle = left + (right - left) / 2;
+                // Median of three as the pivot:
+                if (key[middle] < key[left]) Swap(middle, left);
+                if (key[right] < key[left]) Swap(right, left);
+                if (key[right] < key[middle]) Swap(right, middle);
+                double pivot = key[middle];
+                int i = left, j = right;
+                while (i <= j)
+                {
+                    while (key[i] < pivot) i++;
+                    while (key[j] > pivot) j--;
+                    if (i <= j)
+                    {
+                        Swap(i, j);
+                        i++; j--;
+                    }
+                }
+                if (nth <= j) right = j;
+                else if (nth >= i) left = i;
+                else return;
+            }
+        }
+
+        private void Swap(int i, int j)
+        {
+            double x = xs[i]; xs[i] = xs[j]; xs[j] = x;
+            double y = ys[i]; ys[i] = ys[j]; ys[j] = y;
+            int index = order[i]; order[i] = order[j]; order[j] = index;
+        }
+
+        /// <summary>
+        /// The range of points (lo inclusive, hi exclusive) of a node, from the halving of the ranges of its ancestors.
+        /// </summary>
+        private void Range(int node, out int lo, out int hi)
+        {
+            lo = 0; hi = count;
+            // Path from the root, most significant step first:
+            int depth = 0;
+            for (int k = node + 1; k > 1; k >>= 1) depth++;
+            for (int level = depth - 1; level >= 0; --level)
+            {
+                int mid = lo + (hi - lo) / 2;
+                if ((((node + 1) >> level) & 1) == 0) hi = mid;
+                else lo = mid;
+            }
+        }
+
+        private double BoxDistance(int node, double x, double y, double xScale, double yScale)
+        {
+            double dx = (x < nodeXMin[node]) ? nodeXMin[node] - x : (x > nodeXMax[node] ? x - nodeXMax[node] : 0);
+            double dy = (y < nodeYMin[node]) ? nodeYMin[node] - y : (y > nodeYMax[node] ? y - nodeYMax[node] : 0);
+            dx *= xScale; dy *= yScale;
+            return dx * dx + dy * dy;
+        }
+
+        private static void HeapPush(double[] distance, int[] index, ref int size, double value, int item)
+        {
+            int i = size++;
+            while (i > 0)
+            {
+                int parent = (i - 1) / 2;
+                if (distance[parent] >= value) break;
+                distance[i] = distance[parent]; index[i] = index[parent];
+                i = parent;
+            }
+            distance[i] = value; index[i] = item;
+        }
+
+        private static void HeapReplace(double[] distance, int[] index, int size, double value, int item)
+        {
+            distance[0] = value; index[0] = item;
+            SiftDown(distance, index, size, 0);
+        }
+
+        private static void SiftDown(double[] distance, int[] index, int size, int i)
+        {
+            double value = distance[i]; int item = index[i];
+            while (true)
+            {
+                int child = 2 * i + 1;
+                if (child >= size) break;
+                if (child + 1 < size && distance[child + 1] > distance[child]) child++;
+                if (distance[child] <= value) break;
+                distance[i] = distance[child]; index[i] = index[child];
+                i = child;
+            }
+            distance[i] = value; index[i] = item;
+        }
+
+        private static bool IsFinite(double value)
+        {
+            return !Double.IsNaN(value) && !Double.IsInfinity(value);
+        }
+    }
+}
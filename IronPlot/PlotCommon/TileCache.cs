@@ -0,0 +1,125 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace IronPlot
+{
+    /// <summary>
+    /// Least-recently-used cache with a memory cap: each value is added with its size in bytes, and the least
+    /// recently used values are discarded whenever the total size exceeds Capacity.
+    /// </summary>
+    public class TileCache<TKey, TValue>
+    {
+        struct Entry
+        {
+            public TKey Key;
+            public TValue Value;
+            public long Size;
+        }
+
+        Dictionary<TKey, LinkedListNode<Entry>> entries = new Dictionary<TKey, LinkedListNode<Entry>>();
+        // Most recently used first:
+        LinkedList<Entry> order = new LinkedList<Entry>();
+        long capacity, size, hits, misses;
+
+        public TileCache(long capacity)
+        {
+            Capacity = capacity;
+        }
+
+        /// <summary>
+        /// Maximum total size in bytes of the cached values.
+        /// </summary>
+        public long Capacity
+        {
+            get { return capacity; }
+            set
+            {
+                if (value < 0) throw new ArgumentException("Capacity must not be negative");
+                capacity = value;
+                Trim();
+            }
+        }
+
+        /// <summary>
+        /// Total size in bytes of the cached values.
+        /// </summary>
+        public long Size
+        {
+            get { return size; }
+        }
+
+        public int Count
+        {
+            get { return entries.Count; }
+        }
+
+        public long Hits
+        {
+            get { return hits; }
+        }
+
+        public long Misses
+        {
+            get { return misses; }
+        }
+
+        public bool TryGetValue(TKey key, out TValue value)
+        {
+            LinkedListNode<Entry> node;
+            if (entries.TryGetValue(key, out node))
+            {
+                order.Remove(node);
+                order.AddFirst(node);
+                value = node.Value.Value;
+                hits++;
+                return true;
+            }
+            value = default(TValue);
+            misses++;
+            return false;
+        }
+
+        /// <summary>
+        /// Add (or replace) the value for key, then discard least recently used values until the cache fits its capacity.
+        /// </summary>
+        public void Add(TKey key, TValue value, long size)
+        {
+            Remove(key);
+            entries[key] = order.AddFirst(new Entry() { Key = key, Value = value, Size = size });
+            this.size += size;
+            Trim();
+        }
+
+        public bool Remove(TKey key)
+        {
+            LinkedListNode<Entry> node;
+            if (!entries.TryGetValue(key, out node)) return false;
+            order.Remove(node);
+            entries.Remove(key);
+            size -= node.Value.Size;
+            return true;
+        }
+
+        public void Clear()
+        {
+            entries.Clear();
+            order.Clear();
+            size = 0;
+        }
+
+        private void Trim()
+        {
+            while (size > capacity && order.Count > 0)
+            {
+                Entry last = order.Last.Value;
+                order.RemoveLast();
+                entries.Remove(last.Key);
+                size -= last.Size;
+            }
+        }
+    }
+}
@@ -77,5 +77,26 @@ namespace IronPythonConsole
             get { return pad.Console.DisableAutocompletionForCallables; }
             set { pad.Console.DisableAutocompletionForCallables = value; }
         }
+
+        [DefaultValue(30.0)]
+        public double OutputFrameRate
+        {
+            get { return pad.Output.MaxFrameRate; }
+            set { pad.Output.MaxFrameRate = value; }
+        }
+
+        [DefaultValue(10000)]
+        public int ScrollbackLines
+        {
+            get { return pad.Output.MaxScrollbackLines; }
+            set { pad.Output.MaxScrollbackLines = value; }
+        }
+
+        [DefaultValue(4000000)]
+        public int ScrollbackCharacters
+        {
+            get { return pad.Output.MaxScrollbackCharacters; }
+            set { pad.Output.MaxScrollbackCharacters = value; }
+        }
     }
 }
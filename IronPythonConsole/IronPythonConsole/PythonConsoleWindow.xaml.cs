@@ -166,6 +166,12 @@ namespace IronPythonConsole
 			textEditor.Save(currentFileName);
 		}
 
+        void saveOutputClick(object sender, RoutedEventArgs e)
+        {
+            SaveFileDialog dlg = new SaveFileDialog { DefaultExt = ".txt", Filter = "Plain Text|*.txt|All Files|*.*", FilterIndex = 0 };
+            if (dlg.ShowDialog() ?? false) console.Pad.Output.SaveLog(dlg.FileName);
+        }
+
         void runClick(object sender, EventArgs e)
         {
             RunStatements();
@@ -0,0 +1,223 @@
+﻿// Copyright (c) 2010 Joe Moorhouse
+
+using System;
+using System.Collections.Concurrent;
+using System.IO;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using System.Windows.Threading;
+using ICSharpCode.AvalonEdit.Document;
+
+namespace PythonConsoleControl
+{
+    /// <summary>
+    /// Buffers text written to the console from any thread and writes it to the document on the UI thread
+    /// at most MaxFrameRate times a second, however often it is written.
+    /// The document keeps at most MaxScrollbackLines lines and MaxScrollbackCharacters characters: the oldest
+    /// text is removed, to a temporary file, so that SaveLog can still write the whole of the output. Buffered text
+    /// beyond the limits goes straight to the file, without being inserted into the document.
+    /// </summary>
+    public class ConsoleOutputBuffer
+    {
+        public event EventHandler Flushed;
+
+        ConcurrentQueue<string> pending = new ConcurrentQueue<string>();
+        // 1 while a flush is scheduled on the UI thread.
+        int flushScheduled = 0;
+        long lastFlushTicks = 0;
+        Dispatcher dispatcher;
+        TextDocument document;
+        Action<string> output;
+        string evictedPath = null;
+        long evictedCharacters = 0;
+
+        /// <param name="output">Writes text to the end of the document; called on the UI thread.</param>
+        public ConsoleOutputBuffer(Dispatcher dispatcher, TextDocument document, Action<string> output)
+        {
+            this.dispatcher = dispatcher;
+            this.document = document;
+            this.output = output;
+            MaxFrameRate = 30;
+            MaxScrollbackLines = 10000;
+            MaxScrollbackCharacters = 4000000;
+        }
+
+        /// <summary>
+        /// Largest number of times a second that buffered text is written to the document.
+        /// </summary>
+        public double MaxFrameRate { get; set; }
+
+        /// <summary>
+        /// Lines of the document kept; older lines are removed. Zero for no limit.
+        /// </summary>
+        public int MaxScrollbackLines { get; set; }
+
+        /// <summary>
+        /// Characters of the document kept; older lines are removed. Zero for no limit.
+        /// </summary>
+        public int MaxScrollbackCharacters { get; set; }
+
+        /// <summary>
+        /// Characters removed from the start of the document so far.
+        /// </summary>
+        public long EvictedCharacters
+        {
+            get { return Interlocked.Read(ref evictedCharacters); }
+        }
+
+        /// <summary>
+        /// True if there is text that has not yet been written to the document.
+        /// </summary>
+        public bool Pending
+        {
+            get { return !pending.IsEmpty || flushScheduled == 1; }
+        }
+
+        /// <summary>
+        /// Add text to the buffer. Can be called from any thread, and does not wait for the UI thread.
+        /// </summary>
+        public void Write(string text)
+        {
+            if (string.IsNullOrEmpty(text)) return;
+            pending.Enqueue(text);
+            if (Interlocked.CompareExchange(ref flushScheduled, 1, 0) != 0) return;
+            long frameTicks = MaxFrameRate > 0 ? (long)(TimeSpan.TicksPerSecond / MaxFrameRate) : 0;
+            long wait = Interlocked.Read(ref lastFlushTicks) + frameTicks - DateTime.UtcNow.Ticks;
+            if (wait <= 0) dispatcher.BeginInvoke(new Action(Flush), DispatcherPriority.Background);
+            else Task.Delay(TimeSpan.FromTicks(wait)).ContinueWith(t => dispatcher.BeginInvoke(new Action(Flush), DispatcherPriority.Background));
+        }
+
+        /// <summary>
+        /// Write all buffered text to the document now. Must be called on the UI thread.
+        /// </summary>
+        public void Flush()
+        {
+            // Cleared first, so that text written while the buffer is drained schedules another flush.
+            Interlocked.Exchange(ref flushScheduled, 0);
+            Interlocked.Exchange(ref lastFlushTicks, DateTime.UtcNow.Ticks);
+            string text;
+            if (!pending.TryDequeue(out text)) return;
+            string next;
+            if (pending.TryDequeue(out next))
+            {
+                StringBuilder builder = new StringBuilder(text);
+                do builder.Append(next); while (pending.TryDequeue(out next));
+                text = builder.ToString();
+            }
+            text = text.Replace("\r\r\n", "\r").Replace("\r\n", "\r");
+            // Text that would be removed as soon as it was written is removed before, so that a burst of output
+            // larger than the scrollback is not all inserted into the document.
+            int overflow = Overflow(text);
+            if (overflow > 0)
+            {
+                Evict(document.Text + text.Substring(0, overflow));
+                document.Remove(0, document.TextLength);
+                document.UndoStack.ClearAll();
+                text = text.Substring(overflow);
+            }
+            output(text);
+            TrimScrollback();
+            if (Flushed != null) Flushed(this, EventArgs.Empty);
+        }
+
+        /// <summary>
+        /// Write everything written to the console, including text removed from the document, to path.
+        /// Must be called on the UI thread.
+        /// </summary>
+        public void SaveLog(string path)
+        {
+            Flush();
+            using (FileStream log = new FileStream(path, FileMode.Create, FileAccess.Write))
+            {
+                if (evictedPath != null)
+                {
+                    using (FileStream evicted = File.OpenRead(evictedPath)) evicted.CopyTo(log);
+                }
+                byte[] text = Encoding.UTF8.GetBytes(LogText(document.Text));
+                log.Write(text, 0, text.Length);
+            }
+        }
+
+        /// <summary>
+        /// Text of the document with the line endings of the platform (the console ends lines with '\r').
+        /// </summary>
+        private static string LogText(string text)
+        {
+            return text.Replace("\r\n", "\n").Replace('\r', '\n').Replace("\n", Environment.NewLine);
+        }
+
+        /// <summary>
+        /// Length of the whole lines at the start of text that TrimScrollback would remove, with the whole of the
+        /// document, if text were written to it: those beyond the scrollback limits counting from the end of text.
+        /// </summary>
+        private int Overflow(string text)
+        {
+            char[] delimiters = { '\r', '\n' };
+            int maxLines = MaxScrollbackLines, maxCharacters = MaxScrollbackCharacters;
+            int overflow = 0;
+            if (maxLines > 0)
+            {
+                // The start of the line maxLines from the end is after the maxLines-th delimiter from the end.
+                int delimiter = text.Length;
+                for (int k = 0; k < maxLines; ++k)
+                {
+                    delimiter = delimiter > 0 ? text.LastIndexOfAny(delimiters, delimiter - 1) : -1;
+                    if (delimiter < 0) break;
+                }
+                if (delimiter >= 0) overflow = delimiter + 1;
+            }
+            if (maxCharacters > 0 && text.Length - overflow > maxCharacters)
+            {
+                int start = text.Length - maxCharacters;
+                int delimiter = text.IndexOfAny(delimiters, start - 1);
+                // Otherwise the rest of text is the last line, which is always kept.
+                if (delimiter < 0) delimiter = text.LastIndexOfAny(delimiters);
+                overflow = Math.Max(overflow, delimiter + 1);
+            }
+            return overflow;
+        }
+
+        /// <summary>
+        /// Remove whole lines from the start of the document until it is within the scrollback limits.
+        /// The last line (the prompt and the command being typed) is always kept.
+        /// </summary>
+        private void TrimScrollback()
+        {
+            int maxLines = MaxScrollbackLines, maxCharacters = MaxScrollbackCharacters;
+            int removeTo = 0;
+            if (maxLines > 0 && document.LineCount > maxLines)
+                removeTo = document.GetLineByNumber(document.LineCount - maxLines + 1).Offset;
+            if (maxCharacters > 0 && document.TextLength - removeTo > maxCharacters)
+            {
+                DocumentLine line = document.GetLineByOffset(document.TextLength - maxCharacters);
+                removeTo = Math.Max(removeTo, line.Offset == document.TextLength - maxCharacters ? line.Offset : line.EndOffset + line.DelimiterLength);
+            }
+            removeTo = Math.Min(removeTo, document.GetLineByNumber(document.LineCount).Offset);
+            if (removeTo <= 0) return;
+            Evict(document.GetText(0, removeTo));
+            document.Remove(0, removeTo);
+            // The undo stack would otherwise keep the removed text.
+            document.UndoStack.ClearAll();
+        }
+
+        private void Evict(string text)
+        {
+            if (evictedPath == null) evictedPath = Path.GetTempFileName();
+            // Whole lines are removed, so no line ending is split between two calls.
+            File.AppendAllText(evictedPath, LogText(text), new UTF8Encoding(false));
+            Interlocked.Add(ref evictedCharacters, text.Length);
+        }
+
+        /// <summary>
+        /// Delete the file of removed text.
+        /// </summary>
+        public void Close()
+        {
+            if (evictedPath == null) return;
+            try { File.Delete(evictedPath); }
+            catch (IOException) { }
+            evictedPath = null;
+        }
+    }
+}
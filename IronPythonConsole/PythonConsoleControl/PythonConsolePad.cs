@@ -40,9 +40,15 @@ namespace PythonConsoleControl
             get { return host.Console; }
         }
 
+        public ConsoleOutputBuffer Output
+        {
+            get { return pythonTextEditor.Output; }
+        }
+
         public void Dispose()
         {
             host.Dispose();
+            pythonTextEditor.Output.Close();
         }
     }
 }
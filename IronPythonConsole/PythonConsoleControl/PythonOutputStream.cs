@@ -3,6 +3,7 @@
 using System;
 using System.IO;
 using System.Text;
+using System.Threading;
 
 namespace PythonConsoleControl
 {
@@ -11,10 +12,15 @@ namespace PythonConsoleControl
         public event EventHandler TextWritten;
 
         PythonTextEditor textEditor;
+        // Keeps the bytes of a character split between two writes.
+        Decoder decoder = Encoding.UTF8.GetDecoder();
+        // 1 if text has been written since TextWritten was last raised.
+        int textPending = 0;
 
         public PythonOutputStream(PythonTextEditor textEditor)
         {
             this.textEditor = textEditor;
+            textEditor.Output.Flushed += OutputFlushed;
         }
 
         public override bool CanRead
@@ -62,15 +68,27 @@ namespace PythonConsoleControl
         }
 
         /// <summary>
-        /// Assumes the bytes are UTF8 and writes them to the text editor.
+        /// Assumes the bytes are UTF8 and writes them to the text editor's output buffer.
+        /// TextWritten is raised once the text reaches the editor, at most once for each flush of the buffer.
         /// </summary>
         public override void Write(byte[] buffer, int offset, int count)
         {
-            string text = UTF8Encoding.UTF8.GetString(buffer, offset, count);
+            string text;
+            lock (decoder)
+            {
+                char[] chars = new char[decoder.GetCharCount(buffer, offset, count)];
+                decoder.GetChars(buffer, offset, count, chars, 0);
+                text = new string(chars);
+            }
+            if (text.Length == 0) return;
+            // Set before the text is buffered, so that the flush that writes it raises TextWritten.
+            Interlocked.Exchange(ref textPending, 1);
             textEditor.Write(text);
-            if (!string.IsNullOrEmpty(text))
-                OnTextWritten();
-            
+        }
+
+        void OutputFlushed(object sender, EventArgs e)
+        {
+            if (Interlocked.Exchange(ref textPending, 0) == 1) OnTextWritten();
         }
 
         protected virtual void OnTextWritten()
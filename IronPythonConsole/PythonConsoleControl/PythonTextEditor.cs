@@ -24,8 +24,7 @@ namespace PythonConsoleControl
     {
         internal TextEditor textEditor;
         internal TextArea textArea;
-        StringBuilder writeBuffer = new StringBuilder();
-        volatile bool writeInProgress = false;
+        ConsoleOutputBuffer output;
         PythonConsoleCompletionWindow completionWindow = null;
         int completionEventIndex = 0;
         int descriptionEventIndex = 1;
@@ -39,6 +38,11 @@ namespace PythonConsoleControl
         {
             this.textEditor = textEditor;
             this.textArea = textEditor.TextArea;
+            output = new ConsoleOutputBuffer(textArea.Dispatcher, textArea.Document, delegate(string text)
+            {
+                MoveToEnd();
+                PerformTextInput(text);
+            });
             completionWaitHandles = new WaitHandle[] { completionRequestedEvent, descriptionRequestedEvent };
             completionThread = new Thread(new ThreadStart(Completion));
             completionThread.Priority = ThreadPriority.Lowest;
@@ -49,7 +53,15 @@ namespace PythonConsoleControl
 
         public bool WriteInProgress
         {
-            get { return writeInProgress; }
+            get { return output.Pending; }
+        }
+
+        /// <summary>
+        /// The buffer of text written to the console, with its frame rate and scrollback limits.
+        /// </summary>
+        public ConsoleOutputBuffer Output
+        {
+            get { return output; }
         }
 
         public ICollection<CommandBinding> CommandBindings
@@ -62,62 +74,24 @@ namespace PythonConsoleControl
             Write(text, false);
         }
 
-        Stopwatch sw;
-
+        /// <summary>
+        /// Write text to the end of the console. Unless allowSynchronous, text is buffered and written on the
+        /// UI thread at the buffer's frame rate (see ConsoleOutputBuffer); otherwise it must be called on the UI thread.
+        /// </summary>
         public void Write(string text, bool allowSynchronous)
         {
-            //text = text.Replace("\r\r\n", "\r\n");
-            text = text.Replace("\r\r\n", "\r");
-            text = text.Replace("\r\n", "\r");
             if (allowSynchronous)
             {
+                // Keep the order of writes:
+                output.Flush();
+                //text = text.Replace("\r\r\n", "\r\n");
+                text = text.Replace("\r\r\n", "\r");
+                text = text.Replace("\r\n", "\r");
                 MoveToEnd();
                 PerformTextInput(text);
                 return;
             }
-            lock (writeBuffer)
-            {
-                writeBuffer.Append(text);
-            }
-            if (!writeInProgress)
-            {
-                writeInProgress = true;
-                ThreadPool.QueueUserWorkItem(new WaitCallback(CheckAndOutputWriteBuffer));
-                sw = Stopwatch.StartNew();
-            }
-        }
-
-        private void CheckAndOutputWriteBuffer(Object stateInfo)
-        {
-            AutoResetEvent writeCompletedEvent = new AutoResetEvent(false);
-            Action action = new Action(delegate()
-            {
-                string toWrite;
-                lock (writeBuffer)
-                {
-                    toWrite = writeBuffer.ToString();
-                    writeBuffer.Remove(0, writeBuffer.Length);
-                    //writeBuffer.Clear();
-                }
-                MoveToEnd();
-                PerformTextInput(toWrite);
-                writeCompletedEvent.Set();
-            });
-            while (true)
-            {
-                // Clear writeBuffer and write out.
-                textArea.Dispatcher.BeginInvoke(action, DispatcherPriority.Normal);
-                // Check if writeBuffer has refilled in the meantime; if so clear and write out again.
-                writeCompletedEvent.WaitOne();
-                lock (writeBuffer)
-                {
-                    if (writeBuffer.Length == 0)
-                    {
-                        writeInProgress = false;
-                        break;
-                    }
-                }
-            }
+            output.Write(text);
         }
 
         private void MoveToEnd()